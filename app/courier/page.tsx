@@ -10,6 +10,7 @@ import CalendarComponent from "@/components/Calendar";
 import { toast } from "sonner";
 import { checkStockBeforeSale, ShortageRow } from "@/hooks/useInventory";
 import InventoryShortageDialog from "@/components/InventoryShortageDialog";
+import { getRecentAddressSets, AddressSet } from "@/lib/deliveryService";
 
 const toLocalDateStr = (d: Date = new Date()) =>
     `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
@@ -44,6 +45,7 @@ export default function CourierSalesPage() {
     const [recipientPhone, setRecipientPhone] = useState("");
     const [recipientAddress, setRecipientAddress] = useState("");
     const [recipientDetailAddress, setRecipientDetailAddress] = useState("");
+    const [recentAddressSets, setRecentAddressSets] = useState<AddressSet[]>([]);
 
     const [isEditMode, setIsEditMode] = useState(false); // [수정] 수정 모드 상태 추가
 
@@ -131,6 +133,21 @@ export default function CourierSalesPage() {
         if (isSameAsOrderer) { setRecipientName(ordererName); setRecipientPhone(ordererPhone); }
     }, [isSameAsOrderer, ordererName, ordererPhone]);
 
+    // 고객을 고르면 최근 배송지 세트(customer_address_sets 5행)를 불러온다
+    useEffect(() => {
+        if (!selectedCustomerId) { setRecentAddressSets([]); return; }
+        let cancelled = false;
+        getRecentAddressSets(selectedCustomerId).then(sets => { if (!cancelled) setRecentAddressSets(sets); });
+        return () => { cancelled = true; };
+    }, [selectedCustomerId]);
+
+    const applyAddressSet = (set: AddressSet) => {
+        setIsSameAsOrderer(set.recipient_name === ordererName && set.recipient_phone === ordererPhone);
+        setRecipientName(set.recipient_name); setRecipientPhone(set.recipient_phone);
+        setRecipientAddress(set.address); setRecipientDetailAddress(set.detail_address || "");
+        if (set.delivery_note) setDeliveryNote(set.delivery_note);
+    };
+
     const handleResetAllStates = () => {
         setEditingRecordId(null); setEditingGroupId(null); setSelectedCustomerId(null); setSearchTerm("");
         setOrdererName(""); setOrdererPhone(""); setRecipientName(""); setRecipientPhone("");
@@ -388,6 +405,20 @@ export default function CourierSalesPage() {
                                         <UserCheck className="w-3.5 h-3.5" /> 주문자고정
                                     </button>
                                 </div>
+                                {recentAddressSets.length > 0 && (
+                                    <div className="flex gap-1.5 overflow-x-auto scrollbar-hide px-1">
+                                        {recentAddressSets.map(set => {
+                                            const active = set.address === recipientAddress && set.recipient_name === recipientName;
+                                            return (
+                                                <button key={`${set.recipient_name}|${set.address}`} onClick={() => applyAddressSet(set)}
+                                                    className={`shrink-0 max-w-[220px] px-3 py-1.5 rounded-xl text-[10px] font-black border truncate transition-all
+                                                        ${active ? 'bg-rose-50 border-rose-300 text-rose-600' : 'bg-white border-slate-200 text-slate-500'}`}>
+                                                    {set.recipient_name || '수령인 없음'} · {set.address}
+                                                </button>
+                                            );
+                                        })}
+                                    </div>
+                                )}
                                 {!isSameAsOrderer && (
                                     <div className="grid grid-cols-1 sm:grid-cols-2 gap-2 animate-in slide-in-from-top-1">
                                         <input type="text" value={recipientName} onChange={(e) => setRecipientName(e.target.value)} placeholder="수령인 성함" className="p-3.5 bg-slate-50 border border-slate-100 rounded-xl text-sm font-black" />
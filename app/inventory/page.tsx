@@ -6,7 +6,7 @@ import { PackageCheck, RefreshCcw, Plus, TrendingUp, TrendingDown, Minus, AlertT
 import EmojiPicker, { EmojiClickData } from "emoji-picker-react";
 import { useAuthStore } from "@/store/authStore";
 import { supabase, FarmCrop, ProcessingRecord } from "@/lib/supabase";
-import { fetchStockMap, StockMap, fetchGradeStockMap, GradeStockMap } from "@/hooks/useInventory";
+import { fetchStockMap, StockMap, fetchGradeStockMap, GradeStockMap, fetchSalesRecordMap } from "@/hooks/useInventory";
 import { formatKSTDate, getNowKST, toKSTDateString } from "@/lib/utils";
 import { toast } from "sonner";
 
@@ -130,18 +130,14 @@ export default function InventoryPage() {
         if (!farm?.id) return;
         setLoading(true);
         try {
-            const [stock, gradeStock, cropsRes, histRes, procRes, runRes, saleRes] = await Promise.all([
+            const [stock, gradeStock, cropsRes, histRes, procRes, runRes, saleMap] = await Promise.all([
                 fetchStockMap(farm.id),
                 fetchGradeStockMap(farm.id),
                 supabase.from("farm_crops").select("*").eq("farm_id", farm.id).order("sort_order"),
                 supabase.from("inventory_adjustments").select("*").eq("farm_id", farm.id).order("adjusted_at", { ascending: false }).limit(30),
                 supabase.from("processing_records").select("*").eq("farm_id", farm.id).order("processed_date", { ascending: false }).limit(20),
                 supabase.from("processing_runs").select("*").eq("farm_id", farm.id).order("run_date", { ascending: false }).limit(20),
-                supabase
-                    .from("inventory_adjustments")
-                    .select("crop_name, quantity, adjustment_type, reason")
-                    .eq("farm_id", farm.id)
-                    .lt("quantity", 0),
+                fetchSalesRecordMap(farm.id),
             ]);
             setStockMap(stock);
             setGradeStockMap(gradeStock);
@@ -169,19 +165,6 @@ export default function InventoryPage() {
 
             setProcessingHistory(mergedProcessing as ProcessingRecord[]);
 
-            const saleMap: Record<string, number> = {};
-            for (const row of saleRes.data ?? []) {
-                const t = String((row as any).adjustment_type ?? "");
-                const reason = String((row as any).reason ?? "");
-                const isSaleType = ["sale", "shipment", "delivery", "order_out"].includes(t);
-                const isSaleReason = /판매|출고/.test(reason);
-                if (!isSaleType && !isSaleReason) continue;
-
-                const cropName = String((row as any).crop_name ?? "");
-                const qty = Math.abs(Number((row as any).quantity ?? 0));
-                if (!cropName || !Number.isFinite(qty) || qty <= 0) continue;
-                saleMap[cropName] = (saleMap[cropName] ?? 0) + qty;
-            }
             setSalesRecordMap(saleMap);
         } finally {
             setLoading(false);
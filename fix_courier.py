@@ -1,4 +1,8 @@
-import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from patchkit.jsx import JsxError, find_element
 
 with open('app/courier/page.tsx', 'r', encoding='utf-8') as f:
     text = f.read()
@@ -8,9 +12,13 @@ if idx != -1:
     before = text[:idx]
     after = text[idx:]
     
-    modal_match = re.search(r'(<div className="fixed inset-0 z-\[100\].*?</div>\s*</div>\s*</div>)', after, re.DOTALL)
-    if modal_match:
-        modal_content = modal_match.group(1)
+    # 닫는 </div> 개수를 짐작하지 않고 태그 짝을 맞춰 모달 요소 전체를 찾는다
+    try:
+        start, end = find_element(after, '<div className="fixed inset-0 z-[100]')
+        modal_content = after[start:end]
+    except JsxError:
+        modal_content = None
+    if modal_content:
         
         # We need to wrap the component return in <> </> so we can put modal at the end securely.
         return_idx = before.rfind('return (')
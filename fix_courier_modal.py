@@ -1,5 +1,9 @@
 import codecs
-import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from patchkit.jsx import JsxError, find_call
 
 file_path = r'c:\Users\User\Desktop\제미나이 3\연습\claude\projects_001\farm-manager\app\courier\page.tsx'
 
@@ -13,8 +17,12 @@ content = content.replace(
 )
 
 # 2. Remove the useEffect for automatic price calculation
-useEffect_pattern = r"    // \[로직 추가\] 수량/단가 변경 시 총 상품 금액 자동 계산\r?\n    useEffect\(\(\) => \{.*?\}, \[quantity, unitPrice\]\);\r?\n"
-content = re.sub(useEffect_pattern, '', content, flags=re.DOTALL)
+#    (주석 줄부터 짝이 맞는 useEffect(...); 까지 한 번에 찾는다)
+try:
+    start, end = find_call(content, '    // [로직 추가] 수량/단가 변경 시 총 상품 금액 자동 계산')
+    content = content[:start] + content[end:]
+except JsxError:
+    pass
 
 # 3. Update handleEdit
 content = content.replace(
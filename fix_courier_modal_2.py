@@ -1,13 +1,17 @@
-import codecs
+import sys
+from pathlib import Path
 
-with open('app/courier/page.tsx', 'r', 'utf-8') as f:
-    lines = f.readlines()
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from patchkit.tsxindex import TsxIndex
 
-# Extract lines 257 to 440 (0-indexed) which corresponds to lines 258 to 441 in file
-form_lines = lines[257:441]
+idx = TsxIndex.for_file('app/courier/page.tsx')
+content = idx.text
 
-# Combine into a string
-form_str = ''.join(form_lines)
+# Locate the order form by structure (inside the component's return) instead of lines[257:441]
+ret = idx.component_return()
+form = idx.element('<div className="relative bg-white/80 backdrop-blur-md p-3 rounded-3xl border border-white shadow-sm space-y-4">', within=ret)
+form_start, form_end = idx.line_start(form.start), idx.line_end(form.end - 1)
+form_str = content[form_start:form_end]
 
 # Apply input changes
 quantity_old = '''onChange={(e) => setQuantity(e.target.value.replace(/[^0-9]/g, ''))}'''
@@ -29,7 +33,6 @@ unitprice_new = '''onChange={(e) => {
                                                 if (q > 0 && p > 0) setCourierTotalPrice((q * p).toString());
                                                 else setCourierTotalPrice("");
                                             }}'''
-unitprice_str_target = '''onChange={(e) => setUnitPrice(stripNonDigits(e.target.value))}\n                                                className="w-full bg-transparent text-xl font-black text-center outline-none text-slate-700"'''
 
 totalprice_old = '''onChange={(e) => setCourierTotalPrice(stripNonDigits(e.target.value))}'''
 totalprice_new = '''onChange={(e) => {
@@ -39,7 +42,6 @@ totalprice_new = '''onChange={(e) => {
                                                 const t = Number(rawT) || 0;
                                                 if (q > 0) setUnitPrice(Math.floor(t / q).toString());
                                             }}'''
-totalprice_target = '''onChange={(e) => setCourierTotalPrice(stripNonDigits(e.target.value))}\n                                            className="w-full bg-transparent text-3xl font-black text-center text-emerald-600 outline-none"'''
 
 form_str = form_str.replace(quantity_old, quantity_new)
 form_str = form_str.replace(unitprice_old, unitprice_new)
@@ -65,11 +67,13 @@ form_str = form_str.replace(btn_old, btn_new)
 
 render_form_func = '    const renderOrderForm = (inModal = false) => (\n' + form_str + '    );\n\n'
 
-# Insert render_form_func at line 223 (before `return (`)
-lines.insert(223, render_form_func)
+# Insert render_form_func before the component's `return (` and replace the form block with a call
+ret_line = idx.line_start(ret.start)
+content = (
+    content[:ret_line] + render_form_func + content[ret_line:form_start]
+    + '                    {!isEditMode && renderOrderForm(false)}\n'
+    + content[form_end:]
+)
 
-# We added 1 item to `lines` array. So the previous form block is now from `258:442` (inclusive length is 184).
-lines[258:442] = ['                    {!isEditMode && renderOrderForm(false)}\n']
-
-with open('app/courier/page.tsx', 'w', 'utf-8') as f:
-    f.writelines(lines)
+with open('app/courier/page.tsx', 'w', encoding='utf-8') as f:
+    f.write(content)
@@ -1,11 +1,17 @@
-with open('app/courier/page.tsx', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+import sys
+from pathlib import Path
 
-# Extract lines 257 to 440 (0-indexed) which corresponds to lines 258 to 441 in file
-form_lines = lines[257:441]
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from patchkit.tsxindex import TsxIndex
 
-# Combine into a string
-form_str = ''.join(form_lines)
+idx = TsxIndex.for_file('app/courier/page.tsx')
+content = idx.text
+
+# Locate the order form by structure (inside the component's return) instead of lines[257:441]
+ret = idx.component_return()
+form = idx.element('<div className="relative bg-white/80 backdrop-blur-md p-3 rounded-3xl border border-white shadow-sm space-y-4">', within=ret)
+form_start, form_end = idx.line_start(form.start), idx.line_end(form.end - 1)
+form_str = content[form_start:form_end]
 
 # Apply input changes
 quantity_old = '''onChange={(e) => setQuantity(e.target.value.replace(/[^0-9]/g, ''))}'''
@@ -61,11 +67,13 @@ form_str = form_str.replace(btn_old, btn_new)
 
 render_form_func = '    const renderOrderForm = (inModal = false) => (\n' + form_str + '    );\n\n'
 
-# Insert render_form_func at line 223 (before `return (`)
-lines.insert(223, render_form_func)
-
-# We added 1 item to `lines` array. So the previous form block is now from `258:442` (inclusive length is 184).
-lines[258:442] = ['                    {!isEditMode && renderOrderForm(false)}\n']
+# Insert render_form_func before the component's `return (` and replace the form block with a call
+ret_line = idx.line_start(ret.start)
+content = (
+    content[:ret_line] + render_form_func + content[ret_line:form_start]
+    + '                    {!isEditMode && renderOrderForm(false)}\n'
+    + content[form_end:]
+)
 
 with open('app/courier/page.tsx', 'w', encoding='utf-8') as f:
-    f.writelines(lines)
+    f.write(content)
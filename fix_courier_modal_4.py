@@ -1,11 +1,25 @@
-with open('app/courier/page.tsx', 'r', encoding='utf-8') as f:
-    content = f.read()
+import sys
+from pathlib import Path
 
-modal_start_str = '{/* 헤더 */}'
-modal_end_str = '</div>\n                    </div>\n                )\n            }'
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from patchkit.jsx import JsxError
+from patchkit.tsxindex import TsxIndex
+
+idx = TsxIndex.for_file('app/courier/page.tsx')
+content = idx.text
 
+# Replace the modal card's children from the header comment up to the card's closing tag,
+# located by structure instead of a content.find() on the closing whitespace
+modal_start_str = '{/* 헤더 */}'
 start_idx = content.find(modal_start_str)
-end_idx = content.find(modal_end_str)
+if start_idx < 0:
+    raise JsxError(f"앵커를 찾지 못함: {modal_start_str!r}")
+card = idx.jsx_at(start_idx)
+if card is None:
+    raise JsxError(f"앵커를 감싸는 JSX 요소가 없음 (line {idx.line_of(start_idx)})")
+end_idx = content.rfind('</div>', card[0], card[1])
+if end_idx < start_idx:
+    raise JsxError(f"모달 카드의 닫는 태그를 찾지 못함 (line {idx.line_of(card[0])})")
 
 new_modal_content = '''{/* 헤더 */}
                             <div className="flex items-center justify-between">
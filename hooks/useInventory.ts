@@ -76,6 +76,49 @@ export async function fetchStockMap(farmId: string): Promise<StockMap> {
     return stock;
 }
 
+/**
+ * 품목별 누적 판매기록(재고와 분리)을 반환한다.
+ * inventory_sales_totals(조정 행이 쓰일 때 트리거가 한 번 분류해 누적한 합계)를 읽는다.
+ * 집계 테이블이 아직 없는 DB에서는 기존 방식(음수 조정 전체를 읽어 분류)으로 계산한다.
+ */
+export async function fetchSalesRecordMap(farmId: string): Promise<Record<string, number>> {
+    const { data, error } = await supabase
+        .from("inventory_sales_totals")
+        .select("crop_name, total_qty")
+        .eq("farm_id", farmId);
+
+    const saleMap: Record<string, number> = {};
+    if (!error) {
+        for (const row of data ?? []) {
+            const qty = Number(row.total_qty ?? 0);
+            if (!row.crop_name || !Number.isFinite(qty) || qty <= 0) continue;
+            saleMap[row.crop_name] = qty;
+        }
+        return saleMap;
+    }
+
+    // 마이그레이션(20260310000000_add_inventory_sales_totals) 적용 전 호환 경로
+    const { data: rows } = await supabase
+        .from("inventory_adjustments")
+        .select("crop_name, quantity, adjustment_type, reason")
+        .eq("farm_id", farmId)
+        .lt("quantity", 0);
+
+    for (const row of rows ?? []) {
+        const t = String((row as any).adjustment_type ?? "");
+        const reason = String((row as any).reason ?? "");
+        const isSaleType = ["sale", "shipment", "delivery", "order_out"].includes(t);
+        const isSaleReason = /판매|출고/.test(reason);
+        if (!isSaleType && !isSaleReason) continue;
+
+        const cropName = String((row as any).crop_name ?? "");
+        const qty = Math.abs(Number((row as any).quantity ?? 0));
+        if (!cropName || !Number.isFinite(qty) || qty <= 0) continue;
+        saleMap[cropName] = (saleMap[cropName] ?? 0) + qty;
+    }
+    return saleMap;
+}
+
 /**
  * 판매 전 재고를 확인한다.
  * - grade 없는 항목 → fetchStockMap(총재고) 기준
@@ -12,12 +12,38 @@ export interface AddressSet {
     last_used: string;
 }
 
+const toAddressSet = (item: any, lastUsed: string): AddressSet => ({
+    recipient_name: item.recipient_name || "",
+    recipient_phone: item.recipient_phone || "",
+    address: item.address || "",
+    postal_code: item.postal_code || "",
+    detail_address: item.detail_address || "",
+    delivery_note: item.delivery_note || "",
+    latitude: item.latitude || null,
+    longitude: item.longitude || null,
+    last_used: lastUsed
+});
+
 /**
  * 특정 고객의 최근 배송지 세트(수령인+번호+주소+우편번호)를 추출합니다.
+ * customer_address_sets(판매 행이 쓰일 때 트리거가 (수령인|주소) 별 최신 세트로 유지)를 읽는다.
+ * 집계 테이블이 아직 없는 DB에서는 기존 방식(최근 판매 50건을 읽어 중복 제거)으로 계산한다.
  */
 export const getRecentAddressSets = async (customerId: string): Promise<AddressSet[]> => {
     if (!customerId) return [];
 
+    const { data: sets, error: setsError } = await supabase
+        .from('customer_address_sets')
+        .select('recipient_name, recipient_phone, address, postal_code, detail_address, delivery_note, latitude, longitude, last_used')
+        .eq('customer_id', customerId)
+        .order('last_used', { ascending: false })
+        .limit(5);
+
+    if (!setsError) {
+        return (sets ?? []).map(item => toAddressSet(item, item.last_used));
+    }
+
+    // 마이그레이션(20260311000000_add_customer_address_sets) 적용 전 호환 경로
     try {
         const { data, error } = await supabase
             .from('sales_records')
@@ -37,17 +63,7 @@ export const getRecentAddressSets = async (customerId: string): Promise<AddressS
             const key = `${item.recipient_name || ''}|${item.address || ''}`;
             if (!seen.has(key) && item.address) {
                 seen.add(key);
-                uniqueSets.push({
-                    recipient_name: item.recipient_name || "",
-                    recipient_phone: item.recipient_phone || "",
-                    address: item.address || "",
-                    postal_code: item.postal_code || "",
-                    detail_address: item.detail_address || "",
-                    delivery_note: item.delivery_note || "",
-                    latitude: item.latitude || null,
-                    longitude: item.longitude || null,
-                    last_used: item.recorded_at
-                });
+                uniqueSets.push(toAddressSet(item, item.recorded_at));
             }
         });
 
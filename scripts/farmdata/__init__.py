@@ -0,0 +1,6 @@
+"""Supabase 내보내기(JSON/NDJSON)로 앱의 집계를 재현·검증하는 오프라인 데이터 도구.
+
+    python -m farmdata.ledger exports/2026-03-10      # 농장별 StockMap / GradeStockMap
+
+(scripts/ 에서 실행하거나 PYTHONPATH=scripts 로 실행, numpy 필요)
+"""
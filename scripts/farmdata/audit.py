@@ -0,0 +1,296 @@
+"""데이터 무결성 감사 — 내보내기 스냅샷 한 번 읽기로 모든 불변식을 검사한다.
+
+thorough_audit.js, final_audit.js, emergency_audit.js, check_orphan_customers.js, audit_settlement.js,
+verify_vital_data.js 는 각자 전체 테이블을 조회하고 결과를 콘솔과 verification_log.txt 같은 파일에
+따로 남긴다. 이 감사기는 테이블마다 내보내기를 한 번만 읽어 id → 행 해시 표를 만들고, 모든 불변식을
+그 위의 해시 조인으로 검사한다. 비용은 행 수에 선형이다. 결과는 구조화된 보고서(JSON) 하나다.
+
+검사 (severity: error 는 데이터가 틀린 것, warn 은 확인이 필요한 것, info 는 참고)
+    sales_without_farm        error  sales_records.farm_id 가 비었거나 farms 에 없음
+    sales_dangling_customer   error  customer_id 가 customers 에 없음
+    sales_dangling_partner    error  partner_id 가 partners 에 없음
+    customer_unknown_farm     error  customers.farm_id 가 farms 에 없음
+    partner_unknown_farm      error  partners.farm_id 가 farms 에 없음
+    customer_without_sales    info   판매가 한 건도 없는 고객 (check_orphan_customers.js)
+    partner_without_sales     info   판매가 한 건도 없는 거래처
+    inspection_over_harvest   error  harvest_id 별 선별 수량 합 > 수확 수량
+    inspection_dangling       error  harvest_id 가 harvests 에 없음
+    run_without_adjustment    error  취소되지 않은 processing_runs 에 '레시피 생산 투입/산출 (id)' 재고 조정이 없음
+    adjustment_dangling_run   warn   위 사유의 run id 가 processing_runs 에 없음
+    settled_amount_mismatch   warn   정산 완료, settled_amount > 0, price > 0 인데 두 값이 다름
+    settled_without_amount    warn   정산 완료인데 settled_amount 도 price 도 없음 (매출 0 으로 잡힘)
+    settled_group_partial     error  B2B 정산 (거래처, settled_at) 묶음에 settled_amount 있는 행과 없는 행이 섞임
+                                     (audit_settlement.js 의 첫 행에만 금액이 들어간 패턴)
+
+내보내기에 없는 테이블에 걸린 검사는 건너뛰고 보고서의 skipped 에 남긴다.
+
+    python -m farmdata.audit exports/2026-03-10                       # 요약은 표준 오류, 보고서는 표준 출력
+    python -m farmdata.audit exports/2026-03-10 --out audit.json --sample 50
+    python -m farmdata.audit exports/2026-03-10 --fail-on warn        # warn 이상이 있으면 종료 코드 1
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from .export import load_table, table_path
+from .js import js_number, js_truthy
+
+AUDIT_TABLES = ("farms", "customers", "partners", "sales_records", "harvests", "harvest_inspections",
+                "processing_runs", "inventory_adjustments")
+SEVERITIES = ("info", "warn", "error")
+DEFAULT_SAMPLE = 20
+# app/processing/runs/page.tsx 가 남기는 재고 조정 사유
+RUN_REASON = re.compile(r"레시피 생산 (투입|산출) \(([^()\s]+)\)")
+
+
+@dataclass
+class Check:
+    id: str
+    severity: str
+    title: str
+    count: int = 0
+    sample: list[dict] = field(default_factory=list)
+
+    def add(self, item: dict, limit: int) -> None:
+        self.count += 1
+        if len(self.sample) < limit:
+            self.sample.append(item)
+
+
+def _qty(v) -> Decimal:
+    """numeric 열을 정확히 더하기 위해 Decimal 로 (해석할 수 없으면 0)."""
+    if v is None or isinstance(v, bool):
+        return Decimal(0)
+    try:
+        return Decimal(str(v))
+    except InvalidOperation:
+        return Decimal(0)
+
+
+class Auditor:
+    def __init__(self, export_dir: str | Path, sample: int = DEFAULT_SAMPLE):
+        self.export_dir = export_dir
+        self.sample = sample
+        self.checks: dict[str, Check] = {}
+        self.skipped: dict[str, str] = {}
+        self.counts: dict[str, int] = {}
+
+    def check(self, id: str, severity: str, title: str) -> Check:
+        c = self.checks.get(id)
+        if c is None:
+            c = self.checks[id] = Check(id, severity, title)
+        return c
+
+    def _load(self, table: str) -> list[dict] | None:
+        """테이블 행 (내보내기 파일이 없으면 None)."""
+        if table_path(self.export_dir, table) is None:
+            return None
+        rows = list(load_table(self.export_dir, table))
+        self.counts[table] = len(rows)
+        return rows
+
+    def _skip(self, ids: Iterable[str], missing: str) -> None:
+        for i in ids:
+            self.skipped[i] = f"{missing} 내보내기 없음"
+
+    def run(self) -> "Auditor":
+        t = {name: self._load(name) for name in AUDIT_TABLES}
+        farms = {str(f["id"]) for f in t["farms"]} if t["farms"] is not None else None
+        self._sales(t["sales_records"], t["customers"], t["partners"], farms)
+        self._harvests(t["harvests"], t["harvest_inspections"])
+        self._runs(t["processing_runs"], t["inventory_adjustments"])
+        return self
+
+    # --- 판매 · 고객 · 거래처 ----------------------------------------------
+
+    def _sales(self, sales: list[dict] | None, customers: list[dict] | None, partners: list[dict] | None,
+               farms: set[str] | None) -> None:
+        n = self.sample
+        if sales is None:
+            self._skip(("sales_without_farm", "sales_dangling_customer", "sales_dangling_partner",
+                        "customer_without_sales", "partner_without_sales", "settled_amount_mismatch",
+                        "settled_without_amount", "settled_group_partial"), "sales_records")
+            sales = []
+        if farms is None:
+            self._skip(("customer_unknown_farm", "partner_unknown_farm"), "farms")
+        customer_ids = {str(c["id"]) for c in customers} if customers is not None else None
+        partner_ids = {str(p["id"]) for p in partners} if partners is not None else None
+        if customer_ids is None:
+            self._skip(("sales_dangling_customer", "customer_without_sales", "customer_unknown_farm"), "customers")
+        if partner_ids is None:
+            self._skip(("sales_dangling_partner", "partner_without_sales", "partner_unknown_farm"), "partners")
+
+        no_farm = self.check("sales_without_farm", "error", "farm_id 가 없거나 알 수 없는 판매")
+        dangling_c = self.check("sales_dangling_customer", "error", "없는 고객을 가리키는 판매")
+        dangling_p = self.check("sales_dangling_partner", "error", "없는 거래처를 가리키는 판매")
+        mismatch = self.check("settled_amount_mismatch", "warn", "정산액과 판매가가 다른 정산 완료 판매")
+        no_amount = self.check("settled_without_amount", "warn", "정산액도 판매가도 없는 정산 완료 판매")
+        used_c: Counter = Counter()
+        used_p: Counter = Counter()
+        b2b_groups: dict[tuple, list[dict]] = defaultdict(list)
+
+        for s in sales:
+            sid = s.get("id")
+            farm = s.get("farm_id")
+            if not farm or (farms is not None and str(farm) not in farms):
+                no_farm.add({"id": sid, "farm_id": farm}, n)
+            cid, pid = s.get("customer_id"), s.get("partner_id")
+            if cid:
+                used_c[str(cid)] += 1
+                if customer_ids is not None and str(cid) not in customer_ids:
+                    dangling_c.add({"id": sid, "customer_id": cid}, n)
+            if pid:
+                used_p[str(pid)] += 1
+                if partner_ids is not None and str(pid) not in partner_ids:
+                    dangling_p.add({"id": sid, "partner_id": pid}, n)
+            if s.get("is_settled") is not True:
+                continue
+            sa, price = s.get("settled_amount"), s.get("price")
+            has_sa = sa is not None and js_number(sa) > 0
+            if has_sa and js_truthy(price) and js_number(price) > 0 and js_number(sa) != js_number(price):
+                mismatch.add({"id": sid, "price": price, "settled_amount": sa,
+                              "diff": js_number(sa) - js_number(price)}, n)
+            elif not has_sa and not (js_truthy(price) and js_number(price) != 0):
+                no_amount.add({"id": sid, "price": price, "settled_amount": sa}, n)
+            if s.get("sale_type") == "b2b":
+                b2b_groups[(s.get("partner_id") or "unknown", s.get("settled_at"))].append(s)
+
+        partial = self.check("settled_group_partial", "error", "정산액이 일부 행에만 들어간 B2B 정산 묶음")
+        for (pid, settled_at), group in b2b_groups.items():
+            if len(group) < 2:
+                continue
+            amounts = [g.get("settled_amount") for g in group]
+            if any(a is None or js_number(a) == 0 for a in amounts) and any(a is not None and js_number(a) > 0 for a in amounts):
+                partial.add({"partner_id": pid, "settled_at": settled_at, "rows": len(group),
+                             "ids": [g.get("id") for g in group],
+                             "price_total": sum(js_number(g.get("price")) for g in group if js_truthy(g.get("price"))),
+                             "settled_total": sum(js_number(a) for a in amounts if js_truthy(a))}, n)
+
+        for rows, used, label, name_field in ((customers, used_c, "customer", "name"),
+                                              (partners, used_p, "partner", "company_name")):
+            if rows is None:
+                continue
+            unused = self.check(f"{label}_without_sales", "info", f"판매가 없는 {'고객' if label == 'customer' else '거래처'}")
+            unknown = self.check(f"{label}_unknown_farm", "error", f"알 수 없는 농장의 {'고객' if label == 'customer' else '거래처'}")
+            for r in rows:
+                rid = str(r["id"])
+                if sales and not used[rid]:
+                    unused.add({"id": rid, "name": r.get(name_field), "farm_id": r.get("farm_id")}, n)
+                if farms is not None and str(r.get("farm_id")) not in farms:
+                    unknown.add({"id": rid, "name": r.get(name_field), "farm_id": r.get("farm_id")}, n)
+
+    # --- 수확 · 선별 ------------------------------------------------------
+
+    def _harvests(self, harvests: list[dict] | None, inspections: list[dict] | None) -> None:
+        if harvests is None or inspections is None:
+            self._skip(("inspection_over_harvest", "inspection_dangling"),
+                       "harvests" if harvests is None else "harvest_inspections")
+            return
+        n = self.sample
+        quantity = {str(h["id"]): _qty(h.get("quantity")) for h in harvests}
+        total: dict[str, Decimal] = defaultdict(Decimal)
+        rows: Counter = Counter()
+        dangling = self.check("inspection_dangling", "error", "없는 수확을 가리키는 선별")
+        for i in inspections:
+            hid = str(i.get("harvest_id"))
+            if hid not in quantity:
+                dangling.add({"id": i.get("id"), "harvest_id": i.get("harvest_id")}, n)
+                continue
+            total[hid] += _qty(i.get("quantity"))
+            rows[hid] += 1
+        over = self.check("inspection_over_harvest", "error", "선별 수량 합이 수확 수량을 넘는 수확")
+        for hid, inspected in total.items():
+            if inspected > quantity[hid]:
+                over.add({"harvest_id": hid, "quantity": float(quantity[hid]), "inspected": float(inspected),
+                          "excess": float(inspected - quantity[hid]), "inspections": rows[hid]}, n)
+
+    # --- 가공 생산 · 재고 조정 -------------------------------------------
+
+    def _runs(self, runs: list[dict] | None, adjustments: list[dict] | None) -> None:
+        if runs is None or adjustments is None:
+            self._skip(("run_without_adjustment", "adjustment_dangling_run"),
+                       "processing_runs" if runs is None else "inventory_adjustments")
+            return
+        n = self.sample
+        linked: dict[str, set[str]] = defaultdict(set)
+        adj_of: dict[str, list] = defaultdict(list)
+        for a in adjustments:
+            reason = a.get("reason")
+            if not isinstance(reason, str):
+                continue
+            m = RUN_REASON.search(reason)
+            if m:
+                linked[m.group(2)].add(m.group(1))
+                adj_of[m.group(2)].append(a.get("id"))
+        run_ids = set()
+        missing = self.check("run_without_adjustment", "error", "재고 조정이 없는 가공 생산")
+        for r in runs:
+            rid = str(r["id"])
+            run_ids.add(rid)
+            if js_truthy(r.get("is_cancelled")):
+                continue
+            lacks = [k for k in ("투입", "산출") if k not in linked.get(rid, ())]
+            if lacks:
+                missing.add({"id": rid, "farm_id": r.get("farm_id"), "run_date": r.get("run_date"), "missing": lacks}, n)
+        dangling = self.check("adjustment_dangling_run", "warn", "없는 가공 생산을 가리키는 재고 조정")
+        for rid, ids in adj_of.items():
+            if rid not in run_ids:
+                dangling.add({"run_id": rid, "adjustment_ids": ids}, n)
+
+    # --- 보고서 ----------------------------------------------------------
+
+    def report(self, seconds: float) -> dict:
+        checks = [c for c in self.checks.values() if c.id not in self.skipped]
+        checks.sort(key=lambda c: (-SEVERITIES.index(c.severity), c.id))
+        return {
+            "export": str(self.export_dir),
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seconds": round(seconds, 3),
+            "tables": self.counts,
+            "summary": {s: sum(c.count for c in checks if c.severity == s) for s in SEVERITIES},
+            "checks": [{"id": c.id, "severity": c.severity, "title": c.title, "count": c.count, "sample": c.sample}
+                       for c in checks],
+            "skipped": self.skipped,
+        }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="내보내기 스냅샷으로 데이터 무결성 불변식 전체 검사")
+    ap.add_argument("export_dir", help=f"{' / '.join(AUDIT_TABLES)} 내보내기 디렉터리 (없는 테이블은 건너뜀)")
+    ap.add_argument("--out", default=None, help="JSON 보고서 파일 (기본: 표준 출력)")
+    ap.add_argument("--sample", type=int, default=DEFAULT_SAMPLE, help="검사마다 보고서에 남길 예시 행 수")
+    ap.add_argument("--fail-on", choices=SEVERITIES, default="error", help="이 등급 이상이 있으면 종료 코드 1")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    auditor = Auditor(args.export_dir, args.sample).run()
+    report = auditor.report(time.perf_counter() - t0)
+    text = json.dumps(report, ensure_ascii=False, indent=2, default=str)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    for c in report["checks"]:
+        if c["count"]:
+            print(f"[{c['severity']}] {c['id']}: {c['count']}건 — {c['title']}", file=sys.stderr)
+    for check_id, why in report["skipped"].items():
+        print(f"[skip] {check_id}: {why}", file=sys.stderr)
+    tables = ", ".join(f"{t} {n}" for t, n in report["tables"].items())
+    print(f"검사 {len(report['checks'])}개 ({tables}) {report['seconds']}초", file=sys.stderr)
+    threshold = SEVERITIES.index(args.fail_on)
+    failed = any(c["count"] for c in report["checks"] if SEVERITIES.index(c["severity"]) >= threshold)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
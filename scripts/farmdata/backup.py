@@ -0,0 +1,501 @@
+"""processing_records / processing_runs 스트리밍 NDJSON 백업·복원.
+
+scripts/_backup 의 processing_records_<farm>_<timestamp>.json 처럼 테이블 전체를 JSON 배열
+하나로 저장하면, 복원할 때 배열 전체를 메모리에 올리고 행마다 쓰게 된다.
+이 도구는 다음과 같이 동작한다.
+
+- 행을 id 순 키셋 페이지(WHERE id > 마지막 id ORDER BY id LIMIT n)로 읽는다.
+  고정 크기 청크 파일(chunk-00000.ndjson ...)에 쓰고 청크마다 sha256 을 manifest.json 에 남긴다.
+- 청크는 임시 파일에 다 쓴 뒤 교체하고 그다음 manifest 를 갱신한다. 중간에 끊겨도
+  마지막 완료 청크 이후부터 이어서 백업한다 (dump --resume).
+- 복원은 청크 체크섬을 확인한 뒤 id 기준 일괄 upsert(batch 행씩)한다. 완료한 청크는
+  대상 DB별 진행 파일에 기록되므로, 다시 실행하면 남은 청크부터 이어서 복원한다.
+- 메모리는 청크 하나 크기로 일정하다.
+
+대상 DB
+    sqlite:///local.db                       로컬 SQLite (표준 라이브러리)
+    postgresql://user@localhost/farm         로컬 Postgres (psycopg 필요)
+    supabase                                 NEXT_PUBLIC_SUPABASE_URL + SUPABASE_SERVICE_ROLE_KEY (PostgREST)
+
+    python -m farmdata.backup dump --db supabase --farm <FARM_ID> --out scripts/_backup
+    python -m farmdata.backup dump --resume scripts/_backup/processing_records_<FARM_ID>_<ts> --db supabase
+    python -m farmdata.backup verify scripts/_backup/processing_records_<FARM_ID>_<ts>
+    python -m farmdata.backup restore scripts/_backup/processing_records_<FARM_ID>_<ts> --db sqlite:///local.db
+    python -m farmdata.backup convert scripts/_backup/processing_records_<FARM_ID>_<ts>.json
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import decimal
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, Sequence
+
+from .export import iter_rows
+
+BACKUP_TABLES = ("processing_records", "processing_runs")
+DEFAULT_CHUNK_ROWS = 5000
+DEFAULT_BATCH = 500
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+class BackupError(Exception):
+    """체크섬 불일치, manifest 손상, 대상 DB 오류 등."""
+
+
+def _json_default(v):
+    if isinstance(v, decimal.Decimal):
+        return int(v) if v == v.to_integral_value() else float(v)
+    if isinstance(v, (dt.datetime, dt.date, dt.time)):
+        return v.isoformat()
+    if isinstance(v, uuid.UUID):
+        return str(v)
+    if isinstance(v, (bytes, memoryview)):
+        return bytes(v).hex()
+    raise TypeError(f"JSON 으로 바꿀 수 없는 값: {type(v).__name__}")
+
+
+def dump_line(row: dict) -> bytes:
+    return (json.dumps(row, ensure_ascii=False, default=_json_default, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def file_sha256(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# --- 대상 DB ---------------------------------------------------------------
+
+
+class Store(ABC):
+    """키셋 페이지 읽기와 id 기준 upsert 만 있으면 된다."""
+
+    name = ""
+
+    @abstractmethod
+    def page(self, table: str, farm_id: str | None, after_id: str | None, limit: int) -> list[dict]:
+        """id 오름차순으로 after_id 다음 행을 limit 개까지."""
+
+    @abstractmethod
+    def upsert(self, table: str, rows: Sequence[dict]) -> None:
+        """id 가 같으면 덮어쓰고 없으면 넣는다."""
+
+    def close(self) -> None:
+        pass
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqlStore(Store):
+    """DB-API 연결 (sqlite3 / psycopg). 두 DB 모두 INSERT ... ON CONFLICT (id) DO UPDATE 를 지원한다."""
+
+    def __init__(self, conn, placeholder: str, name: str, json_adapter=None):
+        self.conn = conn
+        self.ph = placeholder
+        self.name = name
+        self.json_adapter = json_adapter
+
+    def page(self, table, farm_id, after_id, limit):
+        where, params = [], []
+        if farm_id is not None:
+            where.append(f"farm_id = {self.ph}")
+            params.append(farm_id)
+        if after_id is not None:
+            where.append(f"id > {self.ph}")
+            params.append(after_id)
+        sql = f"SELECT * FROM {_quote(table)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY id LIMIT {int(limit)}"
+        cur = self.conn.cursor()
+        cur.execute(sql, params)
+        cols = [d[0] for d in cur.description]
+        rows = [dict(zip(cols, r)) for r in cur.fetchall()]
+        cur.close()
+        return rows
+
+    def _value(self, v):
+        if isinstance(v, (dict, list)):
+            return self.json_adapter(v) if self.json_adapter else json.dumps(v, ensure_ascii=False)
+        return v
+
+    def upsert(self, table, rows):
+        for cols, group in _group_by_columns(rows):
+            if "id" not in cols:
+                raise BackupError(f"{table}: id 없는 행은 upsert 할 수 없습니다.")
+            col_sql = ", ".join(map(_quote, cols))
+            updates = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in cols if c != "id")
+            sql = (f"INSERT INTO {_quote(table)} ({col_sql}) VALUES ({', '.join([self.ph] * len(cols))}) "
+                   f"ON CONFLICT (id) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING"))
+            cur = self.conn.cursor()
+            cur.executemany(sql, [[self._value(r.get(c)) for c in cols] for r in group])
+            cur.close()
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class RestStore(Store):
+    """Supabase PostgREST. upsert 는 Prefer: resolution=merge-duplicates."""
+
+    def __init__(self, url: str, key: str):
+        self.base = url.rstrip("/") + "/rest/v1/"
+        self.key = key
+        self.name = urllib.parse.urlparse(url).netloc
+
+    def _request(self, method: str, path: str, body: bytes | None = None, prefer: str = "") -> bytes:
+        req = urllib.request.Request(self.base + path, data=body, method=method)
+        req.add_header("apikey", self.key)
+        req.add_header("Authorization", f"Bearer {self.key}")
+        req.add_header("Content-Type", "application/json")
+        if prefer:
+            req.add_header("Prefer", prefer)
+        try:
+            with urllib.request.urlopen(req, timeout=60) as resp:
+                return resp.read()
+        except urllib.error.HTTPError as e:
+            raise BackupError(f"{method} {path.split('?')[0]}: HTTP {e.code} {e.read()[:300].decode('utf-8', 'replace')}")
+
+    def page(self, table, farm_id, after_id, limit):
+        q = [("select", "*"), ("order", "id.asc"), ("limit", str(limit))]
+        if farm_id is not None:
+            q.append(("farm_id", f"eq.{farm_id}"))
+        if after_id is not None:
+            q.append(("id", f"gt.{after_id}"))
+        return json.loads(self._request("GET", f"{table}?{urllib.parse.urlencode(q)}"))
+
+    def upsert(self, table, rows):
+        for cols, group in _group_by_columns(rows):
+            body = b"[" + b",".join(dump_line(r)[:-1] for r in group) + b"]"
+            self._request("POST", f"{table}?on_conflict=id", body, prefer="resolution=merge-duplicates,return=minimal")
+
+
+def _group_by_columns(rows: Sequence[dict]) -> Iterator[tuple[list[str], list[dict]]]:
+    """열 구성이 같은 연속 행끼리 묶는다 (일괄 INSERT 는 열 목록이 같아야 한다)."""
+    cols: list[str] | None = None
+    group: list[dict] = []
+    for r in rows:
+        keys = list(r)
+        if keys != cols and group:
+            yield cols, group
+            group = []
+        cols = keys
+        group.append(r)
+    if group:
+        yield cols, group
+
+
+def open_store(target: str) -> Store:
+    if target.startswith("sqlite:///"):
+        conn = sqlite3.connect(target[len("sqlite:///"):])
+        return SqlStore(conn, "?", target)
+    if target.startswith(("postgres://", "postgresql://")):
+        try:
+            import psycopg
+            from psycopg.types.json import Jsonb
+        except ImportError:
+            raise BackupError("Postgres 대상에는 psycopg 가 필요합니다 (pip install psycopg).") from None
+        return SqlStore(psycopg.connect(target), "%s", target, json_adapter=Jsonb)
+    if target == "supabase":
+        url = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+        key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+        if not url or not key:
+            raise BackupError("환경변수 누락: NEXT_PUBLIC_SUPABASE_URL, (SUPABASE_SERVICE_ROLE_KEY 또는 NEXT_PUBLIC_SUPABASE_ANON_KEY)")
+        return RestStore(url, key)
+    raise BackupError(f"알 수 없는 대상: {target} (sqlite:///파일 | postgresql://... | supabase)")
+
+
+# --- 백업 -----------------------------------------------------------------
+
+
+class Manifest:
+    def __init__(self, path: Path, data: dict):
+        self.path = path
+        self.data = data
+
+    @classmethod
+    def load(cls, backup_dir: str | Path) -> "Manifest":
+        path = Path(backup_dir) / MANIFEST
+        if not path.exists():
+            raise BackupError(f"{backup_dir}: {MANIFEST} 가 없습니다.")
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != MANIFEST_VERSION:
+            raise BackupError(f"{path}: 지원하지 않는 manifest 버전 {data.get('version')}")
+        return cls(path, data)
+
+    @classmethod
+    def create(cls, backup_dir: Path, table: str, farm_id: str | None, chunk_rows: int, source: str) -> "Manifest":
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        m = cls(backup_dir / MANIFEST, {
+            "version": MANIFEST_VERSION, "table": table, "farm_id": farm_id, "chunk_rows": chunk_rows,
+            "source": source, "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "complete": False,
+            "rows": 0, "chunks": [],
+        })
+        m.save()
+        return m
+
+    @property
+    def dir(self) -> Path:
+        return self.path.parent
+
+    @property
+    def chunks(self) -> list[dict]:
+        return self.data["chunks"]
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def add_chunk(self, name: str, rows: int, sha: str, first_id, last_id) -> None:
+        self.chunks.append({"file": name, "rows": rows, "sha256": sha, "first_id": first_id, "last_id": last_id})
+        self.data["rows"] += rows
+        self.save()
+
+
+def _id(row: dict):
+    v = row.get("id")
+    return v if v is None or isinstance(v, (str, int)) else _json_default(v)
+
+
+def _write_chunk(backup_dir: Path, index: int, rows: Sequence[dict]) -> tuple[str, str]:
+    name = f"chunk-{index:05d}.ndjson"
+    tmp = backup_dir / (name + ".tmp")
+    h = hashlib.sha256()
+    with open(tmp, "wb") as f:
+        for r in rows:
+            line = dump_line(r)
+            h.update(line)
+            f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, backup_dir / name)
+    return name, h.hexdigest()
+
+
+def _drop_torn_chunks(m: Manifest) -> None:
+    """manifest 에 기록되지 않은 청크(쓰다 끊긴 것)를 지운다."""
+    known = {c["file"] for c in m.chunks}
+    for p in m.dir.glob("chunk-*.ndjson*"):
+        if p.name not in known:
+            p.unlink()
+
+
+def dump(store: Store, m: Manifest, page_rows: int = 1000, log=print) -> Manifest:
+    """manifest 의 마지막 청크 이후부터 백업을 이어 간다."""
+    if m.data["complete"]:
+        return m
+    _drop_torn_chunks(m)
+    if m.chunks:
+        last = m.chunks[-1]
+        if file_sha256(m.dir / last["file"]) != last["sha256"]:
+            raise BackupError(f"{last['file']}: 체크섬 불일치 — 이어서 백업할 수 없습니다.")
+    after = m.chunks[-1]["last_id"] if m.chunks else None
+    table, farm_id, chunk_rows = m.data["table"], m.data["farm_id"], m.data["chunk_rows"]
+    buf: list[dict] = []
+    while True:
+        page = store.page(table, farm_id, after, min(page_rows, chunk_rows))
+        buf.extend(page)
+        if page:
+            after = page[-1]["id"]
+        while len(buf) >= chunk_rows or (not page and buf):
+            rows, buf = buf[:chunk_rows], buf[chunk_rows:]
+            name, sha = _write_chunk(m.dir, len(m.chunks), rows)
+            m.add_chunk(name, len(rows), sha, _id(rows[0]), _id(rows[-1]))
+            log(f"  {name}: {len(rows)}행 (누적 {m.data['rows']})")
+        if not page:
+            break
+    m.data["complete"] = True
+    m.data["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    m.save()
+    return m
+
+
+def new_backup_dir(out: str | Path, table: str, farm_id: str | None) -> Path:
+    stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H-%M-%S-%fZ")
+    return Path(out) / f"{table}_{farm_id or 'all'}_{stamp}"
+
+
+def convert_legacy(path: str | Path, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Manifest:
+    """기존 JSON 배열 백업(processing_records_<farm>_<ts>.json)을 청크 백업 디렉터리로 바꾼다."""
+    path = Path(path)
+    stem = path.name[: -len(".json")] if path.name.endswith(".json") else path.name
+    table = next((t for t in BACKUP_TABLES if stem.startswith(t + "_")), stem.split("_")[0])
+    farm_id = stem[len(table) + 1:].rsplit("_", 1)[0] or None
+    m = Manifest.create(path.with_name(stem), table, farm_id, chunk_rows, f"file:{path.name}")
+    _drop_torn_chunks(m)
+    buf: list[dict] = []
+    for row in iter_rows(path):
+        buf.append(row)
+        if len(buf) >= chunk_rows:
+            name, sha = _write_chunk(m.dir, len(m.chunks), buf)
+            m.add_chunk(name, len(buf), sha, _id(buf[0]), _id(buf[-1]))
+            buf = []
+    if buf:
+        name, sha = _write_chunk(m.dir, len(m.chunks), buf)
+        m.add_chunk(name, len(buf), sha, _id(buf[0]), _id(buf[-1]))
+    m.data["complete"] = True
+    m.save()
+    return m
+
+
+# --- 검증·복원 -------------------------------------------------------------
+
+
+def verify(m: Manifest) -> list[str]:
+    """체크섬·행 수가 맞지 않는 청크 이름들."""
+    bad = []
+    for c in m.chunks:
+        p = m.dir / c["file"]
+        if not p.exists() or file_sha256(p) != c["sha256"]:
+            bad.append(c["file"])
+    return bad
+
+
+def iter_chunk(m: Manifest, chunk: dict) -> Iterator[dict]:
+    """체크섬을 확인하며 청크의 행을 읽는다 (불일치하면 마지막에 BackupError)."""
+    h = hashlib.sha256()
+    n = 0
+    with open(m.dir / chunk["file"], "rb") as f:
+        for line in f:
+            h.update(line)
+            n += 1
+            yield json.loads(line)
+    if h.hexdigest() != chunk["sha256"] or n != chunk["rows"]:
+        raise BackupError(f"{chunk['file']}: 체크섬 불일치")
+
+
+class RestoreState:
+    """대상 DB별 복원 진행 (완료한 청크 이름)."""
+
+    def __init__(self, m: Manifest, target: str):
+        key = hashlib.sha256(target.encode("utf-8")).hexdigest()[:12]
+        self.path = m.dir / f".restore-{key}.json"
+        self.done: set[str] = set()
+        if self.path.exists():
+            self.done = set(json.loads(self.path.read_text(encoding="utf-8"))["done"])
+
+    def mark(self, chunk: str) -> None:
+        self.done.add(chunk)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"done": sorted(self.done)}), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def restore(store: Store, m: Manifest, target: str, batch: int = DEFAULT_BATCH, table: str | None = None,
+            log=print) -> int:
+    """청크를 차례로 검증·upsert 한다. 반영한 행 수를 돌려준다."""
+    if not m.data["complete"]:
+        raise BackupError(f"{m.dir}: 완료되지 않은 백업입니다 (dump --resume 으로 마저 백업).")
+    bad = verify(m)
+    if bad:
+        raise BackupError(f"{m.dir}: 체크섬 불일치 청크 {', '.join(bad)} — 복원하지 않습니다.")
+    table = table or m.data["table"]
+    state = RestoreState(m, target)
+    total = 0
+    for chunk in m.chunks:
+        if chunk["file"] in state.done:
+            continue
+        rows: list[dict] = []
+        for row in iter_chunk(m, chunk):
+            rows.append(row)
+            if len(rows) >= batch:
+                store.upsert(table, rows)
+                total += len(rows)
+                rows = []
+        if rows:
+            store.upsert(table, rows)
+            total += len(rows)
+        state.mark(chunk["file"])
+        log(f"  {chunk['file']}: {chunk['rows']}행 복원")
+    return total
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="processing_records / processing_runs NDJSON 청크 백업·복원")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("dump", help="DB → 청크 백업")
+    p.add_argument("--db", required=True, help="sqlite:///파일 | postgresql://... | supabase")
+    p.add_argument("--farm", default=None, help="농장 id (생략하면 전체)")
+    p.add_argument("--table", action="append", choices=BACKUP_TABLES, default=None)
+    p.add_argument("--out", default="scripts/_backup")
+    p.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    p.add_argument("--resume", default=None, help="끊긴 백업 디렉터리를 이어서 백업")
+
+    p = sub.add_parser("restore", help="청크 백업 → DB (id 기준 upsert)")
+    p.add_argument("backup_dir")
+    p.add_argument("--db", required=True)
+    p.add_argument("--batch", type=int, default=DEFAULT_BATCH)
+    p.add_argument("--table", default=None, help="다른 테이블 이름으로 복원")
+
+    p = sub.add_parser("verify", help="청크 체크섬 확인")
+    p.add_argument("backup_dir")
+
+    p = sub.add_parser("convert", help="기존 JSON 배열 백업 → 청크 백업")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+
+    args = ap.parse_args(argv)
+    try:
+        if args.command == "verify":
+            m = Manifest.load(args.backup_dir)
+            bad = verify(m)
+            state = "완료" if m.data["complete"] else "미완료"
+            print(f"{m.data['table']} {m.data['rows']}행, 청크 {len(m.chunks)}개 ({state}), 불일치 {len(bad)}")
+            for name in bad:
+                print(f"  BAD {name}")
+            return 1 if bad else 0
+
+        if args.command == "convert":
+            for f in args.files:
+                m = convert_legacy(f, args.chunk_rows)
+                print(f"{f} -> {m.dir} ({m.data['rows']}행, 청크 {len(m.chunks)}개)")
+            return 0
+
+        store = open_store(args.db)
+        try:
+            if args.command == "dump":
+                if args.resume:
+                    manifests = [Manifest.load(args.resume)]
+                else:
+                    manifests = [
+                        Manifest.create(new_backup_dir(args.out, t, args.farm), t, args.farm, args.chunk_rows, store.name)
+                        for t in args.table or BACKUP_TABLES
+                    ]
+                for m in manifests:
+                    print(f"{m.data['table']} -> {m.dir}")
+                    dump(store, m)
+                    print(f"  완료: {m.data['rows']}행, 청크 {len(m.chunks)}개")
+                return 0
+
+            m = Manifest.load(args.backup_dir)
+            n = restore(store, m, args.db, args.batch, args.table)
+            print(f"복원 완료: {n}행 ({args.table or m.data['table']})")
+            return 0
+        finally:
+            store.close()
+    except BackupError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
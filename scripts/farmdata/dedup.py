@@ -0,0 +1,438 @@
+"""중복 입력 탐지 — processing_records / processing_runs / sales_records / inventory_adjustments.
+
+저장 버튼을 두 번 누르거나 스크립트를 다시 돌리면 id 만 다르고 내용이 같은 행이 생긴다
+(scripts/_backup 의 "고구마 라떼 200개" 두 행, fix-double-deduction-and-juice359.mjs,
+cleanup_duplicate_partners.js 가 고친 것들).
+
+- 행마다 정규화한 내용 키 (농장, 날짜, 품목, 수량, 단위 + 테이블별 열)를 만들어 해시 버킷에 넣는다.
+  테이블을 한 번 훑으면 끝난다 (O(n)).
+- 같은 버킷 안에서는 입력 시각(created_at 등)이 window 초 안에 이어지는 행끼리만 한 묶음으로 본다.
+  같은 날 같은 양을 두 번 판 정상 거래를 중복으로 잡지 않기 위해서다.
+  입력 시각이 없는 행(예전 백업)은 시각 없는 행끼리 묶는다.
+- 취소된 가공 기록(is_cancelled / cancelled_at)은 이미 상쇄되었으므로 제외한다.
+
+묶음마다 남길 행 하나(연결된 재고 조정이 있는 행 → 채워진 열이 많은 행 → 먼저 입력된 행)를 고른다.
+나머지 행은 다음과 같이 처리한다.
+- 비교 열(메모, 가격, 정산 등)까지 모두 같고 안전하게 되돌릴 수 있으면 병합 계획에 넣는다.
+- 아니면 검토 목록에 넣는다.
+
+병합 계획은 앱이 쓰는 되돌리기 방식을 따른다.
+    processing_records     is_cancelled = true + 연결된 조정(processing_record_id)의 역방향 조정 INSERT
+                           (재고 화면의 가공 취소와 같다)
+    processing_runs        연결된 조정(reason 의 "(<run id>)")과 run 삭제 (취소 열이 없다)
+    sales_records          삭제 (정산된 행은 검토로)
+    inventory_adjustments  삭제 (가공 기록에 연결된 조정은 가공 기록 쪽에서 처리하므로 검토로)
+
+    python -m farmdata.dedup exports/2026-03-10 --report dedup.txt --plan dedup_plan.ndjson --sql dedup_plan.sql
+    python -m farmdata.dedup --file processing_records=_backup/processing_records_<farm>_<ts>.json
+
+계획의 각 동작에는 바뀌기 전 행(before)이 들어 있다. 적용 전에 farmdata.backup 으로 백업해 둘 것.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+import sys
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from .export import ExportError, iter_rows, load_table, parse_timestamp
+from .js import js_number, js_truthy
+
+KST = timezone(timedelta(hours=9))
+DEFAULT_WINDOW = 600.0
+
+
+@dataclass(frozen=True)
+class DedupSpec:
+    """테이블별 내용 키 구성. 각 항목은 열 이름 후보 (앞에서부터 값이 있는 열을 쓴다)."""
+
+    table: str
+    date: tuple[str, ...]
+    crop: tuple[str, ...]
+    qty: tuple[str, ...]
+    unit: tuple[str, ...] = ()
+    ts: tuple[str, ...] = ("created_at",)
+    extra: tuple[str, ...] = ()  # 키에 더하는 열 — 달라야 다른 입력
+    compare: tuple[str, ...] = ()  # 키에는 안 넣지만, 다르면 검토로 돌리는 열
+
+
+# processing_runs 는 마이그레이션(input_qty ...)과 앱 insert(input_quantity ...)의 열 이름이 다르다
+SPECS = {
+    s.table: s
+    for s in (
+        DedupSpec(
+            "processing_records", ("processed_date",), ("output_crop_name",), ("output_quantity",), ("output_unit",),
+            compare=("inputs", "memo", "output_crop_id"),
+        ),
+        DedupSpec(
+            "processing_runs", ("run_date",), ("output_crop_name",), ("actual_output_qty", "actual_output_quantity"),
+            ("output_unit",),
+            extra=("recipe_id", "input_qty|input_quantity"),
+            compare=("expected_output_qty|expected_output_quantity", "input_unit", "memo"),
+        ),
+        DedupSpec(
+            "sales_records", ("recorded_at",), ("crop_name",), ("quantity",), ("sale_unit",),
+            ts=("created_at", "recorded_at"),
+            extra=("sale_type", "grade", "partner_id", "customer_id", "client_id"),
+            compare=("price", "settled_amount", "is_settled", "payment_status", "address", "detail_address",
+                     "recipient_name", "delivery_method", "shipping_cost", "product_spec"),
+        ),
+        DedupSpec(
+            "inventory_adjustments", ("adjusted_at",), ("crop_name",), ("quantity",),
+            ts=("created_at", "adjusted_at"),
+            extra=("adjustment_type", "grade", "processing_record_id"),
+            compare=("reason",),
+        ),
+    )
+}
+
+# app/processing/runs/page.tsx: reason = `레시피 생산 투입 (${run.id})`
+_RUN_REF = re.compile(r"\(([0-9a-fA-F-]{36})\)")
+
+
+def pick(row: dict, names: Iterable[str]):
+    """후보 열 중 처음으로 값이 있는 것. "a|b" 는 한 열의 별칭."""
+    for name in names:
+        for alias in name.split("|"):
+            v = row.get(alias)
+            if v is not None:
+                return v
+    return None
+
+
+def norm_text(v) -> str:
+    if v is None:
+        return ""
+    s = unicodedata.normalize("NFC", str(v))
+    return " ".join(s.split()).casefold()
+
+
+def norm_qty(v) -> str:
+    """NUMERIC(10,2) 기준 — 200, "200", 200.0 은 같은 값."""
+    x = js_number(v)
+    return "NaN" if math.isnan(x) else repr(round(x, 2) + 0.0)
+
+
+def kst_date(v) -> str:
+    """날짜 열 → KST 날짜 (lib/utils.ts toKSTDateString). 시간대 없는 값은 적힌 날짜 그대로."""
+    if not v or not isinstance(v, str):
+        return ""
+    s = v.strip()
+    if len(s) <= 10 or not re.search(r"(Z|[+-]\d\d(:?\d\d)?)$", s):
+        return s[:10]
+    ts = parse_timestamp(s)
+    if not math.isfinite(ts):
+        return s[:10]
+    return datetime.fromtimestamp(ts, KST).strftime("%Y-%m-%d")
+
+
+def _norm_value(v) -> str:
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return norm_qty(v)
+    if isinstance(v, (dict, list)):
+        return json.dumps(v, ensure_ascii=False, sort_keys=True)
+    return norm_text(v)
+
+
+def content_key(spec: DedupSpec, row: dict) -> tuple:
+    return (
+        str(row.get("farm_id")),
+        kst_date(pick(row, spec.date)),
+        norm_text(pick(row, spec.crop)),
+        norm_qty(pick(row, spec.qty)),
+        norm_text(pick(row, spec.unit)),
+    ) + tuple(_norm_value(pick(row, (c,))) for c in spec.extra)
+
+
+def is_cancelled(row: dict) -> bool:
+    return bool(row.get("is_cancelled")) or js_truthy(row.get("cancelled_at")) or row.get("status") == "cancelled"
+
+
+@dataclass
+class Cluster:
+    """같은 내용으로 window 안에 입력된 행 묶음."""
+
+    table: str
+    key: tuple
+    rows: list[dict]
+    times: list[float]
+    keep: dict | None = None
+    drop: list[dict] = field(default_factory=list)
+    differs: list[str] = field(default_factory=list)  # 값이 서로 다른 비교 열
+    review: list[str] = field(default_factory=list)  # 병합 계획에서 뺀 이유
+
+    @property
+    def safe(self) -> bool:
+        return not self.differs and not self.review
+
+
+def _chains(members: list[tuple[float, int, dict]], window: float | None) -> Iterable[list[tuple[float, int, dict]]]:
+    """시각 순으로 정렬해 간격이 window 이하인 행끼리 잇는다. 시각 없는 행은 따로 한 묶음."""
+    untimed = [m for m in members if not math.isfinite(m[0])]
+    if len(untimed) > 1:
+        yield untimed
+    timed = sorted((m for m in members if math.isfinite(m[0])), key=lambda m: (m[0], m[1]))
+    run: list = []
+    for m in timed:
+        if run and window is not None and m[0] - run[-1][0] > window:
+            if len(run) > 1:
+                yield run
+            run = []
+        run.append(m)
+    if len(run) > 1:
+        yield run
+
+
+def find_clusters(spec: DedupSpec, rows: Iterable[dict], window: float | None = DEFAULT_WINDOW) -> list[Cluster]:
+    buckets: dict[tuple, list[tuple[float, int, dict]]] = {}
+    seen: set = set()
+    for i, r in enumerate(rows):
+        rid = r.get("id")
+        if rid is not None:
+            if rid in seen:  # 같은 행이 여러 파일에 있는 경우
+                continue
+            seen.add(rid)
+        if is_cancelled(r):
+            continue
+        buckets.setdefault(content_key(spec, r), []).append((parse_timestamp(pick(r, spec.ts)), i, r))
+    clusters = []
+    for key, members in buckets.items():
+        if len(members) < 2:
+            continue
+        for chain in _chains(members, window):
+            clusters.append(Cluster(spec.table, key, [m[2] for m in chain], [m[0] for m in chain]))
+    clusters.sort(key=lambda c: (c.key[0], c.key[1], c.key[2]))
+    return clusters
+
+
+class Dependents:
+    """가공 기록·생산 확정에 연결된 inventory_adjustments (id → 조정 행 목록)."""
+
+    def __init__(self, adjustments: Iterable[dict] | None):
+        self.known = adjustments is not None
+        self.by_record: dict[str, list[dict]] = {}
+        self.by_run: dict[str, list[dict]] = {}
+        for a in adjustments or ():
+            rec = a.get("processing_record_id")
+            if rec:
+                self.by_record.setdefault(rec, []).append(a)
+            m = _RUN_REF.search(str(a.get("reason") or ""))
+            if m:
+                self.by_run.setdefault(m.group(1), []).append(a)
+
+    def of(self, table: str, row_id) -> list[dict]:
+        if table == "processing_records":
+            return self.by_record.get(row_id, [])
+        if table == "processing_runs":
+            return self.by_run.get(row_id, [])
+        return []
+
+    def linked(self, adjustment: dict) -> bool:
+        return bool(adjustment.get("processing_record_id")) or bool(_RUN_REF.search(str(adjustment.get("reason") or "")))
+
+
+def _filled(row: dict) -> int:
+    return sum(1 for v in row.values() if v not in (None, "", [], {}))
+
+
+def resolve(spec: DedupSpec, cluster: Cluster, deps: Dependents) -> Cluster:
+    """남길 행과 지울 행을 정하고, 계획에 넣어도 안전한지 판단한다."""
+    order = sorted(
+        range(len(cluster.rows)),
+        key=lambda i: (
+            not deps.of(spec.table, cluster.rows[i].get("id")),
+            -_filled(cluster.rows[i]),
+            cluster.times[i],
+            str(cluster.rows[i].get("id")),
+        ),
+    )
+    cluster.keep = cluster.rows[order[0]]
+    cluster.drop = [cluster.rows[i] for i in order[1:]]
+    cluster.differs = [
+        c for c in spec.compare
+        if len({_norm_value(pick(r, (c,))) for r in cluster.rows}) > 1
+    ]
+    if spec.table in ("processing_records", "processing_runs") and not deps.known:
+        cluster.review.append("inventory_adjustments 내보내기가 없어 연결된 재고 조정을 알 수 없음")
+    if spec.table == "sales_records" and any(r.get("is_settled") or js_truthy(r.get("settled_amount")) for r in cluster.drop):
+        cluster.review.append("정산된 판매 기록")
+    if spec.table == "inventory_adjustments" and any(deps.linked(r) for r in cluster.drop):
+        cluster.review.append("가공 기록에 연결된 조정 (가공 기록 쪽에서 처리)")
+    return cluster
+
+
+def _reverse_adjustment(adj: dict, now: str) -> dict:
+    """재고 화면의 가공 취소와 같은 역방향 조정."""
+    return {
+        "farm_id": adj.get("farm_id"),
+        "crop_name": adj.get("crop_name"),
+        "quantity": -js_number(adj.get("quantity")),
+        "adjustment_type": "correction",
+        "reason": f"중복 가공 기록 취소 원복 ({adj.get('reason') or ''})",
+        "adjusted_at": now,
+        "grade": adj.get("grade"),
+        "processing_record_id": adj.get("processing_record_id"),
+    }
+
+
+def plan_actions(cluster: Cluster, deps: Dependents, now: str) -> list[dict]:
+    """지울 행마다 적용할 동작들 (before 는 되돌릴 때 쓰는 원래 행)."""
+    actions = []
+    table = cluster.table
+    for r in cluster.drop:
+        rid = r.get("id")
+        linked = deps.of(table, rid)
+        if table == "processing_records":
+            actions.append({"op": "update", "table": table, "id": rid,
+                            "set": {"is_cancelled": True, "cancelled_at": now}, "before": r})
+            for a in linked:
+                actions.append({"op": "insert", "table": "inventory_adjustments", "row": _reverse_adjustment(a, now),
+                                "before": a})
+        else:
+            for a in linked:
+                actions.append({"op": "delete", "table": "inventory_adjustments", "id": a.get("id"), "before": a})
+            actions.append({"op": "delete", "table": table, "id": rid, "before": r})
+    return actions
+
+
+def _sql_literal(v) -> str:
+    if v is None:
+        return "NULL"
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, float) and not math.isfinite(v):
+        # repr 은 nan / inf 를 내므로 Postgres numeric 의 특수값 리터럴로 쓴다
+        return "'NaN'::numeric" if math.isnan(v) else f"'{'-' if v < 0 else ''}Infinity'::numeric"
+    if isinstance(v, (int, float)):
+        return repr(v)
+    if isinstance(v, (dict, list)):
+        v = json.dumps(v, ensure_ascii=False)
+    return "'" + str(v).replace("'", "''") + "'"
+
+
+def sql_lines(plan: Iterable[dict]) -> Iterable[str]:
+    yield "-- farmdata.dedup 병합 계획 (적용 전 백업: python -m farmdata.backup dump ...)"
+    yield "BEGIN;"
+    for entry in plan:
+        yield ""
+        yield f"-- {entry['table']} 유지 {entry['keep']} / 중복 {', '.join(map(str, entry['drop']))}"
+        for a in entry["actions"]:
+            t = f"public.{a['table']}"
+            if a["op"] == "delete":
+                yield f"DELETE FROM {t} WHERE id = {_sql_literal(a['id'])};"
+            elif a["op"] == "update":
+                sets = ", ".join(f"{k} = {_sql_literal(v)}" for k, v in a["set"].items())
+                yield f"UPDATE {t} SET {sets} WHERE id = {_sql_literal(a['id'])} AND is_cancelled IS NOT TRUE;"
+            elif a["op"] == "insert":
+                cols = list(a["row"])
+                yield (f"INSERT INTO {t} ({', '.join(cols)}) "
+                       f"VALUES ({', '.join(_sql_literal(a['row'][c]) for c in cols)});")
+    yield ""
+    yield "COMMIT;"
+
+
+def _when(ts: float) -> str:
+    return datetime.fromtimestamp(ts, KST).strftime("%m-%d %H:%M:%S") if math.isfinite(ts) else "시각 없음"
+
+
+def report_lines(results: dict[str, tuple[int, list[Cluster]]]) -> Iterable[str]:
+    for table, (n_rows, clusters) in results.items():
+        extra = sum(len(c.drop) for c in clusters)
+        safe = sum(1 for c in clusters if c.safe)
+        yield f"== {table}: {n_rows}행, 중복 묶음 {len(clusters)}개 (중복 행 {extra}), 병합 계획 {safe} / 검토 {len(clusters) - safe}"
+        for c in clusters:
+            farm, date, crop, qty, unit = c.key[:5]
+            tag = "병합" if c.safe else "검토"
+            yield f"  [{tag}] {farm} {date} {crop} {qty}{unit} × {len(c.rows)}"
+            for r, ts in zip(c.rows, c.times):
+                mark = "유지" if r is c.keep else "중복"
+                yield f"      {mark} {r.get('id')} ({_when(ts)})"
+            if c.differs:
+                yield f"      다른 열: {', '.join(c.differs)}"
+            for why in c.review:
+                yield f"      검토: {why}"
+
+
+def _parse_files(items: Sequence[str] | None) -> dict[str, list[Path]]:
+    files: dict[str, list[Path]] = {}
+    for item in items or ():
+        table, sep, path = item.partition("=")
+        if not sep or table not in SPECS:
+            raise SystemExit(f"--file 는 <{'|'.join(SPECS)}>=<경로> 형식이어야 합니다: {item}")
+        files.setdefault(table, []).append(Path(path))
+    return files
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="중복 입력 탐지 (검토 보고서 + 병합 계획)")
+    ap.add_argument("export_dir", nargs="?", help="Supabase 내보내기 디렉터리")
+    ap.add_argument("--file", action="append", help="테이블=파일 (예: processing_records=_backup/x.json), 여러 번 가능")
+    ap.add_argument("--table", action="append", choices=list(SPECS), help="검사할 테이블 (기본: 있는 것 전부)")
+    ap.add_argument("--window", type=float, default=DEFAULT_WINDOW, help=f"입력 시각 간격 허용 초 (기본 {DEFAULT_WINDOW:g})")
+    ap.add_argument("--any-time", action="store_true", help="입력 시각과 상관없이 내용이 같으면 중복")
+    ap.add_argument("--report", help="검토 보고서 경로 (기본: 표준 출력)")
+    ap.add_argument("--plan", help="병합 계획 NDJSON 경로")
+    ap.add_argument("--sql", help="병합 계획 SQL 경로 (BEGIN/COMMIT 한 트랜잭션)")
+    args = ap.parse_args(argv)
+
+    files = _parse_files(args.file)
+    if not args.export_dir and not files:
+        ap.error("export_dir 또는 --file 이 필요합니다.")
+    window = None if args.any_time else args.window
+
+    def rows_of(table: str, required: bool) -> list[dict] | None:
+        if table in files:
+            return [r for p in files[table] for r in iter_rows(p)]
+        if args.export_dir:
+            rows = list(load_table(args.export_dir, table, required=False))
+            return rows if rows or required else None
+        return None
+
+    try:
+        adjustments = rows_of("inventory_adjustments", required=False)
+        deps = Dependents(adjustments)
+        now = datetime.now(KST).strftime("%Y-%m-%d %H:%M:%S")
+        results: dict[str, tuple[int, list[Cluster]]] = {}
+        plan: list[dict] = []
+        for table in args.table or SPECS:
+            rows = adjustments if table == "inventory_adjustments" else rows_of(table, required=False)
+            if rows is None:
+                continue
+            spec = SPECS[table]
+            clusters = [resolve(spec, c, deps) for c in find_clusters(spec, rows, window)]
+            results[table] = (len(rows), clusters)
+            for c in clusters:
+                if c.safe:
+                    plan.append({
+                        "table": table, "key": list(c.key), "keep": c.keep.get("id"),
+                        "drop": [r.get("id") for r in c.drop], "actions": plan_actions(c, deps, now),
+                    })
+    except ExportError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+
+    lines = list(report_lines(results))
+    if args.report:
+        Path(args.report).write_text("\n".join(lines) + "\n", encoding="utf-8")
+        print(f"보고서: {args.report}")
+    else:
+        print("\n".join(lines))
+    if args.plan:
+        with open(args.plan, "w", encoding="utf-8") as f:
+            for entry in plan:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        print(f"병합 계획: {args.plan} ({len(plan)}개 묶음)")
+    if args.sql:
+        Path(args.sql).write_text("\n".join(sql_lines(plan)) + "\n", encoding="utf-8")
+        print(f"SQL: {args.sql}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
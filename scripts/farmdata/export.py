@@ -0,0 +1,129 @@
+"""Supabase 테이블 내보내기(JSON / NDJSON) 로더.
+
+내보내기 디렉터리는 테이블마다 파일 하나를 둔다.
+
+    exports/2026-03-10/
+        harvest_records.ndjson       # 한 줄에 한 행
+        sales_records.json           # 행 배열, 또는 supabase-js 응답 {"data": [...]}
+        inventory_adjustments.jsonl.gz
+
+행 순서는 파일에 적힌 순서 그대로 유지한다 (앱이 받은 순서와 같아야 합계의 끝자리까지 같다).
+"""
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import math
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator
+
+TABLE_SUFFIXES = (".ndjson", ".jsonl", ".json")
+
+
+class ExportError(Exception):
+    """내보내기 파일이 없거나 형식이 맞지 않을 때."""
+
+
+def table_path(export_dir: str | Path, table: str) -> Path | None:
+    """export_dir 에서 table 의 내보내기 파일을 찾는다 (.gz 포함)."""
+    export_dir = Path(export_dir)
+    for suffix in TABLE_SUFFIXES:
+        for name in (table + suffix, table + suffix + ".gz"):
+            p = export_dir / name
+            if p.is_file():
+                return p
+    return None
+
+
+def _open_text(path: Path) -> io.TextIOBase:
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8-sig")
+    return open(path, encoding="utf-8-sig")
+
+
+def iter_rows(path: str | Path) -> Iterator[dict]:
+    """내보내기 파일의 행을 순서대로 내보낸다. NDJSON 은 한 줄씩 읽는다."""
+    path = Path(path)
+    stem = path.name[:-3] if path.suffix == ".gz" else path.name
+    with _open_text(path) as f:
+        if stem.endswith((".ndjson", ".jsonl")):
+            for no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ExportError(f"{path}:{no}: JSON 형식 오류 ({e.msg})") from None
+            return
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ExportError(f"{path}: JSON 형식 오류 ({e.msg})") from None
+    if isinstance(data, dict):
+        if data.get("error"):
+            raise ExportError(f"{path}: 오류 응답이 저장되어 있습니다 ({data['error']})")
+        data = data.get("data")
+    if not isinstance(data, list):
+        raise ExportError(f"{path}: 행 배열이 아닙니다.")
+    yield from data
+
+
+def load_table(export_dir: str | Path, table: str, required: bool = True) -> Iterator[dict]:
+    """table 의 행들. 파일이 없으면 required=True 일 때 ExportError, 아니면 빈 목록."""
+    path = table_path(export_dir, table)
+    if path is None:
+        if required:
+            raise ExportError(f"{export_dir}: {table} 내보내기 파일이 없습니다 ({'/'.join(TABLE_SUFFIXES)}).")
+        return iter(())
+    return iter_rows(path)
+
+
+class Factor:
+    """값 → 정수 코드 사전 (처음 나온 순서대로 0, 1, 2, ...)."""
+
+    def __init__(self, values: Iterable = ()):
+        self.index: dict = {}
+        self.values: list = []
+        for v in values:
+            self.code(v)
+
+    def code(self, value) -> int:
+        c = self.index.get(value)
+        if c is None:
+            c = self.index[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def parse_timestamp(value) -> float:
+    """ISO 8601 시각 → UTC epoch 초. 시간대가 없으면 UTC(Supabase 세션 기본값)로 본다.
+
+    값이 없거나 해석할 수 없으면 -inf (가장 오래된 행으로 취급).
+    """
+    if not value or not isinstance(value, str):
+        return -math.inf
+    s = value.strip().replace(" ", "T", 1)
+    if s.endswith(("Z", "z")):
+        s = s[:-1] + "+00:00"
+    # Postgres 는 "+09" 처럼 분 없는 오프셋을 쓴다
+    if len(s) > 3 and s[-3] in "+-" and s[-2:].isdigit() and "T" in s:
+        s += ":00"
+    try:
+        dt = datetime.fromisoformat(s)
+    except ValueError:
+        return -math.inf
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def format_timestamp(epoch: float) -> str:
+    """parse_timestamp 의 역 (UTC, 마이크로초까지)."""
+    if not math.isfinite(epoch):
+        return ""
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
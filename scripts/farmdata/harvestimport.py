@@ -0,0 +1,460 @@
+"""수확·선별 일괄 입력 — 검증은 메모리에서 한 번, 쓰기는 묶음마다 여러 행 INSERT 한 문장.
+
+harvest_inspections 에는 행마다 도는 트리거가 둘 있다
+(supabase/migrations/20260308000002_add_harvest_management.sql).
+    harvest_inspection_total_check        BEFORE INSERT — 그 수확의 선별 행을 모두 다시 더한다
+    auto_inventory_on_inspection          AFTER INSERT  — inventory_adjustments 에 한 행씩 INSERT
+한 철의 선별 자료를 앱처럼 한 행씩 넣으면 수확마다 제곱에 비례해 느려진다.
+
+여기서는
+    1. 선별 행을 harvest_id 로 묶고, DB 에 이미 있는 선별 합계를 한 번에 읽어
+       "선별 수량 합 <= 수확 수량" 을 메모리에서 검사한다 (수확 단위로 통과/거부).
+       트리거는 BEFORE 시점에 새 행을 빼고 더하므로 마지막 행이 넘치는 것을 놓치지만, 여기서는 새 행까지 더한다.
+    2. 통과한 수확을 묶음(--batch 행)으로 나눠, 묶음마다 한 트랜잭션에서
+       harvests → harvest_inspections → inventory_adjustments 를 각각 여러 행 INSERT 한 문장으로 쓴다.
+       한 수확의 선별 행은 한 묶음에 모두 들어간다.
+    3. inventory_adjustments 는 트리거와 같은 규칙으로 만든다
+       (adjustment_type = harvest_<등급>, reason = '선별 완료: 등급 (위치: ..)').
+
+Postgres 에서는 묶음 트랜잭션 안에서 선별 INSERT 동안만 ALTER TABLE ... DISABLE TRIGGER 로 위 두 트리거를
+끄고 다시 켠다 (테이블 소유자 권한 필요). 외래 키 검사(harvest_id, farm_id, inspector_id)는 그대로 돌고,
+inspector_id 는 계획 단계에서 auth.users 와도 맞춰 본다. ALTER TABLE 은 harvest_inspections 를
+ACCESS EXCLUSIVE 로 잠그므로 묶음이 끝날 때까지 다른 세션은 이 테이블을 기다린다.
+권한이 없으면 --keep-triggers 로 트리거에 맡긴다
+(여러 행 한 문장은 그대로지만 재고 조정은 트리거가 만들고, 합계 검사도 행마다 다시 돈다).
+묶음을 쓸 때 기존 수확 행을 FOR UPDATE 로 잠그고 선별 합계를 다시 읽어, 검사 뒤에 들어온 선별까지 반영한다.
+
+이미 있는 id(수확·선별)는 건너뛰므로 같은 파일을 다시 넣어도 된다.
+
+입력 (내보내기 형식 .ndjson/.jsonl/.json(.gz) 또는 .csv)
+    harvests             id, farm_id, crop_name, harvest_date, quantity, unit, memo, created_by
+    harvest_inspections  id, harvest_id, farm_id, grade, quantity, unit, processing_type,
+                         warehouse_location, inspector_id, inspection_memo
+
+    python -m farmdata.harvestimport imports/2026-spring --db sqlite:///.farmdata/localdb.sqlite --dry-run
+    python -m farmdata.harvestimport --harvests h.csv --inspections i.csv --db postgresql://... --created-by <uuid>
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+from farmdata.export import ExportError, iter_rows, table_path
+from farmdata.localdb import LocalDB, LocalDBError
+
+GRADES = ("normal", "downgrade", "processing", "discard")
+PROCESSING_TYPES = ("direct_storage", "downgrade_storage", "mark_for_processing", "mark_for_discard")
+ADJUSTMENT_TYPES = {"normal": "harvest_normal", "downgrade": "harvest_downgrade",
+                    "processing": "harvest_for_processing", "discard": "harvest_discard"}
+
+HARVEST_COLUMNS = ("id", "farm_id", "crop_name", "harvest_date", "quantity", "unit", "memo", "created_by")
+INSPECTION_COLUMNS = ("id", "harvest_id", "farm_id", "grade", "quantity", "unit", "processing_type",
+                      "warehouse_location", "inspector_id", "inspection_memo")
+ADJUSTMENT_COLUMNS = ("id", "farm_id", "crop_name", "adjustment_type", "quantity", "reason", "adjusted_at")
+# 직접 INSERT 할 때 끄는 harvest_inspections 트리거 (외래 키 트리거는 건드리지 않는다)
+BYPASSED_TRIGGERS = ("harvest_inspection_total_check", "auto_inventory_on_inspection")
+
+MAX_PARAMS = 30000  # SQLite 32766, Postgres 65535 보다 작게
+CENT = Decimal("0.01")
+
+
+class HarvestImportError(Exception):
+    """입력 파일을 읽을 수 없거나 DB 가 요구 조건을 채우지 못할 때."""
+
+
+# --- 입력 -------------------------------------------------------------------
+
+
+def read_rows(path: str | Path) -> Iterator[dict]:
+    path = Path(path)
+    if path.suffix == ".csv":
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                yield {k.strip(): (v.strip() if v is not None and v.strip() != "" else None) for k, v in row.items()}
+        return
+    yield from iter_rows(path)
+
+
+def _table_file(src: str | Path, table: str) -> Path | None:
+    p = table_path(src, table)
+    if p is None and (Path(src) / f"{table}.csv").is_file():
+        p = Path(src) / f"{table}.csv"
+    return p
+
+
+def quantity(value) -> Decimal | None:
+    """NUMERIC(10,2) 로 반올림한 수량. 숫자가 아니면 None."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        q = Decimal(str(value).replace(",", "")).quantize(CENT)
+    except InvalidOperation:
+        return None
+    return q if q.is_finite() else None
+
+
+@dataclass
+class Problem:
+    where: str  # 파일:행 또는 harvest_id
+    message: str
+
+
+@dataclass
+class Harvest:
+    row: dict
+    quantity: Decimal
+    existing: bool = False  # DB 에 이미 있는 수확 (이번에 쓰지 않는다)
+    inspected: Decimal = Decimal(0)  # DB 에 이미 있는 선별 합계
+    inspections: list[dict] = field(default_factory=list)
+
+
+def load_harvests(rows: Iterable[dict], source: str, created_by: str | None,
+                  problems: list[Problem]) -> dict[str, Harvest]:
+    out: dict[str, Harvest] = {}
+    for no, r in enumerate(rows, 1):
+        where = f"{source}:{no}"
+        q = quantity(r.get("quantity"))
+        missing = [c for c in ("farm_id", "crop_name", "harvest_date", "unit") if not r.get(c)]
+        if missing:
+            problems.append(Problem(where, f"필수 값 없음: {', '.join(missing)}"))
+            continue
+        if q is None or q <= 0:
+            problems.append(Problem(where, f"수확 수량이 양수가 아님: {r.get('quantity')!r}"))
+            continue
+        row = {c: r.get(c) for c in HARVEST_COLUMNS}
+        row["id"] = str(r.get("id") or uuid.uuid4())
+        row["created_by"] = r.get("created_by") or created_by
+        if not row["created_by"]:
+            problems.append(Problem(where, "created_by 없음 (--created-by 로 기본값을 줄 수 있음)"))
+            continue
+        if row["id"] in out:
+            problems.append(Problem(where, f"같은 수확 id 가 두 번 나옴: {row['id']}"))
+            continue
+        out[row["id"]] = Harvest(row, q)
+    return out
+
+
+def load_inspections(rows: Iterable[dict], source: str, problems: list[Problem]) -> list[tuple[str, dict, Decimal]]:
+    out = []
+    seen = set()
+    for no, r in enumerate(rows, 1):
+        where = f"{source}:{no}"
+        q = quantity(r.get("quantity"))
+        if not r.get("harvest_id") or not r.get("unit"):
+            problems.append(Problem(where, "필수 값 없음: harvest_id / unit"))
+            continue
+        if r.get("grade") not in GRADES:
+            problems.append(Problem(where, f"알 수 없는 등급: {r.get('grade')!r}"))
+            continue
+        if r.get("processing_type") and r["processing_type"] not in PROCESSING_TYPES:
+            problems.append(Problem(where, f"알 수 없는 처리 유형: {r['processing_type']!r}"))
+            continue
+        if q is None or q <= 0:
+            problems.append(Problem(where, f"선별 수량이 양수가 아님: {r.get('quantity')!r}"))
+            continue
+        row = {c: r.get(c) for c in INSPECTION_COLUMNS}
+        if row["inspector_id"]:
+            try:
+                row["inspector_id"] = str(uuid.UUID(str(row["inspector_id"])))
+            except ValueError:
+                problems.append(Problem(where, f"inspector_id 가 UUID 가 아님: {row['inspector_id']!r}"))
+                continue
+        row["id"] = str(r.get("id") or uuid.uuid4())
+        if row["id"] in seen:
+            problems.append(Problem(where, f"같은 선별 id 가 두 번 나옴: {row['id']}"))
+            continue
+        seen.add(row["id"])
+        out.append((where, row, q))
+    return out
+
+
+# --- DB ---------------------------------------------------------------------
+
+
+def _chunks(seq: Sequence, n: int) -> Iterator[Sequence]:
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+
+def _in_list(values: Sequence[str]) -> tuple[str, dict]:
+    names = {f"v{i}": v for i, v in enumerate(values)}
+    return ", ".join(f":{k}" for k in names), names
+
+
+def existing_ids(db: LocalDB, table: str, ids: Sequence[str], lock: bool = False) -> set[str]:
+    found = set()
+    for part in _chunks(list(ids), 1000):
+        ph, params = _in_list(part)
+        sql = f"SELECT id FROM {table} WHERE id IN ({ph})"
+        if lock and db.dialect == "postgres":
+            sql += " FOR UPDATE"
+        found.update(str(r[0]) for r in db.query(sql, params))
+    return found
+
+
+def harvest_facts(db: LocalDB, ids: Sequence[str]) -> dict[str, tuple[Decimal, str, str]]:
+    """DB 에 있는 수확의 (수량, 작물, 농장)."""
+    out = {}
+    for part in _chunks(list(ids), 1000):
+        ph, params = _in_list(part)
+        sql = f"SELECT id, quantity, crop_name, farm_id FROM harvests WHERE id IN ({ph})"
+        for hid, q, crop, farm in db.query(sql, params):
+            out[str(hid)] = (quantity(q) or Decimal(0), crop, str(farm))
+    return out
+
+
+def inspected_totals(db: LocalDB, ids: Sequence[str]) -> dict[str, Decimal]:
+    out = {}
+    for part in _chunks(list(ids), 1000):
+        ph, params = _in_list(part)
+        for hid, total in db.query(
+                f"SELECT harvest_id, SUM(quantity) FROM harvest_inspections WHERE harvest_id IN ({ph}) "
+                "GROUP BY harvest_id", params):
+            out[str(hid)] = quantity(total) or Decimal(0)
+    return out
+
+
+def insert_values(db: LocalDB, table: str, columns: Sequence[str], rows: Sequence[dict]) -> int:
+    """여러 행 INSERT 한 문장 (자리표시자 수가 한도를 넘으면 그만큼만 나눈다).
+
+    이름 붙은 자리표시자는 SQLite 가 문장을 준비할 때 이름을 차례로 찾아 행 수의 제곱으로 느려지므로
+    insert_many 처럼 위치 자리표시자를 쓴다.
+    """
+    mark = "?" if db.dialect == "sqlite" else "%s"
+    one = "(" + ", ".join(mark for _ in columns) + ")"
+    per = max(1, MAX_PARAMS // len(columns))
+    cur = db.conn.cursor()
+    for part in _chunks(rows, per):
+        values = [_db_value(db, r.get(c)) for r in part for c in columns]
+        cur.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ", ".join(one for _ in part), values)
+    cur.close()
+    return len(rows)
+
+
+def _db_value(db: LocalDB, v):
+    if isinstance(v, Decimal):
+        return float(v) if db.dialect == "sqlite" else v
+    return v
+
+
+@contextmanager
+def transaction(db: LocalDB):
+    if db.dialect == "sqlite":
+        db.execute("BEGIN IMMEDIATE").close()
+        try:
+            yield
+        except BaseException:
+            db.execute("ROLLBACK").close()
+            raise
+        db.execute("COMMIT").close()
+    else:
+        with db.conn.transaction():
+            yield
+
+
+# --- 가져오기 ----------------------------------------------------------------
+
+
+@dataclass
+class ImportReport:
+    harvests: int = 0
+    inspections: int = 0
+    adjustments: int = 0
+    skipped_harvests: int = 0  # 이미 있는 id
+    skipped_inspections: int = 0
+    rejected: list[Problem] = field(default_factory=list)  # 수확 단위 거부 (합계 초과 등)
+    problems: list[Problem] = field(default_factory=list)  # 행 단위 오류
+    batches: int = 0
+    seconds: float = 0.0
+
+
+def adjustment_for(inspection: dict, crop_name: str, at: str) -> dict:
+    """create_inventory_adjustment_on_inspection 과 같은 재고 조정 행."""
+    location = inspection.get("warehouse_location")
+    return {"id": str(uuid.uuid4()), "farm_id": inspection["farm_id"], "crop_name": crop_name,
+            "adjustment_type": ADJUSTMENT_TYPES[inspection["grade"]], "quantity": inspection["quantity"],
+            "reason": f"선별 완료: {inspection['grade']}" + (f" (위치: {location})" if location else ""),
+            "adjusted_at": at}
+
+
+def plan(db: LocalDB, harvests: dict[str, Harvest], inspections: list[tuple[str, dict, Decimal]],
+         report: ImportReport) -> list[Harvest]:
+    """DB 의 기존 행을 반영해 수확마다 선별을 붙이고, 합계 규칙을 어기는 수확을 거른다."""
+    referenced = {row["harvest_id"] for _, row, _ in inspections}
+    for hid, (q, crop, farm) in harvest_facts(db, sorted(referenced | set(harvests))).items():
+        if hid in harvests:
+            report.skipped_harvests += 1
+        # DB 에 있는 수확은 DB 의 수량을 기준으로 검사한다
+        harvests[hid] = Harvest({"id": hid, "crop_name": crop, "farm_id": farm}, q, existing=True)
+    done = existing_ids(db, "harvest_inspections", [row["id"] for _, row, _ in inspections])
+    report.skipped_inspections = len(done)
+    # inspector_id 는 auth.users 를 참조한다 (SQLite 대역에는 auth.users 도 외래 키도 없다)
+    inspectors = sorted({row["inspector_id"] for _, row, _ in inspections if row.get("inspector_id")})
+    known = existing_ids(db, "auth.users", inspectors) if db.dialect == "postgres" else set(inspectors)
+
+    for where, row, q in inspections:
+        h = harvests.get(row["harvest_id"])
+        if h is None:
+            report.problems.append(Problem(where, f"수확을 찾을 수 없음: {row['harvest_id']}"))
+            continue
+        if row["id"] in done:
+            continue
+        if row.get("inspector_id") and row["inspector_id"] not in known:
+            report.problems.append(Problem(where, f"선별자를 찾을 수 없음 (auth.users): {row['inspector_id']}"))
+            continue
+        if row.get("farm_id") and row["farm_id"] != h.row["farm_id"]:
+            report.problems.append(Problem(where, f"농장이 수확과 다름: {row['farm_id']} != {h.row['farm_id']}"))
+            continue
+        row["farm_id"] = h.row["farm_id"]
+        row["quantity"] = q
+        h.inspections.append(row)
+
+    for hid, total in inspected_totals(db, [hid for hid, h in harvests.items() if h.existing]).items():
+        harvests[hid].inspected = total
+
+    ok = []
+    for hid, h in harvests.items():
+        new = sum((r["quantity"] for r in h.inspections), Decimal(0))
+        if h.inspected + new > h.quantity:
+            report.rejected.append(Problem(hid, f"선별 수량({h.inspected + new}) 은 수확 수량({h.quantity})을 "
+                                                f"초과할 수 없습니다 (기존 {h.inspected}, 이번 {new}, {len(h.inspections)}행)"))
+            continue
+        if h.existing and not h.inspections:
+            continue
+        ok.append(h)
+    return ok
+
+
+def batches(harvests: Sequence[Harvest], size: int) -> Iterator[list[Harvest]]:
+    """수확을 쪼개지 않고 행 수가 size 근처가 되도록 묶는다."""
+    cur: list[Harvest] = []
+    n = 0
+    for h in harvests:
+        rows = (0 if h.existing else 1) + 2 * len(h.inspections)
+        if cur and n + rows > size:
+            yield cur
+            cur, n = [], 0
+        cur.append(h)
+        n += rows
+    if cur:
+        yield cur
+
+
+def write_batch(db: LocalDB, batch: Sequence[Harvest], keep_triggers: bool, report: ImportReport) -> None:
+    at = datetime.now(timezone.utc).isoformat()
+    with transaction(db):
+        existing = [h for h in batch if h.existing]
+        if existing:
+            # 검사 뒤에 다른 선별이 들어왔을 수 있으므로, 잠근 상태에서 기존 합계를 다시 읽는다
+            existing_ids(db, "harvests", [h.row["id"] for h in existing], lock=True)
+            now = inspected_totals(db, [h.row["id"] for h in existing])
+            for h in existing:
+                total = now.get(h.row["id"], Decimal(0))
+                if total != h.inspected:
+                    h.inspected = total
+                    new = sum((r["quantity"] for r in h.inspections), Decimal(0))
+                    if total + new > h.quantity:
+                        report.rejected.append(Problem(h.row["id"], f"쓰는 사이 기존 선별이 {total} 로 바뀌어 "
+                                                                    f"수확 수량({h.quantity})을 넘음"))
+                        h.inspections = []
+        new_harvests = [{**h.row, "quantity": h.quantity} for h in batch if not h.existing]
+        inspections = [r for h in batch for r in h.inspections]
+        adjustments = [adjustment_for(r, h.row["crop_name"], at) for h in batch for r in h.inspections]
+        if new_harvests:
+            report.harvests += insert_values(db, "harvests", HARVEST_COLUMNS, new_harvests)
+        if inspections:
+            bypass = db.dialect == "postgres" and not keep_triggers
+            if bypass:
+                try:
+                    _set_triggers(db, "DISABLE")
+                except Exception as e:  # 테이블 소유자가 아님 (InsufficientPrivilege)
+                    raise HarvestImportError(f"트리거를 끌 권한이 없습니다 ({e}). --keep-triggers 로 다시 실행하세요.") from e
+            report.inspections += insert_values(db, "harvest_inspections", INSPECTION_COLUMNS, inspections)
+            if bypass:
+                _set_triggers(db, "ENABLE")
+            # SQLite 대역에는 트리거가 없고, Postgres 는 위에서 껐으므로 직접 쓴다
+            if db.dialect == "sqlite" or bypass:
+                report.adjustments += insert_values(db, "inventory_adjustments", ADJUSTMENT_COLUMNS, adjustments)
+    report.batches += 1
+
+
+def _set_triggers(db: LocalDB, action: str) -> None:
+    """BYPASSED_TRIGGERS 를 끄거나 켠다. 트랜잭션 안에서만 부르므로 실패하면 함께 되돌려진다."""
+    for name in BYPASSED_TRIGGERS:
+        db.execute(f"ALTER TABLE public.harvest_inspections {action} TRIGGER {name}").close()
+
+
+def run(db: LocalDB, harvest_rows: Iterable[dict], inspection_rows: Iterable[dict], *, created_by: str | None = None,
+        batch_size: int = 5000, keep_triggers: bool = False, dry_run: bool = False, skip_invalid: bool = False,
+        sources: tuple[str, str] = ("harvests", "harvest_inspections"), log=None) -> ImportReport:
+    report = ImportReport()
+    t0 = time.perf_counter()
+    harvests = load_harvests(harvest_rows, sources[0], created_by, report.problems)
+    inspections = load_inspections(inspection_rows, sources[1], report.problems)
+    ok = plan(db, harvests, inspections, report)
+    if (report.problems or report.rejected) and not skip_invalid:
+        report.seconds = time.perf_counter() - t0
+        return report
+    if not dry_run:
+        for i, batch in enumerate(batches(ok, batch_size), 1):
+            write_batch(db, batch, keep_triggers, report)
+            if log:
+                log(f"  묶음 {i}: 수확 {report.harvests}, 선별 {report.inspections}, 재고 조정 {report.adjustments}")
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="수확·선별 자료를 검증한 뒤 묶음 INSERT 로 넣는다")
+    ap.add_argument("src", nargs="?", help="harvests / harvest_inspections 파일이 있는 디렉터리")
+    ap.add_argument("--harvests", help="수확 파일 (src 대신)")
+    ap.add_argument("--inspections", help="선별 파일 (src 대신)")
+    ap.add_argument("--db", required=True, help="sqlite:///파일 | postgresql://...")
+    ap.add_argument("--created-by", help="created_by 가 비어 있는 수확에 넣을 사용자 id")
+    ap.add_argument("--batch", type=int, default=5000, help="묶음당 대략의 행 수 (수확은 쪼개지 않음)")
+    ap.add_argument("--keep-triggers", action="store_true", help="Postgres 트리거를 끄지 않는다 (재고 조정은 트리거가 만든다)")
+    ap.add_argument("--skip-invalid", action="store_true", help="오류가 있는 행·수확만 빼고 나머지를 넣는다")
+    ap.add_argument("--dry-run", action="store_true", help="검증만 하고 쓰지 않는다")
+    args = ap.parse_args(argv)
+
+    h_path = Path(args.harvests) if args.harvests else (_table_file(args.src, "harvests") if args.src else None)
+    i_path = Path(args.inspections) if args.inspections else (
+        _table_file(args.src, "harvest_inspections") if args.src else None)
+    if h_path is None and i_path is None:
+        print("오류: harvests / harvest_inspections 입력이 없습니다.", file=sys.stderr)
+        return 1
+    try:
+        db = LocalDB.open(args.db)
+        report = run(db, read_rows(h_path) if h_path else (), read_rows(i_path) if i_path else (),
+                     created_by=args.created_by, batch_size=args.batch, keep_triggers=args.keep_triggers,
+                     dry_run=args.dry_run, skip_invalid=args.skip_invalid,
+                     sources=(h_path.name if h_path else "-", i_path.name if i_path else "-"),
+                     log=lambda m: print(m, file=sys.stderr))
+    except (ExportError, LocalDBError, HarvestImportError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    db.close()
+
+    for p in report.problems:
+        print(f"행 오류 {p.where}: {p.message}")
+    for p in report.rejected:
+        print(f"거부 수확 {p.where}: {p.message}")
+    blocked = (report.problems or report.rejected) and not args.skip_invalid
+    verb = "검증만 함" if args.dry_run else ("쓰지 않음 (오류, --skip-invalid 로 나머지만 넣을 수 있음)" if blocked else "완료")
+    print(f"{verb}: 수확 {report.harvests}, 선별 {report.inspections}, 재고 조정 {report.adjustments} "
+          f"({report.batches}묶음, {report.seconds:.2f}초) / 이미 있음 수확 {report.skipped_harvests}, "
+          f"선별 {report.skipped_inspections} / 행 오류 {len(report.problems)}, 거부 수확 {len(report.rejected)}")
+    return 1 if blocked else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
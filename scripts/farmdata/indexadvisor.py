@@ -0,0 +1,763 @@
+"""쿼리 모양 정적 추출 + 인덱스 권고 — 앱의 supabase-js 체인과 마이그레이션의 인덱스를 맞대 본다.
+
+app/ · hooks/ · lib/ · components/ 의 .ts/.tsx 에서 supabase.from("테이블")... 체인을 읽어
+(테이블, 같음 조건, 범위 조건, 정렬, limit) 모양으로 바꾸고, scripts/*.sql + supabase/migrations/*.sql 이
+선언한 인덱스(기본 키·UNIQUE 포함, DROP INDEX 반영)와 비교한다.
+
+판정 (btree 기준)
+    완전   같음 조건 열이 모두 인덱스 앞쪽에 있고, 그 다음 열이 정렬(없으면 범위 조건) 열이다.
+           UNIQUE 인덱스의 열이 모두 같음 조건이면 한 행이므로 완전으로 본다.
+    일부   앞쪽 몇 열만 쓸 수 있다 (나머지는 읽고 거르거나 따로 정렬).
+    없음   쓸 수 있는 인덱스가 없다 (농장 전체 또는 테이블 전체를 읽는다).
+    if (...) query = query.eq(...) 처럼 조건부로 붙는 조건은 권고 열에서 뺀다.
+
+권고 점수 (호출 위치마다 더한다)
+    1 + (정렬과 limit 이 함께 있으면 2: 인덱스로 앞 N 행만 읽는다) + (지금 쓸 수 있는 인덱스가 없으면 1)
+    한 권고의 쿼리를 다른 권고가 완전히 받쳐 주면 (그중 점수가 가장 높은) 그쪽으로 합친다.
+
+스키마 드리프트
+    앱 쿼리가 쓰는데 마이그레이션이 선언하지 않은 테이블·열 (ADD/DROP/RENAME COLUMN 반영). 이런 쿼리에는
+    만들 수 없는 CREATE INDEX 대신 드리프트로 따로 적는다.
+
+중복 인덱스
+    같은 테이블의 다른 btree 인덱스의 앞부분과 같은 일반 인덱스, 그리고 권고를 만들면 앞부분이 되는 인덱스.
+    앱 쿼리가 쓰지 않는 인덱스도 따로 적는다 (FK 열은 ON DELETE 검사에 쓰이므로 뺀다).
+
+--verify 는 farmdata.querybench 로 로컬 DB 에 시드한 뒤 권고 인덱스를 만들기 전후의 쿼리 시간을 잰다.
+
+    python -m farmdata.indexadvisor
+    python -m farmdata.indexadvisor --shapes --sql supabase/migrations/20260401000000_add_query_indexes.sql
+    python -m farmdata.indexadvisor --verify sqlite:////tmp/advisor.sqlite --farms 20 --rows 3000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from farmdata.localdb import (ALTER_TABLE, CREATE_INDEX, CREATE_TABLE, REPO_ROOT, balanced_end, ddl_statements,
+                              keyword, read_sql, schema_files, split_sql, split_top, table_name)
+
+SOURCE_DIRS = ("app", "hooks", "lib", "components")
+NONE, PARTIAL, FULL = 0, 1, 2
+LEVEL_NAMES = {NONE: "없음", PARTIAL: "일부", FULL: "완전"}
+
+EQ_METHODS = {"eq", "is", "in", "contains", "containedBy"}
+RANGE_METHODS = {"gt", "gte", "lt", "lte"}
+OTHER_METHODS = {"neq", "not", "like", "ilike", "or", "textSearch", "overlaps", "likeAnyOf", "ilikeAnyOf"}
+OPS = {"select", "insert", "update", "upsert", "delete"}
+FILTER_OPS = {"eq": "eq", "is": "is", "in": "in", "gt": "gt", "gte": "gte", "lt": "lt", "lte": "lte"}
+RECEIVER_BLOCKLIST = {"Array", "Buffer", "Object", "storage", "Uint8Array"}
+
+
+# --- supabase-js 체인 읽기 ---------------------------------------------------
+
+
+@dataclass
+class Shape:
+    file: str
+    line: int
+    table: str
+    op: str = "select"
+    eq: list[str] = field(default_factory=list)
+    range: list[str] = field(default_factory=list)
+    other: list[str] = field(default_factory=list)
+    order: list[tuple[str, bool]] = field(default_factory=list)  # (열, 내림차순)
+    limit: int | str | None = None
+    conditional: list[str] = field(default_factory=list)  # if 안에서 붙는 조건 열
+
+    @property
+    def site(self) -> str:
+        return f"{self.file}:{self.line}"
+
+    def describe(self) -> str:
+        parts = [self.op]
+        if self.eq:
+            parts.append(f"eq({', '.join(self.eq)})")
+        if self.range:
+            parts.append(f"range({', '.join(self.range)})")
+        if self.other:
+            parts.append(f"other({', '.join(self.other)})")
+        if self.conditional:
+            parts.append(f"if({', '.join(self.conditional)})")
+        if self.order:
+            parts.append("order(" + ", ".join(c + (" desc" if d else "") for c, d in self.order) + ")")
+        if self.limit is not None:
+            parts.append(f"limit {self.limit}")
+        return " ".join(parts)
+
+
+def _skip_ws(text: str, i: int) -> int:
+    n = len(text)
+    while i < n:
+        if text[i].isspace():
+            i += 1
+        elif text.startswith("//", i):
+            j = text.find("\n", i)
+            i = n if j < 0 else j + 1
+        elif text.startswith("/*", i):
+            j = text.find("*/", i + 2)
+            i = n if j < 0 else j + 2
+        else:
+            break
+    return i
+
+
+def _string_end(text: str, i: int) -> int:
+    """text[i] 가 따옴표일 때 문자열 다음 위치 (템플릿의 ${...} 포함)."""
+    q, j, n = text[i], i + 1, len(text)
+    while j < n:
+        c = text[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == q:
+            return j + 1
+        if q == "`" and text.startswith("${", j):
+            j = _group_end(text, j + 1)
+            continue
+        j += 1
+    return n
+
+
+def _group_end(text: str, i: int) -> int:
+    """text[i] 가 ( [ { 일 때 짝이 맞는 닫는 괄호 다음 위치."""
+    pairs = {"(": ")", "[": "]", "{": "}"}
+    stack = [pairs[text[i]]]
+    j, n = i + 1, len(text)
+    while j < n and stack:
+        c = text[j]
+        if c in "'\"`":
+            j = _string_end(text, j)
+            continue
+        if text.startswith("//", j) or text.startswith("/*", j):
+            j = _skip_ws(text, j)
+            continue
+        if c in pairs:
+            stack.append(pairs[c])
+        elif c == stack[-1]:
+            stack.pop()
+        j += 1
+    return j
+
+
+def _split_args(raw: str) -> list[str]:
+    args, depth, start, j = [], 0, 0, 0
+    while j < len(raw):
+        c = raw[j]
+        if c in "'\"`":
+            j = _string_end(raw, j)
+            continue
+        if c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+        elif c == "," and depth == 0:
+            args.append(raw[start:j].strip())
+            start = j + 1
+        j += 1
+    if raw[start:].strip():
+        args.append(raw[start:].strip())
+    return args
+
+
+def _literal(arg: str | None):
+    """문자열 / 정수 리터럴이면 값, 아니면 None."""
+    if not arg:
+        return None
+    arg = arg.strip()
+    if len(arg) >= 2 and arg[0] in "'\"`" and arg[-1] == arg[0] and "${" not in arg:
+        return arg[1:-1]
+    if re.fullmatch(r"\d+", arg):
+        return int(arg)
+    return None
+
+
+def _walk(text: str, i: int) -> tuple[list[tuple[str, list[str]]], int]:
+    """i 부터 .method(args) 를 이어서 읽는다. (호출 목록, 끝 위치)."""
+    calls = []
+    while True:
+        j = _skip_ws(text, i)
+        if not text.startswith(".", j) or text.startswith("...", j):
+            return calls, i
+        m = re.match(r"\.\s*([A-Za-z_]\w*)", text[j:])
+        if not m:
+            return calls, i
+        k = _skip_ws(text, j + m.end())
+        if not text.startswith("(", k):
+            return calls, i  # .data 같은 속성 접근
+        end = _group_end(text, k)
+        calls.append((m.group(1), _split_args(text[k + 1:end - 1])))
+        i = end
+
+
+def _apply(shape: Shape, calls: Iterable[tuple[str, list[str]]], conditional: bool = False) -> None:
+    for name, args in calls:
+        col = _literal(args[0]) if args else None
+        if name in OPS:
+            if shape.op == "select" and name != "select":
+                shape.op = name
+            if name == "select" and len(args) > 1 and re.search(r"head\s*:\s*true", args[1]):
+                shape.op = "count"
+            continue
+        if name == "filter" and len(args) >= 2:
+            name = FILTER_OPS.get(_literal(args[1]) or "", "not")
+        if name == "match" and args:
+            cols = re.findall(r"([A-Za-z_]\w*)\s*:", args[0])
+            (shape.conditional if conditional else shape.eq).extend(cols)
+            continue
+        if name == "order" and isinstance(col, str):
+            opts = args[1] if len(args) > 1 else ""
+            if re.search(r"(foreignTable|referencedTable)\s*:", opts):
+                continue
+            shape.order.append((col, bool(re.search(r"ascending\s*:\s*false", opts))))
+            continue
+        if name == "limit" and args:
+            shape.limit = _literal(args[0]) if _literal(args[0]) is not None else "?"
+            continue
+        if name == "range" and len(args) >= 2:
+            lo, hi = _literal(args[0]), _literal(args[1])
+            shape.limit = hi - lo + 1 if isinstance(lo, int) and isinstance(hi, int) else "?"
+            continue
+        if name in ("single", "maybeSingle"):
+            shape.limit = 1
+            continue
+        if not isinstance(col, str):
+            continue
+        if conditional and (name in EQ_METHODS or name in RANGE_METHODS):
+            if col not in shape.conditional:
+                shape.conditional.append(col)
+        elif name in EQ_METHODS:
+            shape.eq.append(col)
+        elif name in RANGE_METHODS:
+            if col not in shape.range:
+                shape.range.append(col)
+        elif name in OTHER_METHODS:
+            shape.other.append(col)
+
+
+_FROM = re.compile(r"\.\s*from\s*\(\s*(['\"`])([A-Za-z_]\w*)\1\s*\)")
+_ASSIGN = re.compile(r"(?:let|const|var)\s+([A-Za-z_]\w*)\s*(?::\s*[\w<>\[\], ]+)?=\s*(?:await\s+)?[\w.]*\s*$")
+
+
+def extract_shapes(text: str, file: str) -> list[Shape]:
+    shapes = []
+    for m in _FROM.finditer(text):
+        before = text[max(0, m.start() - 200):m.start()]
+        recv = re.search(r"([A-Za-z_$][\w$]*)\s*$", before)
+        if recv and recv.group(1) in RECEIVER_BLOCKLIST:
+            continue
+        shape = Shape(file=file, line=text.count("\n", 0, m.start()) + 1, table=m.group(2))
+        calls, end = _walk(text, m.end())
+        _apply(shape, calls)
+        var = _ASSIGN.search(text[max(0, m.start() - 200):m.start()])
+        if var:
+            _follow(text, end, var.group(1), shape)
+        shapes.append(shape)
+    return shapes
+
+
+def _follow(text: str, start: int, var: str, shape: Shape) -> None:
+    """let query = supabase.from(...) 뒤에서 query 에 이어 붙는 호출을 모은다."""
+    nxt = _FROM.search(text, start)
+    stop = min(nxt.start() if nxt else len(text), start + 4000)
+    rx = re.compile(rf"(\b{re.escape(var)}\s*=\s*)?(?:await\s+)?\b{re.escape(var)}(?=\s*\.)")
+    for m in rx.finditer(text, start, stop):
+        calls, _ = _walk(text, m.end())
+        _apply(shape, calls, conditional=bool(m.group(1)))
+
+
+def _is_backup(name: str) -> bool:
+    """page.page.backup.tsx, page.tsx.bak_final 같은 사본은 배포되지 않는다."""
+    return bool(re.search(r"\.(backup|bak\w*|orig|old)\b", name))
+
+
+def scan_sources(root: Path = REPO_ROOT, dirs: Sequence[str] = SOURCE_DIRS) -> list[Shape]:
+    out = []
+    for d in dirs:
+        for path in sorted((root / d).rglob("*")):
+            if path.suffix not in (".ts", ".tsx") or "node_modules" in path.parts or _is_backup(path.name):
+                continue
+            out.extend(extract_shapes(path.read_text(encoding="utf-8", errors="replace"),
+                                      str(path.relative_to(root))))
+    return out
+
+
+# --- 선언된 인덱스 ------------------------------------------------------------
+
+
+@dataclass
+class Index:
+    table: str
+    name: str
+    columns: tuple[str, ...]
+    desc: tuple[bool, ...]
+    unique: bool = False
+    primary: bool = False
+    where: str | None = None
+    method: str = "btree"
+    source: str = ""
+
+    def label(self) -> str:
+        cols = ", ".join(c + (" DESC" if d else "") for c, d in zip(self.columns, self.desc))
+        extra = " PK" if self.primary else " UNIQUE" if self.unique else ""
+        where = f" WHERE {self.where}" if self.where else ""
+        method = "" if self.method == "btree" else f" USING {self.method}"
+        return f"{self.name}{method} ({cols}){extra}{where}"
+
+
+@dataclass
+class Catalog:
+    indexes: dict[str, Index] = field(default_factory=dict)
+    foreign_keys: set[tuple[str, str]] = field(default_factory=set)
+    columns: dict[str, set[str]] = field(default_factory=dict)  # 테이블 → 선언된 열 (ADD/DROP/RENAME COLUMN 반영)
+
+    def on(self, table: str) -> list[Index]:
+        return [ix for ix in self.indexes.values() if ix.table == table]
+
+    def add(self, ix: Index) -> None:
+        self.indexes.setdefault(ix.name, ix)  # IF NOT EXISTS — 먼저 만든 것이 남는다
+
+
+def _index_columns(raw: str) -> tuple[tuple[str, ...], tuple[bool, ...]]:
+    cols, desc = [], []
+    for part in split_top(raw):
+        m = re.fullmatch(r'"?(\w+)"?(\s+(ASC|DESC))?(\s+NULLS\s+(FIRST|LAST))?', part.strip(), re.I)
+        if m:
+            cols.append(m.group(1).lower())
+            desc.append((m.group(3) or "").upper() == "DESC")
+        else:
+            cols.append(" ".join(part.lower().split()))  # 식 인덱스는 그대로
+            desc.append(False)
+    return tuple(cols), tuple(desc)
+
+
+def _constraint_index(cat: Catalog, table: str, elem: str, source: str, name: str | None = None) -> None:
+    m = re.match(r"(PRIMARY\s+KEY|UNIQUE)\s*(NULLS\s+NOT\s+DISTINCT\s*)?\(([^)]*)\)", elem.strip(), re.I)
+    if not m:
+        return
+    cols, desc = _index_columns(m.group(3))
+    primary = m.group(1).upper().startswith("PRIMARY")
+    name = name or (f"{table}_pkey" if primary else f"{table}_{'_'.join(cols)}_key")
+    cat.add(Index(table, name, cols, desc, unique=True, primary=primary, source=source))
+
+
+def _column_constraints(cat: Catalog, table: str, col_def: str, source: str) -> None:
+    col = col_def.split(None, 1)[0].strip('"').lower()
+    cat.columns.setdefault(table, set()).add(col)
+    if re.search(r"\bPRIMARY\s+KEY\b", col_def, re.I):
+        cat.add(Index(table, f"{table}_pkey", (col,), (False,), unique=True, primary=True, source=source))
+    elif re.search(r"\bUNIQUE\b", col_def, re.I):
+        cat.add(Index(table, f"{table}_{col}_key", (col,), (False,), unique=True, source=source))
+    if re.search(r"\bREFERENCES\b", col_def, re.I):
+        cat.foreign_keys.add((table, col))
+
+
+def _table_elements(cat: Catalog, table: str, elems: Iterable[str], source: str) -> None:
+    for e in elems:
+        name = None
+        m = re.match(r"CONSTRAINT\s+\"?(\w+)\"?\s+(.*)", e.strip(), re.I | re.S)
+        if m:
+            name, e = m.group(1), m.group(2)
+        head = keyword(e)
+        if head in ("primary", "unique"):
+            _constraint_index(cat, table, e, source, name)
+        elif head == "foreign":
+            fk = re.match(r"FOREIGN\s+KEY\s*\(([^)]*)\)", e.strip(), re.I)
+            if fk:
+                cat.foreign_keys.update((table, c.strip().strip('"').lower()) for c in fk.group(1).split(","))
+        elif head not in ("check", "exclude", "like", "") and name is None:
+            _column_constraints(cat, table, e, source)
+
+
+def load_catalog(files: Iterable[Path] | None = None) -> Catalog:
+    cat = Catalog()
+    for path in files if files is not None else schema_files():
+        source = str(path.relative_to(REPO_ROOT)) if path.is_relative_to(REPO_ROOT) else str(path)
+        for top in split_sql(read_sql(path)):
+            for stmt in ddl_statements(top):
+                _catalog_statement(cat, stmt.strip(), source)
+    return cat
+
+
+def _catalog_statement(cat: Catalog, stmt: str, source: str) -> None:
+    m = CREATE_TABLE.match(stmt)
+    if m:
+        table = table_name(m.group(3)).lower()
+        cat.columns.setdefault(table, set())
+        start = stmt.find("(", m.end() - 1)
+        _table_elements(cat, table, split_top(stmt[start + 1:balanced_end(stmt, start) - 1]), source)
+        return
+    m = ALTER_TABLE.match(stmt)
+    if m:
+        table = table_name(m.group(3)).lower()
+        for clause in split_top(stmt[m.end():]):
+            a = re.match(r"ADD\s+(COLUMN\s+)?(IF\s+NOT\s+EXISTS\s+)?(.*)", clause, re.I | re.S)
+            if a:
+                _table_elements(cat, table, [a.group(3)], source)
+                continue
+            d = re.match(r"DROP\s+(COLUMN\s+)?(IF\s+EXISTS\s+)?\"?(\w+)\"?", clause, re.I)
+            if d and d.group(3).lower() not in ("constraint", "default", "not"):
+                cat.columns.get(table, set()).discard(d.group(3).lower())
+                continue
+            r = re.match(r"RENAME\s+(COLUMN\s+)?\"?(\w+)\"?\s+TO\s+\"?(\w+)\"?", clause, re.I)
+            if r and r.group(2).lower() != "constraint" and r.group(2).lower() in cat.columns.get(table, set()):
+                cat.columns[table].discard(r.group(2).lower())
+                cat.columns[table].add(r.group(3).lower())
+        return
+    m = CREATE_INDEX.match(stmt)
+    if m:
+        start = m.end() - 1
+        end = balanced_end(stmt, start)
+        cols, desc = _index_columns(stmt[start + 1:end - 1])
+        where = re.search(r"\bWHERE\b(.*)", stmt[end:], re.I | re.S)
+        cat.add(Index(table_name(m.group(6)).lower(), m.group(4).strip('"'), cols, desc, unique=bool(m.group(1)),
+                      where=" ".join(where.group(1).split()) if where else None,
+                      method=(m.group(8) or "btree").lower(), source=source))
+        return
+    m = re.match(r"DROP\s+INDEX\s+(CONCURRENTLY\s+)?(IF\s+EXISTS\s+)?(.*)", stmt, re.I | re.S)
+    if m:
+        for name in m.group(3).split(","):
+            cat.indexes.pop(table_name(name.split()[0]) if name.split() else "", None)
+
+
+# --- 비교 -------------------------------------------------------------------
+
+
+def _where_columns(where: str) -> set[str]:
+    return {w.lower() for w in re.findall(r"[A-Za-z_]\w*", where)} - {"is", "not", "null", "and", "or", "true",
+                                                                       "false", "in"}
+
+
+def serves(ix: Index, shape: Shape) -> int:
+    """ix 가 shape 에 얼마나 맞는지 (NONE / PARTIAL / FULL)."""
+    if ix.method != "btree":
+        return NONE
+    filtered = set(shape.eq) | set(shape.range) | set(shape.other) | set(shape.conditional)
+    if ix.where and not _where_columns(ix.where) <= filtered:
+        return NONE
+    eq = set(shape.eq)
+    cols = ix.columns
+    if ix.unique and cols and set(cols) <= eq:
+        return FULL
+    m = 0
+    while m < len(cols) and cols[m] in eq:
+        m += 1
+    rest = cols[m:]
+    order = [(c, d) for c, d in shape.order if c not in eq]
+    sort_ok = True
+    if order:
+        names = [c for c, _ in order]
+        if list(rest[:len(names)]) != names:
+            sort_ok = False
+        else:
+            flips = [d != ix.desc[m + i] for i, (_, d) in enumerate(order)]
+            sort_ok = all(flips) or not any(flips)  # btree 는 거꾸로도 읽는다
+    leads_range = bool(rest) and rest[0] in shape.range
+    if m == 0 and not (order and sort_ok) and not leads_range:
+        return NONE
+    if eq <= set(cols[:m]) and sort_ok and (order or not shape.range or leads_range):
+        return FULL
+    return PARTIAL
+
+
+def indexable(shape: Shape) -> bool:
+    return shape.op not in ("insert", "upsert") and bool(shape.eq or shape.range or shape.order)
+
+
+def best(catalog: Catalog, shape: Shape) -> tuple[int, Index | None]:
+    level, found = NONE, None
+    for ix in catalog.on(shape.table):
+        s = serves(ix, shape)
+        if s > level:
+            level, found = s, ix
+    return level, found
+
+
+def _recommended_key(shape: Shape) -> tuple[tuple[str, bool], ...]:
+    eq = list(dict.fromkeys(shape.eq))
+    if "farm_id" in eq:  # 모든 화면이 농장으로 먼저 자른다
+        eq.remove("farm_id")
+        eq.insert(0, "farm_id")
+    key = [(c, False) for c in eq]
+    order = [(c, d) for c, d in shape.order if c not in eq]
+    if order:
+        key.extend(order)
+    elif shape.range:
+        key.append((shape.range[0], False))
+    return tuple(key)
+
+
+@dataclass
+class Recommendation:
+    table: str
+    key: tuple[tuple[str, bool], ...]
+    score: int = 0
+    shapes: list[Shape] = field(default_factory=list)
+    current: list[str] = field(default_factory=list)  # 지금 가장 잘 맞는 인덱스 (판정)
+    supersedes: list[str] = field(default_factory=list)  # 이 인덱스가 생기면 앞부분이 되는 기존 인덱스
+
+    @property
+    def name(self) -> str:
+        return f"idx_{self.table}_" + "_".join(c for c, _ in self.key)
+
+    def columns_sql(self) -> str:
+        return ", ".join(c + (" DESC" if d else "") for c, d in self.key)
+
+    def create_sql(self) -> str:
+        return f"CREATE INDEX IF NOT EXISTS {self.name} ON public.{self.table} ({self.columns_sql()});"
+
+    def as_index(self) -> Index:
+        return Index(self.table, self.name, tuple(c for c, _ in self.key), tuple(d for _, d in self.key))
+
+
+def _canonical(key: tuple[tuple[str, bool], ...], eq_len: int) -> tuple[tuple[str, bool], ...]:
+    """같음 조건 뒤의 방향을 한꺼번에 뒤집은 두 키는 같은 인덱스다 (btree 는 거꾸로도 읽는다)."""
+    tail = key[eq_len:]
+    return key[:eq_len] + min(tail, tuple((c, not d) for c, d in tail))
+
+
+def _site_score(shape: Shape, level: int) -> int:
+    return 1 + (2 if shape.order and shape.limit is not None else 0) + (1 if level == NONE else 0)
+
+
+@dataclass
+class Drift:
+    shape: Shape
+    missing: list[str]  # 스키마에 선언되지 않은 열 (테이블이 없으면 빈 목록)
+
+
+def _shape_columns(shape: Shape) -> list[str]:
+    return list(dict.fromkeys(shape.eq + shape.range + shape.conditional + [c for c, _ in shape.order]))
+
+
+def missing_columns(catalog: Catalog, shape: Shape) -> list[str] | None:
+    """쿼리가 쓰지만 스키마에 없는 열. 테이블 자체가 없으면 None."""
+    have = catalog.columns.get(shape.table)
+    if have is None:
+        return None
+    return [c for c in _shape_columns(shape) if c not in have]
+
+
+def schema_drift(catalog: Catalog, shapes: Iterable[Shape]) -> list[Drift]:
+    """앱 쿼리가 쓰는데 마이그레이션에 선언되지 않은 테이블·열. 이런 쿼리에는 인덱스를 권고하지 않는다."""
+    out = []
+    for shape in shapes:
+        if not indexable(shape):
+            continue
+        missing = missing_columns(catalog, shape)
+        if missing is None or missing:
+            out.append(Drift(shape, missing or []))
+    return out
+
+
+def recommend(catalog: Catalog, shapes: Iterable[Shape]) -> list[Recommendation]:
+    recs: dict[tuple[str, tuple], Recommendation] = {}
+    for shape in shapes:
+        if not indexable(shape) or missing_columns(catalog, shape) != []:
+            continue  # 드리프트 쿼리 — 만들 수 없는 DDL 대신 schema_drift 로 보고한다
+        level, ix = best(catalog, shape)
+        if level == FULL:
+            continue
+        key = _recommended_key(shape)
+        if not key:
+            continue
+        eq_len = len(set(shape.eq))
+        rec = recs.get((shape.table, _canonical(key, eq_len)))
+        if rec is None:
+            rec = recs[(shape.table, _canonical(key, eq_len))] = Recommendation(shape.table, key)
+        elif shape.order and not any(s.order for s in rec.shapes):
+            rec.key = key  # 정렬하는 쿼리의 방향을 따른다
+        rec.shapes.append(shape)
+        rec.score += _site_score(shape, level)
+        rec.current.append(f"{ix.name} ({LEVEL_NAMES[level]})" if ix else "없음")
+
+    # 다른 권고의 앞부분인 권고는 긴 쪽으로 합친다
+    merged = sorted(recs.values(), key=lambda r: -len(r.key))
+    out: list[Recommendation] = []
+    for rec in merged:
+        targets = [o for o in out if o.table == rec.table and all(serves(o.as_index(), s) == FULL for s in rec.shapes)]
+        target = max(targets, key=lambda o: (o.score, -len(o.key)), default=None)
+        if target:
+            target.shapes.extend(rec.shapes)
+            target.score += rec.score
+            target.current.extend(rec.current)
+        else:
+            out.append(rec)
+    for rec in out:
+        cols = tuple(c for c, _ in rec.key)
+        rec.supersedes = [ix.name for ix in catalog.on(rec.table)
+                          if not ix.unique and not ix.where and ix.method == "btree"
+                          and len(ix.columns) < len(cols) and cols[:len(ix.columns)] == ix.columns]
+    return sorted(out, key=lambda r: (-r.score, r.table, r.name))
+
+
+@dataclass
+class Redundant:
+    index: Index
+    reason: str
+
+
+def redundant(catalog: Catalog, shapes: Sequence[Shape]) -> tuple[list[Redundant], list[Redundant]]:
+    """(다른 인덱스의 앞부분인 인덱스, 앱 쿼리가 쓰지 않는 인덱스)."""
+    dupes, unused = [], []
+    plain = [ix for ix in catalog.indexes.values() if ix.method == "btree" and not ix.where]
+    for ix in plain:
+        if ix.unique or ix.primary:
+            continue
+        for other in plain:
+            if other is ix or other.table != ix.table or len(other.columns) < len(ix.columns):
+                continue
+            if other.columns[:len(ix.columns)] != ix.columns:
+                continue
+            if len(other.columns) == len(ix.columns) and not other.unique and other.name > ix.name:
+                continue  # 똑같은 두 인덱스는 이름이 뒤인 쪽만 적는다
+            dupes.append(Redundant(ix, f"{other.name} 의 앞부분"))
+            break
+    by_table: dict[str, list[Shape]] = {}
+    for s in shapes:
+        if indexable(s):
+            by_table.setdefault(s.table, []).append(s)
+    for ix in catalog.indexes.values():
+        if ix.unique or ix.primary or any(d.index is ix for d in dupes):
+            continue
+        if (ix.table, ix.columns[0]) in catalog.foreign_keys:
+            continue
+        users = [s for s in by_table.get(ix.table, []) if serves(ix, s) != NONE]
+        if not users:
+            why = "앱 쿼리 없음" if ix.table not in by_table else "어느 앱 쿼리도 쓰지 않음"
+            unused.append(Redundant(ix, why))
+    return dupes, unused
+
+
+# --- 검증 (로컬 벤치마크) ------------------------------------------------------
+
+
+def verify(target: str, recs: Sequence[Recommendation], farms: int, rows: int, iterations: int,
+           month: str) -> tuple[list[tuple[str, float, float]], list[str]]:
+    """권고 인덱스를 만들기 전후의 querybench 쿼리별 p50 (ms), 그리고 스키마에 열이 없어 못 만든 권고."""
+    from farmdata.localdb import LocalDB, replay, to_sqlite
+    from farmdata.querybench import QUERY_SHAPES, bench_shapes, month_params, seed
+
+    if target.startswith("sqlite:///"):
+        Path(target[len("sqlite:///"):]).unlink(missing_ok=True)
+    db = LocalDB.open(target)
+    replay(db, schema_files())
+    farm_ids = [f for f, _ in seed(db, farms, rows).farms]
+    base = month_params(month)
+    before = {t.name: t.summary()["p50_ms"] for t in bench_shapes(db, farm_ids, iterations, base)}
+    skipped = []
+    for rec in recs:
+        if not {c for c, _ in rec.key} <= set(db.columns(rec.table)):
+            skipped.append(rec.name)  # 앱이 쓰지만 스키마에 없는 열 (드리프트)
+            continue
+        stmts = to_sqlite(rec.create_sql().rstrip(";")) if db.dialect == "sqlite" else [rec.create_sql()]
+        for stmt in stmts:
+            db.execute(stmt).close()
+    db.execute("ANALYZE").close()
+    after = {t.name: t.summary()["p50_ms"] for t in bench_shapes(db, farm_ids, iterations, base)}
+    db.close()
+    tables = {r.table for r in recs}
+    timings = [(name, before[name], after[name]) for name, q in QUERY_SHAPES.items()
+               if re.search(r"\bFROM\s+(\w+)", q.sql).group(1) in tables]
+    return timings, skipped
+
+
+# --- 보고서 ------------------------------------------------------------------
+
+
+def report_lines(shapes: Sequence[Shape], recs: Sequence[Recommendation], dupes: Sequence[Redundant],
+                 unused: Sequence[Redundant], catalog: Catalog, show_shapes: bool = False,
+                 drift: Sequence[Drift] = ()) -> list[str]:
+    lines = [f"쿼리 체인 {len(shapes)}개 ({len({s.file for s in shapes})}개 파일), "
+             f"선언된 인덱스 {len(catalog.indexes)}개"]
+    if show_shapes:
+        lines.append("")
+        lines.append("== 쿼리 모양")
+        for s in sorted(shapes, key=lambda s: (s.table, s.site)):
+            level, ix = best(catalog, s) if indexable(s) else (None, None)
+            verdict = "" if level is None else f"  → {LEVEL_NAMES[level]}" + (f" {ix.name}" if ix else "")
+            lines.append(f"  {s.table:<26}{s.describe():<60}{s.site}{verdict}")
+    lines.append("")
+    lines.append(f"== 없는 인덱스 ({len(recs)}개, 점수순)")
+    for i, r in enumerate(recs, 1):
+        lines.append(f"{i:>3}. {r.table} ({r.columns_sql()})  점수 {r.score}  [{len(r.shapes)}곳]")
+        lines.append(f"       {r.create_sql()}")
+        lines.append(f"       지금: {', '.join(sorted(set(r.current)))}")
+        if r.supersedes:
+            lines.append(f"       만들면 중복: {', '.join(r.supersedes)}")
+        for s in r.shapes:
+            lines.append(f"       - {s.site}  {s.describe()}")
+    lines.append("")
+    lines.append(f"== 스키마 드리프트 ({len(drift)}곳, 마이그레이션에 없는 테이블·열이라 권고에서 뺌)")
+    for d in drift:
+        what = f"{d.shape.table}.{{{', '.join(d.missing)}}}" if d.missing else f"{d.shape.table} (테이블 없음)"
+        lines.append(f"  {what:<36}{d.shape.site:<36}{d.shape.describe()}")
+    lines.append("")
+    lines.append(f"== 중복 인덱스 ({len(dupes)}개)")
+    for d in dupes:
+        lines.append(f"  {d.index.table}.{d.index.label()}  — {d.reason}  [{d.index.source}]")
+    lines.append("")
+    lines.append(f"== 앱 쿼리가 쓰지 않는 인덱스 ({len(unused)}개, RPC·트리거·관리 SQL 에서 쓸 수 있음)")
+    for d in unused:
+        lines.append(f"  {d.index.table}.{d.index.label()}  — {d.reason}  [{d.index.source}]")
+    return lines
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="supabase-js 쿼리 모양을 읽어 없는/중복 인덱스를 찾는다")
+    ap.add_argument("--root", default=str(REPO_ROOT), help="저장소 루트")
+    ap.add_argument("--shapes", action="store_true", help="읽은 쿼리 모양과 판정을 모두 출력")
+    ap.add_argument("--min-score", type=int, default=1, help="이 점수 미만의 권고는 뺀다")
+    ap.add_argument("--sql", help="권고 CREATE INDEX 문을 이 파일에 쓴다 (마이그레이션 초안)")
+    ap.add_argument("--json", help="결과를 JSON 으로 저장")
+    ap.add_argument("--verify", metavar="DB", help="로컬 DB 에 시드하고 권고 전후 시간을 잰다 (sqlite:///파일 | postgresql://...)")
+    ap.add_argument("--farms", type=int, default=20, help="--verify 합성 농장 수")
+    ap.add_argument("--rows", type=int, default=2000, help="--verify 농장당 판매 행 수의 기준")
+    ap.add_argument("--iterations", type=int, default=50, help="--verify 쿼리마다 반복 횟수")
+    ap.add_argument("--month", default="2026-01", help="--verify finance 쿼리의 기준 월")
+    args = ap.parse_args(argv)
+
+    root = Path(args.root)
+    shapes = scan_sources(root)
+    catalog = load_catalog(schema_files(root))
+    recs = [r for r in recommend(catalog, shapes) if r.score >= args.min_score]
+    dupes, unused = redundant(catalog, shapes)
+    drift = schema_drift(catalog, shapes)
+    print("\n".join(report_lines(shapes, recs, dupes, unused, catalog, args.shapes, drift)))
+
+    if args.sql:
+        body = ["-- farmdata.indexadvisor 권고 (점수순). 적용 전에 --verify 결과와 쓰기 부하를 확인할 것."]
+        for r in recs:
+            body.append(f"-- 점수 {r.score}: " + ", ".join(sorted({s.site for s in r.shapes})))
+            body.append(r.create_sql())
+            body.extend(f"-- DROP INDEX IF EXISTS public.{name};  (위 인덱스의 앞부분)" for name in r.supersedes)
+        Path(args.sql).write_text("\n".join(body) + "\n", encoding="utf-8")
+    if args.json:
+        result = {
+            "recommendations": [{"table": r.table, "columns": r.columns_sql(), "score": r.score, "sql": r.create_sql(),
+                                 "supersedes": r.supersedes, "sites": [s.site for s in r.shapes]} for r in recs],
+            "redundant": [{"index": d.index.name, "table": d.index.table, "reason": d.reason} for d in dupes],
+            "unused": [{"index": d.index.name, "table": d.index.table, "reason": d.reason} for d in unused],
+            "drift": [{"table": d.shape.table, "missing": d.missing, "site": d.shape.site} for d in drift],
+            "shapes": [asdict(s) for s in shapes],
+        }
+        Path(args.json).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.verify:
+        rows, skipped = verify(args.verify, recs, args.farms, args.rows, args.iterations, args.month)
+        print("")
+        print(f"== 검증 ({args.verify}, 농장 {args.farms}개, p50 ms)")
+        if skipped:
+            print(f"스키마에 열이 없어 만들지 못함: {', '.join(skipped)}")
+        print(f"{'쿼리':<32}{'전':>10}{'후':>10}{'배':>8}")
+        for name, b, a in rows:
+            print(f"{name:<32}{b:>10.3f}{a:>10.3f}{(b / a if a else 0):>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
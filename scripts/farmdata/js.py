@@ -0,0 +1,131 @@
+"""앱(TypeScript) 코드와 결과를 바이트 단위로 맞추기 위한 JS 의미론 도우미.
+
+- js_number    : Number(v ?? 0)
+- js_truthy    : if (v) / if (!v)
+- js_key       : 객체 키로 쓰일 때의 String(v)
+- js_num_str   : Number.prototype.toString (JSON.stringify 의 숫자 표기)
+- js_stringify : JSON.stringify(obj) — 공백 없음, 정수 인덱스 키 우선 순서 포함
+"""
+from __future__ import annotations
+
+import json
+import math
+import re
+
+# JS 의 StrWhiteSpaceChar (trim 대상)
+_JS_WS = " \t\n\v\f\r\u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"
+_DECIMAL = re.compile(r"[+-]?(?:Infinity|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)")
+_RADIX = re.compile(r"0([xXoObB])([0-9a-fA-F]+)")
+_RADIX_BASE = {"x": 16, "o": 8, "b": 2}
+
+
+def js_number(v) -> float:
+    """`Number(v ?? 0)` 과 같은 값."""
+    if v is None:
+        return 0.0
+    if isinstance(v, bool):
+        return 1.0 if v else 0.0
+    if isinstance(v, (int, float)):
+        return float(v)
+    if isinstance(v, str):
+        s = v.strip(_JS_WS)
+        if not s:
+            return 0.0
+        if _DECIMAL.fullmatch(s):
+            return float(s.replace("Infinity", "inf"))
+        m = _RADIX.fullmatch(s)
+        if m:
+            try:
+                return float(int(m.group(2), _RADIX_BASE[m.group(1).lower()]))
+            except ValueError:
+                return math.nan
+        return math.nan
+    if isinstance(v, list) and not v:
+        return 0.0
+    return math.nan
+
+
+def js_truthy(v) -> bool:
+    if isinstance(v, float) and math.isnan(v):
+        return False
+    return bool(v) if v is not None else False
+
+
+def js_or_zero(v) -> float:
+    """Number(v || 0)"""
+    return js_number(v) if js_truthy(v) else 0.0
+
+
+def js_date_part(v) -> str:
+    """String(v).split('T')[0]"""
+    return str(v).split("T")[0]
+
+
+def js_num_str(x: float) -> str:
+    """Number::toString(10). 최단 왕복 자릿수는 repr 과 같고 표기 규칙만 다르다."""
+    if math.isnan(x):
+        return "NaN"
+    if math.isinf(x):
+        return "Infinity" if x > 0 else "-Infinity"
+    if x == 0:
+        return "0"
+    sign = "-" if x < 0 else ""
+    mantissa, _, exp = repr(abs(float(x))).partition("e")
+    int_part, _, frac = mantissa.partition(".")
+    all_digits = int_part + frac
+    digits = all_digits.lstrip("0")
+    # 값 = 0.digits × 10^n
+    n = len(int_part) + (int(exp) if exp else 0) - (len(all_digits) - len(digits))
+    digits = digits.rstrip("0")
+    k = len(digits)
+    if k <= n <= 21:
+        out = digits + "0" * (n - k)
+    elif 0 < n <= 21:
+        out = digits[:n] + "." + digits[n:]
+    elif -6 < n <= 0:
+        out = "0." + "0" * (-n) + digits
+    else:
+        e = n - 1
+        out = digits[0] + ("." + digits[1:] if k > 1 else "") + "e" + ("+" if e >= 0 else "-") + str(abs(e))
+    return sign + out
+
+
+def js_key(v) -> str:
+    """객체 키로 쓰일 때의 문자열 (String(v))."""
+    if isinstance(v, str):
+        return v
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, (int, float)):
+        return js_num_str(float(v))
+    if v is None:
+        return "null"
+    return str(v)
+
+
+def _is_array_index(key: str) -> bool:
+    return key.isdigit() and key.isascii() and (key == "0" or key[0] != "0") and int(key) < 2**32 - 1
+
+
+def js_key_order(keys) -> list[str]:
+    """삽입 순서의 키 목록을 JS 객체의 열거 순서로 (정수 인덱스 키가 오름차순으로 먼저)."""
+    keys = list(keys)
+    index = sorted((k for k in keys if _is_array_index(k)), key=int)
+    return index + [k for k in keys if not _is_array_index(k)]
+
+
+def js_stringify(obj) -> str:
+    """JSON.stringify(obj). dict 는 삽입 순서를 JS 열거 순서로 바꿔 쓴다."""
+    if isinstance(obj, dict):
+        return "{" + ",".join(f"{js_stringify(k)}:{js_stringify(obj[k])}" for k in js_key_order(obj)) + "}"
+    if isinstance(obj, (list, tuple)):
+        return "[" + ",".join(js_stringify(v) for v in obj) + "]"
+    if isinstance(obj, bool):
+        return "true" if obj else "false"
+    if isinstance(obj, (int, float)):
+        x = float(obj)
+        return "null" if math.isnan(x) or math.isinf(x) else js_num_str(x)
+    if obj is None:
+        return "null"
+    # 문자열 이스케이프 규칙(\uXXXX 소문자, U+2028 미이스케이프)은 json 모듈과 같다
+    return json.dumps(obj, ensure_ascii=False)
@@ -0,0 +1,303 @@
+"""재고 원장 엔진 — hooks/useInventory.ts 의 fetchStockMap / fetchGradeStockMap 재현.
+
+내보내기의 harvest_records / sales_records / inventory_adjustments 를 열 단위 NumPy 배열
+(농장·품목은 정수 코드, 수량은 float64)로 읽고, 모든 농장을 한 번에 (농장, 품목[, 등급])
+그룹 합계로 계산한다. 결과는 앱이 만드는 StockMap / GradeStockMap 의 JSON.stringify 와
+바이트 단위로 같다.
+
+- 품목 키 순서: JS 객체 삽입 순서 (수확 → 판매 → 조정 순으로 처음 나온 순서)
+- 합계: np.add.at 은 인덱스 순서대로 한 원소씩 더한다 (버퍼링 없음). 그래서 품목별 덧셈
+  순서가 JS 루프와 같고 부동소수점 끝자리까지 같다. np.bincount 나 pairwise 합은
+  순서가 달라 끝자리가 달라질 수 있다.
+- 수량: Number(r.quantity ?? 0), 품목 건너뛰기: !r.crop_name (farmdata.js)
+
+주의: PostgREST 는 요청당 max_rows(supabase/config.toml: 1000)행까지만 돌려준다.
+앱의 조회에는 range 가 없으므로, 행이 그보다 많은 농장은 앱 화면의 재고가 일부 행만으로
+계산된다. --max-rows 1000 을 주면 그 동작(내보내기 순서상 앞쪽 N행)을 재현하고,
+없으면 전체 이력 기준의 정답을 계산한다.
+
+    python -m farmdata.ledger exports/2026-03-10 --out stock.ndjson
+    python -m farmdata.ledger exports/2026-03-10 --farm <farm_id> --max-rows 1000
+    python -m farmdata.ledger exports/2026-03-10 --check ui_dump.ndjson
+
+(scripts/ 에서 실행하거나 PYTHONPATH=scripts 로 실행, numpy 필요)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .export import Factor, load_table, parse_timestamp
+from .js import js_key, js_number, js_stringify, js_truthy
+
+# useInventory.ts normGrade
+GRADES = ("sang", "jung", "ha")
+GRADE_CODES = {"sang": 0, "상": 0, "특/상": 0, "jung": 1, "중": 1, "ha": 2, "하": 2}
+
+LEDGER_TABLES = ("harvest_records", "sales_records", "inventory_adjustments")
+POSTGREST_MAX_ROWS = 1000
+
+
+def norm_grade(g) -> int:
+    """등급 코드 0/1/2, 인식 못 하면 -1 (switch 의 엄격 비교라 문자열만 인정)."""
+    return GRADE_CODES.get(g, -1) if isinstance(g, str) else -1
+
+
+@dataclass
+class LedgerColumns:
+    """한 테이블의 열 배열. crop 은 !crop_name 이면 -1, grade 는 norm_grade 결과."""
+
+    farm: np.ndarray  # int32
+    crop: np.ndarray  # int32
+    grade: np.ndarray  # int8
+    has_grade: np.ndarray  # bool — grade IS NOT NULL (서버 쪽 필터)
+    qty: np.ndarray  # float64
+    ts: np.ndarray | None = None  # float64 epoch 초 (ts_field 를 준 경우, 값이 없으면 -inf)
+    ids: np.ndarray | None = None  # object (ts_field 를 준 경우)
+
+    def __len__(self) -> int:
+        return len(self.qty)
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[dict], farms: Factor, crops: Factor, ts_field: str | None = None
+    ) -> "LedgerColumns":
+        farm, crop, grade, has_grade, qty = [], [], [], [], []
+        ts, ids = [], []
+        for r in rows:
+            if ts_field:
+                ts.append(parse_timestamp(r.get(ts_field)))
+                ids.append(r.get("id"))
+            farm.append(farms.code(r.get("farm_id")))
+            name = r.get("crop_name")
+            crop.append(crops.code(js_key(name)) if js_truthy(name) else -1)
+            g = r.get("grade")
+            grade.append(norm_grade(g) if js_truthy(g) else -1)
+            has_grade.append(g is not None)
+            qty.append(js_number(r.get("quantity")))
+        return cls(
+            np.array(farm, dtype=np.int32),
+            np.array(crop, dtype=np.int32),
+            np.array(grade, dtype=np.int8),
+            np.array(has_grade, dtype=bool),
+            np.array(qty, dtype=np.float64),
+            np.array(ts, dtype=np.float64) if ts_field else None,
+            np.array(ids, dtype=object) if ts_field else None,
+        )
+
+    def take(self, mask: np.ndarray) -> "LedgerColumns":
+        return LedgerColumns(
+            self.farm[mask], self.crop[mask], self.grade[mask], self.has_grade[mask], self.qty[mask],
+            None if self.ts is None else self.ts[mask],
+            None if self.ids is None else self.ids[mask],
+        )
+
+    def farm_counts(self, mask: np.ndarray | None = None, n_farms: int = 0) -> np.ndarray:
+        farm = self.farm if mask is None else self.farm[mask]
+        return np.bincount(farm, minlength=n_farms)
+
+
+def first_n_per_farm(farm: np.ndarray, mask: np.ndarray, n: int | None) -> np.ndarray:
+    """mask 인 행 중 농장마다 앞쪽 n 행만 남긴다 (PostgREST max_rows 재현)."""
+    if n is None:
+        return mask
+    idx = np.flatnonzero(mask)
+    f = farm[idx]
+    order = np.argsort(f, kind="stable")
+    sf = f[order]
+    starts = np.flatnonzero(np.r_[True, sf[1:] != sf[:-1]])
+    rank = np.arange(len(sf)) - np.repeat(starts, np.diff(np.r_[starts, len(sf)]))
+    keep = np.zeros_like(mask)
+    keep[idx[order[rank < n]]] = True
+    return keep
+
+
+def _groups(farm: np.ndarray, crop: np.ndarray, n_crops: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(농장, 품목) 을 처음 나온 순서대로 번호 매긴다. (행별 그룹 번호, 그룹 농장, 그룹 품목)."""
+    if len(farm) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    key = farm.astype(np.int64) * max(n_crops, 1) + crop
+    uniq, first, inv = np.unique(key, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    ordered = uniq[order]
+    return rank[inv.ravel()], ordered // max(n_crops, 1), ordered % max(n_crops, 1)
+
+
+class StockLedger:
+    def __init__(
+        self,
+        harvest: LedgerColumns,
+        sales: LedgerColumns,
+        adjustments: LedgerColumns,
+        farms: Factor,
+        crops: Factor,
+        max_rows: int | None = None,
+    ):
+        self.harvest = harvest
+        self.sales = sales
+        self.adjustments = adjustments
+        self.farms = farms
+        self.crops = crops
+        self.max_rows = max_rows
+
+    @classmethod
+    def from_export(
+        cls, export_dir: str | Path, max_rows: int | None = None, ts_fields: dict[str, str] | None = None
+    ) -> "StockLedger":
+        """ts_fields 를 주면 테이블마다 그 열을 시각 배열(ts)로 함께 읽는다 (farmdata.snapshot)."""
+        farms, crops = Factor(), Factor()
+        ts_fields = ts_fields or {}
+        tables = [
+            LedgerColumns.from_rows(load_table(export_dir, t), farms, crops, ts_fields.get(t))
+            for t in LEDGER_TABLES
+        ]
+        return cls(*tables, farms=farms, crops=crops, max_rows=max_rows)
+
+    @property
+    def tables(self) -> dict[str, LedgerColumns]:
+        return dict(zip(LEDGER_TABLES, (self.harvest, self.sales, self.adjustments)))
+
+    def take(self, masks: dict[str, np.ndarray]) -> "StockLedger":
+        """테이블별 행 마스크로 거른 원장 (농장/품목 코드표는 공유)."""
+        parts = [t.take(masks[name]) for name, t in self.tables.items()]
+        return StockLedger(*parts, farms=self.farms, crops=self.crops, max_rows=self.max_rows)
+
+    def _concat(self, masks: Sequence[np.ndarray], signs: Sequence[float]):
+        parts = (self.harvest, self.sales, self.adjustments)
+        farm = np.concatenate([t.farm[m] for t, m in zip(parts, masks)])
+        crop = np.concatenate([t.crop[m] for t, m in zip(parts, masks)])
+        grade = np.concatenate([t.grade[m] for t, m in zip(parts, masks)])
+        # x - q 와 x + (-q) 는 IEEE 754 에서 같은 값
+        qty = np.concatenate([t.qty[m] * s if s < 0 else t.qty[m] for t, m, s in zip(parts, masks, signs)])
+        return farm, crop, grade, qty
+
+    def _query_mask(self, t: LedgerColumns, graded_query: bool) -> np.ndarray:
+        mask = t.has_grade.copy() if graded_query else np.ones(len(t), dtype=bool)
+        return first_n_per_farm(t.farm, mask, self.max_rows)
+
+    def stock_maps(self) -> dict[str, dict[str, float]]:
+        """농장 id -> StockMap (수확 - 판매 + 조정)."""
+        masks = [self._query_mask(t, False) & (t.crop >= 0) for t in (self.harvest, self.sales, self.adjustments)]
+        farm, crop, _, qty = self._concat(masks, (1.0, -1.0, 1.0))
+        group, g_farm, g_crop = _groups(farm, crop, len(self.crops))
+        sums = np.zeros(len(g_farm), dtype=np.float64)
+        np.add.at(sums, group, qty)
+        out: dict[str, dict[str, float]] = {}
+        crop_names = self.crops.values
+        farm_ids = self.farms.values
+        for f, c, v in zip(g_farm.tolist(), g_crop.tolist(), sums.tolist()):
+            out.setdefault(farm_ids[f], {})[crop_names[c]] = v
+        return out
+
+    def grade_stock_maps(self) -> dict[str, dict[str, dict[str, float]]]:
+        """농장 id -> GradeStockMap (등급 있는 판매/조정만 반영)."""
+        masks = [
+            self._query_mask(self.harvest, False),
+            self._query_mask(self.sales, True),
+            self._query_mask(self.adjustments, True),
+        ]
+        masks = [m & (t.crop >= 0) & (t.grade >= 0) for m, t in zip(masks, (self.harvest, self.sales, self.adjustments))]
+        farm, crop, grade, qty = self._concat(masks, (1.0, -1.0, 1.0))
+        group, g_farm, g_crop = _groups(farm, crop, len(self.crops))
+        sums = np.zeros((len(g_farm), len(GRADES)), dtype=np.float64)
+        np.add.at(sums, (group, grade.astype(np.intp)), qty)
+        out: dict[str, dict[str, dict[str, float]]] = {}
+        crop_names = self.crops.values
+        farm_ids = self.farms.values
+        for f, c, row in zip(g_farm.tolist(), g_crop.tolist(), sums.tolist()):
+            out.setdefault(farm_ids[f], {})[crop_names[c]] = dict(zip(GRADES, row))
+        return out
+
+    def truncated_farms(self, limit: int = POSTGREST_MAX_ROWS) -> dict[str, dict[str, int]]:
+        """조회 하나가 limit 행을 넘는 농장 (앱 화면 재고가 잘린 행으로 계산되는 농장)."""
+        n = len(self.farms)
+        counts = {
+            "harvest_records": self.harvest.farm_counts(None, n),
+            "sales_records": self.sales.farm_counts(None, n),
+            "inventory_adjustments": self.adjustments.farm_counts(None, n),
+        }
+        out: dict[str, dict[str, int]] = {}
+        for table, c in counts.items():
+            for f in np.flatnonzero(c > limit).tolist():
+                out.setdefault(self.farms.values[f], {})[table] = int(c[f])
+        return out
+
+    def farm_ids(self) -> list[str]:
+        return sorted((f for f in self.farms.values if f is not None), key=str)
+
+
+def report_lines(ledger: StockLedger, farms: Sequence[str] | None = None) -> Iterable[str]:
+    """농장마다 {"farm_id", "stock", "gradeStock"} 한 줄. stock/gradeStock 은 JSON.stringify 와 같은 바이트."""
+    stock = ledger.stock_maps()
+    grade = ledger.grade_stock_maps()
+    for farm in farms or ledger.farm_ids():
+        yield (
+            f'{{"farm_id":{js_stringify(farm)},"stock":{js_stringify(stock.get(farm, {}))},'
+            f'"gradeStock":{js_stringify(grade.get(farm, {}))}}}'
+        )
+
+
+def check_lines(lines: Iterable[str], reference: str | Path, key: Sequence[str] = ("farm_id",)) -> list:
+    """기준 NDJSON(앱 덤프 또는 stock_reference.mjs 출력)과 key 별로 바이트 비교한다.
+
+    불일치한 key 값들 (key 가 열 하나면 그 값, 여러 개면 튜플).
+    """
+    def key_of(line: str):
+        obj = json.loads(line)
+        return obj[key[0]] if len(key) == 1 else tuple(obj[k] for k in key)
+
+    ref: dict = {}
+    with open(reference, encoding="utf-8-sig") as f:
+        for line in f:
+            if line.strip():
+                ref[key_of(line)] = line.rstrip("\n")
+    diffs = []
+    for line in lines:
+        k = key_of(line)
+        if k in ref and ref[k] != line:
+            diffs.append(k)
+    return diffs
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="내보내기로부터 농장별 StockMap/GradeStockMap 계산")
+    ap.add_argument("export_dir", help="harvest_records / sales_records / inventory_adjustments 내보내기 디렉터리")
+    ap.add_argument("--farm", action="append", default=None, help="대상 농장 id (기본: 전체)")
+    ap.add_argument("--max-rows", type=int, default=None, help="조회당 행 수 제한 재현 (앱과 같게 하려면 1000)")
+    ap.add_argument("--out", default=None, help="NDJSON 출력 파일 (기본: 표준 출력)")
+    ap.add_argument("--check", default=None, help="바이트 비교할 기준 NDJSON")
+    args = ap.parse_args(argv)
+
+    ledger = StockLedger.from_export(args.export_dir, max_rows=args.max_rows)
+    lines = list(report_lines(ledger, args.farm))
+    if args.out:
+        Path(args.out).write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    elif not args.check:
+        for line in lines:
+            print(line)
+
+    for farm, tables in ledger.truncated_farms().items():
+        detail = ", ".join(f"{t} {n}행" for t, n in tables.items())
+        print(f"경고: {farm} 은 조회 행 수가 {POSTGREST_MAX_ROWS} 을 넘습니다 ({detail}) — 앱 화면 재고는 잘린 행 기준",
+              file=sys.stderr)
+
+    if args.check:
+        diffs = check_lines(lines, args.check)
+        for farm in diffs:
+            print(f"불일치: {farm}", file=sys.stderr)
+        print(f"{len(lines)}개 농장 비교, 불일치 {len(diffs)}", file=sys.stderr)
+        return 1 if diffs else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,804 @@
+"""페이지 부하 생성기 — 화면이 보내는 요청 묶음을 asyncio 가상 사용자로 동시에 재생하고 페이지별 처리량·지연 분포를 본다.
+
+querybench 가 쿼리 하나·화면 하나의 비용을 잰다면, 이 도구는 "농장 사용자 N명이 동시에 화면을 열면"을 잰다.
+호스팅된 Supabase 대신 로컬 대역(stand-in)에 보낸다.
+
+요청 묶음 (설정 파일, JSON)
+    {"month": "2026-01",
+     "navigation": [[["/auth/v1/user", ...]]],          # proxy.ts — 화면을 열 때마다 먼저 차례로
+     "pages": {"inventory": {"weight": 2, "source": "...", "phases": [[[요청, ...], ...], ...]}}}
+    단계(phase)는 차례로, 단계 안의 구성원은 Promise.all 처럼 동시에, 구성원 안의 요청은 await 로 차례로 보낸다
+    (querybench.GROUPS 와 같은 꼴). 요청은 경로 문자열이나 {"name", "path", "single"} 이다.
+    경로의 {farm_id} {user_id} {start_ts} {end_ts} {start_date} {end_date} 는 가상 사용자·기준 월로 채운다.
+    기본 설정(python -m farmdata.loadgen config)은 inventory loadAll, finance fetchFinanceData,
+    proxy.ts 의 auth.getUser() + profiles/farms 확인을 그대로 옮긴 것이다.
+
+대역 (serve)
+    LocalDB(sqlite/Postgres) 위의 작은 HTTP/1.1 서버. PostgREST 의 GET 만 흉내 낸다.
+    - select=열,별칭:테이블(열) — 임베드는 <별칭 단수>_id 로 LEFT JOIN (partner:partners(company_name))
+    - 열=eq|neq|gt|gte|lt|lte|like|ilike|is|in.값, not. 접두, order=열.desc.nullslast, limit/offset
+    - max_rows 1000, Accept: application/vnd.pgrst.object+json (.single()) → 한 행이 아니면 406
+    - GET /auth/v1/user — Bearer 토큰을 사용자 id 로 보고 profiles 에서 찾는다 (JWT 검증은 하지 않음)
+    DB 연결 수는 --db-pool 로 정한다 (Supabase 요금제의 풀 크기에 맞춰 본다). RLS 는 흉내 내지 않는다.
+    --latency-ms 로 응답마다 네트워크 왕복 지연을 더할 수 있다.
+
+부하 (run)
+    가상 사용자 --concurrency 명이 각자 농장 하나를 맡아 화면을 가중치대로 고르고, 열고, 생각 시간만큼 쉰다.
+    사용자마다 keep-alive 연결을 최대 6개(브라우저의 호스트당 한도) 쓴다. --url 이 없으면 대역을 하위 프로세스로 띄운다.
+    보고서: 페이지별 방문 수 · 초당 방문 · p50/p90/p99/최대 (ms) · 오류, 요청별 같은 표, 페이지별 log2 지연 히스토그램.
+    부하 생성기 자신도 한 프로세스라서, 사용자 수를 크게 올릴 때는 이 프로세스의 CPU 가 먼저 차지 않는지 본다.
+
+    python -m farmdata.loadgen run --concurrency 50 --duration 30
+    python -m farmdata.loadgen run --db sqlite:////tmp/bench.sqlite --no-seed --db-pool 15 --latency-ms 20
+    python -m farmdata.loadgen config > mix.json && python -m farmdata.loadgen run --config mix.json --json load.json
+    python -m farmdata.loadgen serve --port 54321
+    python -m farmdata.loadgen run --url http://127.0.0.1:54321 --users users.json --apikey $ANON_KEY
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import random
+import re
+import ssl
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Sequence
+from urllib.parse import parse_qsl, urlsplit
+
+from farmdata.localdb import DEFAULT_SQLITE, LocalDB, LocalDBError, replay, schema_files, split_top
+from farmdata.querybench import MAX_ROWS, SeedReport, ensure_columns, month_params, percentile, seed
+
+
+class LoadGenError(Exception):
+    pass
+
+
+CONNS_PER_USER = 6  # 브라우저의 HTTP/1.1 호스트당 연결 한도
+BOUNDS_MS = [2.0 ** i for i in range(15)]  # 1, 2, 4, ... 16384 ms
+OBJECT_JSON = "application/vnd.pgrst.object+json"
+_SALES_SELECT = "select=*,partner:partners(company_name),customer:customers(name)"
+
+
+def _rest(table: str, query: str) -> str:
+    return f"/rest/v1/{table}?{query}"
+
+
+DEFAULT_CONFIG = {
+    "month": "2026-01",
+    # proxy.ts: getUser → profiles(.single) → farms(.maybeSingle), 모두 await
+    "navigation": [[[
+        {"name": "proxy.getUser", "path": "/auth/v1/user"},
+        {"name": "proxy.profile", "single": True,
+         "path": _rest("profiles", "select=role,must_change_password&id=eq.{user_id}")},
+        {"name": "proxy.farm", "path": _rest("farms", "select=is_active&owner_id=eq.{user_id}")},
+    ]]],
+    "pages": {
+        "inventory": {"weight": 2, "source": "app/inventory/page.tsx loadAll", "phases": [[
+            [{"name": "stock.harvest", "path": _rest("harvest_records", "select=crop_name,quantity&farm_id=eq.{farm_id}")},
+             {"name": "stock.sales", "path": _rest("sales_records", "select=crop_name,quantity&farm_id=eq.{farm_id}")},
+             {"name": "stock.adjust",
+              "path": _rest("inventory_adjustments", "select=crop_name,quantity&farm_id=eq.{farm_id}")}],
+            [{"name": "grade.harvest",
+              "path": _rest("harvest_records", "select=crop_name,quantity,grade&farm_id=eq.{farm_id}")}],
+            [{"name": "grade.sales", "path": _rest(
+                "sales_records", "select=crop_name,quantity,grade&farm_id=eq.{farm_id}&grade=not.is.null")}],
+            [{"name": "grade.adjust", "path": _rest(
+                "inventory_adjustments", "select=crop_name,quantity,grade&farm_id=eq.{farm_id}&grade=not.is.null")}],
+            [{"name": "inventory.farm_crops",
+              "path": _rest("farm_crops", "select=*&farm_id=eq.{farm_id}&order=sort_order.asc")}],
+            [{"name": "inventory.adjust_history", "path": _rest(
+                "inventory_adjustments", "select=*&farm_id=eq.{farm_id}&order=adjusted_at.desc&limit=30")}],
+            [{"name": "inventory.processing_records", "path": _rest(
+                "processing_records", "select=*&farm_id=eq.{farm_id}&order=processed_date.desc&limit=20")}],
+            [{"name": "inventory.processing_runs", "path": _rest(
+                "processing_runs", "select=*&farm_id=eq.{farm_id}&order=run_date.desc&limit=20")}],
+            [{"name": "inventory.sales_totals",
+              "path": _rest("inventory_sales_totals", "select=crop_name,total_qty&farm_id=eq.{farm_id}")}],
+        ]]},
+        "finance": {"weight": 1, "source": "app/finance/page.tsx fetchFinanceData", "phases": [
+            [[{"name": "finance.sales_courier", "path": _rest("sales_records", _SALES_SELECT + (
+                "&farm_id=eq.{farm_id}&delivery_method=eq.courier&is_settled=eq.true"
+                "&recorded_at=gte.{start_ts}&recorded_at=lte.{end_ts}&order=recorded_at.desc"))}],
+             [{"name": "finance.sales_b2b", "path": _rest("sales_records", _SALES_SELECT + (
+                 "&farm_id=eq.{farm_id}&sale_type=eq.b2b&is_settled=eq.true"
+                 "&settled_at=gte.{start_date}&settled_at=lte.{end_date}&order=settled_at.desc"))}],
+             [{"name": "finance.sales_unsettled", "path": _rest("sales_records", _SALES_SELECT + (
+                 "&farm_id=eq.{farm_id}&is_settled=eq.false&order=recorded_at.desc"))}]],
+            [[{"name": "finance.expenditures", "path": _rest("expenditures", (
+                "select=amount,category,main_category,expense_date,notes,payment_method"
+                "&farm_id=eq.{farm_id}&expense_date=gte.{start_date}&expense_date=lte.{end_date}"))}],
+             [{"name": "finance.attendance", "path": _rest("attendance_records", (
+                 "select=daily_wage,headcount,worker_name,work_date&farm_id=eq.{farm_id}&is_present=eq.true"
+                 "&work_date=gte.{start_date}&work_date=lte.{end_date}"))}],
+             [{"name": "finance.farm_crops",
+               "path": _rest("farm_crops", "select=crop_name,category&farm_id=eq.{farm_id}&is_active=is.true")}],
+             [{"name": "finance.other_incomes", "path": _rest("other_incomes", (
+                 "select=amount,income_type,income_date&farm_id=eq.{farm_id}"
+                 "&income_date=gte.{start_date}&income_date=lte.{end_date}"))}]],
+        ]},
+    },
+}
+
+
+# --- 설정 -------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Call:
+    name: str
+    path: str
+    single: bool = False
+
+
+Phases = list[list[list[Call]]]  # 단계(차례로) → 구성원(동시에) → 요청(차례로)
+
+
+@dataclass
+class Page:
+    name: str
+    weight: float
+    source: str
+    phases: Phases
+
+
+def _calls(where: str, member) -> list[Call]:
+    if not isinstance(member, list) or not member:
+        raise LoadGenError(f"{where}: 구성원은 요청의 비어 있지 않은 배열이어야 합니다")
+    out = []
+    for c in member:
+        if isinstance(c, str):
+            c = {"path": c}
+        if not isinstance(c, dict) or not isinstance(c.get("path"), str) or not c["path"].startswith("/"):
+            raise LoadGenError(f"{where}: 요청은 '/' 로 시작하는 경로이거나 {{\"path\": ...}} 여야 합니다: {c!r}")
+        name = c.get("name") or urlsplit(c["path"]).path.rsplit("/", 1)[-1]
+        out.append(Call(str(name), c["path"], bool(c.get("single", False))))
+    return out
+
+
+def _phases(where: str, raw) -> Phases:
+    if not isinstance(raw, list) or not all(isinstance(p, list) and p for p in raw):
+        raise LoadGenError(f"{where}: phases 는 단계 배열, 단계는 구성원 배열이어야 합니다")
+    return [[_calls(f"{where}[{i}]", m) for m in phase] for i, phase in enumerate(raw)]
+
+
+def parse_config(data: dict) -> tuple[Phases, list[Page], str]:
+    """(navigation, pages, month). 설정이 잘못되면 LoadGenError."""
+    if not isinstance(data, dict) or not isinstance(data.get("pages"), dict) or not data["pages"]:
+        raise LoadGenError("설정에 pages 가 없습니다")
+    nav = _phases("navigation", data["navigation"]) if data.get("navigation") else []
+    pages = []
+    for name, spec in data["pages"].items():
+        if not isinstance(spec, dict):
+            raise LoadGenError(f"pages.{name}: 객체여야 합니다")
+        weight = spec.get("weight", 1)
+        if not isinstance(weight, (int, float)) or weight < 0:
+            raise LoadGenError(f"pages.{name}.weight: 0 이상의 수여야 합니다")
+        pages.append(Page(name, float(weight), str(spec.get("source", "")), _phases(f"pages.{name}", spec.get("phases"))))
+    if not any(p.weight for p in pages):
+        raise LoadGenError("모든 페이지의 weight 가 0 입니다")
+    month = str(data.get("month", DEFAULT_CONFIG["month"]))
+    if not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", month):
+        raise LoadGenError(f"month 는 YYYY-MM 이어야 합니다: {month}")
+    return nav, pages, month
+
+
+def load_config(path: str | None) -> tuple[Phases, list[Page], str]:
+    if not path:
+        return parse_config(DEFAULT_CONFIG)
+    try:
+        return parse_config(json.loads(Path(path).read_text(encoding="utf-8")))
+    except (OSError, json.JSONDecodeError) as e:
+        raise LoadGenError(f"설정을 읽을 수 없습니다 ({path}): {e}") from None
+
+
+# --- 대역: PostgREST GET → SQL ----------------------------------------------
+
+
+class RestError(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+_IDENT = re.compile(r"[A-Za-z_]\w*")
+_OPS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "LIKE", "ilike": "ILIKE"}
+
+
+def _value(v: str):
+    return {"true": True, "false": False}.get(v, v)
+
+
+def _ident(name: str, have: Sequence[str], table: str) -> str:
+    if not _IDENT.fullmatch(name) or name not in have:
+        raise RestError(400, "42703", f"column {table}.{name} does not exist")
+    return f'"{name}"'
+
+
+@dataclass
+class Embed:
+    alias: str
+    columns: list[str]
+
+
+def translate(table: str, query: Sequence[tuple[str, str]], columns_of, dialect: str = "sqlite"
+              ) -> tuple[str, dict, list[str], list[Embed]]:
+    """PostgREST 쿼리 문자열 → (SQL, 매개변수, 기본 열, 임베드). columns_of(table) 은 열 목록 (없으면 빈 목록)."""
+    have = columns_of(table) if _IDENT.fullmatch(table) else []
+    if not have:
+        raise RestError(404, "42P01", f'relation "public.{table}" does not exist')
+    select, where, order, params = "*", [], [], {}
+    limit, offset = MAX_ROWS, 0
+    for key, raw in query:
+        if key == "select":
+            select = raw or "*"
+        elif key in ("limit", "offset"):
+            if not raw.isdigit():
+                raise RestError(400, "PGRST103", f"{key} 는 0 이상의 정수여야 합니다: {raw}")
+            if key == "limit":
+                limit = min(int(raw), MAX_ROWS)
+            else:
+                offset = int(raw)
+        elif key == "order":
+            for term in raw.split(","):
+                col, *mods = term.split(".")
+                sql = "t." + _ident(col, have, table)
+                for m in mods:
+                    if m not in ("asc", "desc", "nullsfirst", "nullslast"):
+                        raise RestError(400, "PGRST100", f"order 수식어를 모릅니다: {m}")
+                    sql += {"asc": " ASC", "desc": " DESC", "nullsfirst": " NULLS FIRST", "nullslast": " NULLS LAST"}[m]
+                order.append(sql)
+        else:
+            col = "t." + _ident(key, have, table)
+            negate = raw.startswith("not.")
+            op, _, val = raw[4 if negate else 0:].partition(".")
+            p = f"p{len(params)}"
+            if op == "is":
+                lit = {"null": "NULL", "true": "TRUE", "false": "FALSE"}.get(val)
+                if lit is None:
+                    raise RestError(400, "PGRST100", f"is 는 null/true/false 만 받습니다: {val}")
+                cond = f"{col} IS {lit}"
+            elif op == "in":
+                if not (val.startswith("(") and val.endswith(")")):
+                    raise RestError(400, "PGRST100", f"in 값은 (a,b) 꼴이어야 합니다: {val}")
+                names = []
+                for i, v in enumerate(split_top(val[1:-1])):
+                    params[f"{p}_{i}"] = _value(v.strip('"'))
+                    names.append(f":{p}_{i}")
+                cond = f"{col} IN ({', '.join(names) or 'NULL'})"
+            elif op in _OPS:
+                sql_op = "LIKE" if op == "ilike" and dialect == "sqlite" else _OPS[op]
+                params[p] = val.replace("*", "%") if op in ("like", "ilike") else _value(val)
+                cond = f"{col} {sql_op} :{p}"
+            else:
+                raise RestError(400, "PGRST100", f"연산자를 모릅니다: {key}={raw}")
+            where.append(f"NOT ({cond})" if negate else cond)
+
+    base, embeds, base_sql, embed_sql, joins = [], [], [], [], []
+    for item in split_top(select):
+        if "(" in item:
+            head, _, inner = item.partition("(")
+            alias, _, rel = head.partition(":") if ":" in head else (head, "", head)
+            rel = rel.split("!")[0]
+            rel_have = columns_of(rel) if _IDENT.fullmatch(rel) else []
+            fk = f"{alias.removesuffix('s')}_id"
+            if not rel_have or fk not in have or "id" not in rel_have:
+                raise RestError(400, "PGRST200", f"Could not find a relationship between '{table}' and '{rel}'")
+            e = f"e{len(embeds)}"
+            names = [c.strip() for c in inner.rstrip(")").split(",") if c.strip()]
+            names = rel_have if names == ["*"] else names
+            joins.append(f'LEFT JOIN "{rel}" {e} ON {e}."id" = t."{fk}"')
+            embed_sql.append(f'{e}."id"')
+            embed_sql.extend(f"{e}.{_ident(c, rel_have, rel)}" for c in names)
+            embeds.append(Embed(alias, names))
+        elif item == "*":
+            base.extend(have)
+            base_sql.extend(f't."{c}"' for c in have)
+        else:
+            alias, _, col = item.partition(":") if ":" in item else (item, "", item)
+            col = col.split("::")[0]
+            base.append(alias)
+            base_sql.append(f't.{_ident(col, have, table)} AS "{alias}"')
+    sql = f'SELECT {", ".join(base_sql + embed_sql or ["1"])} FROM "{table}" t' + "".join(" " + j for j in joins)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if order:
+        sql += " ORDER BY " + ", ".join(order)
+    sql += f" LIMIT {limit}" + (f" OFFSET {offset}" if offset else "")
+    return sql, params, base, embeds
+
+
+def shape_rows(rows: Sequence[tuple], base: list[str], embeds: list[Embed]) -> list[dict]:
+    out = []
+    n = len(base)
+    for r in rows:
+        d = dict(zip(base, r[:n]))
+        j = n
+        for e in embeds:
+            d[e.alias] = None if r[j] is None else dict(zip(e.columns, r[j + 1:j + 1 + len(e.columns)]))
+            j += 1 + len(e.columns)
+        out.append(d)
+    return out
+
+
+class StandIn:
+    """PostgREST/GoTrue 의 GET 을 흉내 내는 HTTP/1.1 서버. DB 작업은 --db-pool 크기의 스레드 풀(스레드마다 연결)에서 돈다."""
+
+    def __init__(self, target: str, pool: int, latency_ms: float = 0.0):
+        self.target = target
+        self.latency = latency_ms / 1000
+        self.pool = ThreadPoolExecutor(max_workers=pool, thread_name_prefix="db")
+        self.local = threading.local()
+        self.columns: dict[str, list[str]] = {}
+        db = self._db()
+        self.dialect = db.dialect
+        for t in db.tables():
+            self.columns[t] = db.columns(t)
+
+    def _db(self) -> LocalDB:
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = self.local.db = LocalDB.open(self.target)
+        return db
+
+    def _columns_of(self, table: str) -> list[str]:
+        return self.columns.get(table, [])
+
+    def rest(self, table: str, query: list[tuple[str, str]], single: bool) -> tuple[int, object]:
+        sql, params, base, embeds = translate(table, query, self._columns_of, self.dialect)
+        rows = shape_rows(self._db().query(sql, params), base, embeds)
+        if not single:
+            return 200, rows
+        if len(rows) != 1:
+            raise RestError(406, "PGRST116", f"JSON object requested, multiple (or no) rows returned ({len(rows)})")
+        return 200, rows[0]
+
+    def user(self, token: str) -> tuple[int, object]:
+        rows = self._db().query("SELECT id, role FROM profiles WHERE id = :id", {"id": token}) if token else []
+        if not rows:
+            return 401, {"code": 401, "error_code": "bad_jwt", "msg": "invalid JWT"}
+        return 200, {"id": rows[0][0], "aud": "authenticated", "role": "authenticated"}
+
+    def handle(self, method: str, target: str, headers: dict[str, str]) -> tuple[int, object]:
+        url = urlsplit(target)
+        if method != "GET":
+            return 405, {"code": "PGRST000", "message": f"대역은 GET 만 받습니다: {method}"}
+        try:
+            if url.path == "/auth/v1/user":
+                auth = headers.get("authorization", "")
+                return self.user(auth[7:] if auth.lower().startswith("bearer ") else "")
+            if url.path.startswith("/rest/v1/"):
+                single = OBJECT_JSON in headers.get("accept", "")
+                return self.rest(url.path[len("/rest/v1/"):], parse_qsl(url.query, keep_blank_values=True), single)
+            return 404, {"code": "PGRST125", "message": f"Invalid path: {url.path}"}
+        except RestError as e:
+            return e.status, {"code": e.code, "message": str(e), "details": None, "hint": None}
+        except Exception as e:  # DB 오류는 PostgREST 처럼 400 으로 돌려준다
+            return 400, {"code": type(e).__name__, "message": str(e), "details": None, "hint": None}
+
+    async def connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, target, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                if n := int(headers.get("content-length", 0)):
+                    await reader.readexactly(n)
+                status, payload = await loop.run_in_executor(self.pool, self.handle, method, target, headers)
+                body = json.dumps(payload, ensure_ascii=False, default=str).encode()
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                close = headers.get("connection", "").lower() == "close"
+                writer.write((f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                              f"Content-Type: application/json; charset=utf-8\r\nContent-Length: {len(body)}\r\n"
+                              f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n").encode() + body)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(target: str, host: str, port: int, pool: int, latency_ms: float) -> None:
+    app = StandIn(target, pool, latency_ms)
+    server = await asyncio.start_server(app.connection, host, port, backlog=1024)
+    bound = server.sockets[0].getsockname()
+    print(f"listening http://{bound[0]}:{bound[1]}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+# --- 준비: 시드 · 사용자 ----------------------------------------------------
+
+
+@dataclass(frozen=True)
+class User:
+    farm_id: str
+    user_id: str
+    token: str
+
+
+def prepare(target: str, farms: int, rows: int, seed_value: int, reseed: bool, log) -> tuple[list[User], SeedReport | None]:
+    """대역 DB 를 만들고(스키마 재현 + 시드) 농장 주인마다 가상 사용자를 만든다. 토큰은 사용자 id."""
+    if target.startswith("sqlite:///") and reseed:
+        Path(target[len("sqlite:///"):]).unlink(missing_ok=True)
+    db = LocalDB.open(target)
+    try:
+        replay(db, schema_files())
+        report = seed(db, farms, rows, seed_value, log=log) if reseed else None
+        owners = db.query("SELECT id, owner_id FROM farms WHERE owner_id IS NOT NULL ORDER BY id")
+        # proxy.ts 는 profiles.must_change_password 를 읽는다. sqlite 시드에는 profiles 가 없다.
+        profiles = [{"id": o, "role": "owner", "full_name": f"농장주{i}", "must_change_password": False}
+                    for i, (_, o) in enumerate(owners)]
+        if profiles:
+            have = ensure_columns(db, "profiles", profiles, report or SeedReport())
+            known = {r[0] for r in db.query("SELECT id FROM profiles")}
+            db.insert_many("profiles", [p for p in profiles if p["id"] not in known], have)
+    finally:
+        db.close()
+    return [User(f, o, o) for f, o in owners], report
+
+
+def load_users(path: str) -> list[User]:
+    try:
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        return [User(str(u["farm_id"]), str(u["user_id"]), str(u["token"])) for u in raw]
+    except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+        raise LoadGenError(f"사용자 파일을 읽을 수 없습니다 ({path}): {e} — [{{farm_id, user_id, token}}] 배열") from None
+
+
+# --- 클라이언트 -------------------------------------------------------------
+
+
+class HttpConn:
+    """keep-alive 연결 하나. Content-Length 와 chunked 응답을 읽는다."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host: str, port: int, tls: bool) -> "HttpConn":
+        reader, writer = await asyncio.open_connection(host, port, ssl=ssl.create_default_context() if tls else None,
+                                                       limit=1 << 20)
+        return cls(reader, writer)
+
+    async def get(self, head: bytes) -> tuple[int, int, bool]:
+        """(상태, 본문 바이트 수, 연결을 다시 쓸 수 있는지)."""
+        self.writer.write(head)
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("서버가 연결을 닫았습니다")
+        status = int(status_line.split()[1])
+        headers = {}
+        while (h := await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+            k, _, v = h.decode("latin-1").partition(":")
+            headers[k.strip().lower()] = v.strip().lower()
+        size = 0
+        if "content-length" in headers:
+            size = int(headers["content-length"])
+            await self.reader.readexactly(size)
+        elif headers.get("transfer-encoding") == "chunked":
+            while (n := int((await self.reader.readline()).split(b";")[0], 16)):
+                await self.reader.readexactly(n + 2)
+                size += n
+            await self.reader.readline()
+        else:
+            size = len(await self.reader.read())
+            return status, size, False
+        return status, size, headers.get("connection") != "close"
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class VirtualUser:
+    """농장 사용자 하나. 연결을 최대 CONNS_PER_USER 개까지 열어 다시 쓴다."""
+
+    def __init__(self, url: str, user: User, apikey: str | None):
+        u = urlsplit(url)
+        self.tls = u.scheme == "https"
+        self.host = u.hostname or "127.0.0.1"
+        self.port = u.port or (443 if self.tls else 80)
+        self.prefix = u.path.rstrip("/")
+        self.user = user
+        extra = f"apikey: {apikey}\r\n" if apikey else ""
+        self.headers = (f"Host: {u.netloc}\r\nAuthorization: Bearer {user.token}\r\n{extra}"
+                        "Accept-Encoding: identity\r\nConnection: keep-alive\r\n")
+        self.idle: list[HttpConn] = []
+        self.slots = asyncio.Semaphore(CONNS_PER_USER)
+
+    async def get(self, path: str, single: bool) -> tuple[int, int]:
+        accept = OBJECT_JSON if single else "application/json"
+        head = f"GET {self.prefix}{path} HTTP/1.1\r\n{self.headers}Accept: {accept}\r\n\r\n".encode()
+        async with self.slots:
+            for attempt in range(2):
+                reused = bool(self.idle)
+                conn = self.idle.pop() if reused else await HttpConn.open(self.host, self.port, self.tls)
+                try:
+                    status, size, keep = await conn.get(head)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn.close()
+                    if reused and attempt == 0:  # 서버가 닫은 keep-alive 연결이면 새 연결로 한 번 더
+                        continue
+                    raise
+                if keep:
+                    self.idle.append(conn)
+                else:
+                    conn.close()
+                return status, size
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        for c in self.idle:
+            c.close()
+        self.idle.clear()
+
+
+# --- 측정 -------------------------------------------------------------------
+
+
+@dataclass
+class Stats:
+    name: str
+    samples_ms: list[float] = field(default_factory=list)
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(BOUNDS_MS) + 1))
+    errors: dict[str, int] = field(default_factory=dict)
+    bytes: int = 0
+
+    def add(self, ms: float, error: str | None = None, size: int = 0) -> None:
+        self.samples_ms.append(ms)
+        self.buckets[bisect.bisect_left(BOUNDS_MS, ms)] += 1
+        self.bytes += size
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self, seconds: float) -> dict:
+        s = sorted(self.samples_ms)
+        return {"name": self.name, "n": len(s), "per_sec": round(len(s) / seconds, 2) if seconds else 0.0,
+                **{f"p{p}_ms": round(percentile(s, p), 3) for p in (50, 90, 99)},
+                "max_ms": round(s[-1] if s else 0.0, 3), "errors": sum(self.errors.values()),
+                "error_kinds": dict(sorted(self.errors.items())), "avg_bytes": round(self.bytes / (len(s) or 1)),
+                "histogram": {_bucket_label(i): c for i, c in enumerate(self.buckets) if c}}
+
+
+def _bucket_label(i: int) -> str:
+    return f"<={BOUNDS_MS[i]:g}ms" if i < len(BOUNDS_MS) else f">{BOUNDS_MS[-1]:g}ms"
+
+
+@dataclass
+class Recorder:
+    pages: dict[str, Stats] = field(default_factory=dict)
+    calls: dict[str, Stats] = field(default_factory=dict)
+    on: bool = False
+
+    def call(self, name: str, ms: float, error: str | None, size: int) -> None:
+        if self.on:
+            self.calls.setdefault(name, Stats(name)).add(ms, error, size)
+
+    def page(self, name: str, ms: float, error: str | None) -> None:
+        """방문은 측정 창 안에서 시작했으면 끝난 시각과 상관없이 센다 (호출하는 쪽이 판단)."""
+        self.pages.setdefault(name, Stats(name)).add(ms, error)
+
+
+async def _chain(vu: VirtualUser, member: list[Call], params: dict, rec: Recorder) -> str | None:
+    first = None
+    for call in member:
+        t0 = time.perf_counter()
+        error, size = None, 0
+        try:
+            status, size = await vu.get(call.path.format_map(params), call.single)
+            error = f"HTTP {status}" if status >= 400 else None
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            error = type(e).__name__
+        rec.call(call.name, (time.perf_counter() - t0) * 1000, error, size)
+        first = first or error
+    return first
+
+
+async def visit(vu: VirtualUser, page: Page, nav: Phases, params: dict, rec: Recorder) -> None:
+    """화면 하나를 연다: proxy 단계 다음 페이지 단계. 한 요청이라도 실패하면 그 방문은 오류로 센다."""
+    recording = rec.on
+    t0 = time.perf_counter()
+    error = None
+    for phase in nav + page.phases:
+        results = await asyncio.gather(*(_chain(vu, member, params, rec) for member in phase))
+        error = error or next((r for r in results if r), None)
+    if recording:
+        rec.page(page.name, (time.perf_counter() - t0) * 1000, error)
+
+
+async def run_load(url: str, users: Sequence[User], nav: Phases, pages: list[Page], month: str, concurrency: int,
+                   duration: float, warmup: float, think_ms: float, seed_value: int, apikey: str | None) -> Recorder:
+    """가상 사용자 concurrency 명을 warmup + duration 초 동안 돌린다. warmup 뒤에 시작한 방문만 기록한다."""
+    rec = Recorder()
+    base = month_params(month)
+    live = [p for p in pages if p.weight > 0]
+    weights = [p.weight for p in live]
+    loop = asyncio.get_running_loop()
+    end = loop.time() + warmup + duration
+
+    async def user_loop(i: int) -> None:
+        rng = random.Random(seed_value * 100003 + i)
+        user = users[i % len(users)]
+        vu = VirtualUser(url, user, apikey)
+        params = {**base, "farm_id": user.farm_id, "user_id": user.user_id}
+        await asyncio.sleep(rng.random() * min(1.0, warmup or 1.0))  # 한꺼번에 출발하지 않게
+        try:
+            while loop.time() < end:
+                await visit(vu, rng.choices(live, weights)[0], nav, params, rec)
+                if think_ms:
+                    await asyncio.sleep(rng.expovariate(1000 / think_ms))
+        finally:
+            vu.close()
+
+    async def window() -> None:
+        await asyncio.sleep(warmup)
+        rec.on = True
+        await asyncio.sleep(duration)
+        rec.on = False
+
+    await asyncio.gather(window(), *(user_loop(i) for i in range(concurrency)))
+    return rec
+
+
+async def _spawn(target: str, pool: int, latency_ms: float) -> tuple[asyncio.subprocess.Process, str]:
+    """대역을 하위 프로세스로 띄운다 (부하 생성기와 GIL 을 나눠 쓰지 않게)."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(Path(__file__).resolve().parent.parent),
+                                                       env.get("PYTHONPATH")]))
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "farmdata.loadgen", "serve", "--db", target, "--port", "0",
+        "--db-pool", str(pool), "--latency-ms", str(latency_ms), stdout=asyncio.subprocess.PIPE, env=env)
+    line = (await asyncio.wait_for(proc.stdout.readline(), 60)).decode().strip()
+    if not line.startswith("listening "):
+        proc.kill()
+        raise LoadGenError(f"대역을 띄우지 못했습니다: {line or '출력 없음'}")
+    return proc, line[len("listening "):]
+
+
+async def _run(args, nav: Phases, pages: list[Page], month: str, users: list[User]) -> tuple[Recorder, str]:
+    proc = None
+    url = args.url
+    if not url:
+        proc, url = await _spawn(args.db, args.db_pool, args.latency_ms)
+    try:
+        rec = await run_load(url, users, nav, pages, month, args.concurrency, args.duration, args.warmup,
+                             args.think_ms, args.seed, args.apikey)
+    finally:
+        if proc:
+            proc.terminate()
+            await proc.wait()
+    return rec, url
+
+
+def report_lines(result: dict) -> list[str]:
+    lines = [f"대상: {result['url']}" + (f"  (대역 {result['db']}, DB 연결 {result['db_pool']}, "
+                                        f"왕복 지연 {result['latency_ms']:g}ms)" if result["standin"] else "")]
+    s = result["seed"]
+    if s:
+        lines.append(f"시드: 농장 {s['farms']}개, {sum(s['rows'].values()):,}행, {s['seconds']:.1f}초")
+    lines.append(f"부하: 가상 사용자 {result['concurrency']}명 (농장 {result['users']}개 순환), "
+                 f"측정 {result['duration']:g}초 (데우기 {result['warmup']:g}초), 생각 시간 평균 {result['think_ms']:g}ms, "
+                 f"기준 월 {result['month']}")
+    lines.append("")
+    header = f"{'':<32}{'n':>8}{'/초':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'최대 ms':>10}{'오류':>7}"
+    for title, key in (("페이지별 (proxy 포함, 화면이 기다리는 벽시계)", "pages"), ("요청별", "calls")):
+        lines.append(f"== {title}")
+        lines.append(header)
+        for t in result[key]:
+            lines.append(f"{t['name']:<32}{t['n']:>8}{t['per_sec']:>9.2f}{t['p50_ms']:>10.1f}{t['p90_ms']:>10.1f}"
+                         f"{t['p99_ms']:>10.1f}{t['max_ms']:>10.1f}{t['errors']:>7}")
+            for kind, n in t["error_kinds"].items():
+                lines.append(f"    {kind}: {n}")
+        lines.append("")
+    lines.append("== 페이지별 지연 히스토그램")
+    for t in result["pages"]:
+        lines.append(f"-- {t['name']}")
+        peak = max(t["histogram"].values(), default=0)
+        for label, n in t["histogram"].items():
+            lines.append(f"   {label:>10} {'#' * max(1, round(40 * n / peak)):<40} {n}")
+    return lines
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="페이지 요청 묶음을 동시에 재생하는 부하 생성기 + PostgREST 대역")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="LocalDB 위의 PostgREST/GoTrue 대역만 띄운다")
+    p.add_argument("--db", default=f"sqlite:///{DEFAULT_SQLITE}", help="sqlite:///파일 | postgresql://...")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=54321, help="0 이면 빈 포트")
+    p.add_argument("--db-pool", type=int, default=10, help="DB 연결 수")
+    p.add_argument("--latency-ms", type=float, default=0.0, help="응답마다 더하는 왕복 지연")
+
+    p = sub.add_parser("run", help="가상 사용자로 페이지 요청 묶음을 재생한다")
+    p.add_argument("--url", help="대상 (생략하면 --db 로 대역을 띄운다)")
+    p.add_argument("--users", help="--url 용 사용자 파일: [{farm_id, user_id, token}]")
+    p.add_argument("--apikey", help="apikey 헤더 (Supabase anon key)")
+    p.add_argument("--db", default=f"sqlite:///{DEFAULT_SQLITE}", help="대역 DB: sqlite:///파일 | postgresql://...")
+    p.add_argument("--no-seed", action="store_true", help="이미 시드된 DB 를 그대로 쓴다")
+    p.add_argument("--farms", type=int, default=20, help="합성 농장 수")
+    p.add_argument("--rows", type=int, default=2000, help="농장당 판매 행 수의 기준")
+    p.add_argument("--db-pool", type=int, default=10, help="대역의 DB 연결 수")
+    p.add_argument("--latency-ms", type=float, default=0.0, help="대역이 응답마다 더하는 왕복 지연")
+    p.add_argument("--config", help="요청 묶음 설정 JSON (생략하면 기본 설정)")
+    p.add_argument("--month", help="설정의 기준 월을 덮어쓴다 (YYYY-MM)")
+    p.add_argument("--concurrency", type=int, default=20, help="가상 사용자 수")
+    p.add_argument("--duration", type=float, default=30.0, help="측정 시간 (초)")
+    p.add_argument("--warmup", type=float, default=3.0, help="데우기 시간 (초, 기록하지 않음)")
+    p.add_argument("--think-ms", type=float, default=1000.0, help="화면 사이 평균 생각 시간 (지수 분포, 0 이면 쉬지 않음)")
+    p.add_argument("--seed", type=int, default=1, help="난수 씨앗")
+    p.add_argument("--json", help="결과를 JSON 으로 저장")
+
+    sub.add_parser("config", help="기본 요청 묶음 설정을 출력한다")
+
+    args = ap.parse_args(argv)
+    if args.command == "config":
+        print(json.dumps(DEFAULT_CONFIG, ensure_ascii=False, indent=2))
+        return 0
+    log = lambda m: print(m, file=sys.stderr)  # noqa: E731
+    try:
+        if args.command == "serve":
+            try:
+                asyncio.run(serve(args.db, args.host, args.port, args.db_pool, args.latency_ms))
+            except KeyboardInterrupt:
+                pass
+            return 0
+
+        nav, pages, month = load_config(args.config)
+        month = args.month or month
+        if not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", month):
+            raise LoadGenError(f"--month 는 YYYY-MM 이어야 합니다: {month}")
+        if args.concurrency < 1 or args.duration <= 0:
+            raise LoadGenError("--concurrency 는 1 이상, --duration 은 0 보다 커야 합니다")
+        seeded = None
+        if args.url:
+            if not args.users:
+                raise LoadGenError("--url 에는 --users 가 필요합니다")
+            users = load_users(args.users)
+        else:
+            users, seeded = prepare(args.db, args.farms, args.rows, args.seed, not args.no_seed, log)
+        if not users:
+            raise LoadGenError("가상 사용자가 맡을 농장이 없습니다 (--no-seed 인데 DB 가 비어 있음)")
+        log(f"부하 시작: 사용자 {args.concurrency}명, {args.warmup:g}+{args.duration:g}초")
+        rec, url = asyncio.run(_run(args, nav, pages, month, users))
+    except (LoadGenError, LocalDBError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+
+    result = {
+        "url": url, "standin": not args.url, "db": args.db, "db_pool": args.db_pool, "latency_ms": args.latency_ms,
+        "concurrency": args.concurrency, "users": len(users), "duration": args.duration, "warmup": args.warmup,
+        "think_ms": args.think_ms, "month": month,
+        "seed": seeded and {"farms": len(seeded.farms), "rows": seeded.rows, "seconds": seeded.seconds},
+        "pages": [rec.pages[p.name].summary(args.duration) for p in pages if p.name in rec.pages],
+        "calls": [rec.calls[n].summary(args.duration) for n in dict.fromkeys(
+            c.name for phases in [nav] + [p.phases for p in pages] for phase in phases for m in phase for c in m)
+            if n in rec.calls],
+    }
+    print("\n".join(report_lines(result)))
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0 if all(t["n"] for t in result["pages"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
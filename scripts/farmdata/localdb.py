@@ -0,0 +1,545 @@
+"""로컬 DB 대역 — supabase/migrations 와 scripts/*.sql 스키마를 로컬 SQLite / Postgres 에 재현.
+
+호스팅된 Supabase 에 부하를 주지 않고 쿼리 비용을 재기 위한 기반이다
+(farmdata.querybench 가 이 위에서 시드·측정한다).
+
+재현 순서
+    1. scripts/migration.sql (기본 스키마)
+    2. 나머지 scripts/*.sql (이름순)
+    3. supabase/migrations/*.sql (이름순)
+    실패한 문장은 "아직 없는 테이블" 때문일 수 있으므로, 더 진행되지 않을 때까지 다시 시도한다.
+    끝까지 실패한 문장은 보고서에 남는다.
+
+데이터 문장(INSERT/UPDATE/DELETE/SELECT ...)은 실행하지 않는다. scripts/ 에는 운영 데이터 보정
+스크립트가 섞여 있고, 데이터는 시드가 따로 만든다.
+
+Postgres   문장을 그대로 실행한다. 앞서 Supabase 전용 객체(auth.users, auth.uid(), storage.*,
+           anon/authenticated 역할)를 만들어 둔다.
+SQLite     CREATE TABLE / ALTER TABLE ADD COLUMN / CREATE INDEX 만 옮긴다 (DO 블록 안의 것 포함).
+           타입은 TEXT 등으로 바꾸고, REFERENCES / CHECK / 생성 열 식 / RLS / 함수 / 트리거는 뺀다.
+
+    python -m farmdata.localdb --db sqlite:///.farmdata/localdb.sqlite
+    python -m farmdata.localdb --db postgresql://postgres@localhost/farm_bench --verbose
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_SQLITE = ".farmdata/localdb.sqlite"
+
+# 데이터를 바꾸거나 조회만 하는 문장 — 재현하지 않는다
+DATA_KEYWORDS = {"insert", "update", "delete", "select", "with", "truncate", "copy", "notify", "raise",
+                 "begin", "commit", "rollback", "set", "values"}
+
+POSTGRES_PRELUDE = """
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+CREATE SCHEMA IF NOT EXISTS auth;
+CREATE TABLE IF NOT EXISTS auth.users (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    email text,
+    email_confirmed_at timestamptz,
+    raw_user_meta_data jsonb DEFAULT '{}'::jsonb,
+    created_at timestamptz DEFAULT now()
+);
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS uuid LANGUAGE sql STABLE AS $$
+    SELECT nullif(current_setting('request.jwt.claim.sub', true), '')::uuid
+$$;
+CREATE SCHEMA IF NOT EXISTS storage;
+CREATE TABLE IF NOT EXISTS storage.buckets (
+    id text PRIMARY KEY, name text, public boolean, file_size_limit bigint, allowed_mime_types text[]
+);
+CREATE TABLE IF NOT EXISTS storage.objects (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(), bucket_id text, name text, owner uuid
+);
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN CREATE ROLE anon NOLOGIN; END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN CREATE ROLE authenticated NOLOGIN; END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN CREATE ROLE service_role NOLOGIN; END IF;
+END $$;
+"""
+
+
+class LocalDBError(Exception):
+    """대상 DB 를 열 수 없거나 드라이버가 없을 때."""
+
+
+# --- SQL 문장 나누기 ---------------------------------------------------------
+
+_DOLLAR = re.compile(r"\$[A-Za-z_]*\$")
+
+
+def split_sql(text: str) -> list[str]:
+    """세미콜론으로 문장을 나눈다. 문자열, 따옴표 식별자, 주석, $tag$ 본문 안의 ; 는 건너뛴다."""
+    out: list[str] = []
+    buf: list[str] = []
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c == "-" and text.startswith("--", i):
+            j = text.find("\n", i)
+            i = n if j < 0 else j
+            continue
+        if c == "/" and text.startswith("/*", i):
+            j = text.find("*/", i + 2)
+            i = n if j < 0 else j + 2
+            buf.append(" ")
+            continue
+        if c in "'\"":
+            j = i + 1
+            while j < n:
+                if text[j] == c:
+                    if j + 1 < n and text[j + 1] == c:
+                        j += 2
+                        continue
+                    break
+                j += 1
+            buf.append(text[i:j + 1])
+            i = j + 1
+            continue
+        if c == "$":
+            m = _DOLLAR.match(text, i)
+            if m:
+                end = text.find(m.group(0), m.end())
+                end = n if end < 0 else end + len(m.group(0))
+                buf.append(text[i:end])
+                i = end
+                continue
+        if c == ";":
+            stmt = "".join(buf).strip()
+            if stmt:
+                out.append(stmt)
+            buf = []
+            i += 1
+            continue
+        buf.append(c)
+        i += 1
+    stmt = "".join(buf).strip()
+    if stmt:
+        out.append(stmt)
+    return out
+
+
+def read_sql(path: str | Path) -> str:
+    """BOM 으로 인코딩을 고른다 (scripts/add_grade_column.sql 은 UTF-16)."""
+    raw = Path(path).read_bytes()
+    if raw.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return raw.decode("utf-16")
+    return raw.decode("utf-8-sig", errors="replace")
+
+
+def keyword(stmt: str) -> str:
+    m = re.match(r"\s*([A-Za-z]+)", stmt)
+    return m.group(1).lower() if m else ""
+
+
+def schema_files(root: str | Path = REPO_ROOT) -> list[Path]:
+    root = Path(root)
+    scripts = sorted((root / "scripts").glob("*.sql"))
+    base = [p for p in scripts if p.name == "migration.sql"]
+    rest = [p for p in scripts if p.name != "migration.sql"]
+    return base + rest + sorted((root / "supabase" / "migrations").glob("*.sql"))
+
+
+# --- SQLite 로 옮기기 --------------------------------------------------------
+
+_TYPE_MAP = [
+    (re.compile(r"\b(timestamp|time)\s+with(out)?\s+time\s+zone\b", re.I), "TEXT"),
+    (re.compile(r"\b\w+\s*\[\]", re.I), "TEXT"),
+    (re.compile(r"\b(uuid|timestamptz|timestamp|jsonb|json|date|time|inet|citext)\b", re.I), "TEXT"),
+    (re.compile(r"\b(bigserial|serial)\b", re.I), "INTEGER"),
+]
+
+
+def balanced_end(s: str, start: int) -> int:
+    """s[start] 이 '(' 일 때 짝이 맞는 ')' 다음 위치."""
+    depth = 0
+    i = start
+    while i < len(s):
+        c = s[i]
+        if c == "'":
+            j = s.find("'", i + 1)
+            i = len(s) if j < 0 else j + 1
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return len(s)
+
+
+def split_top(s: str) -> list[str]:
+    """괄호·문자열 밖의 쉼표로 나눈다."""
+    parts, depth, buf, i = [], 0, [], 0
+    while i < len(s):
+        c = s[i]
+        if c == "'":
+            j = s.find("'", i + 1)
+            j = len(s) - 1 if j < 0 else j
+            buf.append(s[i:j + 1])
+            i = j + 1
+            continue
+        if c in "([":
+            depth += 1
+        elif c in ")]":
+            depth -= 1
+        if c == "," and depth == 0:
+            parts.append("".join(buf).strip())
+            buf = []
+        else:
+            buf.append(c)
+        i += 1
+    if "".join(buf).strip():
+        parts.append("".join(buf).strip())
+    return parts
+
+
+def _drop_clause(s: str, pattern: str, with_parens: bool) -> str:
+    """pattern 으로 시작하는 절(과 뒤따르는 괄호)을 지운다."""
+    rx = re.compile(pattern, re.I)
+    while True:
+        m = rx.search(s)
+        if not m:
+            return s
+        end = m.end()
+        if with_parens:
+            p = s.find("(", end)
+            if p >= 0 and not s[end:p].strip():
+                end = balanced_end(s, p)
+        s = s[:m.start()] + " " + s[end:]
+
+
+_REFERENCES = (r"\bREFERENCES\s+[\w.\"]+\s*(\([^)]*\))?"
+               r"(\s+(ON\s+(DELETE|UPDATE)\s+(SET\s+NULL|SET\s+DEFAULT|CASCADE|RESTRICT|NO\s+ACTION)|DEFERRABLE|"
+               r"INITIALLY\s+(DEFERRED|IMMEDIATE)|MATCH\s+\w+))*")
+
+
+def _translate_default(s: str, in_alter: bool) -> str:
+    m = re.search(r"\bDEFAULT\s+", s, re.I)
+    if not m:
+        return s
+    rest = s[m.end():]
+    if rest.startswith("'"):
+        j = m.end() + 1
+        while j < len(s):
+            if s[j] == "'" and not s.startswith("''", j):
+                break
+            j += 2 if s.startswith("''", j) else 1
+        expr_end = j + 1
+        cast = re.match(r"\s*::\s*[\w ]+(\[\])?", s[expr_end:])
+        value = s[m.end():expr_end]
+        end = expr_end + (cast.end() if cast else 0)
+        return s[:m.start()] + f"DEFAULT {value}" + s[end:]
+    word = re.match(r"[\w.]+", rest)
+    if not word:
+        return s[:m.start()] + s[m.end():]
+    name = word.group(0).lower()
+    end = m.end() + word.end()
+    if end < len(s) and s[end:].lstrip().startswith("(") or name == "array":
+        p = s.find("(" if name != "array" else "[", end)
+        end = balanced_end(s, p) if name != "array" else s.find("]", p) + 1
+    cast = re.match(r"\s*::\s*[\w ]+(\[\])?", s[end:])
+    if cast:
+        end += cast.end()
+    expr = s[m.end():end].lower()
+    if re.fullmatch(r"-?[\d.]+|true|false|null|current_date|current_timestamp", name):
+        repl = f"DEFAULT {word.group(0)}"
+        if in_alter and name in ("current_date", "current_timestamp"):
+            repl = ""
+    elif "now()" in expr or name in ("now", "timezone", "transaction_timestamp", "statement_timestamp"):
+        repl = "" if in_alter else "DEFAULT CURRENT_TIMESTAMP"
+    elif name in ("gen_random_uuid", "uuid_generate_v4"):
+        repl = "" if in_alter else "DEFAULT (lower(hex(randomblob(16))))"
+    else:
+        repl = ""
+    return s[:m.start()] + repl + s[end:]
+
+
+def _column_def(col: str, in_alter: bool = False) -> str:
+    s = re.sub(r"\bpublic\.", "", col)
+    s = _drop_clause(s, r"\bGENERATED\s+ALWAYS\s+AS\s*(?=\()", True)
+    s = re.sub(r"\bSTORED\b", "", s, flags=re.I)
+    s = re.sub(r"\bGENERATED\s+(ALWAYS|BY\s+DEFAULT)\s+AS\s+IDENTITY\b", "", s, flags=re.I)
+    s = _drop_clause(s, r"\bCONSTRAINT\s+\w+\s+CHECK\b", True)
+    s = _drop_clause(s, r"\bCHECK\b", True)
+    s = re.sub(_REFERENCES, "", s, flags=re.I)
+    s = _translate_default(s, in_alter)
+    name, _, rest = s.strip().partition(" ")  # 열 이름(date 등)은 타입으로 바꾸지 않는다
+    for rx, repl in _TYPE_MAP:
+        rest = rx.sub(repl, rest)
+    s = name + " " + re.sub(r"\bNUMERIC\s*\([^)]*\)", "NUMERIC", rest, flags=re.I)
+    if in_alter:
+        s = re.sub(r"\b(PRIMARY\s+KEY|UNIQUE)\b", "", s, flags=re.I)
+    return " ".join(s.split())
+
+
+def table_name(raw: str) -> str:
+    return raw.strip().replace('"', "").split(".")[-1]
+
+
+CREATE_TABLE = re.compile(r"CREATE\s+(UNLOGGED\s+)?TABLE\s+(IF\s+NOT\s+EXISTS\s+)?([\w.\"]+)\s*\(", re.I)
+ALTER_TABLE = re.compile(r"ALTER\s+TABLE\s+(IF\s+EXISTS\s+)?(ONLY\s+)?([\w.\"]+)\s+", re.I)
+CREATE_INDEX = re.compile(
+    r"CREATE\s+(UNIQUE\s+)?INDEX\s+(CONCURRENTLY\s+)?(IF\s+NOT\s+EXISTS\s+)?([\w\"]+)\s+ON\s+(ONLY\s+)?([\w.\"]+)\s*"
+    r"(USING\s+(\w+)\s*)?\(", re.I)
+
+
+def ddl_statements(stmt: str) -> list[str]:
+    """DO 블록이면 본문에 직접 있는 테이블/인덱스 DDL 들, 아니면 문장 그대로."""
+    if keyword(stmt) != "do":
+        return [stmt]
+    m = _DOLLAR.search(stmt)
+    if not m:
+        return []
+    body = stmt[m.end():stmt.rfind(m.group(0))]
+    # EXECUTE 문자열(정책 등)은 건너뛴다
+    body = re.sub(r"\$[A-Za-z_]*\$.*?\$[A-Za-z_]*\$", " ", body, flags=re.S)
+    return re.findall(r"((?:ALTER\s+TABLE|CREATE\s+(?:UNIQUE\s+)?INDEX|CREATE\s+TABLE|DROP\s+INDEX)\b[^;]*)", body, re.I)
+
+
+def to_sqlite(stmt: str) -> list[str]:
+    """Postgres DDL 한 문장 → SQLite 문장들 (옮길 수 없으면 빈 목록)."""
+    if keyword(stmt) == "do":
+        return [s for f in ddl_statements(stmt) for s in to_sqlite(f)]
+    m = CREATE_TABLE.match(stmt.strip())
+    if m:
+        name = table_name(m.group(3))
+        start = stmt.find("(", m.end() - 1)
+        inner = stmt[start + 1:balanced_end(stmt, start) - 1]
+        elems = []
+        for e in split_top(inner):
+            head = keyword(e).upper()
+            if head == "CONSTRAINT":
+                e = e.split(None, 2)[2] if len(e.split(None, 2)) > 2 else ""
+                head = keyword(e).upper()
+            if head in ("CHECK", "FOREIGN", "EXCLUDE", "LIKE") or not e:
+                continue
+            elems.append(_column_def(e) if head not in ("PRIMARY", "UNIQUE") else " ".join(e.split()))
+        return [f"CREATE TABLE IF NOT EXISTS {name} (\n    " + ",\n    ".join(elems) + "\n)"]
+    m = ALTER_TABLE.match(stmt.strip())
+    if m:
+        name = table_name(m.group(3))
+        out = []
+        for clause in split_top(stmt.strip()[m.end():]):
+            cm = re.match(r"ADD\s+(COLUMN\s+)?(IF\s+NOT\s+EXISTS\s+)?(.*)", clause, re.I | re.S)
+            if not cm or re.match(r"(CONSTRAINT|PRIMARY|UNIQUE|FOREIGN|CHECK)\b", cm.group(3), re.I):
+                continue
+            out.append(f"ALTER TABLE {name} ADD COLUMN {_column_def(cm.group(3), in_alter=True)}")
+        return out
+    m = CREATE_INDEX.match(stmt.strip())
+    if m:
+        if m.group(8) and m.group(8).lower() != "btree":
+            return []
+        start = m.end() - 1
+        cols = stmt.strip()[start:balanced_end(stmt.strip(), start)]
+        tail = stmt.strip()[balanced_end(stmt.strip(), start):]
+        where = re.search(r"\bWHERE\b.*", tail, re.I | re.S)
+        unique = "UNIQUE " if m.group(1) else ""
+        sql = f"CREATE {unique}INDEX IF NOT EXISTS {m.group(4)} ON {table_name(m.group(6))} {cols}"
+        if where:
+            sql += " " + re.sub(r"\bpublic\.", "", where.group(0))
+        return [sql]
+    return []
+
+
+# --- 연결 -------------------------------------------------------------------
+
+
+class LocalDB:
+    """sqlite3 / psycopg 연결 하나. SQL 은 :name 자리표시자로 쓰고 방언에 맞게 바꾼다."""
+
+    def __init__(self, conn, dialect: str, target: str):
+        self.conn = conn
+        self.dialect = dialect
+        self.target = target
+
+    @classmethod
+    def open(cls, target: str) -> "LocalDB":
+        if target.startswith("sqlite:///"):
+            path = target[len("sqlite:///"):]
+            if path != ":memory:":
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            return cls(conn, "sqlite", target)
+        if target.startswith(("postgres://", "postgresql://")):
+            try:
+                import psycopg
+            except ImportError:
+                raise LocalDBError("Postgres 대상에는 psycopg 가 필요합니다 (pip install psycopg).") from None
+            return cls(psycopg.connect(target, autocommit=True), "postgres", target)
+        raise LocalDBError(f"알 수 없는 대상: {target} (sqlite:///파일 | postgresql://...)")
+
+    def reopen(self) -> "LocalDB":
+        """같은 DB 에 새 연결 (동시 실행용)."""
+        return LocalDB.open(self.target)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def sql(self, text: str) -> str:
+        if self.dialect == "postgres":
+            return re.sub(r"(?<![:\w]):([A-Za-z_]\w*)", r"%(\1)s", text.replace("%", "%%"))
+        return text
+
+    def execute(self, text: str, params: dict | None = None):
+        cur = self.conn.cursor()
+        cur.execute(self.sql(text), params or {})
+        return cur
+
+    def query(self, text: str, params: dict | None = None) -> list[tuple]:
+        cur = self.execute(text, params)
+        rows = cur.fetchall() if cur.description else []
+        cur.close()
+        return rows
+
+    def tables(self) -> list[str]:
+        if self.dialect == "sqlite":
+            rows = self.query("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+        else:
+            rows = self.query("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'")
+        return sorted(r[0] for r in rows)
+
+    def columns(self, table: str) -> list[str]:
+        if self.dialect == "sqlite":
+            return [r[1] for r in self.query(f'PRAGMA table_info("{table}")')]
+        return [r[0] for r in self.query(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = 'public' AND table_name = :t AND is_generated = 'NEVER' ORDER BY ordinal_position",
+            {"t": table})]
+
+    def insert_many(self, table: str, rows: Sequence[dict], columns: Sequence[str] | None = None) -> int:
+        """rows 의 키 중 테이블에 있는 열만 넣는다. 넣은 행 수."""
+        if not rows:
+            return 0
+        have = set(columns or self.columns(table))
+        cols = [c for c in rows[0] if c in have]
+        ph = ", ".join(("?" if self.dialect == "sqlite" else "%s") for _ in cols)
+        sql = f'INSERT INTO "{table}" ({", ".join(f"{chr(34)}{c}{chr(34)}" for c in cols)}) VALUES ({ph})'
+        values = [[_adapt(self.dialect, r.get(c)) for c in cols] for r in rows]
+        cur = self.conn.cursor()
+        if self.dialect == "sqlite":
+            cur.execute("BEGIN")
+            cur.executemany(sql, values)
+            cur.execute("COMMIT")
+        else:
+            with self.conn.transaction():
+                cur.executemany(sql, values)
+        cur.close()
+        return len(rows)
+
+    def explain(self, text: str, params: dict | None = None, analyze: bool = True) -> list[str]:
+        if self.dialect == "sqlite":
+            return [f"{r[0]}:{r[1]} {r[3]}" for r in self.query("EXPLAIN QUERY PLAN " + text, params)]
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+        return [r[0] for r in self.query(prefix + text, params)]
+
+
+def _adapt(dialect: str, v):
+    if isinstance(v, (dict, list)):
+        import json
+
+        if dialect == "postgres":
+            from psycopg.types.json import Jsonb
+
+            return Jsonb(v)
+        return json.dumps(v, ensure_ascii=False)
+    return v
+
+
+# --- 재현 -------------------------------------------------------------------
+
+
+@dataclass
+class ReplayReport:
+    applied: int = 0
+    existing: int = 0
+    skipped: int = 0  # 데이터 문장, SQLite 로 옮길 수 없는 문장
+    failed: list[tuple[str, str, str]] = field(default_factory=list)  # (파일, 문장 첫 줄, 오류)
+    tables: list[str] = field(default_factory=list)
+
+
+def _is_existing(err: Exception) -> bool:
+    msg = str(err).lower()
+    return "already exists" in msg or "duplicate column" in msg
+
+
+def replay(db: LocalDB, files: Iterable[Path] | None = None, log=None) -> ReplayReport:
+    report = ReplayReport()
+    pending: list[tuple[str, str]] = []
+    if db.dialect == "postgres":
+        for stmt in split_sql(POSTGRES_PRELUDE):
+            db.execute(stmt).close()
+    for path in files if files is not None else schema_files():
+        name = str(path.relative_to(REPO_ROOT)) if path.is_relative_to(REPO_ROOT) else str(path)
+        for stmt in split_sql(read_sql(path)):
+            if keyword(stmt) in DATA_KEYWORDS:
+                report.skipped += 1
+                continue
+            if db.dialect == "sqlite":
+                translated = to_sqlite(stmt)
+                if not translated:
+                    report.skipped += 1
+                pending.extend((name, s) for s in translated)
+            else:
+                pending.append((name, stmt))
+
+    errors: dict[int, Exception] = {}
+    while pending:
+        retry: list[tuple[str, str]] = []
+        progressed = False
+        for item in pending:
+            try:
+                db.execute(item[1]).close()
+                report.applied += 1
+                progressed = True
+            except Exception as e:  # 드라이버마다 예외 계층이 다르다
+                if _is_existing(e):
+                    report.existing += 1
+                    progressed = True
+                else:
+                    errors[id(item)] = e
+                    retry.append(item)
+        if not progressed or len(retry) == len(pending):
+            break
+        pending = retry
+    else:
+        retry = []
+    for item in retry:
+        first = item[1].strip().splitlines()[0][:100]
+        report.failed.append((item[0], first, str(errors[id(item)]).splitlines()[0]))
+        if log:
+            log(f"  실패 {item[0]}: {first} — {report.failed[-1][2]}")
+    report.tables = db.tables()
+    return report
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="supabase/migrations + scripts/*.sql 스키마를 로컬 DB 에 재현")
+    ap.add_argument("--db", default=f"sqlite:///{DEFAULT_SQLITE}", help="sqlite:///파일 | postgresql://...")
+    ap.add_argument("--root", default=str(REPO_ROOT), help="저장소 루트")
+    ap.add_argument("--verbose", action="store_true", help="실패한 문장을 모두 출력")
+    args = ap.parse_args(argv)
+    try:
+        db = LocalDB.open(args.db)
+    except LocalDBError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    r = replay(db, schema_files(args.root), log=print if args.verbose else None)
+    print(f"{args.db}: 적용 {r.applied}, 이미 있음 {r.existing}, 건너뜀 {r.skipped}, 실패 {len(r.failed)}")
+    print(f"테이블 {len(r.tables)}개: {', '.join(r.tables)}")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""인건비 집계 엔진 — attendance_records / labor_costs 로 근로자·일·월 급여 합계.
+
+일일 현황 화면(app/labor/page.tsx)은 농장·날짜마다 workers, labor_costs, attendance_records 를
+따로 조회하고, 주간 요약은 7일치를 다시 읽어 렌더링마다 날짜별로 filter/reduce 한다.
+이 엔진은 내보내기를 열 배열로 한 번 읽어 모든 농장의 (농장, 월, 근로자) / (농장, 날짜) /
+(농장, 월) 그룹 합계를 한 번에 계산한다. 월말 급여 정산을 농장 수만큼의 화면 로드가 아니라
+배치 한 번으로 끝낸다.
+
+규칙 (scripts/attendance_wage_update.sql 의 열, 결산 화면과 같은 계산)
+    출근 일당    is_present = true 인 행만, (daily_wage || 0) × (headcount || 1)
+    역할        family / staff / foreign / part_time (attendance_records_role_check). 그 밖의 값은 경고
+    근로자 키    worker_id || worker_name (근로자 화면 급여 탭과 같다)
+    actualWage  근로자 화면 급여 탭 값: 모든 행의 (actual_wage || 0) — 일당 규칙과 비교용
+    알바/용역    labor_costs 행마다 headcount × daily_wage + (tip || 0)
+    출처 키      인력사무소 이고 agency_name 이 있으면 그 이름, 아니면 인력사무소 / 개별직접
+
+날짜는 work_date 의 날짜 부분, 월은 그 앞 7자다. 금액은 원 단위 정수라 합계가 정확하다.
+
+    python -m farmdata.payroll exports/2026-03-10 --month 2026-03                  # 농장·월 합계
+    python -m farmdata.payroll exports/2026-03-10 --month 2026-03 --level worker   # 근로자별
+    python -m farmdata.payroll exports/2026-03-10 --month 2026-03 --level day --farm <farm_id>
+
+(scripts/ 에서 실행하거나 PYTHONPATH=scripts 로 실행, numpy 필요)
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .export import Factor, load_table
+from .js import js_date_part, js_number, js_or_zero, js_stringify, js_truthy
+from .settlement import month_code, month_label
+
+PAYROLL_TABLES = ("attendance_records", "labor_costs")
+# attendance_records_role_check
+ROLES = ("family", "staff", "foreign", "part_time")
+SOURCES = ("인력사무소", "개별직접")
+LEVELS = ("month", "worker", "day")
+
+
+def source_key(c: dict) -> str:
+    """주간 요약의 출처 묶음 이름."""
+    if c.get("source") == "인력사무소":
+        return c["agency_name"] if js_truthy(c.get("agency_name")) else "인력사무소"
+    return "개별직접"
+
+
+def _group(*codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """여러 정수 코드 열의 조합마다 번호. (행별 그룹 번호, 그룹별 코드 행렬) — 그룹은 코드 오름차순."""
+    if not len(codes[0]):
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(codes)), dtype=np.int64)
+    keys, inv = np.unique(np.stack(codes, axis=1), axis=0, return_inverse=True)
+    return inv.ravel(), keys
+
+
+@dataclass
+class AttendanceColumns:
+    farm: np.ndarray  # int32
+    day: np.ndarray  # int32 (dates 코드)
+    month: np.ndarray  # int64
+    worker: np.ndarray  # int32 (workers 코드: worker_id || worker_name)
+    present: np.ndarray  # bool — is_present === true
+    wage: np.ndarray  # float64 — 출근 일당 규칙 (결석 행은 0)
+    headcount: np.ndarray  # float64 — headcount || 1
+    actual: np.ndarray  # float64 — actual_wage || 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], farms: Factor, dates: Factor, workers: Factor,
+                  names: dict[int, tuple[str, str]], months: set[int] | None, warnings: list[str]) -> "AttendanceColumns":
+        cols: dict[str, list] = {k: [] for k in ("farm", "day", "month", "worker", "present", "wage", "headcount", "actual")}
+        for a in rows:
+            date = js_date_part(a.get("work_date"))
+            m = month_code(date)
+            if months is not None and m not in months:
+                continue
+            role = a.get("role")
+            if role not in ROLES:
+                warnings.append(f"attendance_records {a.get('id')}: 알 수 없는 역할 {role!r}")
+            key = a.get("worker_id") or a.get("worker_name")
+            w = workers.code(key)
+            names.setdefault(w, (a.get("worker_name") or "", role or ""))
+            hc = a.get("headcount")
+            headcount = js_number(hc) if js_truthy(hc) else 1.0
+            present = a.get("is_present") is True
+            cols["farm"].append(farms.code(a.get("farm_id")))
+            cols["day"].append(dates.code(date))
+            cols["month"].append(m)
+            cols["worker"].append(w)
+            cols["present"].append(present)
+            cols["wage"].append(js_or_zero(a.get("daily_wage")) * headcount if present else 0.0)
+            cols["headcount"].append(headcount if present else 0.0)
+            cols["actual"].append(js_or_zero(a.get("actual_wage")))
+        return cls(np.array(cols["farm"], dtype=np.int32), np.array(cols["day"], dtype=np.int32),
+                   np.array(cols["month"], dtype=np.int64), np.array(cols["worker"], dtype=np.int32),
+                   np.array(cols["present"], dtype=bool), np.array(cols["wage"], dtype=np.float64),
+                   np.array(cols["headcount"], dtype=np.float64), np.array(cols["actual"], dtype=np.float64))
+
+
+@dataclass
+class LaborCostColumns:
+    farm: np.ndarray  # int32
+    day: np.ndarray  # int32
+    month: np.ndarray  # int64
+    source: np.ndarray  # int8 — SOURCES 순번
+    group: np.ndarray  # int32 (groups 코드: source_key)
+    headcount: np.ndarray  # float64
+    amount: np.ndarray  # float64 — headcount × daily_wage + (tip || 0)
+    tip: np.ndarray  # float64
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], farms: Factor, dates: Factor, groups: Factor,
+                  months: set[int] | None) -> "LaborCostColumns":
+        cols: dict[str, list] = {k: [] for k in ("farm", "day", "month", "source", "group", "headcount", "amount", "tip")}
+        for c in rows:
+            date = js_date_part(c.get("work_date"))
+            m = month_code(date)
+            if months is not None and m not in months:
+                continue
+            headcount = js_number(c.get("headcount"))
+            tip = js_or_zero(c.get("tip"))
+            cols["farm"].append(farms.code(c.get("farm_id")))
+            cols["day"].append(dates.code(date))
+            cols["month"].append(m)
+            cols["source"].append(SOURCES.index(c["source"]) if c.get("source") in SOURCES else -1)
+            cols["group"].append(groups.code(source_key(c)))
+            cols["headcount"].append(headcount)
+            cols["amount"].append(headcount * js_number(c.get("daily_wage")) + tip)
+            cols["tip"].append(tip)
+        return cls(np.array(cols["farm"], dtype=np.int32), np.array(cols["day"], dtype=np.int32),
+                   np.array(cols["month"], dtype=np.int64), np.array(cols["source"], dtype=np.int8),
+                   np.array(cols["group"], dtype=np.int32), np.array(cols["headcount"], dtype=np.float64),
+                   np.array(cols["amount"], dtype=np.float64), np.array(cols["tip"], dtype=np.float64))
+
+
+class PayrollEngine:
+    def __init__(self, attendance: AttendanceColumns, costs: LaborCostColumns, farms: Factor, dates: Factor,
+                 workers: Factor, groups: Factor, names: dict[int, tuple[str, str]], warnings: list[str]):
+        self.attendance = attendance
+        self.costs = costs
+        self.farms = farms
+        self.dates = dates
+        self.workers = workers
+        self.groups = groups
+        self.names = names
+        self.warnings = warnings
+
+    @classmethod
+    def from_export(cls, export_dir: str | Path, months: Sequence[int] | None = None) -> "PayrollEngine":
+        """months 를 주면 그 달의 행만 읽는다."""
+        farms, dates, workers, groups = Factor(), Factor(), Factor(), Factor()
+        names: dict[int, tuple[str, str]] = {}
+        warnings: list[str] = []
+        wanted = set(months) if months else None
+        attendance = AttendanceColumns.from_rows(load_table(export_dir, "attendance_records"), farms, dates,
+                                                 workers, names, wanted, warnings)
+        costs = LaborCostColumns.from_rows(load_table(export_dir, "labor_costs", required=False), farms, dates,
+                                           groups, wanted)
+        return cls(attendance, costs, farms, dates, workers, groups, names, warnings)
+
+    def farm_ids(self) -> list[str]:
+        return sorted((f for f in self.farms.values if f is not None), key=str)
+
+    # --- 근로자별 (농장, 월, 근로자) ------------------------------------------
+
+    def by_worker(self) -> dict[tuple[str, int], list[dict]]:
+        a = self.attendance
+        group, keys = _group(a.farm, a.month, a.worker)
+        n = len(keys)
+        days = np.bincount(group, weights=a.present, minlength=n)
+        headcount = np.bincount(group, weights=a.headcount, minlength=n)
+        wage = np.bincount(group, weights=a.wage, minlength=n)
+        actual = np.bincount(group, weights=a.actual, minlength=n)
+        records = np.bincount(group, minlength=n)
+        out: dict[tuple[str, int], list[dict]] = {}
+        for k, (f, m, w) in enumerate(keys.tolist()):
+            name, role = self.names[w]
+            out.setdefault((self.farms.values[f], m), []).append({
+                "worker": self.workers.values[w], "worker_name": name, "role": role,
+                "days": int(days[k]), "headcount": float(headcount[k]), "wage": float(wage[k]),
+                "actualWage": float(actual[k]), "records": int(records[k]),
+            })
+        for rows in out.values():
+            rows.sort(key=lambda r: (r["worker_name"], str(r["worker"])))
+        return out
+
+    # --- 일별 (농장, 날짜) ------------------------------------------------------
+
+    def by_day(self) -> dict[tuple[str, str], dict]:
+        """주간 요약의 하루 값 + 출근 일당 합계."""
+        a, c = self.attendance, self.costs
+        n_dates = len(self.dates)
+        out: dict[tuple[str, str], dict] = {}
+
+        def cell(farm_code: int, day_code: int) -> dict:
+            key = (self.farms.values[farm_code], self.dates.values[day_code])
+            entry = out.get(key)
+            if entry is None:
+                entry = out[key] = {"laborHeadcount": 0.0, "laborTotal": 0.0, "staffCount": 0,
+                                    "attendanceWage": 0.0, "bySource": {}}
+            return entry
+
+        cell_a = a.farm.astype(np.int64) * n_dates + a.day
+        present = a.present
+        ids, inv = np.unique(cell_a[present], return_inverse=True)
+        staff = np.bincount(inv.ravel(), minlength=len(ids))
+        wage = np.bincount(inv.ravel(), weights=a.wage[present], minlength=len(ids))
+        for code, s, w in zip(ids.tolist(), staff.tolist(), wage.tolist()):
+            e = cell(code // n_dates, code % n_dates)
+            e["staffCount"] = s
+            e["attendanceWage"] = w
+
+        group, keys = _group(c.farm, c.day, c.group)
+        head = np.bincount(group, weights=c.headcount, minlength=len(keys))
+        amount = np.bincount(group, weights=c.amount, minlength=len(keys))
+        for (f, d, g), h, amt in zip(keys.tolist(), head.tolist(), amount.tolist()):
+            e = cell(f, d)
+            e["laborHeadcount"] += h
+            e["laborTotal"] += amt
+            e["bySource"][self.groups.values[g]] = {"headcount": h, "amount": amt}
+        # 화면 weekSummary 와 같은 키 순서
+        return {k: {"laborHeadcount": e["laborHeadcount"], "laborTotal": e["laborTotal"], "staffCount": e["staffCount"],
+                    "total": e["laborHeadcount"] + e["staffCount"], "bySource": e["bySource"],
+                    "attendanceWage": e["attendanceWage"]} for k, e in out.items()}
+
+    # --- 월별 (농장, 월) --------------------------------------------------------
+
+    def by_month(self) -> dict[tuple[str, int], dict]:
+        """월간 요약 스트립 값 + 출근 일당 합계 + 급여 총액."""
+        a, c = self.attendance, self.costs
+        out: dict[tuple[str, int], dict] = {}
+
+        def cell(farm_code: int, m: int) -> dict:
+            key = (self.farms.values[farm_code], m)
+            entry = out.get(key)
+            if entry is None:
+                entry = out[key] = {"staffDays": 0, "agencyCount": 0.0, "directCount": 0.0, "totalCost": 0.0,
+                                    "totalTip": 0.0, "attendanceWage": 0.0}
+            return entry
+
+        group, keys = _group(a.farm, a.month)
+        days = np.bincount(group, weights=a.present, minlength=len(keys))
+        wage = np.bincount(group, weights=a.wage, minlength=len(keys))
+        for (f, m), d, w in zip(keys.tolist(), days.tolist(), wage.tolist()):
+            e = cell(f, m)
+            e["staffDays"] = int(d)
+            e["attendanceWage"] = w
+
+        group, keys = _group(c.farm, c.month)
+        n = len(keys)
+        agency = np.bincount(group, weights=np.where(c.source == 0, c.headcount, 0.0), minlength=n)
+        direct = np.bincount(group, weights=np.where(c.source == 1, c.headcount, 0.0), minlength=n)
+        cost = np.bincount(group, weights=c.amount, minlength=n)
+        tip = np.bincount(group, weights=c.tip, minlength=n)
+        for k, (f, m) in enumerate(keys.tolist()):
+            e = cell(f, m)
+            e.update(agencyCount=float(agency[k]), directCount=float(direct[k]), totalCost=float(cost[k]),
+                     totalTip=float(tip[k]))
+        for e in out.values():
+            e["payroll"] = e["totalCost"] + e["attendanceWage"]
+        return out
+
+
+def report_lines(engine: PayrollEngine, level: str = "month", farms: Sequence[str] | None = None) -> Iterable[str]:
+    """level 마다 한 줄씩 (JSON.stringify 형식). 농장 id, 월/날짜 순."""
+    wanted = set(farms) if farms else None
+    if level == "worker":
+        table = engine.by_worker()
+        for farm, m in sorted(table, key=lambda k: (str(k[0]), k[1])):
+            if wanted is None or farm in wanted:
+                for row in table[(farm, m)]:
+                    yield js_stringify({"farm_id": farm, "month": month_label(m) if m >= 0 else None, **row})
+    elif level == "day":
+        table = engine.by_day()
+        for farm, date in sorted(table, key=lambda k: (str(k[0]), k[1])):
+            if wanted is None or farm in wanted:
+                yield js_stringify({"farm_id": farm, "date": date, **table[(farm, date)]})
+    else:
+        table = engine.by_month()
+        for farm, m in sorted(table, key=lambda k: (str(k[0]), k[1])):
+            if wanted is None or farm in wanted:
+                yield js_stringify({"farm_id": farm, "month": month_label(m) if m >= 0 else None, **table[(farm, m)]})
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="내보내기로부터 농장별 근로자·일·월 인건비 합계 계산")
+    ap.add_argument("export_dir", help=f"{' / '.join(PAYROLL_TABLES)} 내보내기 디렉터리")
+    ap.add_argument("--month", action="append", default=None, help="YYYY-MM (여러 번 가능, 기본: 전체)")
+    ap.add_argument("--year", type=int, action="append", default=None, help="연도의 12개월 전부")
+    ap.add_argument("--level", choices=LEVELS, default="month", help="month: 농장·월, worker: 근로자별, day: 날짜별")
+    ap.add_argument("--farm", action="append", default=None, help="대상 농장 id (기본: 전체)")
+    ap.add_argument("--out", default=None, help="NDJSON 출력 파일 (기본: 표준 출력)")
+    args = ap.parse_args(argv)
+
+    months = [month_code(m) for m in args.month or ()]
+    if any(m < 0 for m in months):
+        ap.error("--month 는 YYYY-MM 형식이어야 합니다.")
+    months += [y * 12 + k for y in args.year or () for k in range(12)]
+
+    engine = PayrollEngine.from_export(args.export_dir, months or None)
+    lines = list(report_lines(engine, args.level, args.farm))
+    if args.out:
+        Path(args.out).write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    else:
+        for line in lines:
+            print(line)
+    for w in engine.warnings[:20]:
+        print(f"경고: {w}", file=sys.stderr)
+    if len(engine.warnings) > 20:
+        print(f"경고 {len(engine.warnings) - 20}건 더 있음", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
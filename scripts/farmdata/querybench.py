@@ -0,0 +1,463 @@
+"""페이지 쿼리 모양 벤치마크 — 로컬 DB 대역에 합성 농장을 시드하고, 화면이 보내는 쿼리를 그대로 잰다.
+
+호스팅된 Supabase 를 건드리지 않고 쿼리 비용을 보기 위한 도구다. 스키마는 farmdata.localdb 가
+supabase/migrations + scripts/*.sql 에서 재현한다.
+
+쿼리 모양 (QUERY_SHAPES)
+    supabase-js 체인을 PostgREST 가 만드는 SQL 과 같은 꼴로 옮겼다.
+    - .eq / .gte / .lte / .is / .not("x", "is", null) → WHERE
+    - .order / .limit → ORDER BY / LIMIT
+    - limit 이 없는 쿼리에는 PostgREST max_rows(supabase/config.toml, 1000) 가 붙는다
+    - partner:partners(company_name) 같은 임베드 → LEFT JOIN
+그룹 (GROUPS)
+    한 화면이 한 번에 보내는 쿼리 묶음. 단계(phase)마다 Promise.all 처럼 동시에 보내고,
+    한 구성원 안의 쿼리(fetchStockMap 의 await 3번 등)는 차례로 보낸다. 그룹 시간은 화면이 기다리는 벽시계 시간이다.
+
+보고서
+    쿼리별 / 그룹별 p50 · p99 · 최대 (ms), 평균 행 수, 가장 큰 농장에 대한 EXPLAIN.
+    재현된 스키마에 없는데 앱이 쓰는 열(스키마 드리프트)은 시드 전에 추가하고 보고서에 적는다.
+
+    python -m farmdata.querybench
+    python -m farmdata.querybench --db sqlite:////tmp/bench.sqlite --farms 50 --rows 5000 --iterations 200
+    python -m farmdata.querybench --db postgresql://postgres@localhost/farm_bench --json bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Sequence
+
+from farmdata.localdb import DEFAULT_SQLITE, LocalDB, LocalDBError, replay, schema_files
+
+MAX_ROWS = 1000  # supabase/config.toml [api] max_rows
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    name: str
+    source: str  # 앱에서 이 쿼리를 보내는 곳
+    sql: str
+
+
+INVENTORY = "app/inventory/page.tsx loadAll"
+STOCK = "hooks/useInventory.ts"
+FINANCE = "app/finance/page.tsx fetchFinanceData"
+_SALES_EMBED = ("SELECT s.*, p.company_name AS partner_company_name, c.name AS customer_name_embed "
+                "FROM sales_records s LEFT JOIN partners p ON p.id = s.partner_id "
+                "LEFT JOIN customers c ON c.id = s.customer_id ")
+
+QUERY_SHAPES = {q.name: q for q in [
+    QueryShape("stock.harvest", f"{STOCK} fetchStockMap",
+               f"SELECT crop_name, quantity FROM harvest_records WHERE farm_id = :farm_id LIMIT {MAX_ROWS}"),
+    QueryShape("stock.sales", f"{STOCK} fetchStockMap",
+               f"SELECT crop_name, quantity FROM sales_records WHERE farm_id = :farm_id LIMIT {MAX_ROWS}"),
+    QueryShape("stock.adjust", f"{STOCK} fetchStockMap",
+               f"SELECT crop_name, quantity FROM inventory_adjustments WHERE farm_id = :farm_id LIMIT {MAX_ROWS}"),
+    QueryShape("grade.harvest", f"{STOCK} fetchGradeStockMap",
+               f"SELECT crop_name, quantity, grade FROM harvest_records WHERE farm_id = :farm_id LIMIT {MAX_ROWS}"),
+    QueryShape("grade.sales", f"{STOCK} fetchGradeStockMap",
+               "SELECT crop_name, quantity, grade FROM sales_records "
+               f"WHERE farm_id = :farm_id AND grade IS NOT NULL LIMIT {MAX_ROWS}"),
+    QueryShape("grade.adjust", f"{STOCK} fetchGradeStockMap",
+               "SELECT crop_name, quantity, grade FROM inventory_adjustments "
+               f"WHERE farm_id = :farm_id AND grade IS NOT NULL LIMIT {MAX_ROWS}"),
+    QueryShape("inventory.farm_crops", INVENTORY,
+               f"SELECT * FROM farm_crops WHERE farm_id = :farm_id ORDER BY sort_order LIMIT {MAX_ROWS}"),
+    QueryShape("inventory.adjust_history", INVENTORY,
+               "SELECT * FROM inventory_adjustments WHERE farm_id = :farm_id ORDER BY adjusted_at DESC LIMIT 30"),
+    QueryShape("inventory.processing_records", INVENTORY,
+               "SELECT * FROM processing_records WHERE farm_id = :farm_id ORDER BY processed_date DESC LIMIT 20"),
+    QueryShape("inventory.processing_runs", INVENTORY,
+               "SELECT * FROM processing_runs WHERE farm_id = :farm_id ORDER BY run_date DESC LIMIT 20"),
+    QueryShape("inventory.sales_totals", f"{STOCK} fetchSalesRecordMap",
+               f"SELECT crop_name, total_qty FROM inventory_sales_totals WHERE farm_id = :farm_id LIMIT {MAX_ROWS}"),
+    QueryShape("finance.sales_courier", FINANCE,
+               _SALES_EMBED + "WHERE s.farm_id = :farm_id AND s.delivery_method = 'courier' AND s.is_settled = :yes "
+               "AND s.recorded_at >= :start_ts AND s.recorded_at <= :end_ts "
+               f"ORDER BY s.recorded_at DESC LIMIT {MAX_ROWS}"),
+    QueryShape("finance.sales_b2b", FINANCE,
+               _SALES_EMBED + "WHERE s.farm_id = :farm_id AND s.sale_type = 'b2b' AND s.is_settled = :yes "
+               "AND s.settled_at >= :start_date AND s.settled_at <= :end_date "
+               f"ORDER BY s.settled_at DESC LIMIT {MAX_ROWS}"),
+    QueryShape("finance.sales_unsettled", FINANCE,
+               _SALES_EMBED + "WHERE s.farm_id = :farm_id AND s.is_settled = :no "
+               f"ORDER BY s.recorded_at DESC LIMIT {MAX_ROWS}"),
+    QueryShape("finance.expenditures", FINANCE,
+               "SELECT amount, category, main_category, expense_date, notes, payment_method FROM expenditures "
+               "WHERE farm_id = :farm_id AND expense_date >= :start_date AND expense_date <= :end_date "
+               f"LIMIT {MAX_ROWS}"),
+    QueryShape("finance.attendance", FINANCE,
+               "SELECT daily_wage, headcount, worker_name, work_date FROM attendance_records "
+               "WHERE farm_id = :farm_id AND is_present = :yes AND work_date >= :start_date AND work_date <= :end_date "
+               f"LIMIT {MAX_ROWS}"),
+    QueryShape("finance.farm_crops", FINANCE,
+               f"SELECT crop_name, category FROM farm_crops WHERE farm_id = :farm_id AND is_active IS TRUE LIMIT {MAX_ROWS}"),
+    QueryShape("finance.other_incomes", FINANCE,
+               "SELECT amount, income_type, income_date FROM other_incomes "
+               f"WHERE farm_id = :farm_id AND income_date >= :start_date AND income_date <= :end_date LIMIT {MAX_ROWS}"),
+]}
+
+# 그룹 → 단계(차례로) → 구성원(동시에) → 쿼리(차례로)
+GROUPS: dict[str, list[list[list[str]]]] = {
+    "inventory.loadAll": [[
+        ["stock.harvest", "stock.sales", "stock.adjust"],
+        ["grade.harvest"], ["grade.sales"], ["grade.adjust"],
+        ["inventory.farm_crops"], ["inventory.adjust_history"], ["inventory.processing_records"],
+        ["inventory.processing_runs"], ["inventory.sales_totals"],
+    ]],
+    "finance.fetchFinanceData": [
+        [["finance.sales_courier"], ["finance.sales_b2b"], ["finance.sales_unsettled"]],
+        [["finance.expenditures"], ["finance.attendance"], ["finance.farm_crops"], ["finance.other_incomes"]],
+    ],
+}
+
+
+# --- 시드 -------------------------------------------------------------------
+
+CROPS = ["딸기", "토마토", "방울토마토", "오이", "고추", "상추", "감자", "고구마", "블루베리", "딸기잼", "토마토주스", "건고추"]
+PROCESSED = {"딸기잼", "토마토주스", "건고추"}
+EXPENSE_CATS = [("인건비", "기본급/월급"), ("인건비", "아르바이트(일당)"), ("인건비", "식대"), ("농자재", "비료"),
+                ("농자재", "농약"), ("시설", "수리"), ("가계생활", "식비"), ("운영", "택배비")]
+
+
+@dataclass
+class SeedReport:
+    farms: list[tuple[str, int]] = field(default_factory=list)  # (farm_id, 판매 행 수)
+    rows: dict[str, int] = field(default_factory=dict)
+    drift: list[tuple[str, str]] = field(default_factory=list)  # 스키마에 없어 추가한 (테이블, 열)
+    seconds: float = 0.0
+
+
+def _uid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _sql_type(dialect: str, value) -> str:
+    if isinstance(value, bool):
+        return "BOOLEAN"
+    if isinstance(value, int):
+        return "BIGINT" if dialect == "postgres" else "INTEGER"
+    if isinstance(value, float):
+        return "NUMERIC"
+    return "TEXT"
+
+
+def ensure_columns(db: LocalDB, table: str, rows: list[dict], report: SeedReport) -> list[str]:
+    """rows[0] 의 키 중 테이블에 없는 열을 추가하고 드리프트로 적는다. 추가 후의 열 목록."""
+    have = db.columns(table)
+    for col, value in rows[0].items():
+        if col not in have:
+            db.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}" {_sql_type(db.dialect, value)}').close()
+            report.drift.append((table, col))
+            have.append(col)
+    return have
+
+
+def _ts(d: date, rng: random.Random) -> str:
+    t = datetime(d.year, d.month, d.day, tzinfo=timezone.utc) + timedelta(seconds=rng.randrange(86400))
+    return t.isoformat()
+
+
+def farm_rows(rng: random.Random, farm_id: str, n_sales: int, start: date, days: int) -> dict[str, list[dict]]:
+    """농장 하나의 합성 행. n_sales 를 기준으로 다른 테이블 크기를 정한다."""
+    day = lambda: start + timedelta(days=rng.randrange(days))  # noqa: E731
+    crops = rng.sample(CROPS, k=rng.randint(4, len(CROPS)))
+    out: dict[str, list[dict]] = {t: [] for t in (
+        "farm_crops", "partners", "customers", "harvest_records", "sales_records", "inventory_adjustments",
+        "processing_records", "processing_recipes", "processing_recipe_items", "processing_runs",
+        "expenditures", "attendance_records", "other_incomes", "inventory_sales_totals")}
+    for i, c in enumerate(crops):
+        out["farm_crops"].append({"id": _uid(rng), "farm_id": farm_id, "crop_name": c, "sort_order": i,
+                                  "is_active": rng.random() > 0.1, "default_unit": "kg",
+                                  "category": "processed" if c in PROCESSED else "crop", "is_temporary": False})
+    partners = [{"id": _uid(rng), "farm_id": farm_id, "company_name": f"거래처{i}", "settlement_type": "월말"}
+                for i in range(rng.randint(3, 20))]
+    customers = [{"id": _uid(rng), "farm_id": farm_id, "name": f"고객{i}", "address": f"서울시 {i}번길"}
+                 for i in range(max(5, n_sales // 20))]
+    out["partners"], out["customers"] = partners, customers
+
+    for _ in range(n_sales):
+        d = day()
+        c = rng.choice(crops)
+        b2b = rng.random() < 0.4
+        settled = rng.random() < 0.7
+        price = rng.randrange(0, 200) * 1000
+        sale = {"id": _uid(rng), "farm_id": farm_id, "crop_name": c, "quantity": rng.randint(1, 30),
+                "grade": rng.choice(["특", "상", "중", None]), "recorded_at": _ts(d, rng), "price": price,
+                "sale_type": "b2b" if b2b else "b2c", "is_settled": settled,
+                "settled_amount": price if settled else 0,
+                "settled_at": (d + timedelta(days=rng.randrange(30))).isoformat() if settled else None,
+                "delivery_method": "direct" if b2b else "courier",
+                "partner_id": rng.choice(partners)["id"] if b2b else None,
+                "customer_id": None if b2b else rng.choice(customers)["id"],
+                "shipping_cost": 0 if b2b else 4000, "packaging_cost": 0 if b2b else 1000}
+        out["sales_records"].append(sale)
+    for _ in range(n_sales):
+        out["harvest_records"].append({"id": _uid(rng), "farm_id": farm_id, "house_number": rng.randint(1, 8),
+                                       "crop_name": rng.choice(crops), "grade": rng.choice(["sang", "jung", "ha"]),
+                                       "quantity": rng.randint(1, 50), "recorded_at": _ts(day(), rng)})
+
+    for _ in range(max(1, n_sales // 50)):
+        out_crop = rng.choice(crops)
+        recipe = {"id": _uid(rng), "farm_id": farm_id, "recipe_name": f"{out_crop} 가공", "output_crop_name": out_crop,
+                  "output_unit": "개", "is_active": True, "created_at": _ts(start, rng)}
+        out["processing_recipes"].append(recipe)
+        out["processing_recipe_items"].append({"id": _uid(rng), "recipe_id": recipe["id"],
+                                               "input_crop_name": rng.choice(crops), "input_unit": "kg",
+                                               "input_per_output": 0.5, "created_at": recipe["created_at"]})
+        d = day()
+        record = {"id": _uid(rng), "farm_id": farm_id, "processed_date": d.isoformat(), "output_crop_name": out_crop,
+                  "output_quantity": rng.randint(1, 40), "output_unit": "개",
+                  "inputs": [{"crop_name": crops[0], "quantity": 5, "unit": "kg"}], "is_cancelled": False}
+        out["processing_records"].append(record)
+        out["processing_runs"].append({"id": _uid(rng), "farm_id": farm_id, "recipe_id": recipe["id"],
+                                       "run_date": day().isoformat(), "input_qty": 10, "input_unit": "kg",
+                                       "expected_output_qty": 20, "actual_output_qty": 19,
+                                       "output_crop_name": out_crop, "output_unit": "개",
+                                       "created_at": _ts(d, rng)})
+    for _ in range(max(1, n_sales // 4)):
+        qty = rng.randint(-20, 20) or 1
+        kind = rng.choice(["correction", "correction", "initial", "sale"])
+        out["inventory_adjustments"].append({"id": _uid(rng), "farm_id": farm_id, "crop_name": rng.choice(crops),
+                                             "adjustment_type": kind,
+                                             "quantity": qty, "reason": "재고 실사", "adjusted_at": _ts(day(), rng),
+                                             "grade": rng.choice(["특", "상", None])})
+    for _ in range(max(1, n_sales // 4)):
+        main, cat = rng.choice(EXPENSE_CATS)
+        out["expenditures"].append({"id": _uid(rng), "farm_id": farm_id, "main_category": main, "category": cat,
+                                    "amount": rng.randrange(1, 500) * 1000, "expense_date": day().isoformat(),
+                                    "payment_method": "카드"})
+        out["attendance_records"].append({"id": _uid(rng), "farm_id": farm_id, "work_date": day().isoformat(),
+                                          "worker_name": f"작업자{rng.randrange(10)}", "role": "family",
+                                          "is_present": rng.random() > 0.1, "daily_wage": 100000,
+                                          "headcount": rng.randint(1, 3)})
+    for _ in range(max(1, n_sales // 20)):
+        out["other_incomes"].append({"id": _uid(rng), "farm_id": farm_id, "amount": rng.randrange(1, 100) * 10000,
+                                     "income_type": "보조금", "income_date": day().isoformat()})
+    totals: dict[str, float] = {}
+    for s in out["sales_records"]:
+        totals[s["crop_name"]] = totals.get(s["crop_name"], 0) + s["quantity"]
+    out["inventory_sales_totals"] = [{"farm_id": farm_id, "crop_name": c, "total_qty": q, "row_count": 1,
+                                      "updated_at": _ts(start, rng)} for c, q in totals.items()]
+    return out
+
+
+# 부모부터 넣는다 (Postgres 의 FK)
+INSERT_ORDER = ["farm_crops", "partners", "customers", "processing_recipes", "processing_recipe_items",
+                "processing_records", "processing_runs", "harvest_records", "sales_records", "inventory_adjustments",
+                "expenditures", "attendance_records", "other_incomes", "inventory_sales_totals"]
+
+
+def seed(db: LocalDB, farms: int, rows: int, seed_value: int = 1, start: date = date(2025, 10, 1),
+         days: int = 180, log=None) -> SeedReport:
+    """합성 농장을 넣는다. 농장 크기는 rows 를 중심으로 치우치게(긴 꼬리) 나눈다."""
+    rng = random.Random(seed_value)
+    report = SeedReport()
+    t0 = time.perf_counter()
+    columns: dict[str, list[str]] = {}
+    for i in range(farms):
+        owner = _uid(rng)
+        farm_id = _uid(rng)
+        n_sales = max(10, int(rows * rng.paretovariate(2.0) / 2))
+        if db.dialect == "postgres":
+            db.execute("INSERT INTO auth.users (id, email) VALUES (:id, :email)",
+                       {"id": owner, "email": f"bench{i}@example.com"}).close()
+            db.insert_many("profiles", [{"id": owner, "role": "owner", "full_name": f"농장주{i}"}])
+        db.insert_many("farms", [{"id": farm_id, "owner_id": owner, "farm_name": f"벤치농장{i}", "is_active": True,
+                                  "inventory_enabled": True, "inventory_warn_only": True}])
+        data = farm_rows(rng, farm_id, n_sales, start, days)
+        for table in INSERT_ORDER:
+            if not data[table]:
+                continue
+            # Postgres 에서는 판매 트리거(inventory_sales_total_sync)가 합계를 채운다
+            if table == "inventory_sales_totals" and db.dialect == "postgres":
+                continue
+            if table not in columns:
+                columns[table] = ensure_columns(db, table, data[table], report)
+            report.rows[table] = report.rows.get(table, 0) + db.insert_many(table, data[table], columns[table])
+        report.farms.append((farm_id, n_sales))
+        if log and (i + 1) % 10 == 0:
+            log(f"  시드 {i + 1}/{farms} 농장")
+    db.execute("ANALYZE").close()
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+# --- 측정 -------------------------------------------------------------------
+
+
+def percentile(sorted_ms: Sequence[float], p: float) -> float:
+    """가장 가까운 순위 방식."""
+    if not sorted_ms:
+        return 0.0
+    k = max(0, min(len(sorted_ms) - 1, int(round(p / 100 * len(sorted_ms) + 0.5)) - 1))
+    return sorted_ms[k]
+
+
+@dataclass
+class Timing:
+    name: str
+    samples_ms: list[float] = field(default_factory=list)
+    rows: int = 0
+
+    def summary(self) -> dict:
+        s = sorted(self.samples_ms)
+        n = len(s) or 1
+        return {"name": self.name, "n": len(s), "p50_ms": round(percentile(s, 50), 3),
+                "p99_ms": round(percentile(s, 99), 3), "max_ms": round(s[-1] if s else 0.0, 3),
+                "avg_rows": round(self.rows / n, 1)}
+
+
+def month_params(month: str) -> dict:
+    """finance 화면이 만드는 기간 문자열 (startStr/endStr, cashStartDate/cashEndDate)."""
+    y, m = map(int, month.split("-"))
+    last = ((date(y + (m == 12), m % 12 + 1, 1)) - timedelta(days=1)).day
+    return {"start_ts": f"{month}-01T00:00:00", "end_ts": f"{month}-{last}T23:59:59",
+            "start_date": f"{month}-01", "end_date": f"{month}-{last}", "yes": True, "no": False}
+
+
+def _run(db: LocalDB, shape: QueryShape, params: dict) -> tuple[float, int]:
+    t0 = time.perf_counter()
+    n = len(db.query(shape.sql, params))
+    return (time.perf_counter() - t0) * 1000, n
+
+
+def bench_shapes(db: LocalDB, farm_ids: Sequence[str], iterations: int, base: dict) -> list[Timing]:
+    """쿼리마다 따로, 차례로 잰다. 농장은 돌아가며 고른다."""
+    out = []
+    for shape in QUERY_SHAPES.values():
+        t = Timing(shape.name)
+        _run(db, shape, {**base, "farm_id": farm_ids[0]})  # 캐시 데우기
+        for i in range(iterations):
+            ms, n = _run(db, shape, {**base, "farm_id": farm_ids[i % len(farm_ids)]})
+            t.samples_ms.append(ms)
+            t.rows += n
+        out.append(t)
+    return out
+
+
+def bench_groups(db: LocalDB, farm_ids: Sequence[str], iterations: int, base: dict) -> list[Timing]:
+    """그룹마다 화면이 기다리는 시간을 잰다. 단계 안의 구성원은 각자 연결로 동시에 보낸다."""
+    width = max(len(phase) for phases in GROUPS.values() for phase in phases)
+    conns = [db.reopen() for _ in range(width)]
+    out = []
+    try:
+        with ThreadPoolExecutor(max_workers=width) as pool:
+            for name, phases in GROUPS.items():
+                t = Timing(name)
+                for i in range(iterations + 1):
+                    params = {**base, "farm_id": farm_ids[i % len(farm_ids)]}
+                    t0 = time.perf_counter()
+                    n = 0
+                    for phase in phases:
+                        futures = [pool.submit(_chain, conns[j], member, params) for j, member in enumerate(phase)]
+                        n += sum(f.result() for f in futures)
+                    if i:  # 첫 회는 데우기
+                        t.samples_ms.append((time.perf_counter() - t0) * 1000)
+                        t.rows += n
+                out.append(t)
+    finally:
+        for c in conns:
+            c.close()
+    return out
+
+
+def _chain(db: LocalDB, member: list[str], params: dict) -> int:
+    return sum(len(db.query(QUERY_SHAPES[q].sql, params)) for q in member)
+
+
+def explain_all(db: LocalDB, farm_id: str, base: dict) -> dict[str, list[str]]:
+    return {name: db.explain(shape.sql, {**base, "farm_id": farm_id}) for name, shape in QUERY_SHAPES.items()}
+
+
+def report_lines(result: dict) -> list[str]:
+    lines = [f"대상: {result['db']}  ({result['dialect']})"]
+    r = result["replay"]
+    lines.append(f"스키마 재현: 적용 {r['applied']}, 이미 있음 {r['existing']}, 건너뜀 {r['skipped']}, "
+                 f"실패 {len(r['failed'])}")
+    for f in r["failed"]:
+        lines.append(f"  실패 {f[0]}: {f[1]} — {f[2]}")
+    s = result["seed"]
+    if s:
+        lines.append(f"시드: 농장 {s['farms']}개, {sum(s['rows'].values()):,}행, {s['seconds']:.1f}초")
+        for table, col in s["drift"]:
+            lines.append(f"  스키마 드리프트: {table}.{col} — 앱이 쓰지만 마이그레이션에 없어 추가함")
+    lines.append(f"측정: 농장 {result['bench_farms']}개 순환, 반복 {result['iterations']}회, 기준 월 {result['month']}")
+    lines.append("")
+    header = f"{'쿼리':<32}{'p50 ms':>10}{'p99 ms':>10}{'최대 ms':>10}{'평균 행':>10}"
+    for title, key in (("쿼리별 (차례로)", "shapes"), ("화면별 (Promise.all 벽시계)", "groups")):
+        lines.append(f"== {title}")
+        lines.append(header)
+        for t in result[key]:
+            lines.append(f"{t['name']:<32}{t['p50_ms']:>10.3f}{t['p99_ms']:>10.3f}{t['max_ms']:>10.3f}"
+                         f"{t['avg_rows']:>10.1f}")
+        lines.append("")
+    lines.append(f"== EXPLAIN (가장 큰 농장 {result['explain_farm']})")
+    for name, plan in result["explain"].items():
+        lines.append(f"-- {name}  [{QUERY_SHAPES[name].source}]")
+        lines.extend(f"   {p}" for p in plan)
+    return lines
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="로컬 DB 대역에 시드하고 페이지 쿼리 모양을 잰다")
+    ap.add_argument("--db", default=f"sqlite:///{DEFAULT_SQLITE}", help="sqlite:///파일 | postgresql://...")
+    ap.add_argument("--farms", type=int, default=20, help="합성 농장 수")
+    ap.add_argument("--rows", type=int, default=2000, help="농장당 판매 행 수의 기준 (다른 테이블은 비례)")
+    ap.add_argument("--iterations", type=int, default=100, help="쿼리/그룹마다 반복 횟수")
+    ap.add_argument("--seed", type=int, default=1, help="난수 씨앗")
+    ap.add_argument("--month", default="2026-01", help="finance 쿼리의 기준 월 (YYYY-MM)")
+    ap.add_argument("--no-seed", action="store_true", help="이미 시드된 DB 를 그대로 잰다")
+    ap.add_argument("--json", help="결과를 JSON 으로 저장")
+    args = ap.parse_args(argv)
+
+    if args.db.startswith("sqlite:///") and not args.no_seed:
+        Path(args.db[len("sqlite:///"):]).unlink(missing_ok=True)
+    try:
+        db = LocalDB.open(args.db)
+    except LocalDBError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    log = lambda m: print(m, file=sys.stderr)  # noqa: E731
+    rep = replay(db, schema_files())
+    seeded = None
+    if not args.no_seed:
+        seeded = seed(db, args.farms, args.rows, args.seed, log=log)
+        farms = seeded.farms
+    else:
+        farms = [(r[0], r[1]) for r in db.query(
+            "SELECT farm_id, count(*) FROM sales_records GROUP BY farm_id ORDER BY count(*) DESC")]
+    if not farms:
+        print("오류: 측정할 농장이 없습니다 (--no-seed 인데 DB 가 비어 있음).", file=sys.stderr)
+        return 1
+    farm_ids = [f for f, _ in farms]
+    biggest = max(farms, key=lambda f: f[1])[0]
+    base = month_params(args.month)
+
+    result = {
+        "db": args.db, "dialect": db.dialect, "iterations": args.iterations, "month": args.month,
+        "bench_farms": len(farm_ids), "explain_farm": biggest,
+        "replay": {"applied": rep.applied, "existing": rep.existing, "skipped": rep.skipped, "failed": rep.failed},
+        "seed": seeded and {"farms": len(seeded.farms), "rows": seeded.rows, "drift": seeded.drift,
+                            "seconds": seeded.seconds},
+        "shapes": [t.summary() for t in bench_shapes(db, farm_ids, args.iterations, base)],
+        "groups": [t.summary() for t in bench_groups(db, farm_ids, args.iterations, base)],
+        "explain": explain_all(db, biggest, base),
+    }
+    db.close()
+    print("\n".join(report_lines(result)))
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
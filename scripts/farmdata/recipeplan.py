@@ -0,0 +1,370 @@
+"""가공 레시피(BOM) 계획기 — processing_recipes / processing_recipe_items 와 재고 스냅샷.
+
+가공 생산 확정 화면(app/processing/runs/page.tsx)은 레시피를 고를 때마다 그 레시피의 구성을
+따로 읽고, 처음 들어갈 때와 생산을 확정할 때마다 fetchStockMap(전체 이력 합산)을 다시 부른다.
+그리고 첫 번째 구성(primaryItem)의 재고만 보고 "재고 기준 최대 생산 가능"을 보여 준다.
+이 계획기는 모든 농장의 활성 레시피를 한 번 읽어 구성 행을 (레시피, 농장·품목, 단위당 소요량)
+열 배열로 두고, 한 재고 스냅샷에 대해 모든 레시피의 생산 가능량을 한 번에 계산한다.
+
+- direct     구성 전체를 지금 재고로 충당할 때 만들 수 있는 양 (min 재고 / input_per_output)
+- from_raw   구성 품목이 같은 농장의 다른 레시피 산출물(가공품)이면 그 레시피로 풀어 원물까지
+             내려간 소요량으로 계산한 양. 품목마다 전개 결과를 기억해 두어 공통 중간재는 한 번만 푼다.
+- first_item 화면과 같은 값 (첫 구성만 확인)
+
+같은 품목을 내는 활성 레시피가 여럿이면 화면 목록 순서(created_at 내림차순)의 첫 레시피로 전개한다.
+구성 단위가 산출 레시피의 output_unit 과 다르거나 순환이 있으면 그 품목은 원물로 취급하고 경고한다.
+재고가 음수인 품목은 0 으로 본다.
+
+--plans 는 가상 생산 계획 묶음(NDJSON 한 줄에 계획 하나)을 같은 스냅샷으로 한꺼번에 평가한다.
+
+    {"plan": "3월 1주", "runs": [{"recipe_id": "...", "qty": 40}, {"farm_id": "...", "recipe_name": "딸기잼", "qty": 10}]}
+
+계획의 소요량은 순수요 기준이다 (계획 안의 다른 생산이 내는 산출물도 투입으로 쓸 수 있고, 실행 순서는 보지 않는다).
+--expand 를 주면 가공품 투입을 재고 대신 원물로 풀어 계산한다.
+
+    python -m farmdata.recipeplan exports/2026-03-10 --snapshot .farmdata/stock_snapshot.json
+    python -m farmdata.recipeplan exports/2026-03-10 --farm <farm_id> --out capacity.ndjson
+    python -m farmdata.recipeplan exports/2026-03-10 --plans plans.ndjson [--expand]
+
+재고: --snapshot 을 주면 farmdata.snapshot 의 스냅샷을, 없으면 내보내기 전체로 StockLedger 를 계산한다.
+(scripts/ 에서 실행하거나 PYTHONPATH=scripts 로 실행, numpy 필요)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .export import ExportError, Factor, iter_rows, load_table
+from .js import js_number, js_stringify
+from .ledger import StockLedger
+from .snapshot import StockSnapshot
+
+RECIPE_TABLES = ("processing_recipes", "processing_recipe_items")
+EPSILON = 1e-9
+
+
+class RecipePlanError(Exception):
+    """레시피나 계획 파일을 해석할 수 없을 때."""
+
+
+@dataclass
+class Recipe:
+    id: str
+    farm_id: str
+    name: str
+    output_crop: str
+    output_unit: str
+    created_at: str
+    items: list[tuple[str, str, float]] = field(default_factory=list)  # (품목, 단위, input_per_output)
+    invalid: str | None = None  # 구성을 해석할 수 없는 이유 (이런 레시피는 구성 없이 생산 가능 0)
+
+
+def _is_active(v) -> bool:
+    # 열이 없거나 null 이면 기본값 true
+    return v is None or v is True or str(v).lower() in ("true", "t", "1")
+
+
+def load_recipes(export_dir: str | Path, farms: Sequence[str] | None = None) -> list[Recipe]:
+    """활성 레시피 (농장별 created_at 내림차순, 화면의 목록 순서). 구성은 created_at 오름차순.
+
+    input_per_output 이 양수가 아닌 구성이 있는 레시피는 invalid 로 표시하고 구성을 비운다
+    (화면도 이 경우 생산 가능량을 0 으로 본다).
+    """
+    wanted = set(farms) if farms else None
+    recipes: dict[str, Recipe] = {}
+    for r in load_table(export_dir, "processing_recipes"):
+        if not _is_active(r.get("is_active")) or (wanted is not None and r.get("farm_id") not in wanted):
+            continue
+        recipes[str(r["id"])] = Recipe(str(r["id"]), str(r["farm_id"]), r.get("recipe_name") or "",
+                                       r.get("output_crop_name") or "", r.get("output_unit") or "kg",
+                                       r.get("created_at") or "")
+    items = [i for i in load_table(export_dir, "processing_recipe_items") if str(i.get("recipe_id")) in recipes]
+    items.sort(key=lambda i: i.get("created_at") or "")
+    for i in items:
+        recipe = recipes[str(i["recipe_id"])]
+        per = js_number(i.get("input_per_output"))
+        if not math.isfinite(per) or per <= 0:
+            recipe.invalid = recipe.invalid or \
+                f"구성 {i.get('id')} 의 input_per_output 이 양수가 아님 ({i.get('input_per_output')!r})"
+            continue
+        recipe.items.append((i.get("input_crop_name") or "", i.get("input_unit") or "kg", per))
+    out = list(recipes.values())
+    for r in out:
+        if r.invalid:
+            r.items.clear()
+    # 안정 정렬 두 번: 농장 묶음 안에서 created_at 내림차순
+    out.sort(key=lambda r: r.created_at, reverse=True)
+    out.sort(key=lambda r: r.farm_id)
+    return out
+
+
+class RecipeBook:
+    """레시피 구성을 COO 열 배열로 둔 것.
+
+    keys      (농장, 품목) → 정수 코드
+    direct_*  구성 행 그대로 (recipe, key, per)
+    raw_*     가공품 투입을 원물까지 푼 행 (recipe, key, per)
+    """
+
+    def __init__(self, recipes: Sequence[Recipe]):
+        self.recipes = list(recipes)
+        self.index = {r.id: n for n, r in enumerate(self.recipes)}
+        self.by_name = {(r.farm_id, r.name): n for n, r in reversed(list(enumerate(self.recipes)))}
+        self.keys = Factor()
+        self.warnings: list[str] = []
+        # 품목을 내는 레시피: 목록 순서의 첫 레시피 (구성을 해석할 수 없는 레시피는 빼고)
+        self.producer: dict[tuple[str, str], int] = {}
+        for n, r in enumerate(self.recipes):
+            if r.invalid:
+                self.warnings.append(f"레시피 {r.id} ({r.name}): {r.invalid} — 건너뜀 (생산 가능 0)")
+            else:
+                self.producer.setdefault((r.farm_id, r.output_crop), n)
+            self.keys.code((r.farm_id, r.output_crop))
+
+        d_recipe, d_key, d_per = [], [], []
+        for n, r in enumerate(self.recipes):
+            for crop, _, per in r.items:
+                d_recipe.append(n)
+                d_key.append(self.keys.code((r.farm_id, crop)))
+                d_per.append(per)
+        self.direct_recipe = np.asarray(d_recipe, dtype=np.int64)
+        self.direct_key = np.asarray(d_key, dtype=np.int64)
+        self.direct_per = np.asarray(d_per, dtype=np.float64)
+        self.output_key = np.asarray([self.keys.code((r.farm_id, r.output_crop)) for r in self.recipes], dtype=np.int64)
+
+        self._memo: dict[int, dict[int, float]] = {}
+        self._cuts = 0  # 순환으로 끊은 횟수 (끊긴 전개는 경로에 따라 달라 기억하지 않는다)
+        e_recipe, e_key, e_per = [], [], []
+        for n in range(len(self.recipes)):
+            for k, per in self.expand(n).items():
+                e_recipe.append(n)
+                e_key.append(k)
+                e_per.append(per)
+        self.raw_recipe = np.asarray(e_recipe, dtype=np.int64)
+        self.raw_key = np.asarray(e_key, dtype=np.int64)
+        self.raw_per = np.asarray(e_per, dtype=np.float64)
+
+    @classmethod
+    def from_export(cls, export_dir: str | Path, farms: Sequence[str] | None = None) -> "RecipeBook":
+        return cls(load_recipes(export_dir, farms))
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def expand(self, n: int, _path: tuple[int, ...] = ()) -> dict[int, float]:
+        """레시피 n 의 산출 1단위에 드는 원물 {key: 수량}. 레시피마다 한 번만 계산한다."""
+        done = self._memo.get(n)
+        if done is not None:
+            return done
+        r = self.recipes[n]
+        cuts = self._cuts
+        out: dict[int, float] = {}
+        for crop, unit, per in r.items:
+            key = self.keys.code((r.farm_id, crop))
+            sub = self.producer.get((r.farm_id, crop))
+            if sub is not None and sub != n and sub not in _path:
+                made = self.recipes[sub]
+                if made.output_unit == unit:
+                    for k, q in self.expand(sub, _path + (n,)).items():
+                        out[k] = out.get(k, 0.0) + per * q
+                    continue
+                self.warnings.append(f"{r.name}: {crop} 단위 {unit} 이 레시피 '{made.name}' 산출 단위 "
+                                     f"{made.output_unit} 와 달라 원물로 취급")
+            elif sub is not None:
+                self._cuts += 1
+                self.warnings.append(f"{r.name}: {crop} 전개가 순환하여 원물로 취급")
+            out[key] = out.get(key, 0.0) + per
+        if not _path or self._cuts == cuts:
+            self._memo[n] = out
+        return out
+
+    def find(self, run: dict) -> int:
+        """계획 행의 recipe_id, 또는 (farm_id, recipe_name) 으로 레시피 번호."""
+        if run.get("recipe_id") is not None:
+            n = self.index.get(str(run["recipe_id"]))
+        else:
+            n = self.by_name.get((str(run.get("farm_id")), run.get("recipe_name")))
+        if n is None:
+            raise RecipePlanError(f"활성 레시피를 찾을 수 없음: {json.dumps(run, ensure_ascii=False)}")
+        return n
+
+    def stock_vector(self, stock_maps: dict[str, dict[str, float]]) -> np.ndarray:
+        """keys 순서의 재고 (없으면 0, 음수는 0)."""
+        out = np.zeros(len(self.keys), dtype=np.float64)
+        for k, (farm, crop) in enumerate(self.keys.values):
+            v = stock_maps.get(farm, {}).get(crop, 0.0)
+            out[k] = v if v > 0 else 0.0
+        return out
+
+    # --- 생산 가능량 -------------------------------------------------------
+
+    def _capacity(self, recipe: np.ndarray, key: np.ndarray, per: np.ndarray,
+                  stock: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """레시피별 min(재고 / 소요량) 과 그 병목 key (구성이 없으면 0, -1)."""
+        ratio = stock[key] / per
+        cap = np.full(len(self.recipes), np.inf)
+        np.minimum.at(cap, recipe, ratio)
+        bottleneck = np.full(len(self.recipes), -1, dtype=np.int64)
+        if len(ratio):
+            # 레시피 안에서 비율 오름차순 → 레시피마다 첫 행이 병목
+            order = np.lexsort((ratio, recipe))
+            first = np.r_[True, recipe[order][1:] != recipe[order][:-1]]
+            bottleneck[recipe[order][first]] = key[order][first]
+        cap[np.isinf(cap)] = 0.0
+        return cap, bottleneck
+
+    def capacity(self, stock: np.ndarray) -> dict[str, np.ndarray]:
+        direct, direct_b = self._capacity(self.direct_recipe, self.direct_key, self.direct_per, stock)
+        raw, raw_b = self._capacity(self.raw_recipe, self.raw_key, self.raw_per, stock)
+        # 화면: 레시피의 첫 구성 행만
+        first = np.r_[True, self.direct_recipe[1:] != self.direct_recipe[:-1]] if len(self.direct_recipe) else \
+            np.zeros(0, dtype=bool)
+        first_item = np.zeros(len(self.recipes))
+        idx = self.direct_recipe[first]
+        first_item[idx] = stock[self.direct_key[first]] / self.direct_per[first]
+        return {"direct": direct, "direct_bottleneck": direct_b, "from_raw": raw, "raw_bottleneck": raw_b,
+                "first_item": first_item}
+
+    # --- 가상 계획 ---------------------------------------------------------
+
+    def evaluate(self, plans: Sequence[dict], stock: np.ndarray, expand: bool = False) -> list[dict]:
+        """계획마다 (순수요, 부족량). 모든 계획을 한 (계획 × 관련 품목) 행렬로 계산한다.
+
+        구성을 해석할 수 없는 레시피를 쓰는 생산은 계산에서 빼고 그 계획을 불가능으로 표시한다.
+        """
+        run_plan, run_recipe, run_qty = [], [], []
+        invalid: list[list[str]] = [[] for _ in plans]
+        for p, plan in enumerate(plans):
+            for run in plan.get("runs") or ():
+                qty = js_number(run.get("qty"))
+                if not math.isfinite(qty) or qty <= 0:
+                    raise RecipePlanError(f"계획 {plan.get('plan', p)}: qty 가 양수가 아닙니다 ({run.get('qty')!r})")
+                n = self.find(run)
+                if self.recipes[n].invalid:
+                    invalid[p].append(self.recipes[n].id)
+                    continue
+                run_plan.append(p)
+                run_recipe.append(n)
+                run_qty.append(qty)
+        run_plan_a = np.asarray(run_plan, dtype=np.int64)
+        run_recipe_a = np.asarray(run_recipe, dtype=np.int64)
+        run_qty_a = np.asarray(run_qty, dtype=np.float64)
+
+        recipe, key, per = (self.raw_recipe, self.raw_key, self.raw_per) if expand else \
+            (self.direct_recipe, self.direct_key, self.direct_per)
+        # 레시피별 구성 구간 (recipe 는 오름차순으로 쌓여 있다)
+        starts = np.searchsorted(recipe, np.arange(len(self.recipes) + 1))
+        counts = np.diff(starts)[run_recipe_a]
+        item = np.repeat(starts[run_recipe_a], counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+        use_plan = np.repeat(run_plan_a, counts)
+        use_key = key[item]
+        use_qty = np.repeat(run_qty_a, counts) * per[item]
+
+        touched, cols = np.unique(np.r_[use_key, self.output_key[run_recipe_a]], return_inverse=True)
+        cols = cols.ravel()
+        need = np.zeros((len(plans), len(touched)))
+        np.add.at(need, (use_plan, cols[:len(use_key)]), use_qty)
+        # 계획 안에서 만든 산출물은 다른 생산의 투입으로 쓸 수 있다
+        np.subtract.at(need, (run_plan_a, cols[len(use_key):]), run_qty_a)
+        have = stock[touched]
+        short = np.maximum(need - have, 0.0)
+        short[short <= EPSILON * np.maximum(1.0, have)] = 0.0
+
+        out = []
+        for p, plan in enumerate(plans):
+            uses = np.flatnonzero(need[p] > 0)
+            missing = np.flatnonzero(short[p] > 0)
+            entry = {
+                "plan": plan.get("plan", p),
+                "feasible": not len(missing) and not invalid[p],
+                "shortfall": [self._entry(touched[c], need[p, c], have[c], short[p, c]) for c in missing],
+                "uses": [self._entry(touched[c], need[p, c], have[c]) for c in uses],
+            }
+            if invalid[p]:
+                entry["invalid_recipes"] = invalid[p]
+            out.append(entry)
+        return out
+
+    def _entry(self, key: int, need: float, stock: float, short: float | None = None) -> dict:
+        farm, crop = self.keys.values[int(key)]
+        e = {"farm_id": farm, "crop_name": crop, "need": round(float(need), 6), "stock": round(float(stock), 6)}
+        if short is not None:
+            e["short"] = round(float(short), 6)
+        return e
+
+
+def stock_maps(export_dir: str | Path, snapshot: str | Path | None) -> dict[str, dict[str, float]]:
+    if snapshot:
+        snap = StockSnapshot(snapshot)
+        if snap.empty:
+            raise RecipePlanError(f"{snapshot}: 스냅샷이 없거나 버전이 다릅니다 (python -m farmdata.snapshot update 먼저).")
+        return {farm: snap.stock_map(farm) for farm in snap.farms}
+    return StockLedger.from_export(export_dir).stock_maps()
+
+
+def capacity_lines(book: RecipeBook, stock: np.ndarray) -> Iterable[str]:
+    """레시피마다 {"farm_id", "recipe_id", ..., "direct", "from_raw", "first_item"} 한 줄."""
+    cap = book.capacity(stock)
+
+    def crop(k: int):
+        return book.keys.values[k][1] if k >= 0 else None
+
+    for n, r in enumerate(book.recipes):
+        yield js_stringify({
+            "farm_id": r.farm_id, "recipe_id": r.id, "recipe_name": r.name,
+            "output_crop_name": r.output_crop, "output_unit": r.output_unit,
+            "direct": float(cap["direct"][n]), "bottleneck": crop(int(cap["direct_bottleneck"][n])),
+            "from_raw": float(cap["from_raw"][n]), "raw_bottleneck": crop(int(cap["raw_bottleneck"][n])),
+            "first_item": float(cap["first_item"][n]),
+        })
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="가공 레시피별 생산 가능량과 가상 생산 계획 평가")
+    ap.add_argument("export_dir", help=f"{' / '.join(RECIPE_TABLES)} 내보내기 디렉터리 (--snapshot 이 없으면 재고 원장도)")
+    ap.add_argument("--snapshot", default=None, help="farmdata.snapshot 재고 스냅샷 파일")
+    ap.add_argument("--farm", action="append", default=None, help="대상 농장 id (기본: 전체)")
+    ap.add_argument("--plans", default=None, help="가상 생산 계획 NDJSON (한 줄에 계획 하나)")
+    ap.add_argument("--expand", action="store_true", help="계획의 가공품 투입을 원물까지 풀어 계산")
+    ap.add_argument("--out", default=None, help="NDJSON 출력 파일 (기본: 표준 출력)")
+    args = ap.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        book = RecipeBook.from_export(args.export_dir, args.farm)
+        stock = book.stock_vector(stock_maps(args.export_dir, args.snapshot))
+        loaded = time.perf_counter()
+        if args.plans:
+            plans = list(iter_rows(args.plans))
+            results = book.evaluate(plans, stock, expand=args.expand)
+            lines = [json.dumps(r, ensure_ascii=False) for r in results]
+            summary = f"계획 {len(plans)}개, 가능 {sum(r['feasible'] for r in results)}"
+        else:
+            lines = list(capacity_lines(book, stock))
+            summary = f"레시피 {len(book)}개"
+    except (ExportError, RecipePlanError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    finished = time.perf_counter()
+
+    if args.out:
+        Path(args.out).write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    else:
+        for line in lines:
+            print(line)
+    for w in dict.fromkeys(book.warnings):
+        print(f"경고: {w}", file=sys.stderr)
+    print(f"{summary} (읽기 {loaded - started:.2f}초, 계산 {finished - loaded:.3f}초)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""KST 시간 버킷 롤업 큐브 — 결산·판매 화면용 미리 합산한 합계.
+
+결산(finance), B2B 정산(settled), 택배 정산(b2c-settled), 판매(sales) 화면은 들어올 때마다
+sales_records / expenditures 원본을 다시 읽어 toKSTDateString 으로 날짜를 잘라 합산한다.
+이 큐브는 그 합계를 (농장, 기준, 단위, KST 버킷, 품목, 등급, 채널, 정산 여부) 칸으로 저장해 두고,
+화면의 질의는 칸을 찾아 더하는 것으로 끝낸다.
+
+칸 (sales)
+    basis    recorded: recorded_at 의 KST 날짜, settled: settled_at 의 KST 날짜 (없으면 이 기준에는 안 들어간다)
+    grain    day (YYYY-MM-DD), week (ISO 주, 월요일 시작: YYYY-Www), month (YYYY-MM)
+    channel  b2c: sale_type = b2c 또는 courier, b2b: 그 밖에 sale_type = b2b 또는 partner_id, other
+    settled  is_settled === true
+    값        count, quantity, amount (calculateRecordTotal: 정산되었고 settled_amount > 0 이면 그 값, 아니면 price || 0)
+칸 (expenditures)
+    grain / bucket (expense_date), main_category, kind (wage / meal / wage+meal / farming / household — 결산 분류)
+    값        count, amount
+
+KST 날짜는 lib/utils.ts toKSTDateString 과 같다: 시각 + 9시간의 UTC 날짜.
+날짜만 있는 값('YYYY-MM-DD')은 UTC 자정이라 그 날짜 그대로다. 시간대 없는 시각은 UTC 로 본다 (export.parse_timestamp).
+
+증분 갱신: 행마다 칸에 더한 내용(서명)을 id 로 저장해 둔다. 새 행은 더하고, 서명이 바뀐 행(수정)은 옛 칸에서
+빼고 새 칸에 더한다. 바뀐 행이 닿는 칸만 건드린다. 전체 내보내기로 갱신하면 사라진 id 는 삭제로 보고 뺀다.
+--delta (바뀐 행만 담은 내보내기)는 삭제를 알 수 없으므로 verify 로 주기적으로 확인한다.
+
+    python -m farmdata.rollup update exports/2026-03-10             # 없으면 새로 만든다
+    python -m farmdata.rollup update exports/delta-0311 --delta
+    python -m farmdata.rollup verify exports/2026-03-11 [--repair]  # 처음부터 재계산해 칸마다 비교
+    python -m farmdata.rollup query --farm <farm_id> --grain month --basis settled --by channel,settled
+    python -m farmdata.rollup query --fact expenditures --grain week --from 2026-W10 --to 2026-W12
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable, Sequence
+
+from .export import load_table, parse_timestamp
+from .js import js_number, js_or_zero, js_truthy
+from .settlement import expense_kind
+
+CUBE_VERSION = 1
+DEFAULT_CUBE_PATH = Path(".farmdata/rollup_cube.json")
+DEFAULT_TOLERANCE = 1e-6
+KST = timedelta(hours=9)
+GRAINS = ("day", "week", "month")
+BASES = ("recorded", "settled")
+EXPENSE_KINDS = {0: "farming", 1: "wage", 2: "meal", 3: "wage+meal", 4: "household"}
+
+
+@lru_cache(maxsize=65536)
+def kst_day(value) -> str | None:
+    """toKSTDateString(value). 해석할 수 없으면 None (화면에서는 'NaN-NaN-NaN')."""
+    ts = parse_timestamp(value)
+    if not math.isfinite(ts):
+        return None
+    return (datetime.fromtimestamp(ts, timezone.utc) + KST).date().isoformat()
+
+
+@lru_cache(maxsize=65536)
+def buckets(day: str) -> tuple[str, str, str]:
+    """KST 날짜 → (day, week, month) 버킷."""
+    d = datetime.strptime(day, "%Y-%m-%d").date()
+    year, week, _ = d.isocalendar()
+    return day, f"{year:04d}-W{week:02d}", day[:7]
+
+
+def channel(r: dict) -> str:
+    b2c = r.get("sale_type") == "b2c" or r.get("delivery_method") == "courier"
+    if b2c:
+        return "b2c"
+    if r.get("sale_type") == "b2b" or js_truthy(r.get("partner_id")):
+        return "b2b"
+    return "other"
+
+
+def record_total(r: dict) -> float:
+    """settlementService calculateRecordTotal."""
+    sa = r.get("settled_amount")
+    if r.get("is_settled") and sa is not None and js_number(sa) > 0:
+        return js_number(sa)
+    return js_or_zero(r.get("price"))
+
+
+# --- 행 서명 → 칸 --------------------------------------------------------------
+# 서명은 행이 칸에 더한 내용 전부다. JSON 으로 저장하므로 리스트로 둔다.
+
+
+def sales_signature(r: dict) -> list:
+    return [r.get("farm_id"), kst_day(r.get("recorded_at")), kst_day(r.get("settled_at")),
+            r.get("crop_name") or "", r.get("grade") or "", channel(r), r.get("is_settled") is True,
+            js_number(r.get("quantity")), record_total(r)]
+
+
+def sales_cells(sig: list) -> Iterable[tuple[tuple, list[float]]]:
+    farm, rday, sday, crop, grade, ch, settled, qty, amount = sig
+    for basis, day in (("recorded", rday), ("settled", sday)):
+        if day is None:
+            continue
+        for grain, bucket in zip(GRAINS, buckets(day)):
+            yield (farm, basis, grain, bucket, crop, grade, ch, settled), [1, qty, amount]
+
+
+def expense_signature(e: dict) -> list:
+    wage, meal = expense_kind(e)
+    k = (1 if wage else 0) | (2 if meal else 0)
+    if not k and e.get("main_category") == "가계생활":
+        k = 4
+    return [e.get("farm_id"), kst_day(e.get("expense_date")), e.get("main_category") or "", EXPENSE_KINDS[k],
+            js_or_zero(e.get("amount"))]
+
+
+def expense_cells(sig: list) -> Iterable[tuple[tuple, list[float]]]:
+    farm, day, main, kind, amount = sig
+    if day is None:
+        return
+    for grain, bucket in zip(GRAINS, buckets(day)):
+        yield (farm, grain, bucket, main, kind), [1, amount]
+
+
+class Fact:
+    def __init__(self, table: str, dims: tuple[str, ...], measures: tuple[str, ...],
+                 signature: Callable[[dict], list], cells: Callable[[list], Iterable[tuple[tuple, list[float]]]]):
+        self.table = table
+        self.dims = dims
+        self.measures = measures
+        self.signature = signature
+        self.cells = cells
+
+
+FACTS = {
+    "sales": Fact("sales_records", ("farm_id", "basis", "grain", "bucket", "crop_name", "grade", "channel", "settled"),
+                  ("count", "quantity", "amount"), sales_signature, sales_cells),
+    "expenditures": Fact("expenditures", ("farm_id", "grain", "bucket", "main_category", "kind"),
+                         ("count", "amount"), expense_signature, expense_cells),
+}
+
+
+class RollupCube:
+    """{"facts": {fact: {"cells": [[key..., measures...]], "rows": {id: signature}}}}"""
+
+    def __init__(self, path: str | Path | None = DEFAULT_CUBE_PATH):
+        self.path = Path(path) if path else None
+        self.cells: dict[str, dict[tuple, list[float]]] = {f: {} for f in FACTS}
+        self.rows: dict[str, dict[str, list]] = {f: {} for f in FACTS}
+        self.built_at: str | None = None
+        if self.path and self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == CUBE_VERSION:
+                self.built_at = data.get("saved_at")
+                for name, fact in FACTS.items():
+                    stored = data["facts"].get(name, {})
+                    n = len(fact.dims)
+                    self.cells[name] = {tuple(c[:n]): c[n:] for c in stored.get("cells", [])}
+                    self.rows[name] = stored.get("rows", {})
+
+    @property
+    def empty(self) -> bool:
+        return not any(self.rows.values())
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        facts = {name: {"cells": [list(k) + v for k, v in self.cells[name].items()], "rows": self.rows[name]}
+                 for name in FACTS}
+        data = {"version": CUBE_VERSION, "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "facts": facts}
+        tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    # --- 갱신 ------------------------------------------------------------
+
+    def _apply(self, name: str, sig: list, sign: int, touched: set) -> None:
+        cells = self.cells[name]
+        for key, values in FACTS[name].cells(sig):
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = [0.0] * len(values)
+            for i, v in enumerate(values):
+                cell[i] += sign * v
+            if cell[0] <= 0:  # count 가 0 이면 칸을 지운다 (빼고 남은 부동소수점 찌꺼기 포함)
+                del cells[key]
+            touched.add((name, key))
+
+    def update_fact(self, name: str, rows: Iterable[dict], delta: bool = False) -> dict:
+        """rows 의 새 행·바뀐 행만 칸에 반영한다. delta 가 아니면 rows 에 없는 id 는 삭제로 본다."""
+        fact = FACTS[name]
+        stored = self.rows[name]
+        touched: set = set()
+        seen: set = set()
+        added = changed = 0
+        for r in rows:
+            rid = r.get("id")
+            if rid is None or rid in seen:  # 화면의 seenIds 처럼 처음 행만
+                continue
+            rid = str(rid)
+            seen.add(rid)
+            sig = fact.signature(r)
+            old = stored.get(rid)
+            if old == sig:
+                continue
+            if old is None:
+                added += 1
+            else:
+                changed += 1
+                self._apply(name, old, -1, touched)
+            self._apply(name, sig, 1, touched)
+            stored[rid] = sig
+        removed = 0
+        if not delta:
+            for rid in [i for i in stored if i not in seen]:
+                self._apply(name, stored.pop(rid), -1, touched)
+                removed += 1
+        return {"added": added, "changed": changed, "removed": removed, "touched": len(touched)}
+
+    def update(self, export_dir: str | Path, delta: bool = False) -> dict[str, dict]:
+        return {name: self.update_fact(name, load_table(export_dir, fact.table, required=name == "sales"), delta)
+                for name, fact in FACTS.items()}
+
+    # --- 질의 ------------------------------------------------------------
+
+    def query(self, name: str, where: dict[str, object], by: Sequence[str],
+              bucket_from: str | None = None, bucket_to: str | None = None) -> list[dict]:
+        """where 의 차원 값이 같은 칸을 by 차원별로 더한다. 버킷 범위는 문자열 비교 (같은 grain 안에서 정렬됨)."""
+        fact = FACTS[name]
+        pos = {d: i for i, d in enumerate(fact.dims)}
+        unknown = [d for d in list(where) + list(by) if d not in pos]
+        if unknown:
+            raise ValueError(f"{name} 에 없는 차원: {', '.join(unknown)} (가능: {', '.join(fact.dims)})")
+        b = pos["bucket"]
+        groups: dict[tuple, list[float]] = {}
+        for key, values in self.cells[name].items():
+            if any(key[pos[d]] != v for d, v in where.items()):
+                continue
+            if (bucket_from and key[b] < bucket_from) or (bucket_to and key[b] > bucket_to):
+                continue
+            g = tuple(key[pos[d]] for d in by)
+            acc = groups.get(g)
+            if acc is None:
+                groups[g] = list(values)
+            else:
+                for i, v in enumerate(values):
+                    acc[i] += v
+        return [dict(zip(by, g), **{m: int(x) if m == "count" else x for m, x in zip(fact.measures, v)})
+                for g, v in sorted(groups.items(), key=lambda kv: str(kv[0]))]
+
+    # --- 검증 ------------------------------------------------------------
+
+    def verify(self, export_dir: str | Path, tolerance: float = DEFAULT_TOLERANCE) -> tuple[list[dict], "RollupCube"]:
+        """내보내기로 처음부터 다시 만든 큐브와 칸마다 비교한다. (차이, 재계산 큐브)."""
+        fresh = RollupCube(None)
+        fresh.update(export_dir)
+        drift = []
+        for name, fact in FACTS.items():
+            have, want = self.cells[name], fresh.cells[name]
+            for key in list(want) + [k for k in have if k not in want]:
+                a = have.get(key, [0.0] * len(fact.measures))
+                b = want.get(key, [0.0] * len(fact.measures))
+                if not all(_close(x, y, tolerance) for x, y in zip(a, b)):
+                    drift.append({"fact": name, **dict(zip(fact.dims, key)), "cube": a, "recomputed": b})
+        return drift, fresh
+
+
+def _close(a: float, b: float, tolerance: float) -> bool:
+    return abs(a - b) <= tolerance * max(1.0, abs(a), abs(b))
+
+
+def _where(args: argparse.Namespace) -> dict[str, object]:
+    where: dict[str, object] = {}
+    if args.farm:
+        where["farm_id"] = args.farm
+    where["grain"] = args.grain
+    if args.fact == "sales":
+        where["basis"] = args.basis
+    for item in args.where or ():
+        dim, _, value = item.partition("=")
+        where[dim] = {"true": True, "false": False}.get(value, value)
+    return where
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="KST 시간 버킷 롤업 큐브 (sales_records / expenditures)")
+    ap.add_argument("command", choices=["update", "verify", "query"])
+    ap.add_argument("export_dir", nargs="?", help="내보내기 디렉터리 (update/verify)")
+    ap.add_argument("--cube", default=str(DEFAULT_CUBE_PATH))
+    ap.add_argument("--delta", action="store_true", help="export_dir 이 바뀐 행만 담고 있음 (삭제는 반영 안 됨)")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="verify 허용 상대 오차")
+    ap.add_argument("--repair", action="store_true", help="verify 에서 차이가 있으면 재계산 큐브로 바꿔 저장")
+    ap.add_argument("--fact", choices=list(FACTS), default="sales")
+    ap.add_argument("--farm", default=None, help="query 대상 농장")
+    ap.add_argument("--grain", choices=GRAINS, default="month")
+    ap.add_argument("--basis", choices=BASES, default="recorded", help="sales 날짜 기준")
+    ap.add_argument("--from", dest="bucket_from", default=None, help="버킷 시작 (포함)")
+    ap.add_argument("--to", dest="bucket_to", default=None, help="버킷 끝 (포함)")
+    ap.add_argument("--by", default="bucket", help="묶을 차원 (쉼표 구분)")
+    ap.add_argument("--where", action="append", default=None, help="차원=값 조건 (예: channel=b2c)")
+    args = ap.parse_args(argv)
+
+    cube = RollupCube(args.cube)
+    if args.command == "query":
+        if cube.empty:
+            print(f"{args.cube}: 큐브가 없습니다 (update 먼저).", file=sys.stderr)
+            return 1
+        by = [d.strip() for d in args.by.split(",") if d.strip()]
+        try:
+            rows = cube.query(args.fact, _where(args), by, args.bucket_from, args.bucket_to)
+        except ValueError as e:
+            ap.error(str(e))
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+        return 0
+    if not args.export_dir:
+        ap.error("update/verify 에는 export_dir 이 필요합니다.")
+
+    t0 = time.perf_counter()
+    if args.command == "update":
+        mode = "full" if cube.empty else ("delta" if args.delta else "incremental")
+        info = cube.update(args.export_dir, delta=args.delta)
+        cube.save()
+        print(f"{mode} ({(time.perf_counter() - t0) * 1e3:.0f}ms)")
+        for name, i in info.items():
+            print(f"  {name}: 추가 {i['added']}, 수정 {i['changed']}, 삭제 {i['removed']}, 갱신 칸 {i['touched']}")
+        return 0
+
+    drift, fresh = cube.verify(args.export_dir, args.tolerance)
+    for d in drift[:50]:
+        key = " ".join(str(d[k]) for k in FACTS[d["fact"]].dims)
+        print(f"DRIFT {d['fact']} {key}: 큐브 {d['cube']} / 재계산 {d['recomputed']}")
+    if len(drift) > 50:
+        print(f"... {len(drift) - 50}건 더")
+    print(f"\n차이 {len(drift)}칸 ({(time.perf_counter() - t0) * 1e3:.0f}ms)")
+    if drift and args.repair:
+        fresh.path = cube.path
+        fresh.save()
+        print("재계산한 큐브로 바꿔 저장했습니다.")
+        return 0
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+"""월 결산 엔진 — app/finance/page.tsx fetchFinanceData 와 lib/settlementService.ts 재현.
+
+결산 화면은 농장·월마다 sales_records 를 세 번 조회한다 (입금된 택배 / 정산된 B2B / 미정산 전체).
+그다음 expenditures, attendance_records, farm_crops, other_incomes 를 읽어 브라우저에서 행마다
+계산한다. 이 엔진은 내보내기를 열 배열로 한 번 읽고, 모든 농장·모든 월을 (농장, 월) 그룹 합계로
+한 번에 계산한다. 결과 필드는 화면의 state 와 같다.
+
+조회 조건 재현 (PostgREST 세션 시간대 UTC)
+    택배    delivery_method = courier, is_settled = true, recorded_at ∈ [M-01T00:00:00, M-말일T23:59:59]
+    B2B     sale_type = b2b, is_settled = true, settled_at ∈ [M-01, M-말일]  (말일은 00:00 까지)
+    미정산  is_settled = false (날짜 조건 없음 → 어느 달을 보든 같은 값)
+
+행 계산 (settlementService)
+    금액        is_settled 이고 settled_amount > 0 이면 settled_amount, 아니면 price || 0
+    B2C         sale_type = b2c 또는 delivery_method = courier
+    B2B         B2C 가 아니고 sale_type = b2b 또는 partner_id 있음
+    귀속 월     B2C: (settled_at || recorded_at) 의 날짜 부분, B2B: settled_at 의 날짜 부분
+    택배비      입금된 B2C 의 shipping_cost + packaging_cost — 매출이 아니라 경비
+
+금액은 원 단위 정수라 더하는 순서와 상관없이 합계가 정확하다 (2^53 미만).
+
+    python -m farmdata.settlement exports/2026-03-10 --year 2026 --out settlement.ndjson
+    python -m farmdata.settlement exports/2026-03-10 --month 2026-03 --farm <farm_id>
+    python -m farmdata.settlement exports/2026-03-10 --month 2026-03 --check ref.ndjson
+
+(numpy 필요. 기준 구현: node scripts/farmdata/settlement_reference.mjs)
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .export import Factor, load_table, parse_timestamp
+from .js import js_date_part, js_number, js_or_zero, js_stringify, js_truthy
+from .ledger import check_lines
+
+# app/finance/page.tsx WAGE_CATS
+WAGE_CATS = ("기본급/월급", "명절떡값/선물", "성과급/보너스", "퇴직금/보험", "기타", "아르바이트(일당)", "기타 인건비")
+
+SETTLEMENT_TABLES = ("sales_records", "expenditures", "attendance_records", "farm_crops", "other_incomes")
+
+# 화면 state 순서 그대로
+SUMMARY_FIELDS = (
+    "revenue", "b2bRevenue", "b2cRevenue", "cropRevenue", "processedRevenue", "otherIncomeTotal", "otherIncomeCount",
+    "laborCost", "mealCost", "shippingCost", "expense", "householdCost", "netProfit",
+    "settledB2bCount", "unsettledB2B", "unsettledB2bCount", "unpricedB2bCount", "unsettledB2cCount",
+)
+
+_DAY = 86400.0
+
+
+def month_code(value) -> int:
+    """'YYYY-MM...' 문자열의 앞 7자 → 연*12 + 월-1. 형식이 아니면 -1 (화면의 slice(0, 7) 비교와 같다)."""
+    if not isinstance(value, str) or len(value) < 7:
+        return -1
+    y, dash, m = value[:4], value[4], value[5:7]
+    if dash != "-" or not y.isdigit() or not m.isdigit() or not 1 <= int(m) <= 12:
+        return -1
+    return int(y) * 12 + int(m) - 1
+
+
+def month_label(code: int) -> str:
+    return f"{code // 12:04d}-{code % 12 + 1:02d}"
+
+
+def _epoch_months(ts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """UTC epoch 초 → (월 코드, 다음 달 1일 00:00 의 epoch). 값이 없으면 월 코드 -1."""
+    ok = np.isfinite(ts)
+    us = np.where(ok, ts, 0.0) * 1e6
+    month = us.astype("datetime64[us]").astype("datetime64[M]")
+    code = month.astype(np.int64) + 1970 * 12
+    next_start = (month + 1).astype("datetime64[s]").astype(np.int64).astype(np.float64)
+    return np.where(ok, code, -1), next_start
+
+
+def expense_kind(e: dict) -> tuple[bool, bool]:
+    """(인건비, 식대). 둘 다일 수 있다 — 화면도 양쪽에 더한다 (예: '새참 인건비')."""
+    cat = e.get("category")
+    main = e.get("main_category")
+
+    def has(s: str) -> bool:  # e.category?.includes(s)
+        return isinstance(cat, str) and s in cat
+
+    cat_s = cat if js_truthy(cat) else ""
+    wage_sub = cat_s in WAGE_CATS
+    wage_main = main == "인건비" and not has("식대")
+    wage_kw = (has("인건비") or has("일당")) and not has("식대")
+    wage = (wage_sub or wage_main or wage_kw) and not has("식대")
+    meal = has("식대") or has("새참") or (main == "인건비" and has("식대"))
+    return wage, meal
+
+
+@dataclass
+class SalesColumns:
+    farm: np.ndarray  # int32
+    amount: np.ndarray  # calculateRecordTotal
+    unpriced: np.ndarray  # !price || price === 0
+    b2c: np.ndarray
+    b2b: np.ndarray  # !isB2C && isB2B
+    settled: np.ndarray  # is_settled === true
+    unsettled: np.ndarray  # is_settled === false
+    truthy_settled: np.ndarray  # if (rec.is_settled)
+    processed: np.ndarray  # crop_name ∈ 가공품 목록
+    shipping: np.ndarray  # (shipping_cost || 0) + (packaging_cost || 0)
+    fetched_courier: np.ndarray  # 택배 조회 월 (-1: 조회 안 됨)
+    fetched_b2b: np.ndarray  # B2B 조회 월
+    branch_month: np.ndarray  # 화면이 매출을 귀속시키는 월
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], farms: Factor, processed: set[tuple]) -> "SalesColumns":
+        cols: dict[str, list] = {k: [] for k in (
+            "farm", "amount", "unpriced", "b2c", "b2b", "settled", "unsettled", "truthy_settled", "processed",
+            "shipping", "courier", "sale_b2b", "recorded", "settled_at", "branch_month")}
+        seen: set = set()
+        for r in rows:
+            rid = r.get("id")
+            if rid is not None:
+                if rid in seen:  # 화면의 seenIds
+                    continue
+                seen.add(rid)
+            is_settled = r.get("is_settled")
+            sa = r.get("settled_amount")
+            price = r.get("price")
+            if is_settled and sa is not None and js_number(sa) > 0:
+                amount = js_number(sa)
+            else:
+                amount = js_or_zero(price)
+            b2c = r.get("sale_type") == "b2c" or r.get("delivery_method") == "courier"
+            b2b = not b2c and (r.get("sale_type") == "b2b" or js_truthy(r.get("partner_id")))
+            if b2c:
+                v = r.get("settled_at") if js_truthy(r.get("settled_at")) else r.get("recorded_at")
+                branch = month_code(js_date_part(v if js_truthy(v) else ""))
+            elif b2b and js_truthy(r.get("settled_at")):
+                branch = month_code(js_date_part(r.get("settled_at")))
+            else:
+                branch = -1
+            cols["farm"].append(farms.code(r.get("farm_id")))
+            cols["amount"].append(amount)
+            cols["unpriced"].append(not js_truthy(price) or js_number(price) == 0)
+            cols["b2c"].append(b2c)
+            cols["b2b"].append(b2b)
+            cols["settled"].append(is_settled is True)
+            cols["unsettled"].append(is_settled is False)
+            cols["truthy_settled"].append(js_truthy(is_settled))
+            cols["processed"].append((r.get("farm_id"), r.get("crop_name")) in processed)
+            cols["shipping"].append(js_or_zero(r.get("shipping_cost")) + js_or_zero(r.get("packaging_cost")))
+            cols["courier"].append(r.get("delivery_method") == "courier")
+            cols["sale_b2b"].append(r.get("sale_type") == "b2b")
+            cols["recorded"].append(parse_timestamp(r.get("recorded_at")))
+            cols["settled_at"].append(parse_timestamp(r.get("settled_at")))
+            cols["branch_month"].append(branch)
+
+        settled = np.array(cols["settled"], dtype=bool)
+        rec_month, rec_next = _epoch_months(np.array(cols["recorded"], dtype=np.float64))
+        set_ts = np.array(cols["settled_at"], dtype=np.float64)
+        set_month, set_next = _epoch_months(set_ts)
+        rec_ts = np.array(cols["recorded"], dtype=np.float64)
+        # lte('recorded_at', 'M-말일T23:59:59') / lte('settled_at', 'M-말일')
+        courier_ok = np.array(cols["courier"], dtype=bool) & settled & (rec_ts <= rec_next - 1.0)
+        b2b_ok = np.array(cols["sale_b2b"], dtype=bool) & settled & (set_ts <= set_next - _DAY)
+        return cls(
+            farm=np.array(cols["farm"], dtype=np.int32),
+            amount=np.array(cols["amount"], dtype=np.float64),
+            unpriced=np.array(cols["unpriced"], dtype=bool),
+            b2c=np.array(cols["b2c"], dtype=bool),
+            b2b=np.array(cols["b2b"], dtype=bool),
+            settled=settled,
+            unsettled=np.array(cols["unsettled"], dtype=bool),
+            truthy_settled=np.array(cols["truthy_settled"], dtype=bool),
+            processed=np.array(cols["processed"], dtype=bool),
+            shipping=np.array(cols["shipping"], dtype=np.float64),
+            fetched_courier=np.where(courier_ok, rec_month, -1),
+            fetched_b2b=np.where(b2b_ok, set_month, -1),
+            branch_month=np.array(cols["branch_month"], dtype=np.int64),
+        )
+
+    def revenue_mask(self) -> np.ndarray:
+        """그 달 화면에 매출로 잡히는 행: 귀속 월에 조회되었고 (입금된 B2C 또는 정산일 있는 B2B)."""
+        m = self.branch_month
+        fetched = (m >= 0) & ((self.fetched_courier == m) | (self.fetched_b2b == m))
+        return fetched & self.truthy_settled & (self.b2c | self.b2b)
+
+
+@dataclass
+class DatedColumns:
+    """지출·출근·기타수입: 농장, 월, 금액 (+ 지출 분류)."""
+
+    farm: np.ndarray
+    month: np.ndarray
+    amount: np.ndarray
+    kind: np.ndarray | None = None  # 지출: 0 영농, 1 인건비, 2 식대, 3 인건비+식대, 4 가계
+
+    @classmethod
+    def expenditures(cls, rows: Iterable[dict], farms: Factor) -> "DatedColumns":
+        farm, month, amount, kind = [], [], [], []
+        for e in rows:
+            wage, meal = expense_kind(e)
+            k = (1 if wage else 0) | (2 if meal else 0)
+            if not k and e.get("main_category") == "가계생활":
+                k = 4
+            farm.append(farms.code(e.get("farm_id")))
+            month.append(month_code(e.get("expense_date")))
+            amount.append(js_or_zero(e.get("amount")))
+            kind.append(k)
+        return cls(np.array(farm, dtype=np.int32), np.array(month, dtype=np.int64),
+                   np.array(amount, dtype=np.float64), np.array(kind, dtype=np.int8))
+
+    @classmethod
+    def attendance(cls, rows: Iterable[dict], farms: Factor) -> "DatedColumns":
+        farm, month, amount = [], [], []
+        for a in rows:
+            if a.get("is_present") is not True:
+                continue
+            hc = a.get("headcount")
+            farm.append(farms.code(a.get("farm_id")))
+            month.append(month_code(a.get("work_date")))
+            amount.append(js_or_zero(a.get("daily_wage")) * (js_number(hc) if js_truthy(hc) else 1.0))
+        return cls(np.array(farm, dtype=np.int32), np.array(month, dtype=np.int64), np.array(amount, dtype=np.float64))
+
+    @classmethod
+    def incomes(cls, rows: Iterable[dict], farms: Factor) -> "DatedColumns":
+        farm, month, amount = [], [], []
+        for i in rows:
+            farm.append(farms.code(i.get("farm_id")))
+            month.append(month_code(i.get("income_date")))
+            amount.append(js_or_zero(i.get("amount")))
+        return cls(np.array(farm, dtype=np.int32), np.array(month, dtype=np.int64), np.array(amount, dtype=np.float64))
+
+
+class SettlementEngine:
+    def __init__(self, sales: SalesColumns, expenses: DatedColumns, attendance: DatedColumns,
+                 incomes: DatedColumns, farms: Factor):
+        self.sales = sales
+        self.expenses = expenses
+        self.attendance = attendance
+        self.incomes = incomes
+        self.farms = farms
+
+    @classmethod
+    def from_export(cls, export_dir: str | Path) -> "SettlementEngine":
+        farms = Factor()
+        processed = {
+            (c.get("farm_id"), c.get("crop_name"))
+            for c in load_table(export_dir, "farm_crops", required=False)
+            if c.get("is_active") is True and c.get("category") == "processed"
+        }
+        return cls(
+            SalesColumns.from_rows(load_table(export_dir, "sales_records"), farms, processed),
+            DatedColumns.expenditures(load_table(export_dir, "expenditures", required=False), farms),
+            DatedColumns.attendance(load_table(export_dir, "attendance_records", required=False), farms),
+            DatedColumns.incomes(load_table(export_dir, "other_incomes", required=False), farms),
+            farms,
+        )
+
+    def active_months(self) -> list[int]:
+        s = self.sales
+        months = [s.branch_month[s.revenue_mask()], self.expenses.month, self.attendance.month, self.incomes.month]
+        return sorted(int(m) for m in np.unique(np.concatenate(months)) if m >= 0)
+
+    def farm_ids(self) -> list[str]:
+        return sorted((f for f in self.farms.values if f is not None), key=str)
+
+    def monthly(self, months: Sequence[int]) -> dict[tuple[str, int], dict[str, float]]:
+        """(농장 id, 월 코드) → 화면 값들. 모든 농장·월을 한 번에 계산한다."""
+        n_farms, n_months = len(self.farms), len(months)
+        month_arr = np.array(sorted(months), dtype=np.int64)
+
+        def cell(farm: np.ndarray, month: np.ndarray, mask: np.ndarray) -> np.ndarray:
+            """(농장, 월) 칸 번호. 대상 월이 아니거나 mask 가 아니면 -1."""
+            pos = np.searchsorted(month_arr, month)
+            pos_c = np.minimum(pos, max(n_months - 1, 0))
+            ok = mask & (n_months > 0) & (month_arr[pos_c] == month) if n_months else np.zeros(len(month), bool)
+            return np.where(ok, farm.astype(np.int64) * n_months + pos_c, -1)
+
+        size = n_farms * n_months
+
+        def total(idx: np.ndarray, weights: np.ndarray | None = None) -> np.ndarray:
+            keep = idx >= 0
+            w = None if weights is None else weights[keep]
+            return np.bincount(idx[keep], weights=w, minlength=size).astype(np.float64)
+
+        s = self.sales
+        rev = cell(s.farm, s.branch_month, s.revenue_mask())
+        b2c_rev = np.where(s.b2c, rev, -1)
+        b2b_rev = np.where(s.b2b, rev, -1)
+        revenue = total(rev, s.amount)
+        out_cols = {
+            "revenue": revenue,
+            "b2bRevenue": total(b2b_rev, s.amount),
+            "b2cRevenue": total(b2c_rev, s.amount),
+            "cropRevenue": total(np.where(~s.processed, rev, -1), s.amount),
+            "processedRevenue": total(np.where(s.processed, rev, -1), s.amount),
+            "shippingCost": total(b2c_rev, s.shipping),
+            "settledB2bCount": total(b2b_rev),
+        }
+
+        # 미정산은 날짜 조건이 없어 농장마다 한 값
+        u_b2b = s.unsettled & s.b2b
+        u_b2c = s.unsettled & s.b2c
+        per_farm = {
+            "unsettledB2B": np.bincount(s.farm[u_b2b], weights=s.amount[u_b2b], minlength=n_farms),
+            "unsettledB2bCount": np.bincount(s.farm[u_b2b], minlength=n_farms).astype(np.float64),
+            "unpricedB2bCount": np.bincount(s.farm[u_b2b & s.unpriced], minlength=n_farms).astype(np.float64),
+            "unsettledB2cCount": np.bincount(s.farm[u_b2c], minlength=n_farms).astype(np.float64),
+        }
+        for name, v in per_farm.items():
+            out_cols[name] = np.repeat(v, n_months)
+
+        e = self.expenses
+        exp_cell = cell(e.farm, e.month, np.ones(len(e.month), dtype=bool))
+        wages = total(np.where(e.kind & 1 > 0, exp_cell, -1), e.amount)
+        meals = total(np.where(e.kind & 2 > 0, exp_cell, -1), e.amount)
+        farming = total(np.where(e.kind == 0, exp_cell, -1), e.amount)
+        household = total(np.where(e.kind == 4, exp_cell, -1), e.amount)
+        a = self.attendance
+        att = total(cell(a.farm, a.month, np.ones(len(a.month), dtype=bool)), a.amount)
+        i = self.incomes
+        inc_cell = cell(i.farm, i.month, np.ones(len(i.month), dtype=bool))
+        other = total(inc_cell, i.amount)
+
+        labor = wages + np.where(att > 0, att, 0.0)
+        out_cols.update({
+            "otherIncomeTotal": other,
+            "otherIncomeCount": total(inc_cell),
+            "laborCost": labor,
+            "mealCost": meals,
+            "expense": farming,
+            "householdCost": household,
+            # 순이익 = (매출 + 기타수입) - (인건비 + 식대 + 택배/자재비 + 영농지출 + 가계)
+            "netProfit": revenue + other - (labor + meals + out_cols["shippingCost"] + farming + household),
+        })
+
+        lists = {k: v.tolist() for k, v in out_cols.items()}
+        result: dict[tuple[str, int], dict[str, float]] = {}
+        for f, farm_id in enumerate(self.farms.values):
+            if farm_id is None:
+                continue
+            for p, m in enumerate(month_arr.tolist()):
+                k = f * n_months + p
+                result[(farm_id, m)] = {name: _as_count(name, lists[name][k]) for name in SUMMARY_FIELDS}
+        return result
+
+
+def _as_count(name: str, v: float):
+    return int(v) if name.endswith("Count") else v
+
+
+def report_lines(engine: SettlementEngine, months: Sequence[int], farms: Sequence[str] | None = None) -> Iterable[str]:
+    """(농장, 월)마다 {"farm_id", "month", ...화면 값} 한 줄 (JSON.stringify 와 같은 바이트)."""
+    table = engine.monthly(months)
+    for farm in farms or engine.farm_ids():
+        for m in sorted(months):
+            values = table.get((farm, m)) or {name: 0 for name in SUMMARY_FIELDS}
+            yield js_stringify({"farm_id": farm, "month": month_label(m), **values})
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="내보내기로부터 농장별 월 결산 (결산 화면 값) 계산")
+    ap.add_argument("export_dir", help=f"{' / '.join(SETTLEMENT_TABLES)} 내보내기 디렉터리")
+    ap.add_argument("--month", action="append", default=None, help="YYYY-MM (여러 번 가능)")
+    ap.add_argument("--year", type=int, action="append", default=None, help="연도의 12개월 전부")
+    ap.add_argument("--farm", action="append", default=None, help="대상 농장 id (기본: 전체)")
+    ap.add_argument("--out", default=None, help="NDJSON 출력 파일 (기본: 표준 출력)")
+    ap.add_argument("--check", default=None, help="비교할 기준 NDJSON (settlement_reference.mjs 출력)")
+    args = ap.parse_args(argv)
+
+    engine = SettlementEngine.from_export(args.export_dir)
+    months = [month_code(m) for m in args.month or ()]
+    if any(m < 0 for m in months):
+        ap.error("--month 는 YYYY-MM 형식이어야 합니다.")
+    months += [y * 12 + k for y in args.year or () for k in range(12)]
+    months = sorted(set(months)) or engine.active_months()
+
+    lines = list(report_lines(engine, months, args.farm))
+    if args.out:
+        Path(args.out).write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    elif not args.check:
+        for line in lines:
+            print(line)
+
+    if args.check:
+        diffs = check_lines(lines, args.check, key=("farm_id", "month"))
+        for key in diffs:
+            print(f"불일치: {' '.join(key)}", file=sys.stderr)
+        print(f"{len(lines)}개 (농장, 월) 비교, 불일치 {len(diffs)}", file=sys.stderr)
+        return 1 if diffs else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+/**
+ * app/finance/page.tsx fetchFinanceData 의 조회 조건과 집계 루프,
+ * lib/settlementService.ts 를 그대로 옮겨 내보내기 파일로 실행하는 기준 구현
+ * (farmdata.settlement 비교용). 농장·월마다 화면과 똑같이 한 건씩 계산한다.
+ *
+ * 사용 방법:
+ *   node scripts/farmdata/settlement_reference.mjs exports/2026-03-10 --month 2026-03 [--month ...] > ref.ndjson
+ *   python -m farmdata.settlement exports/2026-03-10 --month 2026-03 --check ref.ndjson
+ */
+import fs from "node:fs";
+import path from "node:path";
+import zlib from "node:zlib";
+
+function loadTable(dir, table, required = true) {
+    for (const suffix of [".ndjson", ".jsonl", ".json"]) {
+        for (const name of [table + suffix, table + suffix + ".gz"]) {
+            const p = path.join(dir, name);
+            if (!fs.existsSync(p)) continue;
+            let raw = fs.readFileSync(p);
+            if (name.endsWith(".gz")) raw = zlib.gunzipSync(raw);
+            const text = raw.toString("utf-8").replace(/^﻿/, "");
+            if (suffix !== ".json") {
+                return text.split("\n").filter((l) => l.trim()).map((l) => JSON.parse(l));
+            }
+            const data = JSON.parse(text);
+            return Array.isArray(data) ? data : data.data;
+        }
+    }
+    if (required) throw new Error(`${dir}: ${table} 내보내기 파일이 없습니다.`);
+    return [];
+}
+
+// PostgREST 의 timestamptz 비교 (시간대 없는 값은 세션 시간대 UTC)
+function ts(v) {
+    if (!v) return NaN;
+    let s = String(v).trim().replace(" ", "T");
+    if (!s.includes("T")) return Date.parse(s + "T00:00:00Z");
+    if (/T.*[+-]\d\d$/.test(s)) s += ":00";
+    if (!/[zZ]$|T.*[+-]\d\d:?\d\d$/.test(s)) s += "Z";
+    return Date.parse(s);
+}
+const between = (v, lo, hi) => { const t = ts(v); return t >= ts(lo) && t <= ts(hi); };
+const dateBetween = (v, lo, hi) => v != null && v >= lo && v <= hi;
+
+const settlementService = {
+    isB2B: (record) => record.sale_type === "b2b" || !!record.partner_id,
+    isB2C: (record) => record.sale_type === "b2c" || record.delivery_method === "courier",
+    calculateRecordTotal: (record) => {
+        if (record.is_settled && record.settled_amount !== null && record.settled_amount !== undefined && record.settled_amount > 0) {
+            return record.settled_amount;
+        }
+        return record.price || 0;
+    },
+};
+
+const WAGE_CATS = ["기본급/월급", "명절떡값/선물", "성과급/보너스", "퇴직금/보험", "기타", "아르바이트(일당)", "기타 인건비"];
+
+const args = process.argv.slice(2);
+const dir = args[0];
+const months = args.flatMap((a, i) => (args[i - 1] === "--month" ? [a] : []));
+
+const sales = loadTable(dir, "sales_records");
+const expenditures = loadTable(dir, "expenditures", false);
+const attendance = loadTable(dir, "attendance_records", false);
+const farmCrops = loadTable(dir, "farm_crops", false);
+const otherIncomes = loadTable(dir, "other_incomes", false);
+
+function finance(farmId, selectedMonth) {
+    const year = parseInt(selectedMonth.split("-")[0]);
+    const month = parseInt(selectedMonth.split("-")[1]);
+    const lastDay = new Date(year, month, 0).getDate();
+    const startStr = `${selectedMonth}-01T00:00:00`;
+    const endStr = `${selectedMonth}-${lastDay}T23:59:59`;
+    const cashStartDate = `${selectedMonth}-01`;
+    const cashEndDate = `${selectedMonth}-${lastDay}`;
+
+    const mine = sales.filter((r) => r.farm_id === farmId);
+    const q1 = mine.filter((r) => r.delivery_method === "courier" && r.is_settled === true && between(r.recorded_at, startStr, endStr));
+    const q2 = mine.filter((r) => r.sale_type === "b2b" && r.is_settled === true && between(r.settled_at, cashStartDate, cashEndDate));
+    const q3 = mine.filter((r) => r.is_settled === false);
+
+    const seenIds = new Set();
+    const salesData = [];
+    [...q1, ...q2, ...q3].forEach((rec) => {
+        if (!seenIds.has(rec.id)) {
+            seenIds.add(rec.id);
+            salesData.push(rec);
+        }
+    });
+
+    const expensesData = expenditures.filter((e) => e.farm_id === farmId && dateBetween(e.expense_date, startStr.split("T")[0], endStr.split("T")[0]));
+    const attendanceData = attendance.filter((a) => a.farm_id === farmId && a.is_present === true && dateBetween(a.work_date, startStr.split("T")[0], endStr.split("T")[0]));
+    const processedNames = farmCrops.filter((c) => c.farm_id === farmId && c.is_active === true).filter((c) => c.category === "processed").map((c) => c.crop_name);
+    const incomes = otherIncomes.filter((i) => i.farm_id === farmId && dateBetween(i.income_date, cashStartDate, cashEndDate));
+    const otherInc = incomes.reduce((sum, i) => sum + (i.amount || 0), 0);
+
+    let totalRev = 0, b2bRev = 0, b2cRev = 0, totalShipping = 0, unsettledAmt = 0, unsettledCount = 0, settledCount = 0;
+    let rawCropRev = 0, procCropRev = 0;
+    const uRecords = [];
+    const newUnsettledB2c = [];
+
+    salesData.forEach((rec) => {
+        const price = settlementService.calculateRecordTotal(rec);
+        const isB2C = settlementService.isB2C(rec);
+        const isB2B = !isB2C && settlementService.isB2B(rec);
+        const isProcessedItem = processedNames.includes(rec.crop_name);
+        if (isB2C) {
+            if (rec.is_settled) {
+                const settledDate = String(rec.settled_at || rec.recorded_at || "").split("T")[0];
+                if (settledDate.slice(0, 7) === selectedMonth) {
+                    totalRev += price;
+                    b2cRev += price;
+                    totalShipping += (rec.shipping_cost || 0) + (rec.packaging_cost || 0);
+                    if (isProcessedItem) procCropRev += price;
+                    else rawCropRev += price;
+                }
+            } else {
+                newUnsettledB2c.push(rec);
+            }
+        } else if (isB2B) {
+            if (rec.is_settled && rec.settled_at) {
+                const dateStr = String(rec.settled_at).split("T")[0];
+                if (dateStr.startsWith(selectedMonth)) {
+                    totalRev += price;
+                    b2bRev += price;
+                    settledCount++;
+                    if (isProcessedItem) procCropRev += price;
+                    else rawCropRev += price;
+                }
+            } else if (!rec.is_settled) {
+                unsettledAmt += price;
+                unsettledCount++;
+                uRecords.push(rec);
+            }
+        }
+    });
+
+    const wagesExpenses = expensesData.filter((e) => {
+        const isWageSub = WAGE_CATS.includes(e.category || "");
+        const isWageMain = e.main_category === "인건비" && !e.category?.includes("식대");
+        const hasWageKeyword = (e.category?.includes("인건비") || e.category?.includes("일당")) && !e.category?.includes("식대");
+        return (isWageSub || isWageMain || hasWageKeyword) && !e.category?.includes("식대");
+    });
+    const mealsExpenses = expensesData.filter((e) => (e.category?.includes("식대") || e.category?.includes("새참")) || (e.main_category === "인건비" && e.category?.includes("식대")));
+    const totalWagesFromExpenses = wagesExpenses.reduce((acc, curr) => acc + (curr.amount || 0), 0);
+    const totalMealsFromExpenses = mealsExpenses.reduce((acc, curr) => acc + (curr.amount || 0), 0);
+    const attendanceWages = attendanceData.reduce((acc, curr) => acc + ((curr.daily_wage || 0) * (curr.headcount || 1)), 0) || 0;
+    const finalWages = totalWagesFromExpenses + (attendanceWages > 0 ? attendanceWages : 0);
+    const finalMeals = totalMealsFromExpenses;
+    const normalExpenses = expensesData.filter((e) => !wagesExpenses.includes(e) && !mealsExpenses.includes(e));
+    const householdExpenses = normalExpenses.filter((e) => e.main_category === "가계생활");
+    const farmingExpenses = normalExpenses.filter((e) => e.main_category !== "가계생활");
+    const totalExp = farmingExpenses.reduce((acc, curr) => acc + (curr.amount || 0), 0) || 0;
+    const totalHousehold = householdExpenses.reduce((acc, curr) => acc + (curr.amount || 0), 0) || 0;
+    const totalCost = finalWages + finalMeals + totalShipping + totalExp + totalHousehold;
+    const netProfit = totalRev + otherInc - totalCost;
+
+    return {
+        farm_id: farmId,
+        month: selectedMonth,
+        revenue: totalRev,
+        b2bRevenue: b2bRev,
+        b2cRevenue: b2cRev,
+        cropRevenue: rawCropRev,
+        processedRevenue: procCropRev,
+        otherIncomeTotal: otherInc,
+        otherIncomeCount: incomes.length,
+        laborCost: finalWages,
+        mealCost: finalMeals,
+        shippingCost: totalShipping,
+        expense: totalExp,
+        householdCost: totalHousehold,
+        netProfit,
+        settledB2bCount: settledCount,
+        unsettledB2B: unsettledAmt,
+        unsettledB2bCount: unsettledCount,
+        unpricedB2bCount: uRecords.filter((r) => !r.price || r.price === 0).length,
+        unsettledB2cCount: newUnsettledB2c.length,
+    };
+}
+
+const farmIds = [...new Set([...sales, ...expenditures, ...attendance, ...otherIncomes].map((r) => r.farm_id))]
+    .filter((f) => f !== null && f !== undefined)
+    .sort();
+for (const farmId of farmIds) {
+    for (const m of months) {
+        process.stdout.write(JSON.stringify(finance(farmId, m)) + "\n");
+    }
+}
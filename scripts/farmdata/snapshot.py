@@ -0,0 +1,285 @@
+"""워터마크 기반 증분 재고 스냅샷.
+
+fetchStockMap 처럼 매번 전체 이력을 다시 합산하지 않고, 농장·품목(·등급)별 재고를
+테이블별 워터마크(수확/판매: recorded_at, 조정: adjusted_at) 시점까지 저장해 둔다.
+다음 실행에서는 워터마크 이후 행만 합산해 더하므로 비용이 이력 길이가 아니라 새 활동량에 비례한다.
+
+- 워터마크와 같은 시각의 행은 id 를 boundary_ids 로 남겨 두 번 더하거나 빠뜨리지 않는다.
+- 전체 내보내기로 update 하면 워터마크 이전 행 수를 농장별로 세어 스냅샷과 비교한다.
+  날짜를 소급한 행(판매 화면은 recorded_at 을 선택 날짜로 저장한다)이 추가되거나 행이 삭제되면
+  수가 달라지므로, 그 농장은 처음부터 다시 계산한다.
+  수정(UPDATE)은 행 수로는 드러나지 않으므로 verify 로 주기적으로 확인한다.
+- --delta 는 워터마크 이후 행만 담은 내보내기(.gt(col, watermark) 조회 결과)를 뜻한다.
+  이때는 행 수 비교를 건너뛴다.
+
+    python -m farmdata.snapshot update exports/2026-03-10            # 없으면 새로 만든다
+    python -m farmdata.snapshot update exports/delta-0311 --delta
+    python -m farmdata.snapshot verify exports/2026-03-11 [--repair]  # 처음부터 재계산해 비교
+    python -m farmdata.snapshot show --farm <farm_id>
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from .export import format_timestamp
+from .js import js_stringify
+from .ledger import GRADES, LEDGER_TABLES, StockLedger
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_PATH = Path(".farmdata/stock_snapshot.json")
+WATERMARK_FIELDS = {
+    "harvest_records": "recorded_at",
+    "sales_records": "recorded_at",
+    "inventory_adjustments": "adjusted_at",
+}
+DEFAULT_TOLERANCE = 1e-6
+
+
+class StockSnapshot:
+    """{"watermarks": {table: {field, ts, epoch, boundary_ids}},
+        "farms": {farm_id: {"stock": {crop: q}, "grade": {crop: {sang, jung, ha}}, "counts": {table: n}}}}
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_SNAPSHOT_PATH, fields: dict[str, str] | None = None):
+        self.path = Path(path)
+        self.watermarks: dict[str, dict] = {}
+        self.farms: dict[str, dict] = {}
+        self.fields = dict(WATERMARK_FIELDS, **(fields or {}))
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == SNAPSHOT_VERSION:
+                self.watermarks = data["watermarks"]
+                self.farms = data["farms"]
+                # 스냅샷을 만든 열 기준을 계속 쓴다
+                self.fields.update({t: w["field"] for t, w in self.watermarks.items()})
+
+    @property
+    def empty(self) -> bool:
+        return not self.watermarks
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        data = {"version": SNAPSHOT_VERSION, "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "watermarks": self.watermarks, "farms": self.farms}
+        tmp.write_text(json.dumps(data, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def stock_map(self, farm_id: str) -> dict[str, float]:
+        return dict(self.farms.get(farm_id, {}).get("stock", {}))
+
+    def grade_stock_map(self, farm_id: str) -> dict[str, dict[str, float]]:
+        return {c: dict(g) for c, g in self.farms.get(farm_id, {}).get("grade", {}).items()}
+
+    # --- 행 구분 ---------------------------------------------------------
+
+    def applied_masks(self, ledger: StockLedger) -> dict[str, np.ndarray]:
+        """이미 스냅샷에 들어 있는 행 (워터마크 이전 + 경계 시각의 기록된 id)."""
+        masks = {}
+        for table, cols in ledger.tables.items():
+            wm = self.watermarks.get(table)
+            if wm is None:
+                masks[table] = np.zeros(len(cols), dtype=bool)
+                continue
+            epoch = wm["epoch"] if wm["epoch"] is not None else -math.inf
+            at_boundary = cols.ts == epoch
+            if at_boundary.any():
+                seen = set(wm["boundary_ids"])
+                at_boundary &= np.fromiter((i in seen for i in cols.ids), dtype=bool, count=len(cols))
+            masks[table] = (cols.ts < epoch) | at_boundary
+        return masks
+
+    def stale_farms(self, ledger: StockLedger, applied: dict[str, np.ndarray]) -> set[str]:
+        """워터마크 이전 행 수가 스냅샷과 다른 농장 (소급 입력·삭제)."""
+        stale = set()
+        n = len(ledger.farms)
+        for table, cols in ledger.tables.items():
+            counts = cols.farm_counts(applied[table], n)
+            for code, farm in enumerate(ledger.farms.values):
+                if farm is None:
+                    continue
+                recorded = self.farms.get(farm, {}).get("counts", {}).get(table, 0)
+                if int(counts[code]) != recorded:
+                    stale.add(farm)
+        # 내보내기에서 행이 모두 사라진 농장
+        stale.update(f for f, e in self.farms.items() if f not in ledger.farms.index and any(e["counts"].values()))
+        return stale
+
+    # --- 갱신 ------------------------------------------------------------
+
+    def _merge(self, ledger: StockLedger) -> None:
+        stock = ledger.stock_maps()
+        grade = ledger.grade_stock_maps()
+        counts = {t: c.farm_counts(None, len(ledger.farms)) for t, c in ledger.tables.items()}
+        for code, farm in enumerate(ledger.farms.values):
+            if farm is None:
+                continue
+            entry = self.farms.get(farm)
+            if entry is None:
+                entry = self.farms[farm] = {"stock": {}, "grade": {}, "counts": {t: 0 for t in LEDGER_TABLES}}
+            for crop, q in stock.get(farm, {}).items():
+                entry["stock"][crop] = entry["stock"].get(crop, 0.0) + q
+            for crop, g in grade.get(farm, {}).items():
+                old = entry["grade"].setdefault(crop, {k: 0.0 for k in GRADES})
+                for k in GRADES:
+                    old[k] += g[k]
+            for t in LEDGER_TABLES:
+                entry["counts"][t] = entry["counts"].get(t, 0) + int(counts[t][code])
+
+    def _advance(self, ledger: StockLedger, masks: dict[str, np.ndarray]) -> None:
+        """masks 의 행을 반영했으므로 워터마크를 그 행들의 최대 시각으로 옮긴다."""
+        for table, cols in ledger.tables.items():
+            ts = cols.ts[masks[table]]
+            ids = cols.ids[masks[table]]
+            finite = ts[np.isfinite(ts)]
+            old = self.watermarks.get(table)
+            old_epoch = old["epoch"] if old and old["epoch"] is not None else -math.inf
+            new_epoch = max(old_epoch, float(finite.max())) if len(finite) else old_epoch
+            boundary = ids[ts == new_epoch].tolist()
+            if old and new_epoch == old_epoch:
+                boundary = old["boundary_ids"] + boundary
+            self.watermarks[table] = {
+                "field": self.fields[table],
+                "ts": format_timestamp(new_epoch),
+                "epoch": new_epoch if math.isfinite(new_epoch) else None,
+                "boundary_ids": sorted(set(boundary), key=str),
+            }
+
+    def update(self, ledger: StockLedger, delta: bool = False) -> dict:
+        """워터마크 이후 행을 반영한다. 전체 내보내기면 소급 입력된 농장은 다시 만든다."""
+        tables = ledger.tables
+        if self.empty:
+            masks = {t: np.ones(len(c), dtype=bool) for t, c in tables.items()}
+            self._merge(ledger)
+            self._advance(ledger, masks)
+            return {"mode": "full", "rows": sum(len(c) for c in tables.values()), "rebuilt": []}
+
+        applied = self.applied_masks(ledger)
+        stale = set() if delta else self.stale_farms(ledger, applied)
+        stale_codes = np.array([ledger.farms.index[f] for f in stale if f in ledger.farms.index], dtype=np.int32)
+
+        new = {t: ~applied[t] & ~np.isin(c.farm, stale_codes) for t, c in tables.items()}
+        self._merge(ledger.take(new))
+        if stale:
+            # 소급 입력·삭제가 있는 농장은 그 농장 행 전체로 다시 만든다
+            for farm in stale:
+                self.farms.pop(farm, None)
+            full = {t: np.isin(c.farm, stale_codes) for t, c in tables.items()}
+            self._merge(ledger.take(full))
+        self._advance(ledger, {t: ~applied[t] for t in tables})
+        return {"mode": "delta" if delta else "incremental", "rows": int(sum(m.sum() for m in new.values())),
+                "rebuilt": sorted(stale, key=str)}
+
+    # --- 검증 ------------------------------------------------------------
+
+    def verify(self, ledger: StockLedger, tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+        """스냅샷에 들어 있어야 할 행으로 처음부터 다시 계산해 차이(drift)를 찾는다."""
+        applied = self.applied_masks(ledger)
+        base = ledger.take(applied)
+        fresh_stock = base.stock_maps()
+        fresh_grade = base.grade_stock_maps()
+        drift = []
+        farms = set(self.farms) | {f for f in ledger.farms.values if f is not None}
+        for farm in sorted(farms, key=str):
+            want_s = fresh_stock.get(farm, {})
+            have_s = self.farms.get(farm, {}).get("stock", {})
+            for crop in list(want_s) + [c for c in have_s if c not in want_s]:
+                a, b = have_s.get(crop, 0.0), want_s.get(crop, 0.0)
+                if not _close(a, b, tolerance):
+                    drift.append({"farm_id": farm, "crop": crop, "grade": None, "snapshot": a, "recomputed": b})
+            want_g = fresh_grade.get(farm, {})
+            have_g = self.farms.get(farm, {}).get("grade", {})
+            for crop in list(want_g) + [c for c in have_g if c not in want_g]:
+                for k in GRADES:
+                    a = have_g.get(crop, {}).get(k, 0.0)
+                    b = want_g.get(crop, {}).get(k, 0.0)
+                    if not _close(a, b, tolerance):
+                        drift.append({"farm_id": farm, "crop": crop, "grade": k, "snapshot": a, "recomputed": b})
+        return drift
+
+    def repair(self, ledger: StockLedger, farms: set[str]) -> None:
+        """farms 를 스냅샷 범위의 행으로 다시 만든다."""
+        applied = self.applied_masks(ledger)
+        codes = np.array([ledger.farms.index[f] for f in farms if f in ledger.farms.index], dtype=np.int32)
+        masks = {t: applied[t] & np.isin(c.farm, codes) for t, c in ledger.tables.items()}
+        for f in farms:
+            self.farms.pop(f, None)
+        self._merge(ledger.take(masks))
+
+
+def _close(a: float, b: float, tolerance: float) -> bool:
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    return abs(a - b) <= tolerance * max(1.0, abs(a), abs(b))
+
+
+def _parse_fields(items: Sequence[str] | None) -> dict[str, str]:
+    out = {}
+    for item in items or ():
+        table, _, field = item.partition("=")
+        if table not in WATERMARK_FIELDS or not field:
+            raise SystemExit(f"--watermark-field 형식: <{'|'.join(WATERMARK_FIELDS)}>=<열 이름>")
+        out[table] = field
+    return out
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="워터마크 기반 증분 재고 스냅샷")
+    ap.add_argument("command", choices=["update", "verify", "show"])
+    ap.add_argument("export_dir", nargs="?", help="내보내기 디렉터리 (update/verify)")
+    ap.add_argument("--snapshot", default=str(DEFAULT_SNAPSHOT_PATH))
+    ap.add_argument("--delta", action="store_true", help="export_dir 이 워터마크 이후 행만 담고 있음")
+    ap.add_argument("--watermark-field", action="append", default=None,
+                    help="테이블별 워터마크 열 (예: sales_records=created_at), 스냅샷을 새로 만들 때만 적용")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="verify 허용 상대 오차")
+    ap.add_argument("--repair", action="store_true", help="verify 에서 차이 난 농장을 다시 계산해 저장")
+    ap.add_argument("--farm", action="append", default=None, help="show 대상 농장")
+    args = ap.parse_args(argv)
+
+    snap = StockSnapshot(args.snapshot, _parse_fields(args.watermark_field))
+    if args.command == "show":
+        for farm in args.farm or sorted(snap.farms, key=str):
+            print(f'{{"farm_id":{js_stringify(farm)},"stock":{js_stringify(snap.stock_map(farm))},'
+                  f'"gradeStock":{js_stringify(snap.grade_stock_map(farm))}}}')
+        for table, wm in snap.watermarks.items():
+            print(f"{table}.{wm['field']} <= {wm['ts'] or '-'} (경계 {len(wm['boundary_ids'])}행)", file=sys.stderr)
+        return 0
+    if not args.export_dir:
+        ap.error("update/verify 에는 export_dir 이 필요합니다.")
+
+    t0 = time.perf_counter()
+    ledger = StockLedger.from_export(args.export_dir, ts_fields=snap.fields)
+    if args.command == "update":
+        info = snap.update(ledger, delta=args.delta)
+        snap.save()
+        rebuilt = f", 재계산 농장 {len(info['rebuilt'])}" if info["rebuilt"] else ""
+        print(f"{info['mode']}: 반영 {info['rows']}행{rebuilt} ({(time.perf_counter() - t0) * 1e3:.0f}ms)")
+        for farm in info["rebuilt"]:
+            print(f"  재계산: {farm} (워터마크 이전 행 수가 바뀜 — 소급 입력 또는 삭제)")
+        return 0
+
+    drift = snap.verify(ledger, args.tolerance)
+    for d in drift:
+        grade = f"[{d['grade']}]" if d["grade"] else ""
+        print(f"DRIFT {d['farm_id']} {d['crop']}{grade}: 스냅샷 {d['snapshot']} / 재계산 {d['recomputed']}")
+    farms = {d["farm_id"] for d in drift}
+    print(f"\n차이 {len(drift)}건 (농장 {len(farms)}개)")
+    if drift and args.repair:
+        snap.repair(ledger, farms)
+        snap.save()
+        print("차이 난 농장을 다시 계산해 저장했습니다.")
+        return 0
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+/**
+ * hooks/useInventory.ts 의 fetchStockMap / fetchGradeStockMap 루프를 그대로 옮겨
+ * 내보내기 파일로 실행하는 기준 구현 (farmdata.ledger 의 바이트 비교용).
+ *
+ * 사용 방법:
+ *   node scripts/farmdata/stock_reference.mjs exports/2026-03-10 [--max-rows 1000] > ref.ndjson
+ *   python -m farmdata.ledger exports/2026-03-10 --check ref.ndjson
+ */
+import fs from "node:fs";
+import path from "node:path";
+import zlib from "node:zlib";
+
+function loadTable(dir, table) {
+    for (const suffix of [".ndjson", ".jsonl", ".json"]) {
+        for (const name of [table + suffix, table + suffix + ".gz"]) {
+            const p = path.join(dir, name);
+            if (!fs.existsSync(p)) continue;
+            let raw = fs.readFileSync(p);
+            if (name.endsWith(".gz")) raw = zlib.gunzipSync(raw);
+            const text = raw.toString("utf-8").replace(/^﻿/, "");
+            if (suffix !== ".json") {
+                return text.split("\n").filter((l) => l.trim()).map((l) => JSON.parse(l));
+            }
+            const data = JSON.parse(text);
+            return Array.isArray(data) ? data : data.data;
+        }
+    }
+    throw new Error(`${dir}: ${table} 내보내기 파일이 없습니다.`);
+}
+
+const args = process.argv.slice(2);
+const dir = args[0];
+const mi = args.indexOf("--max-rows");
+const maxRows = mi >= 0 ? Number(args[mi + 1]) : Infinity;
+
+const harvest = loadTable(dir, "harvest_records");
+const sales = loadTable(dir, "sales_records");
+const adjust = loadTable(dir, "inventory_adjustments");
+
+// supabase.from(...).select(...).eq("farm_id", farmId)[.not("grade", "is", null)] 재현
+const query = (rows, farmId, graded) =>
+    rows.filter((r) => r.farm_id === farmId && (!graded || r.grade !== null && r.grade !== undefined)).slice(0, maxRows);
+
+function fetchStockMap(farmId) {
+    const harvestData = query(harvest, farmId, false);
+    const salesData = query(sales, farmId, false);
+    const adjustData = query(adjust, farmId, false);
+
+    const stock = {};
+    for (const r of harvestData ?? []) {
+        if (!r.crop_name) continue;
+        stock[r.crop_name] = (stock[r.crop_name] ?? 0) + Number(r.quantity ?? 0);
+    }
+    for (const r of salesData ?? []) {
+        if (!r.crop_name) continue;
+        stock[r.crop_name] = (stock[r.crop_name] ?? 0) - Number(r.quantity ?? 0);
+    }
+    for (const r of adjustData ?? []) {
+        if (!r.crop_name) continue;
+        stock[r.crop_name] = (stock[r.crop_name] ?? 0) + Number(r.quantity ?? 0);
+    }
+    return stock;
+}
+
+function fetchGradeStockMap(farmId) {
+    const harvestRes = { data: query(harvest, farmId, false) };
+    const salesRes = { data: query(sales, farmId, true) };
+    const adjRes = { data: query(adjust, farmId, true) };
+
+    const normGrade = (g) => {
+        switch (g) {
+            case "sang": case "상": case "특/상": return "sang";
+            case "jung": case "중": return "jung";
+            case "ha": case "하": return "ha";
+            default: return null;
+        }
+    };
+
+    const map = {};
+    const ensure = (crop) => { if (!map[crop]) map[crop] = { sang: 0, jung: 0, ha: 0 }; };
+
+    for (const r of harvestRes.data ?? []) {
+        if (!r.crop_name || !r.grade) continue;
+        const g = normGrade(r.grade); if (!g) continue;
+        ensure(r.crop_name);
+        map[r.crop_name][g] += Number(r.quantity ?? 0);
+    }
+    for (const r of salesRes.data ?? []) {
+        if (!r.crop_name || !r.grade) continue;
+        const g = normGrade(r.grade); if (!g) continue;
+        ensure(r.crop_name);
+        map[r.crop_name][g] -= Number(r.quantity ?? 0);
+    }
+    for (const r of adjRes.data ?? []) {
+        if (!r.crop_name || !r.grade) continue;
+        const g = normGrade(r.grade); if (!g) continue;
+        ensure(r.crop_name);
+        map[r.crop_name][g] += Number(r.quantity ?? 0);
+    }
+    return map;
+}
+
+const farms = [...new Set([...harvest, ...sales, ...adjust].map((r) => r.farm_id).filter((f) => f != null))].sort();
+for (const farmId of farms) {
+    const line = `{"farm_id":${JSON.stringify(farmId)},"stock":${JSON.stringify(fetchStockMap(farmId))},` +
+        `"gradeStock":${JSON.stringify(fetchGradeStockMap(farmId))}}`;
+    process.stdout.write(line + "\n");
+}
@@ -1,21 +1,33 @@
 ﻿from pathlib import Path
-import shutil
 
-target = Path("app/inventory/page.tsx")
-backup = target.with_suffix(".page.backup.tsx")
+from patchkit import Patch
+from patchkit.backup import BackupStore
+from patchkit.journal import APPLIED, PatchJournal, apply_journaled
 
-text = target.read_text(encoding="utf-8")
-shutil.copy2(target, backup)
+target = Path("app/inventory/page.tsx")
 
 # 필요한 치환들
-text = text.replace(
-    'input_quantity: Number(r.input_quantity ?? r.raw_input_quantity ?? 0),',
-    'input_quantity: Number(r.input_quantity ?? r.input_qty ?? r.raw_input_quantity ?? 0),'
-)
-text = text.replace('adjustment_type: "process_in"', 'adjustment_type: "correction"')
-text = text.replace('adjustment_type: "process_out"', 'adjustment_type: "correction"')
+PATCHES = [
+    Patch(
+        'input_quantity: Number(r.input_quantity ?? r.raw_input_quantity ?? 0),',
+        'input_quantity: Number(r.input_quantity ?? r.input_qty ?? r.raw_input_quantity ?? 0),',
+        count=None, required=False,
+    ),
+    Patch('adjustment_type: "process_in"', 'adjustment_type: "correction"', count=None, required=False),
+    Patch('adjustment_type: "process_out"', 'adjustment_type: "correction"', count=None, required=False),
+]
 
-target.write_text(text, encoding="utf-8")
+# 이미 적용된 상태면 백업/재기록 없이 종료 (내용이 바뀔 때만 .patchkit/backups 에 백업)
+journal = PatchJournal()
+store = BackupStore()
+status, _ = apply_journaled(target, PATCHES, journal, before_write=store.save)
+journal.save()
 
-print("OK patched:", target)
-print("backup    :", backup)
+if status == APPLIED:
+    print("already applied:", target)
+elif status == "unchanged":
+    print("no change   :", target)
+else:
+    rev = store.revisions(target)[-1]
+    print("OK patched:", target)
+    print("backup    :", f"{store.root} @ {rev['at']} (복원: python -m patchkit.backup restore {target.as_posix()} --at {rev['at']})")
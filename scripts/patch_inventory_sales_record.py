@@ -1,17 +1,14 @@
 ﻿# filepath: c:\Users\User\Desktop\제미나이 3\연습\claude\projects_001\farm-manager\scripts\patch_inventory_sales_record.py
 from pathlib import Path
 
-p = Path(r"app\inventory\page.tsx")
-s = p.read_text(encoding="utf-8")
+from patchkit import Patch, PatchError
+from patchkit.journal import APPLIED, PatchJournal, apply_journaled
 
-def replace_or_fail(src: str, dst: str):
-    global s
-    if src not in s:
-        raise SystemExit("패치 실패: 대상 코드 블록을 찾지 못했습니다.")
-    s = s.replace(src, dst, 1)
+p = Path(r"app\inventory\page.tsx")
 
+PATCHES = [
 # 1) state 추가
-replace_or_fail(
+Patch(
 '''    // 등급별 재고 현황 (원물 전용)
     const [gradeStockMap, setGradeStockMap] = useState<GradeStockMap>({});
     const nowKSTTimestamp = () => formatKSTDate(getNowKST());
@@ -22,10 +19,10 @@ replace_or_fail(
     const [salesRecordMap, setSalesRecordMap] = useState<Record<string, number>>({});
     const nowKSTTimestamp = () => formatKSTDate(getNowKST());
 '''
-)
+),
 
 # 2) loadAll 조회 확장 + 판매기록 맵 계산
-replace_or_fail(
+Patch(
 '''            const [stock, gradeStock, cropsRes, histRes, procRes] = await Promise.all([
                 fetchStockMap(farm.id),
                 fetchGradeStockMap(farm.id),
@@ -72,15 +69,22 @@ replace_or_fail(
             }
             setSalesRecordMap(saleMap);
 '''
-)
+),
 
 # 3) 카드 표시 로직 변경 (순재고와 판매기록 분리)
-replace_or_fail(
+Patch(
 '''                            const soldRecord = isProcessedNonTemp ? Math.max(-stock, 0) : 0;
 ''',
 '''                            const soldRecord = isProcessedNonTemp ? (salesRecordMap[crop.crop_name] ?? 0) : 0;
 '''
-)
+),
+]
+
+journal = PatchJournal()
+try:
+    status, _ = apply_journaled(p, PATCHES, journal)
+except PatchError as e:
+    raise SystemExit(str(e))
+journal.save()
 
-p.write_text(s, encoding="utf-8")
-print("patched:", p)
+print("already applied:" if status == APPLIED else "patched:", p)
@@ -1,17 +1,15 @@
 ﻿# filepath: c:\Users\User\Desktop\제미나이 3\연습\claude\projects_001\farm-manager\scripts\patch_inventory_show_processing_runs.py
 from pathlib import Path
 
-p = Path(r"app\inventory\page.tsx")
-s = p.read_text(encoding="utf-8")
+from patchkit import Patch, PatchError
+from patchkit.journal import APPLIED, PatchJournal, patch_set_id
+from patchkit.txn import PatchTransaction
 
-def rep(old: str, new: str):
-    global s
-    if old not in s:
-        raise SystemExit("패치 실패: 대상 코드 블록을 찾지 못했습니다.")
-    s = s.replace(old, new, 1)
+p = Path(r"app\inventory\page.tsx")
 
+PATCHES = [
 # 1) loadAll Promise.all에 processing_runs 조회 추가
-rep(
+Patch(
 '''            const [stock, gradeStock, cropsRes, histRes, procRes, saleRes] = await Promise.all([
                 fetchStockMap(farm.id),
                 fetchGradeStockMap(farm.id),
@@ -37,10 +35,10 @@ rep(
                     .eq("farm_id", farm.id)
                     .lt("quantity", 0),
             ]);'''
-)
+),
 
 # 2) processingHistory 세팅을 병합 로직으로 변경
-rep(
+Patch(
 '''            setStockMap(stock);
             setGradeStockMap(gradeStock);
             setFarmCrops(cropsRes.data ?? []);
@@ -75,10 +73,10 @@ rep(
             setProcessingHistory(mergedProcessing as ProcessingRecord[]);
 
             const saleMap: Record<string, number> = {};'''
-)
+),
 
 # 3) 렌더링 시 run 항목은 취소 버튼 숨김
-rep(
+Patch(
 '''                        {processingHistory.map(rec => {
                             const isCancelled = rec.is_cancelled;
                             const outIcon = cropIconMap[rec.output_crop_name] || "🍯";
@@ -90,9 +88,9 @@ rep(
                             const outIcon = cropIconMap[rec.output_crop_name] || "🍯";
                             const inputs = rec.inputs as { crop_name: string; quantity: number; unit: string }[];
                             return ('''
-)
+),
 
-rep(
+Patch(
 '''                                        {!isCancelled && (
                                             <button
                                                 onClick={() => handleProcessCancel(rec)}
@@ -111,7 +109,15 @@ rep(
                                                 취소
                                             </button>
                                         )}'''
-)
+),
+]
+
+# 임시 파일에 쓴 뒤 os.replace — 실패하면 원본은 그대로, 변경이 없으면 파일을 건드리지 않는다
+try:
+    with PatchTransaction(PatchJournal(), f"patch_inventory_show_processing_runs-{patch_set_id(PATCHES)}") as tx:
+        tx.apply(p, PATCHES)
+except PatchError as e:
+    raise SystemExit(str(e))
+status = tx.statuses[str(p)]
 
-p.write_text(s, encoding="utf-8")
-print("patched:", p)
+print("already applied:" if status == APPLIED else "patched:", p)
@@ -0,0 +1,24 @@
+"""app/ 페이지 패치 스크립트용 공용 도구."""
+from .engine import (
+    AnchorAutomaton,
+    Patch,
+    PatchError,
+    PatchResult,
+    apply_patches,
+    compile_patches,
+    patch_file,
+    plan_patches,
+    plan_spans,
+)
+
+__all__ = [
+    "AnchorAutomaton",
+    "Patch",
+    "PatchError",
+    "PatchResult",
+    "apply_patches",
+    "compile_patches",
+    "patch_file",
+    "plan_patches",
+    "plan_spans",
+]
@@ -0,0 +1,276 @@
+"""패치 대상 파일용 내용 주소(content-addressed) 백업 저장소.
+
+page.tsx.bak_20260310_111534 같은 통째 복사본 대신 .patchkit/backups/ 한 곳에
+sha256 으로 이름 붙인 객체를 쌓는다.
+
+- 같은 내용은 한 번만 저장한다 (중복 제거).
+- 새 리비전은 같은 파일의 직전 리비전에 대한 줄 단위 델타를 zlib 로 압축해 저장한다.
+  체인이 MAX_CHAIN 을 넘으면 전체본을 저장해 복원 비용을 묶어 둔다.
+- 시각(ISO)으로 리비전을 골라 복원한다.
+
+    python -m patchkit.backup save app/inventory/page.tsx
+    python -m patchkit.backup list app/inventory/page.tsx
+    python -m patchkit.backup restore app/inventory/page.tsx --at 2026-03-10T11:15 [--out 경로]
+    python -m patchkit.backup adopt app/inventory/page.tsx   # 기존 .bak*/.backup 사본 흡수
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import sys
+import zlib
+from datetime import datetime
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Sequence
+
+DEFAULT_BACKUP_DIR = Path(".patchkit/backups")
+MAX_CHAIN = 16
+
+
+def _encode_delta(base: bytes, data: bytes) -> bytes:
+    """base 에서 data 를 만드는 줄 단위 델타 (C시작,끝 = 복사 / I길이 = 삽입)."""
+    a = base.splitlines(keepends=True)
+    b = data.splitlines(keepends=True)
+    out: list[bytes] = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            out.append(b"C%d,%d\n" % (i1, i2))
+        elif j2 > j1:
+            chunk = b"".join(b[j1:j2])
+            out.append(b"I%d\n" % len(chunk))
+            out.append(chunk)
+    return b"".join(out)
+
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:
+    lines = base.splitlines(keepends=True)
+    out: list[bytes] = []
+    pos = 0
+    while pos < len(delta):
+        nl = delta.index(b"\n", pos)
+        head = delta[pos:nl]
+        pos = nl + 1
+        if head[:1] == b"C":
+            i1, i2 = map(int, head[1:].split(b","))
+            out.extend(lines[i1:i2])
+        else:
+            n = int(head[1:])
+            out.append(delta[pos:pos + n])
+            pos += n
+    return b"".join(out)
+
+
+def parse_when(value: str) -> datetime:
+    """'2026-03-10', '2026-03-10T11:15', '20260310_111534' 등을 받는다."""
+    v = value.strip()
+    for fmt in ("%Y%m%d_%H%M%S", "%Y%m%d%H%M%S", "%Y%m%d"):
+        try:
+            return datetime.strptime(v, fmt)
+        except ValueError:
+            pass
+    return datetime.fromisoformat(v)
+
+
+class BackupStore:
+    """객체: objects/<sha[:2]>/<sha[2:]> (zlib), 목록: index.json."""
+
+    def __init__(self, root: str | Path = DEFAULT_BACKUP_DIR, repo_root: str | Path | None = None):
+        self.root = Path(root)
+        # 기본 저장 위치(.patchkit/backups)의 두 단계 위가 저장소 루트
+        self.repo_root = Path(repo_root).resolve() if repo_root else self.root.resolve().parent.parent
+        self.index_path = self.root / "index.json"
+        self._index: dict = {"objects": {}, "files": {}}
+        if self.index_path.exists():
+            self._index = json.loads(self.index_path.read_text(encoding="utf-8"))
+
+    # --- 내부 ---------------------------------------------------------
+
+    def _key(self, path: str | Path) -> str:
+        p = Path(path).resolve()
+        try:
+            return p.relative_to(self.repo_root).as_posix()
+        except ValueError:
+            return p.as_posix()
+
+    def _object_path(self, sha: str) -> Path:
+        return self.root / "objects" / sha[:2] / sha[2:]
+
+    def _write_object(self, sha: str, payload: bytes) -> int:
+        target = self._object_path(sha)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        blob = zlib.compress(payload, 9)
+        tmp = target.with_name(target.name + f".{os.getpid()}.tmp")
+        tmp.write_bytes(blob)
+        os.replace(tmp, target)
+        return len(blob)
+
+    def _save_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    # --- 저장 ---------------------------------------------------------
+
+    def put(self, key: str, data: bytes) -> str:
+        """data 를 객체로 저장하고 sha 를 돌려준다. 이미 있으면 아무것도 쓰지 않는다."""
+        objects = self._index["objects"]
+        sha = hashlib.sha256(data).hexdigest()
+        if sha in objects:
+            return sha
+
+        revs = self._index["files"].get(key, [])
+        base = revs[-1]["sha"] if revs else None
+        depth = objects[base]["depth"] + 1 if base else 0
+        if base and depth <= MAX_CHAIN:
+            delta = _encode_delta(self.read_object(base), data)
+            if len(delta) < len(data):
+                stored = self._write_object(sha, b"D" + delta)
+                objects[sha] = {"base": base, "depth": depth, "size": len(data), "stored": stored}
+                return sha
+        stored = self._write_object(sha, b"F" + data)
+        objects[sha] = {"base": None, "depth": 0, "size": len(data), "stored": stored}
+        return sha
+
+    def save(self, path: str | Path, at: datetime | None = None) -> dict | None:
+        """path 의 현재 내용을 리비전으로 기록한다. 직전 리비전과 같으면 None."""
+        return self.save_bytes(path, Path(path).read_bytes(), at)
+
+    def save_bytes(self, path: str | Path, data: bytes, at: datetime | None = None) -> dict | None:
+        key = self._key(path)
+        revs = self._index["files"].setdefault(key, [])
+        sha = self.put(key, data)
+        if revs and revs[-1]["sha"] == sha:
+            return None
+        rev = {"at": (at or datetime.now()).isoformat(timespec="microseconds"), "sha": sha}
+        # 시각순 정렬 유지 (adopt 로 과거 사본을 넣는 경우)
+        ats = [r["at"] for r in revs]
+        revs.insert(bisect.bisect_right(ats, rev["at"]), rev)
+        self._save_index()
+        return rev
+
+    # --- 조회/복원 ----------------------------------------------------
+
+    def revisions(self, path: str | Path) -> list[dict]:
+        return list(self._index["files"].get(self._key(path), []))
+
+    def read_object(self, sha: str) -> bytes:
+        chain: list[bytes] = []
+        cur: str | None = sha
+        while True:
+            payload = zlib.decompress(self._object_path(cur).read_bytes())
+            if payload[:1] == b"F":
+                data = payload[1:]
+                break
+            chain.append(payload[1:])
+            cur = self._index["objects"][cur]["base"]
+        for delta in reversed(chain):
+            data = _apply_delta(data, delta)
+        return data
+
+    def find(self, path: str | Path, at: datetime | str | None = None) -> dict:
+        """at 시각 이전(포함)의 마지막 리비전. at 이 없으면 최신."""
+        revs = self.revisions(path)
+        if not revs:
+            raise FileNotFoundError(f"백업 없음: {path}")
+        if at is None:
+            return revs[-1]
+        when = at if isinstance(at, datetime) else parse_when(at)
+        idx = bisect.bisect_right([r["at"] for r in revs], when.isoformat(timespec="microseconds"))
+        if idx == 0:
+            raise FileNotFoundError(f"{when} 이전 백업 없음: {path}")
+        return revs[idx - 1]
+
+    def restore(self, path: str | Path, at: datetime | str | None = None, out: str | Path | None = None) -> dict:
+        rev = self.find(path, at)
+        Path(out or path).write_bytes(self.read_object(rev["sha"]))
+        return rev
+
+    def stats(self) -> dict:
+        objects = self._index["objects"].values()
+        return {
+            "files": len(self._index["files"]),
+            "revisions": sum(len(r) for r in self._index["files"].values()),
+            "objects": len(self._index["objects"]),
+            "raw_bytes": sum(o["size"] for o in objects),
+            "stored_bytes": sum(o["stored"] for o in objects),
+        }
+
+
+def sibling_copies(path: str | Path) -> list[Path]:
+    """page.tsx.bak_..., page.tsx.backup, page.page.backup.tsx 같은 기존 사본."""
+    p = Path(path)
+    stem = p.name.split(".")[0]
+    out = []
+    for c in p.parent.iterdir():
+        if c == p or not c.is_file():
+            continue
+        if c.name.startswith(p.name + ".") or (c.name.startswith(stem + ".") and "backup" in c.name):
+            out.append(c)
+    return sorted(out, key=copy_timestamp)
+
+
+def copy_timestamp(path: Path) -> datetime:
+    """사본 이름의 날짜(bak_20260310_111534 등)를 우선, 없으면 mtime."""
+    m = re.search(r"(20\d{6})[_-]?(\d{6})?", path.name)
+    if m:
+        try:
+            return parse_when(m.group(1) + ("_" + m.group(2) if m.group(2) else ""))
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(path.stat().st_mtime)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="내용 주소 백업 저장소")
+    ap.add_argument("--store", default=str(DEFAULT_BACKUP_DIR))
+    sub = ap.add_subparsers(dest="command", required=True)
+    sp = sub.add_parser("save")
+    sp.add_argument("files", nargs="+")
+    sp = sub.add_parser("list")
+    sp.add_argument("file")
+    sp = sub.add_parser("restore")
+    sp.add_argument("file")
+    sp.add_argument("--at", default=None, help="이 시각 이전의 마지막 리비전 (기본: 최신)")
+    sp.add_argument("--out", default=None, help="다른 경로로 복원")
+    sp = sub.add_parser("adopt", help="기존 .bak*/.backup 사본을 시각순으로 흡수")
+    sp.add_argument("file")
+    sp.add_argument("--remove", action="store_true", help="흡수한 사본 파일 삭제")
+    sub.add_parser("stats")
+    args = ap.parse_args(argv)
+
+    store = BackupStore(args.store)
+    if args.command == "save":
+        for f in args.files:
+            rev = store.save(f)
+            print(f"{'saved' if rev else 'same '} {f}" + (f"  {rev['at']} {rev['sha'][:12]}" if rev else ""))
+    elif args.command == "list":
+        objects = store._index["objects"]
+        for r in store.revisions(args.file):
+            o = objects[r["sha"]]
+            kind = "delta" if o["base"] else "full "
+            print(f"{r['at']}  {r['sha'][:12]}  {kind}  {o['size']:>8}B -> {o['stored']:>7}B")
+    elif args.command == "restore":
+        try:
+            rev = store.restore(args.file, args.at, args.out)
+        except FileNotFoundError as e:
+            raise SystemExit(str(e))
+        print(f"restored {args.out or args.file} <- {rev['at']} {rev['sha'][:12]}")
+    elif args.command == "adopt":
+        for c in sibling_copies(args.file):
+            store.save_bytes(args.file, c.read_bytes(), copy_timestamp(c))
+            print(f"adopted {c}")
+            if args.remove:
+                c.unlink()
+    elif args.command == "stats":
+        print(json.dumps(store.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
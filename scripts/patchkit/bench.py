@@ -0,0 +1,221 @@
+"""패치 전략 벤치마크 (합성 대형 TSX 페이지).
+
+실제 페이지(app/inventory/page.tsx, app/finance/page.tsx)를 이어 붙여 1만~20만 줄짜리
+합성 페이지를 만들고, 고유 표식 줄을 앵커로 삼는 패치 N개를 전략별로 적용한다.
+
+전략
+- naive  : `old in s` + `s.replace(old, new, 1)` 반복 (기존 patch_inventory_*.py)
+- regex  : `re.subn(re.escape(old), ..., count=1)` 반복 (fix_courier*.py 류)
+- engine : patchkit 단일 패스 엔진 (apply_patches, 검색 방식 자동 선택)
+- engine_ac : 같은 엔진이되 항상 Aho-Corasick 오토마톤으로 검색
+- dryrun : 엔진 구간 계획 + unified diff 스트리밍 (본문 재구성 없음)
+
+측정값: 벽시계 시간(반복 중 최솟값), tracemalloc 최대 사용량.
+복사한 바이트(est_bytes_copied)는 측정값이 아니라 전략이 만든 문자열 길이로 센 추정치다
+(naive/regex 는 치환마다 새 본문 전체, engine 은 조각 복사 + join 한 번을 본문 두 배로 잡는다).
+결과는 JSON 으로 저장하고, --baseline 을 주면 이전 보고서보다 느려진 항목을 표시한다.
+
+    python -m patchkit.bench                              # 기본 크기 전체
+    python -m patchkit.bench --lines 10000 --patches 5 20 --repeat 1
+    python -m patchkit.bench --baseline .patchkit/bench/last.json --tolerance 0.25
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Sequence
+
+from .diff import iter_unified_diff
+from .engine import AnchorAutomaton, Patch, apply_patches, compile_patches, plan_patches
+
+DEFAULT_SOURCES = ("app/inventory/page.tsx", "app/finance/page.tsx")
+DEFAULT_LINES = (10_000, 50_000, 100_000, 200_000)
+DEFAULT_PATCHES = (5, 20, 80)
+DEFAULT_OUT = Path(".patchkit/bench/last.json")
+
+
+def synthetic_page(source: str, target_lines: int, n_patches: int) -> tuple[str, list[Patch]]:
+    """source 를 target_lines 줄까지 반복하고, 고르게 흩어진 표식 줄 n_patches 개를 앵커로 쓴다."""
+    base = Path(source).read_text(encoding="utf-8-sig").splitlines(keepends=True)
+    lines = (base * (target_lines // len(base) + 1))[:target_lines]
+    step = max(3, target_lines // (n_patches + 1))
+    patches: list[Patch] = []
+    out: list[str] = []
+    next_mark = step
+    for i, line in enumerate(lines):
+        if i == next_mark and len(patches) < n_patches:
+            k = len(patches)
+            marker = f"    // @bench-anchor {k}\n"
+            old = marker + line + lines[i + 1] if i + 1 < len(lines) else marker + line
+            new = marker + line.rstrip("\n") + f" /* patched {k} */\n" + old[len(marker) + len(line):]
+            patches.append(Patch(old, new, name=f"anchor-{k}"))
+            out.append(marker)
+            next_mark += step
+        out.append(line)
+    return "".join(out), patches
+
+
+def _char_width(s: str) -> int:
+    """CPython 내부 표현의 글자당 바이트 (1/2/4)."""
+    if s.isascii():
+        return 1
+    return 2 if max(s) <= "\uffff" else 4
+
+
+def _naive(text: str, patches: Sequence[Patch]) -> tuple[str, int]:
+    copied = 0
+    s = text
+    for p in patches:
+        if p.old not in s:
+            raise SystemExit("패치 실패: 대상 코드 블록을 찾지 못했습니다.")
+        s = s.replace(p.old, p.new, 1)
+        copied += len(s)
+    return s, copied
+
+
+def _regex(text: str, patches: Sequence[Patch]) -> tuple[str, int]:
+    copied = 0
+    s = text
+    for p in patches:
+        s, n = re.subn(re.escape(p.old), lambda _m, new=p.new: new, s, count=1)
+        if not n:
+            raise SystemExit("패치 실패: 대상 코드 블록을 찾지 못했습니다.")
+        copied += len(s)
+    return s, copied
+
+
+def _engine(text: str, patches: Sequence[Patch]) -> tuple[str, int]:
+    result = apply_patches(text, patches, compile_patches(patches))
+    # 추정: 구간 조각 복사 + join 한 번
+    return result.text, 2 * len(result.text)
+
+
+def _engine_ac(text: str, patches: Sequence[Patch]) -> tuple[str, int]:
+    automaton = AnchorAutomaton([p.old for p in patches], method="automaton")
+    result = apply_patches(text, patches, automaton)
+    return result.text, 2 * len(result.text)
+
+
+def _dryrun(text: str, patches: Sequence[Patch]) -> tuple[str, int]:
+    plan = plan_patches(text, patches, compile_patches(patches))
+    size = sum(len(chunk) for chunk in iter_unified_diff(text, plan.spans, patches, "page.tsx"))
+    return "", size
+
+
+STRATEGIES: dict[str, Callable[[str, Sequence[Patch]], tuple[str, int]]] = {
+    "naive": _naive,
+    "regex": _regex,
+    "engine": _engine,
+    "engine_ac": _engine_ac,
+    "dryrun": _dryrun,
+}
+
+
+def measure(fn, text: str, patches: Sequence[Patch], repeat: int) -> dict:
+    best = float("inf")
+    out, copied = "", 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out, copied = fn(text, patches)
+        best = min(best, time.perf_counter() - t0)
+    del out
+    tracemalloc.start()
+    fn(text, patches)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"wall_s": best, "peak_bytes": peak, "est_bytes_copied": copied * _char_width(text)}
+
+
+def run_bench(
+    sources: Sequence[str] = DEFAULT_SOURCES,
+    sizes: Sequence[int] = DEFAULT_LINES,
+    patch_counts: Sequence[int] = DEFAULT_PATCHES,
+    strategies: Sequence[str] = tuple(STRATEGIES),
+    repeat: int = 3,
+    log=print,
+) -> list[dict]:
+    results = []
+    for source in sources:
+        for size in sizes:
+            for n in patch_counts:
+                text, patches = synthetic_page(source, size, n)
+                expected = None
+                for name in strategies:
+                    row = {"source": source, "lines": size, "chars": len(text), "patches": len(patches),
+                           "strategy": name, **measure(STRATEGIES[name], text, patches, repeat)}
+                    if name != "dryrun":
+                        got = STRATEGIES[name](text, patches)[0]
+                        expected = expected if expected is not None else got
+                        row["output_ok"] = got == expected
+                    results.append(row)
+                    log(f"{Path(source).parent.name:10s} {size:>7d}줄 패치 {len(patches):>3d} {name:9s}"
+                        f" {row['wall_s'] * 1e3:9.1f}ms  peak {row['peak_bytes'] / 1e6:7.1f}MB"
+                        f"  copied(추정) {row['est_bytes_copied'] / 1e6:8.1f}MB")
+    return results
+
+
+def _key(row: dict) -> tuple:
+    return row["source"], row["lines"], row["patches"], row["strategy"]
+
+
+def compare(results: Sequence[dict], baseline: Sequence[dict], tolerance: float) -> list[dict]:
+    """baseline 보다 wall_s 가 tolerance 이상 늘어난 항목."""
+    old = {_key(r): r for r in baseline}
+    regressions = []
+    for r in results:
+        b = old.get(_key(r))
+        if b and r["wall_s"] > b["wall_s"] * (1 + tolerance):
+            regressions.append({**dict(zip(("source", "lines", "patches", "strategy"), _key(r))),
+                                "baseline_s": b["wall_s"], "wall_s": r["wall_s"],
+                                "ratio": r["wall_s"] / b["wall_s"]})
+    return regressions
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="패치 전략 벤치마크")
+    ap.add_argument("--source", action="append", default=None, help="기준 페이지 (여러 번 지정 가능)")
+    ap.add_argument("--lines", type=int, nargs="+", default=list(DEFAULT_LINES))
+    ap.add_argument("--patches", type=int, nargs="+", default=list(DEFAULT_PATCHES))
+    ap.add_argument("--strategy", action="append", choices=list(STRATEGIES), default=None)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", default=str(DEFAULT_OUT), help="JSON 보고서 경로")
+    ap.add_argument("--baseline", default=None, help="비교할 이전 JSON 보고서")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="허용 지연 비율 (기본 0.25 = 25%%)")
+    args = ap.parse_args(argv)
+
+    results = run_bench(args.source or DEFAULT_SOURCES, args.lines, args.patches,
+                        args.strategy or tuple(STRATEGIES), args.repeat)
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    status = 0
+    if any(r.get("output_ok") is False for r in results):
+        print("경고: 전략 간 결과 본문이 다릅니다.", file=sys.stderr)
+        status = 1
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+        report["regressions"] = compare(results, baseline, args.tolerance)
+        for r in report["regressions"]:
+            print(f"느려짐: {r['strategy']} {r['lines']}줄 패치 {r['patches']}"
+                  f" {r['baseline_s'] * 1e3:.1f}ms -> {r['wall_s'] * 1e3:.1f}ms (x{r['ratio']:.2f})", file=sys.stderr)
+        status = status or (1 if report["regressions"] else 0)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"보고서: {out}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""UTF-8 바이트 수준 앵커 검색 (mmap).
+
+파일 전체를 str 로 디코드하지 않고, 앵커를 UTF-8 로 인코딩해 mmap 위에서 바로 찾는다.
+UTF-8 은 자기 동기화 부호라서 올바른 UTF-8 앵커의 바이트 일치는 항상 글자 경계에서
+시작하고 끝난다. 그래서 str 검색과 찾는 위치가 같다 (오프셋 단위만 바이트).
+결과 파일은 원본 조각(mmap 슬라이스)과 인코딩된 치환문을 임시 파일에 차례로 써서 만들고,
+디코드는 보고용으로 바뀌는 구간에만 한다.
+
+BOM(EF BB BF)은 본문 바이트의 일부로 보고 그대로 보존한다. encoding="utf-8-sig" 를
+주어도 앵커에는 BOM 을 붙이지 않는다.
+
+    python -m patchkit.bytescan "fetchStockMap(" --root app       # app/ 전체에서 앵커 위치
+    python -m patchkit.bytescan "processing_runs" "useInventory" --root app --suffix .tsx
+"""
+from __future__ import annotations
+
+import argparse
+import codecs
+import hashlib
+import mmap
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterator, Sequence
+
+from .engine import AnchorAutomaton, Patch, plan_spans
+from .txn import stage_path
+
+BOM = codecs.BOM_UTF8
+SOURCE_SUFFIXES = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".css", ".json", ".sql")
+SKIP_DIRS = {"node_modules", ".next", ".git", ".patchkit", "__pycache__"}
+
+
+def _anchor_codec(encoding: str) -> str:
+    name = codecs.lookup(encoding).name
+    return "utf-8" if name == "utf-8-sig" else name
+
+
+class BytePatchSet:
+    """패치 묶음의 앵커/치환문을 바이트로 인코딩해 두고 검색기를 함께 들고 있는다."""
+
+    def __init__(self, patches: Sequence[Patch], encoding: str = "utf-8"):
+        codec = _anchor_codec(encoding)
+        self.patches = list(patches)
+        self.encoding = codec
+        self.old = [p.old.encode(codec) for p in patches]
+        self.new = [p.new.encode(codec) for p in patches]
+        self.automaton = AnchorAutomaton(self.old)
+
+
+@dataclass
+class BytePlan:
+    spans: list[tuple[int, int, int]] = field(default_factory=list)  # (바이트 시작, 끝, 패치 번호)
+    counts: list[int] = field(default_factory=list)
+    missing: list[int] = field(default_factory=list)
+
+    def changed(self, pset: BytePatchSet) -> bool:
+        return any(pset.old[i] != pset.new[i] for _, _, i in self.spans)
+
+
+@contextmanager
+def mapped(path: str | Path) -> Iterator[mmap.mmap | bytes]:
+    """읽기 전용 mmap. 빈 파일은 mmap 할 수 없어 b"" 를 준다."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def plan_bytes(buf, pset: BytePatchSet) -> BytePlan:
+    """buf(bytes 또는 mmap) 에서 적용할 바이트 구간을 계산한다. 누락/충돌 시 PatchError."""
+    hits = pset.automaton.find_all(buf)
+    spans, counts, missing = plan_spans(hits, [len(a) for a in pset.old], pset.patches)
+    return BytePlan(spans, counts, missing)
+
+
+def iter_rendered(buf, plan: BytePlan, pset: BytePatchSet) -> Iterator[bytes]:
+    """결과 본문을 조각으로 내보낸다 (전체를 한 덩어리로 만들지 않음)."""
+    cursor = 0
+    for start, end, idx in plan.spans:
+        if start > cursor:
+            yield buf[cursor:start]
+        yield pset.new[idx]
+        cursor = end
+    if cursor < len(buf):
+        yield buf[cursor:]
+
+
+def write_rendered(buf, plan: BytePlan, pset: BytePatchSet, fp: BinaryIO) -> str:
+    """결과 본문을 fp 에 쓰고 sha256 을 돌려준다."""
+    h = hashlib.sha256()
+    for chunk in iter_rendered(buf, plan, pset):
+        h.update(chunk)
+        fp.write(chunk)
+    return h.hexdigest()
+
+
+def rendered_digest(buf, plan: BytePlan, pset: BytePatchSet) -> str:
+    h = hashlib.sha256()
+    for chunk in iter_rendered(buf, plan, pset):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def stage_rendered(path: str | Path, buf, plan: BytePlan, pset: BytePatchSet) -> tuple[Path, str]:
+    """결과를 path 옆 임시 파일에 쓴다. (임시 파일, 결과 sha256)."""
+    path = Path(path)
+    tmp = stage_path(path)
+    with open(tmp, "wb") as f:
+        digest = write_rendered(buf, plan, pset, f)
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+    except OSError:
+        pass
+    return tmp, digest
+
+
+def rewritten_regions(buf, plan: BytePlan, pset: BytePatchSet) -> list[tuple[int, str, str]]:
+    """바뀌는 구간만 디코드한다: (바이트 오프셋, 원래 내용, 새 내용)."""
+    return [
+        (start, bytes(buf[start:end]).decode(pset.encoding), pset.patches[idx].new)
+        for start, end, idx in plan.spans
+    ]
+
+
+def patch_file_bytes(path: str | Path, patches: Sequence[Patch], encoding: str = "utf-8") -> BytePlan:
+    """patch_file 의 바이트 버전. 내용이 바뀔 때만 임시 파일 + os.replace 로 교체한다."""
+    path = Path(path)
+    pset = BytePatchSet(patches, encoding)
+    tmp = None
+    with mapped(path) as buf:
+        plan = plan_bytes(buf, pset)
+        if plan.changed(pset):
+            tmp, _ = stage_rendered(path, buf, plan, pset)
+    if tmp is not None:
+        # Windows 에서는 mmap 을 닫은 뒤에야 교체할 수 있다
+        os.replace(tmp, path)
+    return plan
+
+
+def iter_files(root: str | Path, suffixes: Sequence[str] = SOURCE_SUFFIXES) -> Iterator[Path]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            if not suffixes or name.endswith(tuple(suffixes)):
+                yield Path(dirpath) / name
+
+
+def scan_tree(
+    root: str | Path, anchors: Sequence[str], suffixes: Sequence[str] = SOURCE_SUFFIXES, encoding: str = "utf-8"
+) -> Iterator[tuple[Path, int, int, int]]:
+    """root 아래 파일에서 앵커 위치를 찾는다: (파일, 앵커 번호, 바이트 오프셋, 줄 번호)."""
+    codec = _anchor_codec(encoding)
+    automaton = AnchorAutomaton([a.encode(codec) for a in anchors])
+    for path in iter_files(root, suffixes):
+        with mapped(path) as buf:
+            hits = sorted((pos, idx) for idx, positions in enumerate(automaton.find_all(buf)) for pos in positions)
+            line, cursor = 1, 0
+            for pos, idx in hits:
+                # 줄 번호는 앞 일치 이후 구간만 세므로 파일당 최대 한 번 훑는다
+                line += buf[cursor:pos].count(b"\n")
+                cursor = pos
+                yield path, idx, pos, line
+
+
+def line_at(buf, pos: int, encoding: str = "utf-8") -> str:
+    """pos 가 있는 줄만 디코드한다."""
+    start = buf.rfind(b"\n", 0, pos) + 1
+    end = buf.find(b"\n", pos)
+    raw = bytes(buf[start:len(buf) if end < 0 else end])
+    if start == 0 and raw.startswith(BOM):
+        raw = raw[len(BOM):]
+    return raw.decode(_anchor_codec(encoding), errors="replace").rstrip("\r")
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="mmap 으로 소스 트리에서 앵커 위치 찾기")
+    ap.add_argument("anchors", nargs="+", help="찾을 문자열 (여러 개 가능)")
+    ap.add_argument("--root", default="app", help="검색 디렉터리 (기본: app)")
+    ap.add_argument("--suffix", action="append", default=None, help="대상 확장자 (기본: 소스 파일 전체)")
+    ap.add_argument("--quiet", action="store_true", help="일치한 줄은 출력하지 않고 요약만")
+    args = ap.parse_args(argv)
+
+    suffixes = tuple(args.suffix) if args.suffix else SOURCE_SUFFIXES
+    t0 = time.perf_counter()
+    n_hits = 0
+    for path, idx, pos, line in scan_tree(args.root, args.anchors, suffixes):
+        n_hits += 1
+        if not args.quiet:
+            with mapped(path) as buf:
+                text = line_at(buf, pos)
+            print(f"{path.as_posix()}:{line}: {text.strip()}")
+    elapsed = time.perf_counter() - t0
+    files = list(iter_files(args.root, suffixes))
+    size = sum(f.stat().st_size for f in files)
+    print(f"\n{len(files)}개 파일 {size / 1e6:.1f}MB, 일치 {n_hits}건, {elapsed * 1e3:.1f}ms", file=sys.stderr)
+    return 0 if n_hits else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""패치 구간으로부터 바로 unified diff 를 만드는 스트리밍 미리보기.
+
+패치 결과 본문을 만들지 않고, 원본과 plan_patches 가 찾은 (start, end, patch) 구간만으로
+바뀌는 줄과 앞뒤 문맥 줄을 내보낸다. 메모리는 원본 한 벌 + 변경량에 비례한다.
+출력은 `git apply` / `patch -p1` 로 그대로 적용할 수 있는 형식이다.
+"""
+from __future__ import annotations
+
+from typing import Iterator, Sequence
+
+from .engine import Patch
+
+NO_EOL = "\\ No newline at end of file\n"
+
+
+def _lines(segment: str) -> list[str]:
+    """'\n' 기준으로만 나눈다 (str.splitlines 는 \u2028 등에서도 나눔)."""
+    if not segment:
+        return []
+    parts = segment.split("\n")
+    out = [p + "\n" for p in parts[:-1]]
+    if parts[-1]:
+        out.append(parts[-1])
+    return out
+
+
+def _emit(prefix: str, lines: list[str]) -> Iterator[str]:
+    for line in lines:
+        if line.endswith("\n"):
+            yield prefix + line
+        else:
+            yield prefix + line + "\n"
+            yield NO_EOL
+
+
+def _blocks(text: str, spans: Sequence[tuple[int, int, int]], patches: Sequence[Patch]):
+    """같은 줄을 건드리는 구간끼리 묶어 (줄 시작 오프셋, 줄 끝 오프셋, 새 내용) 블록을 만든다."""
+    block = None
+    for start, end, idx in spans:
+        ls = text.rfind("\n", 0, start) + 1
+        nl = text.find("\n", end - 1) if end > start else text.find("\n", start)
+        le = len(text) if nl < 0 else nl + 1
+        if block is not None and ls < block[1]:
+            # 앞 블록과 줄을 공유 → 합친다
+            b_ls, b_le, parts, cursor = block
+            parts.append(text[cursor:start])
+            parts.append(patches[idx].new)
+            block = [b_ls, max(b_le, le), parts, end]
+            continue
+        if block is not None:
+            yield _close_block(text, block)
+        block = [ls, le, [text[ls:start], patches[idx].new], end]
+    if block is not None:
+        yield _close_block(text, block)
+
+
+def _close_block(text: str, block) -> tuple[int, int, str]:
+    ls, le, parts, cursor = block
+    parts.append(text[cursor:le])
+    return ls, le, "".join(parts)
+
+
+def iter_unified_diff(
+    text: str,
+    spans: Sequence[tuple[int, int, int]],
+    patches: Sequence[Patch],
+    path: str,
+    context: int = 3,
+) -> Iterator[str]:
+    """spans (정렬됨, 겹치지 않음) 를 적용했을 때의 unified diff 를 줄 단위로 내보낸다."""
+    path = path.replace("\\", "/")
+    header_done = False
+
+    line_no = 1  # cursor 위치의 줄 번호
+    cursor = 0
+    delta = 0  # 지금까지 새 파일 줄 수 - 원본 줄 수
+
+    hunk: list[str] = []
+    hunk_old_start = hunk_new_start = 0
+    hunk_old_len = hunk_new_len = 0
+    hunk_end_off = 0  # 현재 hunk 에 포함된 원본의 끝 오프셋
+    hunk_end_line = 0
+
+    def flush():
+        yield f"@@ -{hunk_old_start},{hunk_old_len} +{hunk_new_start},{hunk_new_len} @@\n"
+        yield from hunk
+
+    for ls, le, new_block in _blocks(text, spans, patches):
+        line_no += text.count("\n", cursor, ls)
+        cursor = ls
+        old_lines = _lines(text[ls:le])
+        new_lines = _lines(new_block)
+        if old_lines == new_lines:
+            continue
+        # 블록 앞뒤의 같은 줄은 문맥으로 돌린다
+        k = 0
+        while k < min(len(old_lines), len(new_lines)) and old_lines[k] == new_lines[k]:
+            k += 1
+        j = 0
+        while j < min(len(old_lines), len(new_lines)) - k and old_lines[-1 - j] == new_lines[-1 - j]:
+            j += 1
+        if k:
+            ls += sum(map(len, old_lines[:k]))
+            line_no += k
+            cursor = ls
+        if j:
+            le -= sum(map(len, old_lines[len(old_lines) - j:]))
+        old_lines = old_lines[k:len(old_lines) - j]
+        new_lines = new_lines[k:len(new_lines) - j]
+
+        if not header_done:
+            yield f"--- a/{path}\n"
+            yield f"+++ b/{path}\n"
+            header_done = True
+
+        gap = line_no - hunk_end_line if hunk else None
+        if hunk and gap <= 2 * context:
+            # 이전 hunk 와 문맥이 이어짐 → 사이 줄을 문맥으로 넣는다
+            between = _lines(text[hunk_end_off:ls])
+            hunk.extend(_emit(" ", between))
+            hunk_old_len += len(between)
+            hunk_new_len += len(between)
+        else:
+            if hunk:
+                after = _context_after(text, hunk_end_off, context)
+                hunk.extend(_emit(" ", after))
+                hunk_old_len += len(after)
+                hunk_new_len += len(after)
+                yield from flush()
+            before_off = _context_before_offset(text, ls, context)
+            before = _lines(text[before_off:ls])
+            hunk = list(_emit(" ", before))
+            hunk_old_start = line_no - len(before)
+            hunk_new_start = hunk_old_start + delta
+            hunk_old_len = hunk_new_len = len(before)
+
+        hunk.extend(_emit("-", old_lines))
+        hunk.extend(_emit("+", new_lines))
+        hunk_old_len += len(old_lines)
+        hunk_new_len += len(new_lines)
+        delta += len(new_lines) - len(old_lines)
+        hunk_end_off = le
+        hunk_end_line = line_no + len(old_lines)
+
+    if hunk:
+        after = _context_after(text, hunk_end_off, context)
+        hunk.extend(_emit(" ", after))
+        hunk_old_len += len(after)
+        hunk_new_len += len(after)
+        yield from flush()
+
+
+def _context_before_offset(text: str, ls: int, context: int) -> int:
+    off = ls
+    for _ in range(context):
+        if off == 0:
+            break
+        off = text.rfind("\n", 0, off - 1) + 1
+    return off
+
+
+def _context_after(text: str, off: int, context: int) -> list[str]:
+    end = off
+    for _ in range(context):
+        if end >= len(text):
+            break
+        nl = text.find("\n", end)
+        end = len(text) if nl < 0 else nl + 1
+    return _lines(text[off:end])
+
+
+def unified_diff(text: str, spans, patches: Sequence[Patch], path: str, context: int = 3) -> str:
+    return "".join(iter_unified_diff(text, spans, patches, path, context))
@@ -0,0 +1,164 @@
+"""패치 적용 이력을 sha256 해시로 기록하는 저널.
+
+(패치 id, 파일) 마다 패치 전/후 본문 해시를 남겨 두고, 다시 실행했을 때
+파일 해시가 '패치 후' 해시와 같으면 앵커 검색·백업·재기록 없이 바로 건너뛴다.
+
+    python -m patchkit.journal status [--patch-id ID]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Sequence
+
+from .engine import Patch, PatchResult, apply_patches
+
+DEFAULT_JOURNAL_PATH = Path(".patchkit/journal.json")
+
+APPLIED = "applied"  # 파일이 이미 패치 후 상태
+PENDING = "pending"  # 파일이 기록된 패치 전 상태 (적용 가능)
+UNKNOWN = "unknown"  # 기록 없음 또는 이후 수정됨
+
+
+def file_digest(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def patch_set_id(patches: Sequence[Patch]) -> str:
+    """패치 내용으로 만든 id. 앵커나 치환문이 바뀌면 id 도 바뀐다."""
+    h = hashlib.sha256()
+    for p in patches:
+        for part in (p.old, p.new, str(p.count), str(p.required)):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+class PatchJournal:
+    """JSON 파일 하나에 {patch_id: {file: {before, after, at}}} 형태로 저장한다.
+
+    파일 경로는 root(기본: 저널 디렉터리의 상위 = 저장소 루트) 기준 상대 경로로 기록한다.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_JOURNAL_PATH, root: str | Path | None = None):
+        self.path = Path(path)
+        self.root = Path(root).resolve() if root else self.path.resolve().parent.parent
+        self._data: dict[str, dict[str, dict]] = {}
+        if self.path.exists():
+            self._data = json.loads(self.path.read_text(encoding="utf-8"))
+        self._dirty = False
+
+    def _key(self, file: str | Path) -> str:
+        p = Path(file).resolve()
+        try:
+            return p.relative_to(self.root).as_posix()
+        except ValueError:
+            return p.as_posix()
+
+    def lookup(self, patch_id: str, file: str | Path) -> dict | None:
+        return self._data.get(patch_id, {}).get(self._key(file))
+
+    def state(self, patch_id: str, file: str | Path, digest: str | None = None) -> str:
+        entry = self.lookup(patch_id, file)
+        if entry is None:
+            return UNKNOWN
+        digest = digest or file_digest(file)
+        if digest == entry["after"]:
+            return APPLIED
+        if digest == entry["before"]:
+            return PENDING
+        return UNKNOWN
+
+    def record(self, patch_id: str, file: str | Path, before: str, after: str) -> None:
+        self._data.setdefault(patch_id, {})[self._key(file)] = {
+            "before": before,
+            "after": after,
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self._dirty = True
+
+    def targets(self, patch_id: str) -> dict[str, str]:
+        """patch_id 로 기록된 파일 -> 패치 후 해시."""
+        return {f: e["after"] for f, e in self._data.get(patch_id, {}).items()}
+
+    def status(self, patch_id: str) -> dict[str, str]:
+        """patch_id 로 기록된 파일마다 현재 상태(applied/pending/unknown/missing)."""
+        out: dict[str, str] = {}
+        for f in sorted(self._data.get(patch_id, {})):
+            path = self.root / f
+            out[f] = self.state(patch_id, path) if path.exists() else "missing"
+        return out
+
+    def patch_ids(self) -> list[str]:
+        return sorted(self._data)
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._data, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def apply_journaled(
+    path: str | Path,
+    patches: Sequence[Patch],
+    journal: PatchJournal,
+    patch_id: str | None = None,
+    encoding: str = "utf-8",
+    before_write: Callable[[Path], None] | None = None,
+) -> tuple[str, PatchResult | None]:
+    """저널을 확인한 뒤 패치한다. (상태, 결과) 반환.
+
+    상태가 "applied" 이면 앵커를 찾거나 파일을 쓰지 않았고 결과는 None 이다.
+    before_write 는 실제로 내용이 바뀔 때만 쓰기 직전에 호출된다 (백업용).
+    """
+    path = Path(path)
+    patch_id = patch_id or patch_set_id(patches)
+    raw = path.read_bytes()
+    before = hashlib.sha256(raw).hexdigest()
+    if journal.state(patch_id, path, before) == APPLIED:
+        return APPLIED, None
+
+    src = raw.decode(encoding)
+    result = apply_patches(src, patches)
+    if result.text != src:
+        out = result.text.encode(encoding)
+        if before_write is not None:
+            before_write(path)
+        path.write_bytes(out)
+        journal.record(patch_id, path, before, hashlib.sha256(out).hexdigest())
+        return "patched", result
+    journal.record(patch_id, path, before, before)
+    return "unchanged", result
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="패치 저널 조회")
+    ap.add_argument("command", choices=["status"])
+    ap.add_argument("--journal", default=str(DEFAULT_JOURNAL_PATH))
+    ap.add_argument("--patch-id", default=None, help="생략하면 전체 패치 id")
+    args = ap.parse_args(argv)
+
+    journal = PatchJournal(args.journal)
+    ids = [args.patch_id] if args.patch_id else journal.patch_ids()
+    for pid in ids:
+        print(f"[{pid}]")
+        for f, st in journal.status(pid).items():
+            print(f"  {st:8s} {f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
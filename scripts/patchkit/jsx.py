@@ -0,0 +1,366 @@
+"""태그 균형을 맞춰 JSX 요소/표현식 구간을 찾는 선형 스캐너.
+
+`re.search(r'(<div className="fixed inset-0 z-\\[100\\].*?</div>\\s*</div>\\s*</div>)', ..., re.DOTALL)`
+처럼 닫는 태그 개수를 짐작하는 정규식 대신, 문자열·템플릿 리터럴·주석·정규식 리터럴과
+중첩된 {표현식} 안의 JSX 까지 건너뛰며 여는/닫는 태그를 짝지어 정확한 구간을 돌려준다.
+각 글자는 한 번만 본다.
+
+    span = find_element(src, "{/* ===== 택배 기록 상세/수정 팝업 모달 ===== */}")
+    span = find_element(src, 'className="fixed inset-0 z-[100]')
+    span = find_call(src, "    useEffect(() => {", start=...)
+
+    python -m patchkit.jsx bench      # 정규식 대비 선형성 확인
+"""
+from __future__ import annotations
+
+import re
+import sys
+import time
+
+_OPEN = "([{"
+_CLOSE = {")": "(", "]": "[", "}": "{"}
+# 이 글자 뒤의 '<' 는 JSX 시작, '/' 는 정규식 리터럴로 본다.
+_EXPR_START = set("([{,;:?=&|!~+-*%^<>")
+_KEYWORDS_BEFORE_EXPR = ("return", "typeof", "case", "default", "yield", "await", "else", "in", "of")
+# 평범한 글자는 건너뛰고 다음 관심 글자로 바로 이동한다 (C 수준 스캔).
+_EXPR_STOP = re.compile(r"[\"'`/<()\[\]{}]")
+_CHILD_STOP = re.compile(r"[<{]")
+
+
+class JsxError(ValueError):
+    """균형이 맞지 않거나 앵커를 찾지 못했을 때."""
+
+
+def _line_of(text: str, pos: int) -> int:
+    return text.count("\n", 0, pos) + 1
+
+
+def _skip_ws(text: str, i: int) -> int:
+    n = len(text)
+    while i < n and text[i].isspace():
+        i += 1
+    return i
+
+
+def _skip_string(text: str, i: int) -> int:
+    """i 는 따옴표 위치. 닫는 따옴표 다음 위치를 돌려준다."""
+    q = text[i]
+    i += 1
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == q:
+            return i + 1
+        if c == "\n" and q != "`":
+            break
+        i += 1
+    raise JsxError(f"문자열이 닫히지 않음 (line {_line_of(text, i)})")
+
+
+def _skip_template(text: str, i: int) -> int:
+    """i 는 백틱 위치. ${...} 안은 표현식으로 처리한다."""
+    i += 1
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "`":
+            return i + 1
+        if c == "$" and i + 1 < n and text[i + 1] == "{":
+            i = skip_expression(text, i + 1)
+            continue
+        i += 1
+    raise JsxError("템플릿 리터럴이 닫히지 않음")
+
+
+def _skip_comment(text: str, i: int) -> int:
+    if text.startswith("//", i):
+        nl = text.find("\n", i)
+        return len(text) if nl < 0 else nl
+    end = text.find("*/", i + 2)
+    if end < 0:
+        raise JsxError(f"주석이 닫히지 않음 (line {_line_of(text, i)})")
+    return end + 2
+
+
+def _skip_regex(text: str, i: int) -> int:
+    i += 1
+    n = len(text)
+    in_class = False
+    while i < n:
+        c = text[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "\n":
+            break
+        if in_class:
+            if c == "]":
+                in_class = False
+        elif c == "[":
+            in_class = True
+        elif c == "/":
+            i += 1
+            while i < n and (text[i].isalnum() or text[i] == "_"):
+                i += 1
+            return i
+        i += 1
+    raise JsxError(f"정규식 리터럴이 닫히지 않음 (line {_line_of(text, i)})")
+
+
+def _expr_position(text: str, prev: int, floor: int) -> bool:
+    """직전의 의미 있는 글자(prev, 주석/공백 제외)가 '값이 올 자리'를 뜻하는지 (JSX/정규식 판별용)."""
+    if prev < floor:
+        return True
+    c = text[prev]
+    if c in _EXPR_START:
+        return True
+    if c.isalnum() or c in "_$":
+        k = prev
+        while k >= floor and (text[k].isalnum() or text[k] in "_$"):
+            k -= 1
+        return text[k + 1:prev + 1] in _KEYWORDS_BEFORE_EXPR
+    return False
+
+
+def skip_expression(text: str, i: int, spans: list | None = None) -> int:
+    """i 의 '(' '[' '{' 와 짝이 맞는 닫는 괄호 다음 위치. 안의 JSX 도 처리한다 (spans: element_end 참고)."""
+    if text[i] not in _OPEN:
+        raise JsxError(f"괄호가 아님: {text[i]!r} (line {_line_of(text, i)})")
+    stack = [text[i]]
+    floor = i + 1
+    prev = i  # 직전의 의미 있는 글자 위치
+    i += 1
+    n = len(text)
+    while i < n:
+        m = _EXPR_STOP.search(text, i)
+        if m is None:
+            break
+        if m.start() > i:
+            # 건너뛴 구간의 마지막 비공백 글자가 직전 토큰
+            k = m.start() - 1
+            while k >= i and text[k].isspace():
+                k -= 1
+            if k >= i:
+                prev = k
+            i = m.start()
+        c = text[i]
+        if c == "/" and i + 1 < n and text[i + 1] in "/*":
+            i = _skip_comment(text, i)
+            continue
+        if c in "\"'":
+            i = _skip_string(text, i)
+        elif c == "`":
+            i = _skip_template(text, i)
+        elif c == "/" and _expr_position(text, prev, floor):
+            i = _skip_regex(text, i)
+        elif c == "<" and i + 1 < n and (text[i + 1].isalpha() or text[i + 1] == ">") and _expr_position(text, prev, floor):
+            i = element_end(text, i, spans)
+            # JSX 요소는 값이므로 뒤의 '<' '/' 는 연산자로 본다
+            prev = i - 1
+            while text[prev] == ">" and prev > floor:
+                prev -= 1
+            continue
+        elif c in _OPEN:
+            stack.append(c)
+            i += 1
+        elif c in _CLOSE:
+            if stack[-1] != _CLOSE[c]:
+                raise JsxError(f"괄호 짝이 맞지 않음: {c!r} (line {_line_of(text, i)})")
+            stack.pop()
+            i += 1
+            if not stack:
+                return i
+        else:  # 나눗셈 '/', 비교 '<'
+            i += 1
+        prev = i - 1
+    raise JsxError("괄호가 닫히지 않음")
+
+
+def _read_name(text: str, i: int) -> int:
+    n = len(text)
+    while i < n and (text[i].isalnum() or text[i] in "_$.-:"):
+        i += 1
+    return i
+
+
+def element_end(text: str, i: int, spans: list | None = None) -> int:
+    """i 의 '<' 로 시작하는 JSX 요소(또는 <>…</> 조각)가 끝나는 다음 위치.
+
+    spans 를 주면 이 요소와 안쪽 요소들의 [시작, 끝] 을 끝나는 순서대로 덧붙인다.
+    """
+    if text[i] != "<":
+        raise JsxError(f"'<' 가 아님 (line {_line_of(text, i)})")
+    n = len(text)
+    # 여는 태그
+    j = _read_name(text, i + 1)
+    name = text[i + 1:j]
+    while True:
+        j = _skip_ws(text, j)
+        if j >= n:
+            raise JsxError(f"<{name}> 여는 태그가 닫히지 않음 (line {_line_of(text, i)})")
+        c = text[j]
+        if text.startswith("/>", j):
+            if spans is not None:
+                spans.append([i, j + 2])
+            return j + 2
+        if c == ">":
+            j += 1
+            break
+        if c == "{":
+            j = skip_expression(text, j, spans)
+        elif c in "\"'":
+            j = _skip_string(text, j)
+        elif c == "/" and j + 1 < n and text[j + 1] in "/*":
+            j = _skip_comment(text, j)
+        else:
+            j += 1
+    # 자식 (텍스트는 건너뛰고 '<' '{' 에서만 멈춘다)
+    while j < n:
+        m = _CHILD_STOP.search(text, j)
+        if m is None:
+            break
+        j = m.start()
+        c = text[j]
+        if c == "{":
+            j = skip_expression(text, j, spans)
+        elif c == "<":
+            if text.startswith("</", j):
+                k = _read_name(text, _skip_ws(text, j + 2))
+                close = text[_skip_ws(text, j + 2):k]
+                if close != name:
+                    raise JsxError(
+                        f"<{name}> (line {_line_of(text, i)}) 가 </{close}> (line {_line_of(text, j)}) 로 닫힘"
+                    )
+                end = text.find(">", k)
+                if end < 0:
+                    raise JsxError(f"</{close}> 가 닫히지 않음")
+                if spans is not None:
+                    spans.append([i, end + 1])
+                return end + 1
+            j = element_end(text, j, spans)
+    raise JsxError(f"<{name}> (line {_line_of(text, i)}) 가 닫히지 않음")
+
+
+def _enclosing_tag_start(text: str, pos: int) -> int:
+    """pos 가 속한 여는 태그의 '<' 위치."""
+    k = pos
+    while True:
+        k = text.rfind("<", 0, k)
+        if k < 0:
+            raise JsxError(f"앵커를 감싸는 태그를 찾지 못함 (line {_line_of(text, pos)})")
+        if k + 1 < len(text) and text[k + 1].isalpha():
+            return k
+
+
+def find_element(text: str, anchor: str, start: int = 0) -> tuple[int, int]:
+    """앵커로 JSX 요소/표현식 구간 (시작, 끝) 을 찾는다.
+
+    - 앵커가 여는 태그 안(className="..." 등)이면 그 태그의 요소 전체.
+    - 그렇지 않으면 (주석 `{/* ... */}` 등) 앵커 바로 다음의 요소 또는 `{...}` 표현식.
+    """
+    j = element_start(text, anchor, start)
+    return j, (element_end if text[j] == "<" else skip_expression)(text, j)
+
+
+def element_start(text: str, anchor: str, start: int = 0) -> int:
+    """find_element 의 시작 위치 ('<' 또는 여는 괄호). 끝은 찾지 않는다."""
+    pos = text.find(anchor, start)
+    if pos < 0:
+        raise JsxError(f"앵커를 찾지 못함: {anchor[:60]!r}")
+
+    if text[pos] == "<" and text[pos + 1:pos + 2].isalpha():
+        return pos
+    # 앵커가 태그 속성 안에 있는지: 직전 '<' 이후로 '>' 가 없으면 태그 내부
+    lt = text.rfind("<", 0, pos)
+    if lt >= 0 and text[lt + 1:lt + 2].isalpha() and ">" not in text[lt:pos]:
+        return _enclosing_tag_start(text, pos + 1)
+
+    after = pos + len(anchor)
+    if anchor.lstrip().startswith("{/*") and not anchor.rstrip().endswith("}"):
+        close = text.find("*/}", after)
+        if close < 0:
+            raise JsxError("주석 앵커가 닫히지 않음")
+        after = close + 3
+    j = _skip_ws(text, after)
+    if j >= len(text):
+        raise JsxError("앵커 뒤에 요소가 없음")
+    if text[j] == "<" or text[j] in _OPEN:
+        return j
+    raise JsxError(f"앵커 뒤가 요소/표현식이 아님: {text[j:j + 20]!r} (line {_line_of(text, j)})")
+
+
+def find_call(text: str, anchor: str, start: int = 0, include_newline: bool = True) -> tuple[int, int]:
+    """`useEffect(() => {...}, [...]);` 같은 호출문 구간. 앵커 시작부터 짝 맞는 ')' 와 ';' 까지."""
+    pos = text.find(anchor, start)
+    if pos < 0:
+        raise JsxError(f"앵커를 찾지 못함: {anchor[:60]!r}")
+    paren = text.find("(", pos)
+    if paren < 0:
+        raise JsxError("호출 괄호가 없음")
+    end = skip_expression(text, paren)
+    if text.startswith(";", end):
+        end += 1
+    if include_newline:
+        if text.startswith("\r\n", end):
+            end += 2
+        elif text.startswith("\n", end):
+            end += 1
+    return pos, end
+
+
+# --- 벤치마크 --------------------------------------------------------------
+
+_MODAL_RE = re.compile(r'(<div className="fixed inset-0 z-\[100\].*?</div>\s*</div>\s*</div>)', re.DOTALL)
+
+
+def _synthetic_page(rows: int, broken: bool) -> str:
+    """rows 개 행을 가진 모달. broken 이면 정규식이 기대하는 3중 닫힘이 없는 팝업을 여러 개 둔다."""
+    row = '                <div className="flex gap-2"><span>{r.crop_name}</span><span>{r.quantity}</span></div>\n'
+    body = row * rows
+    modal = (
+        '<div className="fixed inset-0 z-[100] flex">\n'
+        '    <div className="absolute inset-0" onClick={() => setDetailModal(null)} />\n'
+        '    <div className="relative">\n' + body + "    </div>\n</div>\n"
+    )
+    if broken:
+        # 3중 닫힘이 없는 z-[100] 팝업이 반복되면 정규식은 시작점마다 끝까지 훑는다.
+        stub = '<div className="fixed inset-0 z-[100] flex">\n' + row * 4 + "</div>\n"
+        return "<>\n" + stub * max(1, rows // 8) + "</>\n"
+    return "<>\n" + modal + "</>\n"
+
+
+def bench(sizes=(500, 1000, 2000, 4000, 8000)) -> list[dict]:
+    results = []
+    for rows in sizes:
+        for broken in (False, True):
+            page = _synthetic_page(rows, broken)
+            t0 = time.perf_counter()
+            _MODAL_RE.search(page)
+            t_re = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            element_end(page, page.index("<"))
+            t_jsx = time.perf_counter() - t0
+            results.append({"rows": rows, "bytes": len(page), "case": "no-match" if broken else "match",
+                            "regex_s": t_re, "balanced_s": t_jsx})
+    return results
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] != ["bench"]:
+        print("사용법: python -m patchkit.jsx bench")
+        return 2
+    print(f"{'case':9s} {'rows':>6s} {'bytes':>9s} {'regex(ms)':>10s} {'balanced(ms)':>13s}")
+    for r in bench():
+        print(f"{r['case']:9s} {r['rows']:6d} {r['bytes']:9d} {r['regex_s'] * 1e3:10.2f} {r['balanced_s'] * 1e3:13.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""여러 파일에 같은 패치 묶음을 병렬로 적용하는 실행기.
+
+    python -m patchkit.runner --patches migration.json --glob "app/*/page.tsx" --glob "app/**/*.bak_final"
+
+(scripts/ 에서 실행하거나 PYTHONPATH=scripts 로 실행)
+
+패치 정의 JSON 형식: [{"old": "...", "new": "...", "count": 1, "required": true, "name": "..."}]
+파일별로 치환 횟수와 실패 사유를 보고하며, 출력 순서는 항상 파일 경로 정렬 순이다.
+
+--dry-run 이면 파일을 쓰지 않고 unified diff 를 표준 출력으로 흘려보낸다 (요약은 표준 에러).
+파일은 mmap 으로 열어 UTF-8 바이트 위에서 앵커를 찾고 결과를 임시 파일에 조각으로 써서
+교체하므로 본문 전체를 str 로 디코드하지 않는다 (patchkit.bytescan). --dry-run 만 디코드한다.
+한 번에 처리 중인 파일은 워커 수의 두 배로 제한되므로 파일 수가 많아도 메모리가 일정하다.
+
+--transaction 이면 모든 파일을 임시 파일로 스테이징한 뒤, 실패가 하나도 없을 때만
+한꺼번에 교체한다 (patchkit.txn). 실패가 있으면 어떤 파일도 바뀌지 않는다.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Sequence
+
+from .bytescan import BytePatchSet, mapped, plan_bytes, rendered_digest, stage_rendered
+from .diff import unified_diff
+from .engine import AnchorAutomaton, Patch, PatchError, compile_patches, plan_patches
+from .journal import APPLIED, PatchJournal, patch_set_id
+from .txn import StagedFile, TransactionError, commit_staged, discard_staged
+
+
+@dataclass
+class FileReport:
+    path: str
+    status: str  # "patched" | "unchanged" | "applied" | "failed" | "aborted"
+    counts: list[int] = field(default_factory=list)
+    error: str = ""
+    missing: list[str] = field(default_factory=list)
+    before: str = ""
+    after: str = ""
+    diff: str = ""
+    staged: str = ""  # 트랜잭션 모드에서 스테이징한 임시 파일
+
+
+def load_patches(path: str | Path) -> list[Patch]:
+    """JSON 패치 정의 파일을 읽는다."""
+    raw = json.loads(Path(path).read_text(encoding="utf-8-sig"))
+    if isinstance(raw, dict):
+        raw = raw.get("patches", [])
+    return [
+        Patch(
+            old=item["old"],
+            new=item["new"],
+            count=item.get("count", 1),
+            required=item.get("required", True),
+            name=item.get("name", ""),
+        )
+        for item in raw
+    ]
+
+
+def collect_files(patterns: Iterable[str], root: str | Path = ".") -> list[Path]:
+    """glob 패턴들에 걸리는 파일을 중복 없이 정렬해 돌려준다."""
+    root = Path(root)
+    found: set[Path] = set()
+    for pattern in patterns:
+        found.update(p for p in root.glob(pattern) if p.is_file())
+    return sorted(found)
+
+
+# 워커 프로세스마다 한 번만 오토마톤을 만든다.
+_worker_patches: Sequence[Patch] = ()
+_worker_automaton: AnchorAutomaton | None = None
+_worker_bytes: BytePatchSet | None = None
+_worker_write = True
+_worker_targets: dict[str, str] = {}
+_worker_diff = False
+_worker_stage = False
+
+
+def _init_worker(
+    patches: Sequence[Patch],
+    write: bool,
+    targets: dict[str, str] | None = None,
+    diff: bool = False,
+    stage: bool = False,
+) -> None:
+    global _worker_patches, _worker_automaton, _worker_bytes, _worker_write, _worker_targets, _worker_diff, _worker_stage
+    _worker_patches = patches
+    _worker_automaton = compile_patches(patches) if diff else None
+    _worker_bytes = None if diff else BytePatchSet(patches)
+    _worker_write = write
+    _worker_targets = targets or {}
+    _worker_diff = diff
+    _worker_stage = stage
+
+
+def _patch_one(path: str) -> FileReport:
+    if _worker_diff:
+        return _preview_one(path)
+    p = Path(path)
+    tmp = None
+    try:
+        with mapped(p) as buf:
+            before = hashlib.sha256(buf).hexdigest()
+            # 저널상 이미 패치 후 상태면 앵커 검색 없이 끝낸다.
+            if _worker_targets.get(path) == before:
+                return FileReport(path, APPLIED, before=before, after=before)
+            plan = plan_bytes(buf, _worker_bytes)
+            if not plan.changed(_worker_bytes):
+                return FileReport(path, "unchanged", counts=plan.counts, before=before, after=before)
+            if _worker_write:
+                tmp, after = stage_rendered(p, buf, plan, _worker_bytes)
+            else:
+                after = rendered_digest(buf, plan, _worker_bytes)
+        report = FileReport(path, "patched", counts=plan.counts, before=before, after=after)
+        if tmp is not None and _worker_stage:
+            report.staged = str(tmp)
+        elif tmp is not None:
+            os.replace(tmp, p)
+        return report
+    except PatchError as e:
+        return FileReport(path, "failed", error=str(e), missing=e.missing or [f"{a} <> {b}" for a, b in e.conflicts])
+    except OSError as e:
+        if tmp is not None and tmp.exists():
+            tmp.unlink()
+        return FileReport(path, "failed", error=str(e))
+
+
+def _preview_one(path: str) -> FileReport:
+    """dry-run: 결과 본문을 만들지 않고 구간에서 바로 diff 를 만든다."""
+    p = Path(path)
+    try:
+        raw = p.read_bytes()
+        before = hashlib.sha256(raw).hexdigest()
+        if _worker_targets.get(path) == before:
+            return FileReport(path, APPLIED, before=before, after=before)
+        src = raw.decode("utf-8")
+        del raw
+        plan = plan_patches(src, _worker_patches, _worker_automaton)
+    except PatchError as e:
+        return FileReport(path, "failed", error=str(e), missing=e.missing or [f"{a} <> {b}" for a, b in e.conflicts])
+    except (OSError, UnicodeDecodeError) as e:
+        return FileReport(path, "failed", error=str(e))
+    diff = unified_diff(src, plan.spans, _worker_patches, path)
+    return FileReport(path, "patched" if diff else "unchanged", counts=plan.counts, before=before, diff=diff)
+
+
+def _bounded_map(pool: ProcessPoolExecutor, fn: Callable, items: Iterable, window: int) -> Iterator:
+    """pool.map 과 같이 순서를 지키되, 진행 중인 작업을 window 개로 제한한다."""
+    it = iter(items)
+    pending = deque(pool.submit(fn, item) for item in islice(it, window))
+    while pending:
+        result = pending.popleft().result()
+        pending.extend(pool.submit(fn, item) for item in islice(it, 1))
+        yield result
+
+
+def iter_run(
+    patches: Sequence[Patch],
+    files: Sequence[str | Path],
+    workers: int | None = None,
+    write: bool = True,
+    journal: PatchJournal | None = None,
+    patch_id: str | None = None,
+    dry_run: bool = False,
+    transaction: bool = False,
+) -> Iterator[FileReport]:
+    """files 각각에 patches 를 적용하며 결과를 files 순서대로 내보낸다.
+
+    journal 을 주면 이미 패치 후 해시와 같은 파일은 건너뛰고,
+    적용(또는 무변경 확인)한 파일의 전/후 해시를 기록한다.
+    dry_run 이면 파일을 쓰지 않고 각 보고서의 diff 에 unified diff 를 담는다.
+    transaction 이면 전 파일을 스테이징한 뒤 모두 성공했을 때만 교체하므로,
+    보고서는 마지막 파일까지 처리한 다음에 나온다.
+    """
+    write = write and not dry_run
+    stage = transaction and write
+    paths = [str(f) for f in files]
+    if not paths:
+        return
+    targets: dict[str, str] = {}
+    if journal is not None:
+        patch_id = patch_id or patch_set_id(patches)
+        for p in paths:
+            entry = journal.lookup(patch_id, p)
+            if entry:
+                targets[p] = entry["after"]
+
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    if workers <= 1:
+        _init_worker(patches, write, targets, dry_run, stage)
+        reports: Iterable[FileReport] = map(_patch_one, paths)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(list(patches), write, targets, dry_run, stage)
+        )
+        reports = _bounded_map(pool, _patch_one, paths, window=workers * 2)
+    try:
+        if stage:
+            reports = _commit_all(list(reports))
+        for r in reports:
+            if journal is not None and write and r.status in ("patched", "unchanged"):
+                journal.record(patch_id, r.path, r.before, r.after)
+            yield r
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if journal is not None and write:
+            journal.save()
+
+
+def _commit_all(reports: list[FileReport]) -> list[FileReport]:
+    """스테이징된 파일을 한꺼번에 교체한다. 실패가 하나라도 있으면 모두 취소."""
+    staged = [StagedFile(Path(r.path), Path(r.staged), r.before, r.after) for r in reports if r.staged]
+    error = ""
+    if any(r.status == "failed" for r in reports):
+        discard_staged(staged)
+        error = "트랜잭션 취소: 다른 파일의 패치가 실패했습니다."
+    else:
+        try:
+            commit_staged(staged)
+        except (TransactionError, OSError) as e:
+            error = str(e)
+    for r in reports:
+        r.staged = ""
+        if error and r.status == "patched":
+            r.status, r.error = "aborted", error
+    return reports
+
+
+def run(*args, **kwargs) -> list[FileReport]:
+    """iter_run 의 결과를 목록으로 돌려준다."""
+    return list(iter_run(*args, **kwargs))
+
+
+def print_reports(
+    reports: Sequence[FileReport], patches: Sequence[Patch], as_json: bool = False, out=sys.stdout
+) -> None:
+    if as_json:
+        print(json.dumps([asdict(r) for r in reports], ensure_ascii=False, indent=2), file=out)
+        return
+    for r in reports:
+        if r.status == "failed":
+            print(f"FAIL  {r.path}: {r.error}", file=out)
+        elif r.status == "aborted":
+            print(f"ABORT {r.path}: {r.error}", file=out)
+        elif r.status == APPLIED:
+            print(f"DONE  {r.path}  (이미 적용됨)", file=out)
+        else:
+            detail = ", ".join(f"{patches[i].label}={n}" for i, n in enumerate(r.counts) if n)
+            line = f"{'OK   ' if r.status == 'patched' else 'SAME '} {r.path}" + (f"  ({detail})" if detail else "")
+            print(line, file=out)
+    n_ok = sum(r.status == "patched" for r in reports)
+    n_fail = sum(r.status == "failed" for r in reports)
+    n_done = sum(r.status == APPLIED for r in reports)
+    n_abort = sum(r.status == "aborted" for r in reports)
+    n_same = len(reports) - n_ok - n_fail - n_done - n_abort
+    summary = f"\n총 {len(reports)}개 파일: 패치 {n_ok}, 이미 적용 {n_done}, 변경 없음 {n_same}, 실패 {n_fail}"
+    if n_abort:
+        summary += f", 취소 {n_abort}"
+    print(summary, file=out)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="패치 묶음을 여러 파일에 병렬 적용")
+    ap.add_argument("--patches", required=True, help="패치 정의 JSON 파일")
+    ap.add_argument("--glob", action="append", required=True, help='대상 파일 glob (예: "app/*/page.tsx"), 여러 번 지정 가능')
+    ap.add_argument("--root", default=".", help="glob 기준 디렉터리 (기본: 현재 디렉터리)")
+    ap.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    ap.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    ap.add_argument("--journal", default=None, help="패치 저널 경로 (지정하면 이미 적용된 파일은 건너뜀)")
+    ap.add_argument("--patch-id", default=None, help="저널 기록용 패치 id (기본: 패치 내용 해시)")
+    ap.add_argument("--dry-run", action="store_true", help="파일을 쓰지 않고 unified diff 출력")
+    ap.add_argument("--transaction", action="store_true", help="모든 파일이 성공할 때만 한꺼번에 반영")
+    args = ap.parse_args(argv)
+
+    patches = load_patches(args.patches)
+    files = collect_files(args.glob, args.root)
+    journal = PatchJournal(args.journal) if args.journal else None
+    reports = []
+    for r in iter_run(patches, files, workers=args.workers, journal=journal, patch_id=args.patch_id,
+                      dry_run=args.dry_run, transaction=args.transaction):
+        if r.diff:
+            sys.stdout.write(r.diff)
+            r.diff = ""
+        reports.append(r)
+    print_reports(reports, patches, as_json=args.json, out=sys.stderr if args.dry_run else sys.stdout)
+    return 1 if any(r.status in ("failed", "aborted") for r in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""TSX 파일 구조 인덱스 (파일 내용 해시 기준 디스크 캐시).
+
+여러 패치 단계가 같은 파일을 다룰 때마다 `content.find(...)` 나 `lines[257:441]` 같은
+고정 줄 번호로 구간을 찾던 것을, 한 번 만든 구조 인덱스로 대신한다.
+
+- 괄호 짝 ( ) [ ] { } 의 위치, 호출 지점(callee 이름 + 괄호 구간 + 깊이), JSX 요소 구간,
+  줄 시작 오프셋을 한 번의 선형 스캔으로 모은다.
+- 결과는 .patchkit/index/<sha256>.json 에 저장된다. .pyc 처럼 내용 해시가 같으면
+  다시 스캔하지 않고 불러온다.
+- 조회는 정렬된 배열에 대한 이진 탐색(O(log n))이다. element() 는 앵커 문자열 위치만
+  text.find 로 한 번 찾고, 요소의 끝은 인덱스에서 꺼낸다.
+
+    idx = TsxIndex.for_file("app/courier/page.tsx")
+    ret = idx.component_return()             # 컴포넌트의 return ( ... )
+    states = idx.use_states()                 # {"detailModal": Region, ...}
+    blocks = idx.calls("Promise.all")         # Promise.all([...]) 호출들
+
+    python -m patchkit.tsxindex app/courier/page.tsx
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from .jsx import (
+    _EXPR_STOP,
+    _CLOSE,
+    _OPEN,
+    JsxError,
+    _expr_position,
+    _skip_comment,
+    _skip_regex,
+    _skip_string,
+    _skip_template,
+    element_end,
+    element_start,
+    skip_expression,
+)
+
+INDEX_VERSION = 2
+DEFAULT_CACHE_DIR = Path(".patchkit/index")
+
+# '(' 직전의 호출 대상: foo / a.b.c / useState<T[]> / return
+_CALLEE_RE = re.compile(r"([A-Za-z_$][\w$]*(?:\s*\.\s*[A-Za-z_$][\w$]*)*)\s*(?:<[^()]*>)?\s*$")
+_USE_STATE_DECL = re.compile(r"const\s*\[\s*([A-Za-z_$][\w$]*)\s*,\s*([A-Za-z_$][\w$]*)\s*\]\s*=\s*$")
+
+
+@dataclass(frozen=True)
+class Region:
+    kind: str
+    name: str
+    start: int
+    end: int
+    depth: int = 0
+
+    def text(self, source: str) -> str:
+        return source[self.start:self.end]
+
+
+def _lex(text: str) -> dict:
+    """괄호 짝, 호출 지점, JSX 구간을 수집한다."""
+    pairs: list[list[int]] = []  # [open, close]
+    calls: list[list] = []  # [callee, callee_start, open, close, depth]
+    jsx: list[list[int]] = []
+    stack: list[tuple[str, int, int | None]] = []  # (괄호, 위치, calls 내 번호)
+    prev = -1
+    i = 0
+    n = len(text)
+    while i < n:
+        m = _EXPR_STOP.search(text, i)
+        if m is None:
+            break
+        if m.start() > i:
+            k = m.start() - 1
+            while k >= i and text[k].isspace():
+                k -= 1
+            if k >= i:
+                prev = k
+            i = m.start()
+        c = text[i]
+        if c == "/" and i + 1 < n and text[i + 1] in "/*":
+            i = _skip_comment(text, i)
+            continue
+        if c in "\"'":
+            i = _skip_string(text, i)
+        elif c == "`":
+            i = _skip_template(text, i)
+        elif c == "/" and _expr_position(text, prev, 0):
+            i = _skip_regex(text, i)
+        elif c == "<" and i + 1 < n and (text[i + 1].isalpha() or text[i + 1] == ">") and _expr_position(text, prev, 0):
+            # 안쪽 요소까지 모두 jsx 에 쌓인다
+            i = element_end(text, i, jsx)
+            prev = i - 1
+            while text[prev] == ">" and prev > 0:
+                prev -= 1
+            continue
+        elif c in _OPEN:
+            call_no = None
+            if c == "(":
+                cm = _CALLEE_RE.search(text, max(0, i - 200), i)
+                if cm:
+                    call_no = len(calls)
+                    callee = re.sub(r"\s+", "", cm.group(1))
+                    calls.append([callee, cm.start(1), i, -1, len(stack)])
+            stack.append((c, i, call_no))
+            i += 1
+        elif c in _CLOSE:
+            if not stack or stack[-1][0] != _CLOSE[c]:
+                raise JsxError(f"괄호 짝이 맞지 않음: {c!r} (offset {i})")
+            _, open_at, call_no = stack.pop()
+            pairs.append([open_at, i])
+            if call_no is not None:
+                calls[call_no][3] = i
+            i += 1
+        else:
+            i += 1
+        prev = i - 1
+    if stack:
+        raise JsxError(f"닫히지 않은 괄호 {stack[-1][0]!r} (offset {stack[-1][1]})")
+
+    pairs.sort()
+    jsx.sort()
+    line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+    return {"version": INDEX_VERSION, "pairs": pairs, "calls": calls, "jsx": jsx, "line_starts": line_starts}
+
+
+class TsxIndex:
+    _memo: dict[str, "TsxIndex"] = {}
+
+    def __init__(self, text: str, data: dict, sha: str = ""):
+        self.text = text
+        self.sha = sha
+        self._opens = [p[0] for p in data["pairs"]]
+        self._closes = [p[1] for p in data["pairs"]]
+        self._line_starts = data["line_starts"]
+        self._jsx = [tuple(s) for s in data["jsx"]]
+        self._jsx_starts = [s for s, _ in self._jsx]
+        # 요소마다 감싸는 요소의 번호 (시작 위치 순서라서 스택 하나로 구한다)
+        self._jsx_parent: list[int] = []
+        stack: list[int] = []
+        for k, (s, _) in enumerate(self._jsx):
+            while stack and self._jsx[stack[-1]][1] <= s:
+                stack.pop()
+            self._jsx_parent.append(stack[-1] if stack else -1)
+            stack.append(k)
+        self._calls: dict[str, list[Region]] = {}
+        for callee, cstart, open_at, close_at, depth in data["calls"]:
+            self._calls.setdefault(callee, []).append(Region("call", callee, cstart, close_at + 1, depth))
+        # 호출은 여는 괄호 순서(= 시작 위치 오름차순)로 기록되므로 callee 별 시작 위치 배열을 한 번만 만든다
+        self._call_starts = {callee: [r.start for r in regions] for callee, regions in self._calls.items()}
+
+    @classmethod
+    def build(cls, text: str) -> "TsxIndex":
+        return cls(text, _lex(text))
+
+    @classmethod
+    def for_file(cls, path: str | Path, cache_dir: str | Path | None = DEFAULT_CACHE_DIR) -> "TsxIndex":
+        """파일 인덱스. 같은 내용이면 프로세스 메모리 → 디스크 캐시 순으로 재사용한다."""
+        raw = Path(path).read_bytes()
+        sha = hashlib.sha256(raw).hexdigest()
+        if sha in cls._memo:
+            return cls._memo[sha]
+        text = raw.decode("utf-8-sig")
+        data = None
+        cache = Path(cache_dir) / f"{sha}.json" if cache_dir else None
+        if cache is not None and cache.exists():
+            data = json.loads(cache.read_text(encoding="utf-8"))
+            if data.get("version") != INDEX_VERSION:
+                data = None
+        if data is None:
+            data = _lex(text)
+            if cache is not None:
+                cache.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cache.with_name(cache.name + f".{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+                os.replace(tmp, cache)
+        idx = cls(text, data, sha)
+        cls._memo[sha] = idx
+        return idx
+
+    # --- 위치 변환 ------------------------------------------------------
+
+    def line_of(self, offset: int) -> int:
+        """1부터 시작하는 줄 번호."""
+        return bisect.bisect_right(self._line_starts, offset)
+
+    def line_start(self, offset: int) -> int:
+        return self._line_starts[self.line_of(offset) - 1]
+
+    def line_end(self, offset: int) -> int:
+        """offset 이 있는 줄의 개행 다음 위치."""
+        ln = self.line_of(offset)
+        return self._line_starts[ln] if ln < len(self._line_starts) else len(self.text)
+
+    # --- 구조 조회 ------------------------------------------------------
+
+    def match(self, open_at: int) -> int:
+        """open_at 의 여는 괄호와 짝인 닫는 괄호 위치."""
+        k = bisect.bisect_left(self._opens, open_at)
+        if k == len(self._opens) or self._opens[k] != open_at:
+            raise KeyError(f"offset {open_at} 은 여는 괄호가 아님")
+        return self._closes[k]
+
+    def enclosing(self, offset: int) -> tuple[int, int] | None:
+        """offset 을 감싸는 가장 안쪽 괄호 쌍."""
+        k = bisect.bisect_right(self._opens, offset) - 1
+        while k >= 0:
+            if self._closes[k] >= offset:
+                return self._opens[k], self._closes[k]
+            k -= 1
+        return None
+
+    def jsx_at(self, offset: int) -> tuple[int, int] | None:
+        """offset 을 감싸는 가장 안쪽 JSX 요소."""
+        k = bisect.bisect_right(self._jsx_starts, offset) - 1
+        while k >= 0 and self._jsx[k][1] <= offset:
+            k = self._jsx_parent[k]
+        return self._jsx[k] if k >= 0 else None
+
+    def jsx_end(self, start: int) -> int:
+        """start 의 '<' 로 시작하는 JSX 요소의 끝. 인덱스에 없는 위치면 그 요소만 스캔한다."""
+        k = bisect.bisect_left(self._jsx_starts, start)
+        if k < len(self._jsx) and self._jsx[k][0] == start:
+            return self._jsx[k][1]
+        return element_end(self.text, start)
+
+    def calls(self, callee: str, depth: int | None = None, after: int = 0) -> list[Region]:
+        """callee 호출 구간들 (callee 시작 ~ 닫는 괄호). depth 는 감싸는 괄호 개수."""
+        regions = self._calls.get(callee, [])
+        k = bisect.bisect_left(self._call_starts.get(callee, []), after)
+        return [r for r in regions[k:] if depth is None or r.depth == depth]
+
+    def returns(self) -> list[Region]:
+        return [Region("return", "return", r.start, r.end, r.depth) for r in self.calls("return")]
+
+    def component_return(self) -> Region:
+        """컴포넌트 함수 본문 바로 아래의 return ( ... ) — 가장 얕은 것 중 마지막."""
+        rets = self.returns()
+        if not rets:
+            raise JsxError("return ( 를 찾지 못함")
+        shallow = min(r.depth for r in rets)
+        return [r for r in rets if r.depth == shallow][-1]
+
+    def use_states(self) -> dict[str, Region]:
+        """`const [x, setX] = useState(...);` 선언 줄 구간 (줄 시작 ~ 줄 끝)."""
+        out: dict[str, Region] = {}
+        for r in self.calls("useState"):
+            ls = self.line_start(r.start)
+            m = _USE_STATE_DECL.search(self.text, ls, r.start)
+            if m:
+                out[m.group(1)] = Region("useState", m.group(1), ls, self.line_end(r.end - 1), r.depth)
+        return out
+
+    def statement(self, region: Region) -> Region:
+        """호출 구간을 앞의 `const ... =` / `await` 와 뒤의 ';' 까지 넓혀 줄 단위로 돌려준다."""
+        end = region.end
+        if self.text.startswith(";", end):
+            end += 1
+        return Region(region.kind, region.name, self.line_start(region.start), self.line_end(end - 1), region.depth)
+
+    def element(self, anchor: str, within: Region | None = None) -> Region:
+        """within 구간 안에서 앵커로 JSX 요소를 찾는다 (jsx.find_element 와 같은 규칙)."""
+        start = within.start if within else 0
+        s = element_start(self.text, anchor, start)
+        e = self.jsx_end(s) if self.text[s] == "<" else skip_expression(self.text, s)
+        if within and e > within.end:
+            raise JsxError(f"앵커가 구간 밖에 있음: {anchor[:40]!r}")
+        return Region("jsx", anchor[:40], s, e)
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("사용법: python -m patchkit.tsxindex <file.tsx> [callee ...]")
+        return 2
+    idx = TsxIndex.for_file(argv[0])
+    ret = idx.component_return()
+    print(f"{argv[0]} ({idx.sha[:12]})")
+    print(f"  component return : line {idx.line_of(ret.start)}-{idx.line_of(ret.end)}")
+    states = idx.use_states()
+    print(f"  useState         : {len(states)}개 ({', '.join(list(states)[:8])}{' ...' if len(states) > 8 else ''})")
+    for callee in argv[1:] or ["Promise.all", "useEffect"]:
+        spans = [f"{idx.line_of(r.start)}-{idx.line_of(r.end)}" for r in idx.calls(callee)]
+        print(f"  {callee:16s} : {', '.join(spans) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
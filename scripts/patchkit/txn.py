@@ -0,0 +1,230 @@
+"""여러 파일 패치를 한 트랜잭션으로 적용한다.
+
+각 파일의 결과는 같은 디렉터리의 임시 파일(.page.tsx.<pid>.patchkit-tmp)에 먼저 쓰고,
+모든 패치가 성공했을 때만 os.replace 로 한꺼번에 바꿔 넣는다. 하나라도 실패하면
+원본은 그대로 두고 임시 파일만 지운다. 내용이 바뀌지 않은 파일은 아예 쓰지 않으므로
+mtime 이 유지되어 Next.js 재빌드/핫 리로드가 일어나지 않는다.
+
+    with PatchTransaction(journal=PatchJournal(), patch_id="courier_modal") as tx:
+        tx.apply("app/courier/page.tsx", STEP1)
+        tx.apply("app/courier/page.tsx", STEP2)      # STEP1 결과 위에 적용
+        tx.apply("app/inventory/page.tsx", PATCHES)
+    # 블록이 예외 없이 끝나면 commit, 예외가 나면 rollback
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Sequence
+
+from .engine import Patch, PatchResult, apply_patches
+from .journal import APPLIED, PatchJournal, file_digest
+
+STAGE_SUFFIX = ".patchkit-tmp"
+
+
+class TransactionError(Exception):
+    """스테이징 이후 원본이 바뀌었거나 교체 중 실패해 트랜잭션을 되돌렸을 때."""
+
+
+@dataclass
+class StagedFile:
+    path: Path
+    tmp: Path
+    before: str  # 스테이징 시점 원본 해시
+    after: str
+
+
+def stage_path(path: str | Path, tag: str = "") -> Path:
+    """path 와 같은 디렉터리의 임시 파일 경로 (같은 파일 시스템이어야 os.replace 가 원자적)."""
+    path = Path(path)
+    return path.with_name(f".{path.name}.{os.getpid()}{tag}{STAGE_SUFFIX}")
+
+
+def write_staged(path: str | Path, data: bytes) -> Path:
+    """data 를 path 옆 임시 파일에 쓰고 디스크에 내린다. 권한 비트는 원본을 따른다."""
+    path = Path(path)
+    tmp = stage_path(path)
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        shutil.copymode(path, tmp)
+    except OSError:
+        pass
+    return tmp
+
+
+def discard_staged(staged: Sequence[StagedFile]) -> None:
+    for s in staged:
+        try:
+            s.tmp.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _keep_original(path: Path) -> Path:
+    """되돌리기용으로 원본을 하드 링크(안 되면 복사)로 남겨 둔다."""
+    keep = stage_path(path, ".orig")
+    try:
+        keep.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(path, keep)
+    except OSError:
+        shutil.copy2(path, keep)
+    return keep
+
+
+def commit_staged(
+    staged: Sequence[StagedFile], before_write: Callable[[Path], None] | None = None
+) -> None:
+    """스테이징한 파일을 모두 원본 자리로 교체한다.
+
+    스테이징 이후 원본이 바뀐 파일이 있으면 아무것도 바꾸지 않고 TransactionError.
+    교체 도중 실패하면 이미 바꾼 파일을 원래 내용으로 되돌린 뒤 예외를 다시 던진다.
+    before_write 는 교체 전에 파일마다 호출된다 (백업용).
+    """
+    moved = [s.path for s in staged if file_digest(s.path) != s.before]
+    if moved:
+        discard_staged(staged)
+        raise TransactionError(
+            "트랜잭션 취소: 스테이징 이후 파일이 수정되었습니다. -> " + ", ".join(map(str, moved))
+        )
+
+    kept: list[tuple[StagedFile, Path, bool]] = []  # (파일, 원본 사본, 교체 여부)
+    try:
+        if before_write is not None:
+            for s in staged:
+                before_write(s.path)
+        for s in staged:
+            kept.append((s, _keep_original(s.path), False))
+            os.replace(s.tmp, s.path)
+            kept[-1] = (s, kept[-1][1], True)
+    except BaseException:
+        for s, keep, replaced in reversed(kept):
+            if replaced:
+                os.replace(keep, s.path)
+        discard_staged(staged)
+        raise
+    finally:
+        for _, keep, _ in kept:
+            try:
+                keep.unlink()
+            except FileNotFoundError:
+                pass
+
+
+@dataclass
+class _Entry:
+    raw: bytes
+    before: str
+    text: str
+    applied: bool = False  # 저널상 이미 패치 후 상태
+
+
+class PatchTransaction:
+    """여러 파일·여러 단계 패치를 메모리에서 누적한 뒤 한꺼번에 반영한다.
+
+    같은 파일에 apply 를 여러 번 부르면 앞 단계 결과 위에 이어서 적용한다.
+    journal 을 주면 patch_id 로 이미 패치 후 상태인 파일은 건너뛰고, commit 후 전/후 해시를 기록한다.
+    """
+
+    def __init__(
+        self,
+        journal: PatchJournal | None = None,
+        patch_id: str | None = None,
+        encoding: str = "utf-8",
+        before_write: Callable[[Path], None] | None = None,
+    ):
+        if journal is not None and not patch_id:
+            raise ValueError("journal 을 쓰려면 patch_id 가 필요합니다.")
+        self.journal = journal
+        self.patch_id = patch_id
+        self.encoding = encoding
+        self.before_write = before_write
+        self._files: dict[Path, _Entry] = {}
+        self.statuses: dict[str, str] = {}
+
+    def __enter__(self) -> "PatchTransaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def _entry(self, path: str | Path) -> _Entry:
+        key = Path(path)
+        entry = self._files.get(key)
+        if entry is None:
+            raw = key.read_bytes()
+            before = hashlib.sha256(raw).hexdigest()
+            entry = _Entry(raw, before, raw.decode(self.encoding))
+            if self.journal is not None and self.journal.state(self.patch_id, key, before) == APPLIED:
+                entry.applied = True
+            self._files[key] = entry
+        return entry
+
+    def read(self, path: str | Path) -> str:
+        """지금까지 스테이징된 본문 (처음이면 디스크 내용)."""
+        return self._entry(path).text
+
+    def write(self, path: str | Path, text: str) -> None:
+        """직접 편집한 본문을 스테이징한다 (패치 정의로 표현하기 어려운 편집용)."""
+        entry = self._entry(path)
+        if not entry.applied:
+            entry.text = text
+
+    def applied(self, path: str | Path) -> bool:
+        return self._entry(path).applied
+
+    def apply(self, path: str | Path, patches: Sequence[Patch]) -> PatchResult | None:
+        """스테이징된 본문에 patches 를 적용한다. 저널상 이미 적용된 파일이면 None."""
+        entry = self._entry(path)
+        if entry.applied:
+            return None
+        result = apply_patches(entry.text, patches)
+        entry.text = result.text
+        return result
+
+    def commit(self) -> dict[str, str]:
+        """바뀐 파일만 임시 파일로 쓰고 모두 교체한다. 파일별 상태를 돌려준다."""
+        staged: list[StagedFile] = []
+        statuses: dict[str, str] = {}
+        try:
+            for path, entry in self._files.items():
+                if entry.applied:
+                    statuses[str(path)] = APPLIED
+                    continue
+                out = entry.text.encode(self.encoding)
+                if out == entry.raw:
+                    statuses[str(path)] = "unchanged"
+                    continue
+                staged.append(StagedFile(path, write_staged(path, out), entry.before, hashlib.sha256(out).hexdigest()))
+                statuses[str(path)] = "patched"
+        except BaseException:
+            discard_staged(staged)
+            raise
+        commit_staged(staged, self.before_write)
+
+        if self.journal is not None:
+            after = {s.path: s.after for s in staged}
+            for path, entry in self._files.items():
+                if not entry.applied:
+                    self.journal.record(self.patch_id, path, entry.before, after.get(path, entry.before))
+            self.journal.save()
+        self._files.clear()
+        self.statuses = statuses
+        return statuses
+
+    def rollback(self) -> None:
+        """스테이징한 내용을 버린다 (디스크는 건드리지 않았음)."""
+        self._files.clear()
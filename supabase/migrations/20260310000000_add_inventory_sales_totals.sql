@@ -0,0 +1,122 @@
+-- ============================================================
+-- 품목별 누적 판매기록 집계 (inventory_sales_totals)
+-- 목적: 재고 화면 loadAll 이 quantity < 0 인 inventory_adjustments 전체를 매번 읽어
+--       adjustment_type / reason(/판매|출고/) 로 분류하던 것을,
+--       행이 쓰일 때 한 번만 분류하고 (farm_id, crop_name) 별 합계로 유지한다.
+-- 화면은 농장당 품목 수만큼의 행을 한 번 조회한다.
+-- ============================================================
+
+-- 1. 분류 결과 (행 INSERT/UPDATE 시 한 번 계산되어 저장)
+--    app/inventory/page.tsx 의 기존 분류와 같다:
+--    quantity < 0 이고 (유형이 sale/shipment/delivery/order_out 이거나 사유에 판매|출고 포함)
+--    → |quantity| 를 판매기록으로 집계
+ALTER TABLE public.inventory_adjustments
+ADD COLUMN IF NOT EXISTS sales_out_qty NUMERIC(10,2)
+GENERATED ALWAYS AS (
+    CASE
+        WHEN quantity < 0
+         AND crop_name <> ''
+         AND (
+             adjustment_type IN ('sale', 'shipment', 'delivery', 'order_out')
+             OR COALESCE(reason, '') ~ '판매|출고'
+         )
+        THEN -quantity
+        ELSE 0
+    END
+) STORED;
+
+-- 2. 집계 테이블
+CREATE TABLE IF NOT EXISTS public.inventory_sales_totals (
+    farm_id UUID NOT NULL REFERENCES public.farms(id) ON DELETE CASCADE,
+    crop_name TEXT NOT NULL,
+    total_qty NUMERIC(14,2) NOT NULL DEFAULT 0,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (farm_id, crop_name)
+);
+
+-- RLS (조회만 허용, 쓰기는 트리거가 담당)
+ALTER TABLE public.inventory_sales_totals ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_policies
+    WHERE schemaname='public' AND tablename='inventory_sales_totals' AND policyname='inventory_sales_totals_owner'
+  ) THEN
+    EXECUTE $pol$
+      CREATE POLICY "inventory_sales_totals_owner" ON public.inventory_sales_totals
+      FOR SELECT
+      USING (farm_id IN (SELECT id FROM public.farms WHERE owner_id = auth.uid()))
+    $pol$;
+  END IF;
+
+  IF to_regclass('public.profiles') IS NOT NULL THEN
+    IF NOT EXISTS (
+      SELECT 1 FROM pg_policies
+      WHERE schemaname='public' AND tablename='inventory_sales_totals' AND policyname='inventory_sales_totals_admin'
+    ) THEN
+      EXECUTE $pol$
+        CREATE POLICY "inventory_sales_totals_admin" ON public.inventory_sales_totals
+        FOR SELECT
+        USING (EXISTS (SELECT 1 FROM public.profiles WHERE id = auth.uid() AND role = 'admin'))
+      $pol$;
+    END IF;
+  END IF;
+END $$;
+
+GRANT SELECT ON TABLE public.inventory_sales_totals TO authenticated;
+
+-- 3. 트리거: 조정 행이 바뀔 때 해당 (농장, 품목) 합계만 증감
+CREATE OR REPLACE FUNCTION apply_inventory_sales_total()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.farm_id = NEW.farm_id
+       AND OLD.crop_name = NEW.crop_name
+       AND OLD.sales_out_qty = NEW.sales_out_qty THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.sales_out_qty > 0 THEN
+        UPDATE public.inventory_sales_totals
+        SET total_qty = total_qty - OLD.sales_out_qty,
+            row_count = row_count - 1,
+            updated_at = NOW()
+        WHERE farm_id = OLD.farm_id AND crop_name = OLD.crop_name;
+
+        DELETE FROM public.inventory_sales_totals
+        WHERE farm_id = OLD.farm_id AND crop_name = OLD.crop_name AND row_count <= 0;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.sales_out_qty > 0 THEN
+        INSERT INTO public.inventory_sales_totals (farm_id, crop_name, total_qty, row_count)
+        VALUES (NEW.farm_id, NEW.crop_name, NEW.sales_out_qty, 1)
+        ON CONFLICT (farm_id, crop_name) DO UPDATE
+        SET total_qty = inventory_sales_totals.total_qty + EXCLUDED.total_qty,
+            row_count = inventory_sales_totals.row_count + 1,
+            updated_at = NOW();
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+-- 4. 기존 행 집계 (다시 실행해도 같은 결과)
+DELETE FROM public.inventory_sales_totals;
+
+INSERT INTO public.inventory_sales_totals (farm_id, crop_name, total_qty, row_count)
+SELECT farm_id, crop_name, SUM(sales_out_qty), COUNT(*)
+FROM public.inventory_adjustments
+WHERE sales_out_qty > 0
+GROUP BY farm_id, crop_name;
+
+DROP TRIGGER IF EXISTS inventory_sales_total_sync ON public.inventory_adjustments;
+CREATE TRIGGER inventory_sales_total_sync
+    AFTER INSERT OR UPDATE OR DELETE ON public.inventory_adjustments
+    FOR EACH ROW
+    EXECUTE FUNCTION apply_inventory_sales_total();
@@ -0,0 +1,198 @@
+-- ============================================================
+-- 고객별 최근 배송지 세트 (customer_address_sets)
+-- 목적: 택배 화면에서 고객을 고를 때마다 getRecentAddressSets 가 sales_records 50행을 읽어
+--       (수령인|주소) 로 중복을 지우던 것을,
+--       판매 행이 쓰일 때 (고객, 수령인|주소) 별 최신 세트 한 행으로 유지한다.
+-- 화면은 (customer_id, last_used DESC) 인덱스로 5행을 한 번 조회한다.
+-- 차이: 기존 방식은 최근 50건 안의 세트만 보였지만, 여기서는 이력 전체에서 최근 세트 5개를 고른다.
+-- ============================================================
+
+-- 0. 택배 화면이 쓰는 수령인 열 (운영 DB 에는 이미 있을 수 있다)
+ALTER TABLE public.sales_records ADD COLUMN IF NOT EXISTS recipient_name TEXT;
+ALTER TABLE public.sales_records ADD COLUMN IF NOT EXISTS recipient_phone TEXT;
+ALTER TABLE public.sales_records ADD COLUMN IF NOT EXISTS detail_address TEXT;
+ALTER TABLE public.sales_records ADD COLUMN IF NOT EXISTS delivery_note TEXT;
+
+-- 트리거가 한 세트를 다시 계산할 때 쓰는 조회 (고객의 최근 판매부터)
+CREATE INDEX IF NOT EXISTS idx_sales_customer_recorded
+    ON public.sales_records(customer_id, recorded_at DESC);
+
+-- 1. 세트 테이블 (set_key 는 lib/deliveryService.ts 의 중복 기준과 같다: 수령인|주소)
+CREATE TABLE IF NOT EXISTS public.customer_address_sets (
+    customer_id UUID NOT NULL REFERENCES public.customers(id) ON DELETE CASCADE,
+    set_key TEXT NOT NULL,
+    farm_id UUID NOT NULL REFERENCES public.farms(id) ON DELETE CASCADE,
+    recipient_name TEXT,
+    recipient_phone TEXT,
+    address TEXT NOT NULL,
+    postal_code TEXT,
+    detail_address TEXT,
+    delivery_note TEXT,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    last_used TIMESTAMPTZ NOT NULL,
+    last_record_id UUID NOT NULL,
+    PRIMARY KEY (customer_id, set_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_customer_address_sets_recent
+    ON public.customer_address_sets(customer_id, last_used DESC);
+
+-- RLS (조회만 허용, 쓰기는 트리거가 담당)
+ALTER TABLE public.customer_address_sets ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_policies
+    WHERE schemaname='public' AND tablename='customer_address_sets' AND policyname='customer_address_sets_owner'
+  ) THEN
+    EXECUTE $pol$
+      CREATE POLICY "customer_address_sets_owner" ON public.customer_address_sets
+      FOR SELECT
+      USING (farm_id IN (SELECT id FROM public.farms WHERE owner_id = auth.uid()))
+    $pol$;
+  END IF;
+
+  IF to_regclass('public.profiles') IS NOT NULL THEN
+    IF NOT EXISTS (
+      SELECT 1 FROM pg_policies
+      WHERE schemaname='public' AND tablename='customer_address_sets' AND policyname='customer_address_sets_admin'
+    ) THEN
+      EXECUTE $pol$
+        CREATE POLICY "customer_address_sets_admin" ON public.customer_address_sets
+        FOR SELECT
+        USING (EXISTS (SELECT 1 FROM public.profiles WHERE id = auth.uid() AND role = 'admin'))
+      $pol$;
+    END IF;
+  END IF;
+END $$;
+
+GRANT SELECT ON TABLE public.customer_address_sets TO authenticated;
+
+-- 2. 세트 하나를 남은 판매 행에서 다시 계산 (최신 행이 지워지거나 바뀌었을 때)
+CREATE OR REPLACE FUNCTION refresh_customer_address_set(p_customer_id UUID, p_set_key TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    DELETE FROM public.customer_address_sets
+    WHERE customer_id = p_customer_id AND set_key = p_set_key;
+
+    INSERT INTO public.customer_address_sets (
+        customer_id, set_key, farm_id, recipient_name, recipient_phone, address, postal_code,
+        detail_address, delivery_note, latitude, longitude, last_used, last_record_id
+    )
+    SELECT s.customer_id, p_set_key, s.farm_id, s.recipient_name, s.recipient_phone, s.address, s.postal_code,
+           s.detail_address, s.delivery_note, s.latitude, s.longitude, s.recorded_at, s.id
+    FROM public.sales_records s
+    WHERE s.customer_id = p_customer_id
+      AND COALESCE(s.address, '') <> ''
+      AND s.recorded_at IS NOT NULL
+      AND COALESCE(s.recipient_name, '') || '|' || s.address = p_set_key
+    ORDER BY s.recorded_at DESC, s.id DESC
+    LIMIT 1;
+END;
+$$;
+
+-- 3. 전체 다시 만들기: sales_records 를 한 번 훑어 (고객, 세트) 마다 가장 최근 행을 남긴다
+CREATE OR REPLACE FUNCTION rebuild_customer_address_sets()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    n INTEGER;
+BEGIN
+    DELETE FROM public.customer_address_sets;
+
+    INSERT INTO public.customer_address_sets (
+        customer_id, set_key, farm_id, recipient_name, recipient_phone, address, postal_code,
+        detail_address, delivery_note, latitude, longitude, last_used, last_record_id
+    )
+    SELECT DISTINCT ON (s.customer_id, COALESCE(s.recipient_name, '') || '|' || s.address)
+           s.customer_id, COALESCE(s.recipient_name, '') || '|' || s.address, s.farm_id,
+           s.recipient_name, s.recipient_phone, s.address, s.postal_code,
+           s.detail_address, s.delivery_note, s.latitude, s.longitude, s.recorded_at, s.id
+    FROM public.sales_records s
+    WHERE s.customer_id IS NOT NULL
+      AND COALESCE(s.address, '') <> ''
+      AND s.recorded_at IS NOT NULL
+    ORDER BY s.customer_id, COALESCE(s.recipient_name, '') || '|' || s.address, s.recorded_at DESC, s.id DESC;
+
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$;
+
+-- 두 함수는 트리거와 이 마이그레이션만 부른다. public 스키마의 함수는 PostgREST 가 /rpc 로 노출하므로
+-- 클라이언트가 전체 재구성이나 다른 농장의 세트 재계산을 부르지 못하게 실행 권한을 거둔다
+REVOKE EXECUTE ON FUNCTION refresh_customer_address_set(UUID, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rebuild_customer_address_sets() FROM PUBLIC, anon, authenticated;
+
+-- 4. 트리거: 판매 행이 바뀔 때 해당 세트만 갱신
+CREATE OR REPLACE FUNCTION apply_customer_address_set()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    old_key TEXT;
+    new_key TEXT;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.customer_id IS NOT NULL AND COALESCE(OLD.address, '') <> '' THEN
+        old_key := COALESCE(OLD.recipient_name, '') || '|' || OLD.address;
+        -- 이 행이 세트의 최신 행이었을 때만 남은 행에서 다시 고른다
+        IF EXISTS (
+            SELECT 1 FROM public.customer_address_sets
+            WHERE customer_id = OLD.customer_id AND set_key = old_key AND last_record_id = OLD.id
+        ) THEN
+            PERFORM refresh_customer_address_set(OLD.customer_id, old_key);
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.customer_id IS NOT NULL AND COALESCE(NEW.address, '') <> ''
+       AND NEW.recorded_at IS NOT NULL THEN
+        new_key := COALESCE(NEW.recipient_name, '') || '|' || NEW.address;
+        INSERT INTO public.customer_address_sets (
+            customer_id, set_key, farm_id, recipient_name, recipient_phone, address, postal_code,
+            detail_address, delivery_note, latitude, longitude, last_used, last_record_id
+        )
+        VALUES (
+            NEW.customer_id, new_key, NEW.farm_id, NEW.recipient_name, NEW.recipient_phone, NEW.address,
+            NEW.postal_code, NEW.detail_address, NEW.delivery_note, NEW.latitude, NEW.longitude,
+            NEW.recorded_at, NEW.id
+        )
+        ON CONFLICT (customer_id, set_key) DO UPDATE
+        SET farm_id = EXCLUDED.farm_id,
+            recipient_name = EXCLUDED.recipient_name,
+            recipient_phone = EXCLUDED.recipient_phone,
+            address = EXCLUDED.address,
+            postal_code = EXCLUDED.postal_code,
+            detail_address = EXCLUDED.detail_address,
+            delivery_note = EXCLUDED.delivery_note,
+            latitude = EXCLUDED.latitude,
+            longitude = EXCLUDED.longitude,
+            last_used = EXCLUDED.last_used,
+            last_record_id = EXCLUDED.last_record_id
+        WHERE customer_address_sets.last_used <= EXCLUDED.last_used;  -- 과거 날짜로 입력한 판매는 최신 세트를 덮지 않는다
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+-- 5. 기존 행 집계 (다시 실행해도 같은 결과)
+SELECT rebuild_customer_address_sets();
+
+DROP TRIGGER IF EXISTS customer_address_set_sync ON public.sales_records;
+CREATE TRIGGER customer_address_set_sync
+    AFTER INSERT OR DELETE OR UPDATE OF customer_id, recipient_name, recipient_phone, address, postal_code,
+        detail_address, delivery_note, latitude, longitude, recorded_at
+    ON public.sales_records
+    FOR EACH ROW
+    EXECUTE FUNCTION apply_customer_address_set();